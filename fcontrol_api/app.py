@@ -5,6 +5,8 @@ from fcontrol_api.utils.boot_profiler import mark
 
 mark('app.py: import start')
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.exceptions import HTTPException, RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
@@ -20,6 +22,9 @@ from fcontrol_api.exceptions import (
     validation_exception_handler,
 )
 from fcontrol_api.middlewares import middleware_stack
+from fcontrol_api.routers.aisweb import client as aisweb
+from fcontrol_api.services import portal_transparencia
+from fcontrol_api.services.auditoria import auditoria
 
 mark('app.py: middlewares imported')
 
@@ -28,12 +33,22 @@ from fcontrol_api.settings import Settings
 mark('app.py: settings imported')
 
 
-# Sem lifespan: removido deliberadamente para desacoplar o boot de
-# dependências externas (storage/Supabase). Inicializações preguiçosas
-# (ensure_bucket, _get_client, etc.) rodam na 1ª requisição que delas
-# precisar — se o storage estiver fora no momento do deploy, a API ainda
-# sobe e serve endpoints que não dependem dele. Ver services/storage.py.
-app = FastAPI()
+# Lifespan só de desligamento: o boot segue desacoplado de dependências
+# externas (storage/Supabase). Inicializações preguiçosas (ensure_bucket,
+# _get_client, etc.) rodam na 1ª requisição que delas precisar — se o
+# storage estiver fora no momento do deploy, a API ainda sobe e serve
+# endpoints que não dependem dele. Ver services/storage.py.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Grava a auditoria ainda em buffer (services/auditoria.py).
+    await auditoria.encerrar()
+    # Fecha os clientes HTTP compartilhados (keep-alive) das integrações.
+    await portal_transparencia.fechar_cliente()
+    await aisweb.fechar_cliente()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_exception_handler(HTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
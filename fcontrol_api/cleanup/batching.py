@@ -0,0 +1,125 @@
+"""Remoção em lotes para as cleanup tasks.
+
+Um DELETE único sobre meses de acúmulo segura os locks de todas as
+linhas até o commit e espera por qualquer linha que a API esteja
+alterando. Aqui cada lote:
+
+- escolhe até `batch_size` linhas com `FOR UPDATE SKIP LOCKED`: linha
+  travada por uma escrita da API fica para a próxima execução, o cleanup
+  nunca espera por ela;
+- apaga e commita na hora, soltando os locks;
+- dorme `sleep_seconds` antes do próximo, para não monopolizar o banco.
+
+Passado o `time_budget` (contado desde a criação do `BatchDeleter`), a
+task para onde está e o resto sai na próxima execução (`complete` fica
+False). Cada lote vira um item em `CleanupTaskResult.batches`.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fcontrol_api.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+settings = Settings()
+
+
+def locked_ids(model, *where, limit: int):
+    """SELECT dos ids de um lote, pulando as linhas travadas."""
+    return (
+        select(model.id)
+        .where(*where)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+class BatchDeleter:
+    """Executa lotes numa sessão, com orçamento de tempo e pausa."""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        batch_size: int | None = None,
+        time_budget: float | None = None,
+        sleep_seconds: float | None = None,
+    ):
+        self.session = session
+        self.batch_size = (
+            settings.CLEANUP_BATCH_SIZE if batch_size is None else batch_size
+        )
+        self.time_budget = (
+            settings.CLEANUP_TIME_BUDGET_SECONDS
+            if time_budget is None
+            else time_budget
+        )
+        self.sleep_seconds = (
+            settings.CLEANUP_BATCH_SLEEP_SECONDS
+            if sleep_seconds is None
+            else sleep_seconds
+        )
+        self.started = time.monotonic()
+        self.rows = 0
+        self.batches: list[dict] = []
+        self.complete = True
+
+    def expired(self) -> bool:
+        return time.monotonic() - self.started >= self.time_budget
+
+    async def run(self, step: Callable[[int], Awaitable[int]]) -> int:
+        """Chama `step(batch_size)` e commita, lote a lote.
+
+        `step` trava, apaga e devolve quantas linhas tratou; menos que
+        `batch_size` encerra. Devolve o total tratado nesta chamada.
+        """
+        total = 0
+        while True:
+            if self.expired():
+                self.complete = False
+                break
+
+            inicio = time.monotonic()
+            rows = await step(self.batch_size)
+            await self.session.commit()
+            if rows:
+                total += rows
+                self.rows += rows
+                self.batches.append({
+                    'batch': len(self.batches) + 1,
+                    'rows': rows,
+                    'seconds': round(time.monotonic() - inicio, 3),
+                })
+                logger.info(
+                    'Cleanup: lote %d com %d linhas (%d no total)',
+                    len(self.batches),
+                    rows,
+                    self.rows,
+                )
+
+            if rows < self.batch_size:
+                break
+            await asyncio.sleep(self.sleep_seconds)
+        return total
+
+    async def delete(self, model, *where) -> int:
+        """Apaga em lotes as linhas de `model` que atendem `where`."""
+
+        async def step(limit: int) -> int:
+            # O filtro se repete fora da subquery para o planner podar as
+            # partições (user_action_logs).
+            result = await self.session.execute(
+                delete(model).where(
+                    model.id.in_(locked_ids(model, *where, limit=limit)),
+                    *where,
+                )
+            )
+            return result.rowcount
+
+        return await self.run(step)
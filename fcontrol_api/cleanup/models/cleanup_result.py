@@ -10,3 +10,5 @@ class CleanupTaskResult:
     duration_seconds: float = 0.0
     errors: list[str] = field(default_factory=list)
     details: dict = field(default_factory=dict)
+    # Progresso dos deletes em lotes (cleanup.batching): um item por lote
+    batches: list[dict] = field(default_factory=list)
@@ -9,7 +9,12 @@ from fcontrol_api.cleanup.models.cleanup_result import CleanupTaskResult
 
 logger = logging.getLogger(__name__)
 
-ALLOWED_TASKS = {'old_login_logs', 'old_unavailability', 'expired_auth_codes'}
+ALLOWED_TASKS = {
+    'old_login_logs',
+    'old_unavailability',
+    'expired_auth_codes',
+    'expired_exports',
+}
 
 
 async def run_all_tasks(
@@ -95,6 +100,10 @@ def log_report(results: list[CleanupTaskResult]) -> None:
         )
         for err in r.errors:
             lines.append(f'  ERROR: {err}')
+        if r.batches:
+            lines.append(f'  {len(r.batches)} batch(es)')
+        if r.details.get('complete') is False:
+            lines.append('  INCOMPLETE: time budget exhausted')
 
     total = len(results)
     success = sum(1 for r in results if r.status == 'success')
@@ -1,9 +1,10 @@
 import time
 from datetime import datetime, timezone
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from fcontrol_api.cleanup.batching import BatchDeleter
 from fcontrol_api.cleanup.models.cleanup_result import CleanupTaskResult
 from fcontrol_api.models.security.auth import OAuth2AuthorizationCode
 
@@ -25,15 +26,15 @@ async def run(session: AsyncSession) -> CleanupTaskResult:
     """Remove AuthCodes expirados que nunca foram trocados por token."""
     start = time.monotonic()
     now = datetime.now(timezone.utc)
+    lotes = BatchDeleter(session)
 
     try:
-        result = await session.execute(
-            delete(OAuth2AuthorizationCode).where(
-                OAuth2AuthorizationCode.expires_at < now
-            )
+        await lotes.delete(
+            OAuth2AuthorizationCode,
+            OAuth2AuthorizationCode.expires_at < now,
         )
 
-        if result.rowcount == 0:
+        if lotes.rows == 0:
             return CleanupTaskResult(
                 task_name=TASK_NAME,
                 status='skipped',
@@ -41,20 +42,21 @@ async def run(session: AsyncSession) -> CleanupTaskResult:
                 details={'reason': 'Nenhum código expirado'},
             )
 
-        await session.commit()
-
         return CleanupTaskResult(
             task_name=TASK_NAME,
             status='success',
-            rows_affected=result.rowcount,
+            rows_affected=lotes.rows,
             duration_seconds=time.monotonic() - start,
-            details={'cutoff': now.isoformat()},
+            details={'cutoff': now.isoformat(), 'complete': lotes.complete},
+            batches=lotes.batches,
         )
     except Exception as e:
         await session.rollback()
         return CleanupTaskResult(
             task_name=TASK_NAME,
             status='error',
+            rows_affected=lotes.rows,
             duration_seconds=time.monotonic() - start,
             errors=[str(e)],
+            batches=lotes.batches,
         )
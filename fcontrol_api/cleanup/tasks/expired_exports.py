@@ -0,0 +1,101 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fcontrol_api.cleanup.batching import BatchDeleter
+from fcontrol_api.cleanup.models.cleanup_result import CleanupTaskResult
+from fcontrol_api.models.shared.exportacoes import ExportJob
+from fcontrol_api.services.exportacoes import BUCKET
+from fcontrol_api.services.storage import delete_file
+
+TASK_NAME = 'cleanup_expired_exports'
+DESCRIPTION = 'Exports expirados (job + arquivo no storage)'
+
+
+async def count(session: AsyncSession) -> int:
+    now = datetime.now(timezone.utc)
+    result = await session.execute(
+        select(func.count())
+        .select_from(ExportJob)
+        .where(ExportJob.expira_em < now)
+    )
+    return result.scalar() or 0
+
+
+async def run(session: AsyncSession) -> CleanupTaskResult:
+    """Remove jobs de export vencidos e os arquivos deles no storage.
+
+    O arquivo sai antes da linha: se o storage falhar, o job continua no
+    banco e a próxima execução tenta de novo (sem objeto órfão). Job
+    reaberto entre uma execução e outra ganha novo `expira_em` e não é
+    mais candidato. Job cujo arquivo falhou não volta nos lotes
+    seguintes da mesma execução.
+    """
+    start = time.monotonic()
+    now = datetime.now(timezone.utc)
+    lotes = BatchDeleter(session)
+    removidos: list[int] = []
+    falhas: list[int] = []
+    errors: list[str] = []
+
+    async def step(limit: int) -> int:
+        vencidos = (
+            await session.execute(
+                select(ExportJob.id, ExportJob.path)
+                .where(ExportJob.expira_em < now, ExportJob.id.not_in(falhas))
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+
+        lote: list[int] = []
+        for job_id, path in vencidos:
+            if path:
+                try:
+                    await asyncio.to_thread(delete_file, BUCKET, path)
+                except Exception as e:
+                    errors.append(f'{path}: {e}')
+                    falhas.append(job_id)
+                    continue
+            lote.append(job_id)
+
+        if lote:
+            await session.execute(
+                delete(ExportJob).where(ExportJob.id.in_(lote))
+            )
+            removidos.extend(lote)
+        return len(vencidos)
+
+    try:
+        await lotes.run(step)
+
+        if not removidos and not errors:
+            return CleanupTaskResult(
+                task_name=TASK_NAME,
+                status='skipped',
+                duration_seconds=time.monotonic() - start,
+                details={'reason': 'Nenhum export expirado'},
+            )
+
+        return CleanupTaskResult(
+            task_name=TASK_NAME,
+            status='error' if errors and not removidos else 'success',
+            rows_affected=len(removidos),
+            duration_seconds=time.monotonic() - start,
+            errors=errors,
+            details={'cutoff': now.isoformat(), 'complete': lotes.complete},
+            batches=lotes.batches,
+        )
+    except Exception as e:
+        await session.rollback()
+        return CleanupTaskResult(
+            task_name=TASK_NAME,
+            status='error',
+            rows_affected=len(removidos),
+            duration_seconds=time.monotonic() - start,
+            errors=[str(e)],
+            batches=lotes.batches,
+        )
@@ -1,76 +1,207 @@
+"""Retenção dos logs de login (action='login', resource='auth').
+
+`security.user_action_logs` é particionada por mês e, dentro do mês, por
+`action` (migration f2d7b4e8a1c6). Os logins de um mês ficam sozinhos na
+subpartição `user_action_logs_AAAA_MM_login`, então a retenção é um DROP
+dessa tabela — sem DELETE linha a linha, sem inchar a tabela e sem
+segurar lock nas partições em uso. Os outros logs do mês (auditoria de
+negócio, access_denied) ficam em `_demais` e não são tocados.
+
+Consequência: a retenção anda por mês inteiro. Sai o mês cujo fim já
+passou do corte (`days_threshold` dias atrás), ou seja, um login fica
+entre `days_threshold` e ~`days_threshold + 31` dias.
+
+A tarefa também cria as partições dos próximos meses
+(`security.garantir_particoes_user_action_logs`), para nenhum log novo
+cair na partição default. O que já estiver lá (mês sem partição) sai por
+DELETE em lotes (cleanup.batching). Os DDL desistem do lock em
+CLEANUP_LOCK_TIMEOUT_MS em vez de travar a API: a partição fica para a
+próxima execução.
+"""
+
 import time
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from fcontrol_api.cleanup.batching import BatchDeleter
 from fcontrol_api.cleanup.models.cleanup_result import CleanupTaskResult
 from fcontrol_api.models.security.logs import UserActionLog
+from fcontrol_api.settings import Settings
+
+settings = Settings()
 
 TASK_NAME = 'cleanup_old_login_logs'
-DESCRIPTION = 'Logs de login com mais de 30 dias'
+DESCRIPTION = 'Logs de login com mais de 30 dias (por mês inteiro)'
 
+# Meses adiante com partição já criada
+MESES_A_FRENTE = 3
 
-async def count(session: AsyncSession, days_threshold: int = 30) -> int:
+
+def _limite(days_threshold: int) -> datetime:
+    """Início do mês do corte: tudo antes dele já pode sair.
+
+    Usar UTC naive para compatibilidade com a coluna timestamp.
+    """
     cutoff_date = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
         days=days_threshold
     )
+    return cutoff_date.replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def _filtros(limite: datetime) -> tuple:
+    return (
+        UserActionLog.action == 'login',
+        UserActionLog.resource == 'auth',
+        UserActionLog.timestamp < limite,
+    )
+
+
+async def _particoes_vencidas(
+    session: AsyncSession, limite: datetime
+) -> list[str]:
+    """Subpartições `_login` de meses inteiros anteriores a `limite`."""
+    result = await session.execute(
+        text(
+            'SELECT tablename FROM pg_tables '
+            "WHERE schemaname = 'security' AND tablename ~ :padrao "
+            'ORDER BY tablename'
+        ),
+        {'padrao': r'^user_action_logs_[0-9]{4}_[0-9]{2}_login$'},
+    )
+    # O nome carrega o mês (user_action_logs_AAAA_MM_login); o mês sai
+    # inteiro quando começa antes de `limite`.
+    mes_limite = limite.strftime('%Y_%m')
+    return [
+        nome
+        for nome in result.scalars()
+        if nome.removeprefix('user_action_logs_')[:7] < mes_limite
+    ]
+
+
+async def _linhas_estimadas(session: AsyncSession, nome: str) -> int:
+    """Linhas da partição segundo o último ANALYZE (pg_class.reltuples).
+
+    Um count(*) leria a partição inteira só para contar o que o DROP
+    descarta. `reltuples` é -1 se a tabela nunca foi analisada.
+    """
+    reltuples = await session.scalar(
+        text('SELECT reltuples FROM pg_class WHERE oid = to_regclass(:nome)'),
+        {'nome': f'security."{nome}"'},
+    )
+    return max(int(reltuples or 0), 0)
+
+
+async def count(session: AsyncSession, days_threshold: int = 30) -> int:
     result = await session.execute(
         select(func.count())
         .select_from(UserActionLog)
-        .where(
-            UserActionLog.action == 'login',
-            UserActionLog.resource == 'auth',
-            UserActionLog.timestamp < cutoff_date,
-        )
+        .where(*_filtros(_limite(days_threshold)))
     )
     return result.scalar() or 0
 
 
+async def _ddl(session: AsyncSession, sql: str, **params):
+    """Executa DDL sem enfileirar a API atrás dele.
+
+    Sem o lock em CLEANUP_LOCK_TIMEOUT_MS, desiste (DBAPIError) e a
+    savepoint volta; quem chama pula o passo e segue. O commit logo
+    depois solta o lock.
+    """
+    async with session.begin_nested():
+        await session.execute(
+            text("SELECT set_config('lock_timeout', :valor, true)"),
+            {'valor': f'{settings.CLEANUP_LOCK_TIMEOUT_MS}ms'},
+        )
+        result = await session.execute(text(sql), params)
+        resultado = result.scalar() if result.returns_rows else None
+    await session.commit()
+    return resultado
+
+
 async def run(
     session: AsyncSession,
     days_threshold: int = 30,
 ) -> CleanupTaskResult:
-    """Remove logs de login antigos (action='login', resource='auth')."""
+    """Remove os logins de meses encerrados, derrubando as partições."""
     start = time.monotonic()
-    # Usar UTC naive para compatibilidade com a coluna timestamp
-    cutoff_date = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
-        days=days_threshold
-    )
+    limite = _limite(days_threshold)
+    lotes = BatchDeleter(session)
+    rows_affected = 0
+    removidas: list[str] = []
+    errors: list[str] = []
 
     try:
-        delete_result = await session.execute(
-            delete(UserActionLog).where(
-                UserActionLog.action == 'login',
-                UserActionLog.resource == 'auth',
-                UserActionLog.timestamp < cutoff_date,
+        try:
+            criadas = await _ddl(
+                session,
+                'SELECT security.garantir_particoes_user_action_logs('
+                'CAST(now() AS date), :meses)',
+                meses=MESES_A_FRENTE,
             )
-        )
+        except DBAPIError as e:
+            criadas = 0
+            errors.append(f'Partições futuras não criadas: {e.orig}')
+
+        for nome in await _particoes_vencidas(session, limite):
+            if lotes.expired():
+                lotes.complete = False
+                break
+            linhas = await _linhas_estimadas(session, nome)
+            try:
+                await _ddl(session, f'DROP TABLE security."{nome}"')
+            except DBAPIError as e:
+                errors.append(f'{nome}: {e.orig}')
+                continue
+            removidas.append(nome)
+            rows_affected += linhas
 
-        if delete_result.rowcount == 0:
+        # Sobra da partição default (logs de meses que não tinham
+        # partição). O planner poda as partições: só a default é lida.
+        rows_affected += await lotes.delete(UserActionLog, *_filtros(limite))
+
+        if rows_affected == 0 and not removidas and not errors:
             return CleanupTaskResult(
                 task_name=TASK_NAME,
                 status='skipped',
                 duration_seconds=time.monotonic() - start,
-                details={'reason': 'Nenhum log de login antigo'},
+                details={
+                    'reason': 'Nenhum log de login antigo',
+                    'partitions_created': criadas,
+                },
             )
 
-        await session.commit()
-
         return CleanupTaskResult(
             task_name=TASK_NAME,
-            status='success',
-            rows_affected=delete_result.rowcount,
+            status=(
+                'error'
+                if errors and not (rows_affected or removidas)
+                else 'success'
+            ),
+            rows_affected=rows_affected,
             duration_seconds=time.monotonic() - start,
+            errors=errors,
             details={
-                'cutoff_date': cutoff_date.isoformat(),
+                'cutoff_date': limite.isoformat(),
+                'partitions_dropped': removidas,
+                # As linhas das partições derrubadas são estimativa
+                'rows_estimated': bool(removidas),
+                'partitions_created': criadas,
+                'complete': lotes.complete,
             },
+            batches=lotes.batches,
         )
     except Exception as e:
         await session.rollback()
         return CleanupTaskResult(
             task_name=TASK_NAME,
             status='error',
+            rows_affected=rows_affected,
             duration_seconds=time.monotonic() - start,
             errors=[str(e)],
+            batches=lotes.batches,
         )
@@ -4,6 +4,7 @@ from datetime import date, timedelta
 from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from fcontrol_api.cleanup.batching import BatchDeleter, locked_ids
 from fcontrol_api.cleanup.models.cleanup_result import CleanupTaskResult
 from fcontrol_api.models.security.logs import UserActionLog
 from fcontrol_api.models.shared.indisp import Indisp
@@ -29,52 +30,65 @@ async def run(
     """Remove indisponibilidades com date_end anterior ao threshold."""
     start = time.monotonic()
     cutoff_date = date.today() - timedelta(days=days_threshold)
+    lotes = BatchDeleter(session)
+    ids_removed: list[int] = []
+    logs_deleted = 0
 
-    try:
-        query = select(Indisp.id).where(Indisp.date_end < cutoff_date)
-        result = await session.execute(query)
-        ids_to_delete = [row[0] for row in result.all()]
-
-        if not ids_to_delete:
-            return CleanupTaskResult(
-                task_name=TASK_NAME,
-                status='skipped',
-                duration_seconds=time.monotonic() - start,
-                details={'reason': 'Nenhuma indisponibilidade antiga'},
+    async def step(limit: int) -> int:
+        nonlocal logs_deleted
+        ids = list(
+            await session.scalars(
+                locked_ids(Indisp, Indisp.date_end < cutoff_date, limit=limit)
             )
+        )
+        if not ids:
+            return 0
 
         logs_result = await session.execute(
             delete(UserActionLog).where(
                 UserActionLog.resource == 'indisp',
-                UserActionLog.resource_id.in_(ids_to_delete),
+                UserActionLog.resource_id.in_(ids),
             )
         )
-        logs_deleted = logs_result.rowcount
+        logs_deleted += logs_result.rowcount
 
-        await session.execute(
-            delete(Indisp).where(Indisp.id.in_(ids_to_delete))
-        )
+        await session.execute(delete(Indisp).where(Indisp.id.in_(ids)))
+        ids_removed.extend(ids)
+        return len(ids)
 
-        await session.commit()
+    try:
+        await lotes.run(step)
+
+        if not ids_removed:
+            return CleanupTaskResult(
+                task_name=TASK_NAME,
+                status='skipped',
+                duration_seconds=time.monotonic() - start,
+                details={'reason': 'Nenhuma indisponibilidade antiga'},
+            )
 
         return CleanupTaskResult(
             task_name=TASK_NAME,
             status='success',
-            rows_affected=len(ids_to_delete),
+            rows_affected=len(ids_removed),
             duration_seconds=time.monotonic() - start,
             details={
-                'ids_removed': ids_to_delete,
+                'ids_removed': ids_removed,
                 'logs_deleted': logs_deleted,
                 'cutoff_date': str(cutoff_date),
+                'complete': lotes.complete,
             },
+            batches=lotes.batches,
         )
     except Exception as e:
         await session.rollback()
         return CleanupTaskResult(
             task_name=TASK_NAME,
             status='error',
+            rows_affected=lotes.rows,
             duration_seconds=time.monotonic() - start,
             errors=[str(e)],
+            batches=lotes.batches,
         )
 
 
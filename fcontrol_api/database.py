@@ -1,23 +1,160 @@
+import time
+from collections import deque
+from uuid import uuid4
+
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from fcontrol_api.settings import Settings
 
 settings = Settings()
 
-config = {
-    'pool_pre_ping': True,
-    'connect_args': {'command_timeout': 60},
-    'echo': False,
-}
+# Modos de pool (Settings.DB_POOL_MODE):
+# - 'queue': pool asyncpg comum, com cache de prepared statements. Para
+#   conexão direta ao Postgres (dev, ou Supabase na porta 5432).
+# - 'pgbouncer': mesmo pool, mas seguro atrás de pooler em modo
+#   transação (Supabase Supavisor, porta 6543): sem cache de statements
+#   e com nomes únicos, pois a conexão física muda a cada transação.
+# - 'null': NullPool — handshake TCP+TLS+auth a cada requisição.
+POOL_MODES = ('queue', 'pgbouncer', 'null')
+
+# Janela de amostras de espera usada nos percentis das métricas.
+_WAIT_SAMPLES = 1000
+
+
+def resolve_pool_mode(settings: Settings) -> str:
+    """Modo efetivo: o configurado, ou o padrão do ambiente.
+
+    Em produção o padrão é 'pgbouncer': funciona tanto na conexão direta
+    quanto no pooler de transação, então trocar a URL não quebra o deploy.
+    """
+    mode = settings.DB_POOL_MODE
+    if mode is None:
+        mode = 'pgbouncer' if settings.ENV == 'production' else 'queue'
+    if mode not in POOL_MODES:
+        raise ValueError(
+            f'DB_POOL_MODE inválido: {mode!r} (use um de {POOL_MODES})'
+        )
+    return mode
+
+
+class PoolStats:
+    """Contadores de aquisição de conexão do pool (por processo)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    def record(self, seconds: float) -> None:
+        self.acquired += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self._waits.append(seconds)
+
+    def percentile(self, pct: float) -> float:
+        if not self._waits:
+            return 0.0
+        ordered = sorted(self._waits)
+        idx = min(len(ordered) - 1, int(pct / 100 * len(ordered)))
+        return ordered[idx]
+
+
+pool_stats = PoolStats()
+
+
+class _MeteredPool:
+    """Mede o tempo de `_do_get`: espera por conexão livre no pool ou,
+    quando não há conexão para reusar (overflow/NullPool), o connect."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        pool_stats.record(time.perf_counter() - start)
+        return conn
+
+
+class MeteredQueuePool(_MeteredPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class MeteredNullPool(_MeteredPool, NullPool):
+    pass
+
+
+def _prepared_statement_name() -> str:
+    # Nome único por statement: atrás do pooler de transação, outra
+    # sessão pode já ter preparado "__asyncpg_stmt_1__" na mesma conexão.
+    return f'__asyncpg_{uuid4()}__'
+
+
+def engine_config(settings: Settings) -> dict:
+    """kwargs de `create_async_engine` para o modo de pool configurado."""
+    mode = resolve_pool_mode(settings)
+    config = {
+        'pool_pre_ping': True,
+        'connect_args': {'command_timeout': 60},
+        'echo': False,
+    }
+
+    if mode == 'null':
+        config['poolclass'] = MeteredNullPool
+        return config
+
+    # pool_size + max_overflow = teto de conexões por máquina. Com o
+    # padrão (5 + 20) o teto iguala o hard_limit = 25 do fly.toml: nenhuma
+    # requisição admitida pelo proxy espera por conexão.
+    config['poolclass'] = MeteredQueuePool
+    config['pool_size'] = settings.DB_POOL_SIZE
+    config['max_overflow'] = settings.DB_MAX_OVERFLOW
+    config['pool_timeout'] = settings.DB_POOL_TIMEOUT
+    config['pool_recycle'] = settings.DB_POOL_RECYCLE
+
+    if mode == 'pgbouncer':
+        config['connect_args'].update({
+            'statement_cache_size': 0,
+            'prepared_statement_cache_size': 0,
+            'prepared_statement_name_func': _prepared_statement_name,
+        })
+
+    return config
+
+
+POOL_MODE = resolve_pool_mode(settings)
+engine = create_async_engine(settings.DATABASE_URL, **engine_config(settings))
 
-if settings.ENV == 'production':
-    config['poolclass'] = NullPool
-else:
-    config['pool_size'] = 5
-    config['max_overflow'] = 5
 
-engine = create_async_engine(settings.DATABASE_URL, **config)
+def pool_status() -> dict:
+    """Saúde do pool do engine da aplicação (ver /admin/db/pool)."""
+    pool = engine.pool
+    queued = isinstance(pool, AsyncAdaptedQueuePool)
+    acquired = pool_stats.acquired
+    return {
+        'mode': POOL_MODE,
+        'size': pool.size() if queued else 0,
+        'checked_in': pool.checkedin() if queued else 0,
+        'checked_out': pool.checkedout() if queued else 0,
+        # Negativo enquanto o pool ainda não abriu pool_size conexões.
+        'overflow': pool.overflow() if queued else 0,
+        'max_overflow': pool._max_overflow if queued else 0,
+        'acquired': acquired,
+        'timeouts': pool_stats.timeouts,
+        'wait_avg_ms': (
+            pool_stats.wait_total / acquired * 1000 if acquired else 0.0
+        ),
+        'wait_p95_ms': pool_stats.percentile(95) * 1000,
+        'wait_max_ms': pool_stats.wait_max * 1000,
+    }
 
 
 async def get_session():
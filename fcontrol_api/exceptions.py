@@ -25,6 +25,8 @@ async def http_exception_handler(
             errors=errors,
             path=str(request.url.path),
         ).model_dump(),
+        # Ex.: Retry-After do 503 de back-pressure (services/documentos).
+        headers=exc.headers,
     )
 
 
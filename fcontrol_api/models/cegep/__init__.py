@@ -4,5 +4,6 @@ from . import (
     diarias,
     missoes,
     orcamento,
+    portal,
     propostas,
 )
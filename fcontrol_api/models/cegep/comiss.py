@@ -8,6 +8,7 @@ from fcontrol_api.models.shared.tenant import Tenant
 from fcontrol_api.models.shared.users import User
 
 from .base import Base
+from .missoes import FragMis
 
 
 class Comissionamento(Base):
@@ -47,3 +48,29 @@ class Comissionamento(Base):
     user = relationship(
         User, backref='comissionamento', lazy='selectin', uselist=False
     )
+
+
+class ComissContrib(Base):
+    """Contribuição de uma missão para o cache de um comissionamento.
+
+    Uma linha por (comissionamento, missão) que entra no agregado: os
+    totais de `custo_totais` e as datas usadas no módulo. Permite aplicar
+    só a diferença quando uma missão muda, sem reler todas as missões do
+    período (ver `services.comis.atualizar_comiss_da_missao`).
+    """
+
+    __tablename__ = 'comiss_contrib'
+
+    comiss_id: Mapped[int] = mapped_column(
+        ForeignKey(Comissionamento.id, ondelete='CASCADE'), primary_key=True
+    )
+    frag_id: Mapped[int] = mapped_column(
+        ForeignKey(FragMis.id, ondelete='CASCADE'),
+        primary_key=True,
+        index=True,
+    )
+    data_afast: Mapped[date]
+    data_regres: Mapped[date]
+    dias: Mapped[int]
+    diarias: Mapped[float]
+    valor: Mapped[float]
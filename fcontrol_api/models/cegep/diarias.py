@@ -2,6 +2,7 @@ from datetime import date
 from decimal import Decimal
 
 from sqlalchemy import (
+    BigInteger,
     CheckConstraint,
     ForeignKey,
     Identity,
@@ -71,3 +72,19 @@ class DiariaValor(Base):
     valor: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False)
     data_inicio: Mapped[date] = mapped_column(nullable=False)
     data_fim: Mapped[date] = mapped_column(nullable=True)
+
+
+class VersaoCache(Base):
+    """Versão de um cache de referência mantido em memória pelos workers.
+
+    Triggers nas tabelas de origem trocam `versao` por um valor novo da
+    sequence `versao_caches_seq` a cada escrita (ver migration). O worker
+    compara a versão lida com a do cache que tem em memória: difere,
+    recarrega. Sequence e não `versao + 1` porque um rollback desfaria o
+    incremento e o próximo escritor reusaria o número já visto.
+    """
+
+    __tablename__ = 'versao_caches'
+
+    nome: Mapped[str] = mapped_column(primary_key=True)
+    versao: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -0,0 +1,87 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    ForeignKey,
+    Identity,
+    Numeric,
+    String,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from fcontrol_api.models.shared.users import User
+
+from .base import Base
+
+
+class ConsultaPortal(Base):
+    """Resultado já obtido do Portal da Transparência para (cpf, mês).
+
+    Cache das consultas (ver services/sync_remuneracao): o mês fechado não
+    muda no Portal, então o resultado encontrado vale para sempre. O "não
+    encontrado" (`encontrado=False`) expira — o mês corrente aparece no
+    Portal só depois da folha.
+    """
+
+    __tablename__ = 'consultas_portal'
+
+    cpf: Mapped[str] = mapped_column(String(11), primary_key=True)
+    mes_ano: Mapped[date] = mapped_column(Date, primary_key=True)
+    encontrado: Mapped[bool]
+    remuneracao_bruta: Mapped[Decimal | None] = mapped_column(
+        Numeric(14, 2), default=None
+    )
+    remuneracao_liquida: Mapped[Decimal | None] = mapped_column(
+        Numeric(14, 2), default=None
+    )
+    consultado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        init=False,
+        server_default=func.now(),
+    )
+
+
+class SyncPortalJob(Base):
+    """Sincronização em lote (usuários da org x meses) com o Portal.
+
+    O progresso é retomável: o que já foi consultado está em
+    `ConsultaPortal`, então reabrir o job só consulta o que falta.
+    """
+
+    __tablename__ = 'sync_portal_jobs'
+
+    id: Mapped[int] = mapped_column(
+        Identity(), init=False, primary_key=True, nullable=False
+    )
+    uae: Mapped[str] = mapped_column(String(20), index=True)
+    mes_inicio: Mapped[date] = mapped_column(Date)
+    mes_fim: Mapped[date] = mapped_column(Date)
+    created_by: Mapped[int | None] = mapped_column(
+        ForeignKey(User.id, ondelete='SET NULL')
+    )
+    # executando -> concluido | erro
+    status: Mapped[str] = mapped_column(String(10), default='executando')
+    total: Mapped[int] = mapped_column(default=0)
+    processados: Mapped[int] = mapped_column(default=0)
+    falhas: Mapped[int] = mapped_column(default=0)
+    erro: Mapped[str | None] = mapped_column(default=None)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        init=False,
+        server_default=func.now(),
+    )
+    # Pulso do worker: job `executando` sem pulso há mais que
+    # `services.sync_remuneracao.PULSO_TIMEOUT` foi interrompido.
+    atualizado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        init=False,
+    )
+    concluido_em: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), init=False, default=None
+    )
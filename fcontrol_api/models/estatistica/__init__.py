@@ -1 +1 @@
-from . import esf_aer, etapa
+from . import esf_aer, etapa, horas_mes
@@ -15,6 +15,13 @@ from fcontrol_api.models.shared.tenant import Tenant
 
 from .base import Base
 
+# Mesma expressao da `descricao`: coluna gerada nao pode referenciar
+# outra coluna gerada, entao as classificacoes repetem a concatenacao.
+_DESCRICAO = (
+    "grupo || ' ' || prog || COALESCE(' ' || sub_prog, '')"
+    " || COALESCE(' ' || aplicacao, '')"
+)
+
 
 class EsforcoAereo(Base):
     __tablename__ = 'esf_aer'
@@ -29,11 +36,17 @@ class EsforcoAereo(Base):
     sub_prog: Mapped[str | None] = mapped_column(nullable=True)
     aplicacao: Mapped[str | None] = mapped_column(nullable=True)
     descricao: Mapped[str] = mapped_column(
-        Computed(
-            "grupo || ' ' || prog || COALESCE(' ' || sub_prog, '')"
-            " || COALESCE(' ' || aplicacao, '')",
-            persisted=True,
-        ),
+        Computed(_DESCRICAO, persisted=True),
+        init=False,
+    )
+    # Programa de simulador ('SML') / de GTT na descricao. Materializadas
+    # para os filtros nao reaplicarem LIKE sobre o historico inteiro.
+    is_sim: Mapped[bool] = mapped_column(
+        Computed(f"({_DESCRICAO}) LIKE '%SML%'", persisted=True),
+        init=False,
+    )
+    is_gtt: Mapped[bool] = mapped_column(
+        Computed(f"({_DESCRICAO}) LIKE '%GTT%'", persisted=True),
         init=False,
     )
 
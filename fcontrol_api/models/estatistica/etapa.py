@@ -5,6 +5,7 @@ from sqlalchemy import (
     Computed,
     ForeignKey,
     Identity,
+    Index,
     Numeric,
     SmallInteger,
     String,
@@ -21,6 +22,10 @@ from .base import Base
 
 class Missao(Base):
     __tablename__ = 'missao'
+    __table_args__ = (
+        Index('ix_missao_uae_is_simulador', 'uae', 'is_simulador'),
+        {'schema': 'estatistica'},
+    )
 
     id: Mapped[int] = mapped_column(
         SmallInteger,
@@ -75,6 +80,8 @@ class Etapa(Base):
             "nivel ~ '^[0-9]{3}$'",
             name='ck_etapa_nivel_fl',
         ),
+        # Etapas da missao num intervalo de datas (paineis por ano).
+        Index('ix_etapas_missao_id_data', 'missao_id', 'data'),
         {'schema': 'estatistica'},
     )
 
@@ -114,6 +121,13 @@ class Etapa(Base):
     sagem: Mapped[bool]
     parte1: Mapped[bool]
 
+    # Etapa com alguma OI de programa de simulador (`EsforcoAereo.is_sim`).
+    # Mantida pelo trigger `trg_etapa_is_sim` em `oi_etapa`, em qualquer
+    # caminho de escrita; a aplicacao nunca grava.
+    is_sim: Mapped[bool] = mapped_column(
+        server_default='false', index=True, init=False
+    )
+
 
 class OIEtapa(Base):
     __tablename__ = 'oi_etapa'
@@ -123,6 +137,13 @@ class OIEtapa(Base):
             name='ck_oi_etapa_tvoo_multiplo_5',
         ),
         CheckConstraint('tvoo >= 5', name='ck_oi_etapa_tvoo_min'),
+        # Horas por esforco aereo sem visitar o heap (index-only scan).
+        Index(
+            'ix_oi_etapa_esf_aer_id_etapa_id',
+            'esf_aer_id',
+            'etapa_id',
+            postgresql_include=['tvoo'],
+        ),
         {'schema': 'estatistica'},
     )
 
@@ -138,7 +159,15 @@ class OIEtapa(Base):
 
 class TripEtapa(Base):
     __tablename__ = 'trip_etapa'
-    __table_args__ = ({'schema': 'estatistica'},)
+    __table_args__ = (
+        Index(
+            'ix_trip_etapa_trip_id_func_etapa_id',
+            'trip_id',
+            'func',
+            'etapa_id',
+        ),
+        {'schema': 'estatistica'},
+    )
 
     id: Mapped[int] = mapped_column(Identity(), init=False, primary_key=True)
     etapa_id: Mapped[int] = mapped_column(
@@ -0,0 +1,89 @@
+"""Consolidado mensal das horas voadas (derivado de etapas/OIs/trips).
+
+As tabelas abaixo nao sao fonte de verdade: sao mantidas na mesma
+transacao das escritas de etapa (`services.horas_mes`) e reconstruidas
+por `scripts/rebuild_horas_mes.py` em caso de deriva. Cada uma tem o
+grao da tabela bruta que resume — somar linhas de graos diferentes
+duplicaria horas (uma etapa tem N OIs e N tripulantes).
+"""
+
+from datetime import date
+
+from sqlalchemy import Numeric, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class HorasMesAnv(Base):
+    """Uma linha por (org, mes, aeronave, simulador): grao da etapa."""
+
+    __tablename__ = 'horas_mes_anv'
+
+    uae: Mapped[str] = mapped_column(String(20), primary_key=True)
+    ano: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    mes: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    anv: Mapped[str] = mapped_column(primary_key=True)
+    is_simulador: Mapped[bool] = mapped_column(primary_key=True)
+
+    etapas: Mapped[int]
+    tvoo: Mapped[int]
+    pousos: Mapped[int]
+    pax: Mapped[int]
+    carga: Mapped[int]
+    comb: Mapped[int]
+    lub: Mapped[float] = mapped_column(Numeric(9, 1))
+
+
+class HorasMesOI(Base):
+    """Horas por esforco aereo e regime: grao da OI da etapa."""
+
+    __tablename__ = 'horas_mes_oi'
+
+    uae: Mapped[str] = mapped_column(String(20), primary_key=True)
+    ano: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    mes: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    anv: Mapped[str] = mapped_column(primary_key=True)
+    is_simulador: Mapped[bool] = mapped_column(primary_key=True)
+    esf_aer_id: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    reg: Mapped[str] = mapped_column(String(1), primary_key=True)
+
+    tvoo: Mapped[int]
+
+
+class HorasMesTrip(Base):
+    """Horas por tripulante e funcao exercida: grao do tripulante.
+
+    `sml` e o `Etapa.is_sim` (etapa com OI de programa de simulador) —
+    o recorte que o sebo e a escala usam, diferente de
+    `Missao.is_simulador`.
+    """
+
+    __tablename__ = 'horas_mes_trip'
+
+    uae: Mapped[str] = mapped_column(String(20), primary_key=True)
+    ano: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    mes: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    anv: Mapped[str] = mapped_column(primary_key=True)
+    sml: Mapped[bool] = mapped_column(primary_key=True)
+    trip_id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    func: Mapped[str] = mapped_column(String(3), primary_key=True)
+    func_bordo: Mapped[str] = mapped_column(String(2), primary_key=True)
+
+    tvoo: Mapped[int]
+    ultimo_voo: Mapped[date]
+
+
+class VersaoEtapas(Base):
+    """Contador por org, incrementado a cada escrita de etapa.
+
+    Nao resume horas: aproveita o mesmo ponto unico de manutencao para
+    dar uma versao dos dados brutos da org. Entra na chave dos exports
+    guardados no storage (`services.exportacoes`) — qualquer edicao de
+    etapa da org faz o proximo export ser gerado de novo.
+    """
+
+    __tablename__ = 'versao_etapas'
+
+    uae: Mapped[str] = mapped_column(String(20), primary_key=True)
+    versao: Mapped[int] = mapped_column(default=0)
@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, Identity, func
+from sqlalchemy import ForeignKey, Identity, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from fcontrol_api.models.shared.users import User
@@ -9,7 +10,23 @@ from .base import Base
 
 
 class UserActionLog(Base):
+    # Particionada por mês em `timestamp` e, dentro do mês, por `action`
+    # (`<mês>_login` e `<mês>_demais`); ver a migration f2d7b4e8a1c6 e o
+    # cleanup old_login_logs. No banco a PK é (id, timestamp, action) —
+    # exigência do particionamento —, mas `id` segue único (identity) e o
+    # ORM continua identificando a linha só por ele.
     __tablename__ = 'user_action_logs'
+    __table_args__ = (
+        Index('ix_user_action_logs_resource', 'resource', 'resource_id', 'id'),
+        Index('ix_user_action_logs_timestamp', 'timestamp', 'id'),
+        {
+            'schema': 'security',
+            'postgresql_partition_by': 'RANGE ("timestamp")',
+        },
+    )
+    # Traz o `timestamp` no INSERT: log_snapshot_action o lê na base, que
+    # pode ter sido gravada na mesma sessão (sem lazy-load no async).
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(Identity(), init=False, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey(User.id), nullable=False)
@@ -18,6 +35,11 @@ class UserActionLog(Base):
     resource_id: Mapped[int | None] = mapped_column(nullable=True)
     before: Mapped[str | None]
     after: Mapped[str | None]
+    # Logs de snapshot (services.logs.log_snapshot_action): `before`/
+    # `after` ficam nulos e o conteúdo vai aqui — completo no keyframe
+    # (`base_id` nulo) ou como diff sobre o `after` do log `base_id`.
+    snapshot: Mapped[dict | None] = mapped_column(JSONB, default=None)
+    base_id: Mapped[int | None] = mapped_column(default=None)
     timestamp: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, ForeignKey, Identity, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class ExportJob(Base):
+    """Geração assíncrona de um documento (ver services/exportacoes).
+
+    `chave` endereça o conteúdo — org, hash do filtro e versão dos
+    dados —, então há uma linha por arquivo distinto: pedir de novo o
+    mesmo export devolve o arquivo já gravado no storage até `expira_em`.
+    """
+
+    __tablename__ = 'export_jobs'
+
+    id: Mapped[int] = mapped_column(
+        Identity(), init=False, primary_key=True, nullable=False
+    )
+    tipo: Mapped[str] = mapped_column(String(30))
+    uae: Mapped[str] = mapped_column(String(20))
+    chave: Mapped[str] = mapped_column(String(64), unique=True)
+    file_name: Mapped[str]
+    expira_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), index=True
+    )
+    created_by: Mapped[int | None] = mapped_column(
+        ForeignKey('users.id', ondelete='SET NULL')
+    )
+    # pendente -> pronto | erro
+    status: Mapped[str] = mapped_column(String(10), default='pendente')
+    path: Mapped[str | None] = mapped_column(default=None)
+    erro: Mapped[str | None] = mapped_column(default=None)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        init=False,
+        server_default=func.now(),
+    )
+    concluido_em: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), init=False, default=None
+    )
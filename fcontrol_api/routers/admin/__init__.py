@@ -1,6 +1,14 @@
 from fastapi import APIRouter, Depends
 
-from fcontrol_api.routers.admin import diarias, funcoes, soldos
+from fcontrol_api.routers.admin import (
+    auditoria,
+    database,
+    diarias,
+    documentos,
+    funcoes,
+    senhas,
+    soldos,
+)
 from fcontrol_api.security import require_system_admin
 
 # Grupo admin de SISTEMA: control-plane acessível só ao admin de sistema
@@ -10,6 +18,10 @@ router = APIRouter(
     prefix='/admin',
     dependencies=[Depends(require_system_admin)],
 )
+router.include_router(auditoria.router)
+router.include_router(database.router)
 router.include_router(diarias.router)
+router.include_router(documentos.router)
 router.include_router(funcoes.router)
+router.include_router(senhas.router)
 router.include_router(soldos.router)
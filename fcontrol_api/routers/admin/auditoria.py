@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from fcontrol_api.schemas.logs import AuditoriaBufferPublic
+from fcontrol_api.schemas.response import ApiResponse
+from fcontrol_api.services.auditoria import auditoria
+from fcontrol_api.utils.responses import success_response
+
+# Fila da auditoria em buffer desta máquina (access_denied, login).
+router = APIRouter(prefix='/auditoria', tags=['Admin - Auditoria'])
+
+
+@router.get('/buffer', response_model=ApiResponse[AuditoriaBufferPublic])
+async def get_auditoria_buffer():
+    """Entradas pendentes, lotes gravados, falhas e descartes."""
+    return success_response(data=AuditoriaBufferPublic(**auditoria.status()))
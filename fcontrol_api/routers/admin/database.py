@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from fcontrol_api.database import pool_status
+from fcontrol_api.schemas.database import PoolStatusPublic
+from fcontrol_api.schemas.response import ApiResponse
+from fcontrol_api.utils.responses import success_response
+
+# Saúde do pool de conexões desta máquina (cada máquina do fly tem o seu
+# pool e os seus contadores). Gate de sistema aplicado no grupo admin.
+router = APIRouter(prefix='/db', tags=['Admin - Banco de Dados'])
+
+
+@router.get('/pool', response_model=ApiResponse[PoolStatusPublic])
+async def get_pool_status():
+    """Conexões em uso/ociosas, overflow e tempo de espera por conexão."""
+    return success_response(data=PoolStatusPublic(**pool_status()))
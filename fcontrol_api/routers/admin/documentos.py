@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from fcontrol_api.schemas.pool_limitado import PoolLimitadoPublic
+from fcontrol_api.schemas.response import ApiResponse
+from fcontrol_api.services.documentos import documentos
+from fcontrol_api.utils.responses import success_response
+
+# Saturação da geração de documentos desta máquina (vagas, fila do pool
+# de threads, rejeições). Gate de sistema aplicado no grupo admin.
+router = APIRouter(prefix='/documentos', tags=['Admin - Documentos'])
+
+
+@router.get('/pool', response_model=ApiResponse[PoolLimitadoPublic])
+async def get_documentos_pool():
+    """Vagas em uso, fila do pool, rejeições e espera na fila."""
+    return success_response(data=PoolLimitadoPublic(**documentos.status()))
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from fcontrol_api.schemas.pool_limitado import PoolLimitadoPublic
+from fcontrol_api.schemas.response import ApiResponse
+from fcontrol_api.services.senhas import senhas
+from fcontrol_api.utils.responses import success_response
+
+# Saturação do hash de senhas desta máquina. Mesmo payload do pool dos
+# documentos: `jobs_ativos` são logins/trocas de senha admitidos.
+router = APIRouter(prefix='/senhas', tags=['Admin - Senhas'])
+
+
+@router.get('/pool', response_model=ApiResponse[PoolLimitadoPublic])
+async def get_senhas_pool():
+    """Operações admitidas, fila do pool, rejeições e espera na fila."""
+    return success_response(data=PoolLimitadoPublic(**senhas.status()))
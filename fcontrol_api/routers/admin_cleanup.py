@@ -52,6 +52,7 @@ async def run_cleanup(
             duration_seconds=r.duration_seconds,
             errors=r.errors,
             details=r.details,
+            batches=r.batches,
         )
         for r in results
     ]
@@ -29,6 +29,7 @@ from fcontrol_api.schemas.aeromedica.cartoes import (
 from fcontrol_api.schemas.response import ApiResponse
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     ensure_org_permission_or_owner,
     get_current_user,
     permission_checker,
@@ -39,7 +40,7 @@ from fcontrol_api.utils.responses import success_response
 logger = logging.getLogger(__name__)
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/cartoes-saude', tags=['Aeromedica'])
 
@@ -1,24 +1,183 @@
+"""Cliente do AISWEB (DECEA) compartilhado, com cache e coalescência.
+
+- Um único `AsyncClient` por processo, com keep-alive: as consultas
+  reaproveitam a conexão TLS em vez de abrir uma nova a cada chamada.
+  HTTP/2 quando o pacote `h2` está instalado; sem ele, HTTP/1.1.
+- Cache em memória por (área, ICAO, parâmetros) com TTL por área: METAR
+  e TAF até a próxima publicação horária (limitado a `MET_TTL_MAX`, por
+  causa dos SPECI), sol até a virada do dia, ROTAER por `ROTAER_TTL`.
+  Só respostas 200 entram no cache.
+- Coalescência: consultas iguais simultâneas esperam a mesma chamada
+  ao AISWEB — 20 tripulantes abrindo o mesmo aeródromo geram uma só.
+- No máximo `MAX_CONCORRENTES` chamadas ao AISWEB em paralelo por
+  processo (o lote de `POST /met/batch` inclusive); acertos de cache
+  não passam pelo limite.
+
+O cache é por processo; entre máquinas, cada uma consulta uma vez.
+"""
+
+import asyncio
+import importlib.util
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from functools import lru_cache
+from http import HTTPStatus
 
-from httpx import AsyncClient
+import httpx
+from fastapi import HTTPException
+from httpx import AsyncClient, Limits
 
 from fcontrol_api.settings import Settings
 
+AISWEB_URL = 'https://aisweb.decea.gov.br/api/'
+
+# O METAR horário sai nos primeiros minutos da hora cheia.
+MET_PUBLICACAO = timedelta(minutes=5)
+MET_TTL_MAX = 10 * 60
+ROTAER_TTL = 7 * 24 * 3600
+CACHE_MAX = 512
+MAX_CONCORRENTES = 4
+
+_client: AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+_limite: asyncio.Semaphore | None = None
+# chave -> (expira em, time.monotonic(); corpo da resposta)
+_cache: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+_em_voo: dict[tuple, asyncio.Task] = {}
+
 
 @lru_cache
 def _get_settings() -> Settings:
     return Settings()
 
 
+def _http2_disponivel() -> bool:
+    return importlib.util.find_spec('h2') is not None
+
+
 def aisweb_client() -> AsyncClient:
-    settings = _get_settings()
-    return AsyncClient(
-        base_url='https://aisweb.decea.gov.br/api/',
-        params={
-            'apiKey': settings.AISWEB_API_KEY,
-            'apiPass': settings.AISWEB_API_PASS,
-        },
-        timeout=10,
-        follow_redirects=True,
-        headers={'User-Agent': 'Mozilla/5.0'},
-    )
+    """Cliente compartilhado, criado na primeira chamada.
+
+    As conexões do pool pertencem ao event loop em que foram abertas:
+    num loop novo (testes, reinício do worker) o cliente é recriado.
+    """
+    global _client, _client_loop, _limite  # noqa: PLW0603
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        settings = _get_settings()
+        _client = AsyncClient(
+            base_url=AISWEB_URL,
+            params={
+                'apiKey': settings.AISWEB_API_KEY,
+                'apiPass': settings.AISWEB_API_PASS,
+            },
+            timeout=10,
+            follow_redirects=True,
+            headers={'User-Agent': 'Mozilla/5.0'},
+            http2=_http2_disponivel(),
+            limits=Limits(
+                max_connections=20,
+                max_keepalive_connections=10,
+                keepalive_expiry=60,
+            ),
+        )
+        _client_loop = loop
+        _limite = asyncio.Semaphore(MAX_CONCORRENTES)
+    return _client
+
+
+async def fechar_cliente() -> None:
+    global _client, _client_loop  # noqa: PLW0603
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def limpar_cache() -> None:
+    _cache.clear()
+
+
+def ttl_met(agora: datetime | None = None) -> float:
+    """Segundos até a próxima publicação do METAR horário (hora cheia
+    + `MET_PUBLICACAO`), no máximo `MET_TTL_MAX`."""
+    agora = agora or datetime.now(timezone.utc)
+    proxima = agora.replace(minute=0, second=0, microsecond=0)
+    proxima += MET_PUBLICACAO
+    if proxima <= agora:
+        proxima += timedelta(hours=1)
+    return min((proxima - agora).total_seconds(), MET_TTL_MAX)
+
+
+def ttl_sol(agora: datetime | None = None) -> float:
+    """Segundos até a virada do dia (UTC): sem `dt_i`, o AISWEB devolve
+    o dia corrente."""
+    agora = agora or datetime.now(timezone.utc)
+    amanha = agora.replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    return (amanha - agora).total_seconds()
+
+
+def _ler_cache(chave: tuple) -> str | None:
+    entrada = _cache.get(chave)
+    if entrada is None:
+        return None
+    expira, texto = entrada
+    if expira <= time.monotonic():
+        del _cache[chave]
+        return None
+    _cache.move_to_end(chave)
+    return texto
+
+
+def _gravar_cache(chave: tuple, ttl: float, texto: str) -> None:
+    if ttl <= 0:
+        return
+    _cache[chave] = (time.monotonic() + ttl, texto)
+    _cache.move_to_end(chave)
+    while len(_cache) > CACHE_MAX:
+        _cache.popitem(last=False)
+
+
+async def _buscar(chave: tuple, params: dict[str, str], ttl: float) -> str:
+    client = aisweb_client()
+    try:
+        async with _limite:
+            response = await client.get('', params=params)
+        response.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_GATEWAY,
+            detail=f'AISWEB retornou HTTP {e.response.status_code}',
+        )
+    except httpx.RequestError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_GATEWAY,
+            detail='Falha ao conectar ao AISWEB',
+        )
+    _gravar_cache(chave, ttl, response.text)
+    return response.text
+
+
+async def consultar(params: dict[str, str], ttl: float) -> str:
+    """Corpo da resposta do AISWEB para `params` (área, ICAO e demais).
+
+    Vem do cache se houver; senão, junta-se à chamada em andamento com
+    os mesmos parâmetros ou abre uma. Falhas viram 502 e não são
+    guardadas.
+    """
+    chave = tuple(sorted(params.items()))
+    texto = _ler_cache(chave)
+    if texto is not None:
+        return texto
+
+    tarefa = _em_voo.get(chave)
+    if tarefa is None:
+        tarefa = asyncio.ensure_future(_buscar(chave, params, ttl))
+        _em_voo[chave] = tarefa
+        tarefa.add_done_callback(lambda _: _em_voo.pop(chave, None))
+    # shield: quem desistir (cliente desconectou) não cancela a chamada
+    # dos demais.
+    return await asyncio.shield(tarefa)
@@ -1,22 +1,54 @@
+import asyncio
 from http import HTTPStatus
+from typing import Annotated
 
 import defusedxml.ElementTree as ET
-import httpx
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from fcontrol_api.routers.aisweb.client import aisweb_client
+from fcontrol_api.database import get_session
+from fcontrol_api.models.shared.om import OrdemEtapa, OrdemMissao
+from fcontrol_api.routers.aisweb.client import consultar, ttl_met
 from fcontrol_api.schemas.response import ApiResponse
+from fcontrol_api.security import ActiveOrg
 from fcontrol_api.utils.responses import success_response
 
+Session = Annotated[AsyncSession, Depends(get_session)]
+
 router = APIRouter(prefix='/met', tags=['AISWEB'])
 
+MAX_BATCH = 30
+
 
 class MetData(BaseModel):
     metar: str
     taf: str | None = None
 
 
+class MetBatchIn(BaseModel):
+    """Lista de aeródromos ou a OM cujas etapas definem a lista."""
+
+    icaos: list[str] | None = Field(
+        default=None, min_length=1, max_length=MAX_BATCH
+    )
+    ordem_id: int | None = None
+
+    @model_validator(mode='after')
+    def icaos_ou_ordem(self) -> 'MetBatchIn':
+        if (self.icaos is None) == (self.ordem_id is None):
+            raise ValueError('Informe icaos ou ordem_id')
+        return self
+
+
+class MetBatchItem(BaseModel):
+    icao: str
+    metar: str | None = None
+    taf: str | None = None
+    erro: str | None = None
+
+
 def _clean(raw: str | None, prefix: str) -> str | None:
     if not raw:
         return None
@@ -24,35 +56,11 @@ def _clean(raw: str | None, prefix: str) -> str | None:
     return text or None
 
 
-@router.get(
-    '/{icao}',
-    status_code=HTTPStatus.OK,
-    response_model=ApiResponse[MetData],
-)
-async def get_met(icao: str):
-    try:
-        async with aisweb_client() as client:
-            response = await client.get(
-                '',
-                params={
-                    'area': 'met',
-                    'icaoCode': icao.upper(),
-                },
-            )
-            response.raise_for_status()
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_GATEWAY,
-            detail=f'AISWEB retornou HTTP {e.response.status_code}',
-        )
-    except httpx.RequestError:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_GATEWAY,
-            detail='Falha ao conectar ao AISWEB',
-        )
+async def _met(icao: str) -> MetData:
+    texto = await consultar({'area': 'met', 'icaoCode': icao}, ttl_met())
 
     try:
-        root = ET.fromstring(response.text)
+        root = ET.fromstring(texto)
         metar_raw = _clean(root.findtext('.//metar'), 'METAR ')
         taf_raw = _clean(root.findtext('.//taf'), 'TAF ')
     except ET.ParseError:
@@ -64,7 +72,74 @@ async def get_met(icao: str):
     if not metar_raw:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
-            detail=f'METAR não encontrado para {icao.upper()}',
+            detail=f'METAR não encontrado para {icao}',
+        )
+
+    return MetData(metar=metar_raw, taf=taf_raw)
+
+
+async def _met_item(icao: str) -> MetBatchItem:
+    try:
+        met = await _met(icao)
+    except HTTPException as e:
+        return MetBatchItem(icao=icao, erro=e.detail)
+    return MetBatchItem(icao=icao, metar=met.metar, taf=met.taf)
+
+
+async def _icaos_da_ordem(
+    session: AsyncSession, ordem_id: int, active_org: str
+) -> list[str]:
+    """Origens, destinos e alternativas das etapas, na ordem do voo."""
+    ordem = await session.scalar(
+        select(OrdemMissao.id).where(
+            OrdemMissao.id == ordem_id,
+            OrdemMissao.uae == active_org,
+            OrdemMissao.deleted_at.is_(None),
+        )
+    )
+    if ordem is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='Ordem de missão não encontrada',
         )
 
-    return success_response(data=MetData(metar=metar_raw, taf=taf_raw))
+    etapas = await session.execute(
+        select(OrdemEtapa.origem, OrdemEtapa.dest, OrdemEtapa.alternativa)
+        .where(OrdemEtapa.ordem_id == ordem_id)
+        .order_by(OrdemEtapa.dt_dep)
+    )
+    return [icao for etapa in etapas for icao in etapa if icao]
+
+
+@router.post(
+    '/batch',
+    status_code=HTTPStatus.OK,
+    response_model=ApiResponse[list[MetBatchItem]],
+)
+async def get_met_batch(
+    payload: MetBatchIn, session: Session, active_org: ActiveOrg
+):
+    """METAR/TAF de vários aeródromos numa chamada.
+
+    Com `ordem_id`, os aeródromos das etapas da OM (origem, destino e
+    alternativa). Acertos de cache voltam na hora; as demais consultas
+    ao AISWEB rodam em paralelo, limitadas pelo cliente. Falha num
+    aeródromo vai no `erro` do item, sem derrubar o lote.
+    """
+    if payload.ordem_id is not None:
+        icaos = await _icaos_da_ordem(session, payload.ordem_id, active_org)
+    else:
+        icaos = payload.icaos
+
+    unicos = list(dict.fromkeys(icao.strip().upper() for icao in icaos))
+    itens = await asyncio.gather(*(_met_item(icao) for icao in unicos))
+    return success_response(data=itens)
+
+
+@router.get(
+    '/{icao}',
+    status_code=HTTPStatus.OK,
+    response_model=ApiResponse[MetData],
+)
+async def get_met(icao: str):
+    return success_response(data=await _met(icao.upper()))
@@ -3,11 +3,10 @@ from typing import Annotated
 from xml.etree.ElementTree import Element, tostring
 
 import defusedxml.ElementTree as ET
-import httpx
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
-from fcontrol_api.routers.aisweb.client import aisweb_client
+from fcontrol_api.routers.aisweb.client import ROTAER_TTL, consultar
 from fcontrol_api.schemas.response import ApiResponse
 from fcontrol_api.utils.responses import success_response
 
@@ -269,26 +268,13 @@ async def get_rotaer(
     if force:
         params['force'] = force
 
-    try:
-        async with aisweb_client() as client:
-            response = await client.get('', params=params)
-            response.raise_for_status()
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_GATEWAY,
-            detail=f'AISWEB retornou HTTP {e.response.status_code}',
-        )
-    except httpx.RequestError:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_GATEWAY,
-            detail='Falha ao conectar ao AISWEB',
-        )
+    texto = await consultar(params, ROTAER_TTL)
 
     if force and force.lower() == 'html':
-        return success_response(data=RotaerResponse(rotaer_html=response.text))
+        return success_response(data=RotaerResponse(rotaer_html=texto))
 
     try:
-        root = ET.fromstring(response.text)
+        root = ET.fromstring(texto)
     except ET.ParseError:
         raise HTTPException(
             status_code=HTTPStatus.BAD_GATEWAY,
@@ -2,11 +2,10 @@ from http import HTTPStatus
 from typing import Annotated
 
 import defusedxml.ElementTree as ET
-import httpx
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
-from fcontrol_api.routers.aisweb.client import aisweb_client
+from fcontrol_api.routers.aisweb.client import consultar, ttl_sol
 from fcontrol_api.schemas.response import ApiResponse
 from fcontrol_api.utils.responses import success_response
 
@@ -41,23 +40,10 @@ async def get_sol(
     if dt_f:
         params['dt_f'] = dt_f
 
-    try:
-        async with aisweb_client() as client:
-            response = await client.get('', params=params)
-            response.raise_for_status()
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_GATEWAY,
-            detail=f'AISWEB retornou HTTP {e.response.status_code}',
-        )
-    except httpx.RequestError:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_GATEWAY,
-            detail='Falha ao conectar ao AISWEB',
-        )
+    texto = await consultar(params, ttl_sol())
 
     try:
-        root = ET.fromstring(response.text)
+        root = ET.fromstring(texto)
         items = root.findall('.//day')
     except ET.ParseError:
         raise HTTPException(
@@ -25,12 +25,15 @@ from fcontrol_api.models.shared.users import User
 from fcontrol_api.schemas.auth import DevTokenResponse, SwitchOrg, Token
 from fcontrol_api.schemas.response import ApiResponse
 from fcontrol_api.security import (
+    Principal,
+    check_password,
     create_access_token,
     get_current_user,
+    get_current_user_full,
     token_data,
-    verify_password,
     verify_pkce_challenge,
 )
+from fcontrol_api.services.auditoria import auditoria
 from fcontrol_api.services.auth import (
     resolve_default_org,
     user_has_org_access,
@@ -107,7 +110,12 @@ async def authorize(
 
     # 2. Autenticar o usuário
     user = await session.scalar(select(User).where(User.saram == saram))
-    if not user or not verify_password(password, user.password):
+    confere, novo_hash = (
+        await check_password(password, user.password)
+        if user
+        else (False, None)
+    )
+    if not confere:
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED, detail='Credenciais inválidas'
         )
@@ -122,6 +130,11 @@ async def authorize(
     # 2.5 Verificar permissões mínimas baseado no cliente
     await validate_user_client_access(user.id, client.client_id, session)
 
+    # 2.6 Hash com parâmetros antigos do Argon2: refeito com os atuais,
+    # gravado no commit do código abaixo.
+    if novo_hash:
+        user.password = novo_hash
+
     # 3. Gerar e salvar o código de autorização de uso único
     auth_code = secrets.token_urlsafe(32)
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
@@ -225,18 +238,13 @@ async def exchange_code_for_token(
     # --- Geração de Token ---
     user_agent = request.headers.get('user-agent')
 
-    await log_user_action(
-        session=session,
+    auditoria.registrar(
         user_id=user.id,
         action='login',
         resource='auth',
-        resource_id=None,
-        before=None,
         after={'user_agent': user_agent, 'client': client_id},
     )
 
-    await session.commit()
-
     active_org = await resolve_default_org(user.id, session, client_id)
     data = token_data(user, client_id, active_org)
     access_token = create_access_token(data=data)
@@ -253,7 +261,7 @@ async def exchange_code_for_token(
 @router.post('/refresh_token', response_model=ApiResponse[Token])
 async def refresh_access_token(
     request: Request,
-    user: User = Depends(get_current_user),
+    user: User = Depends(get_current_user_full),
 ):
     data = token_data(user, request.state.app_client, request.state.active_org)
     new_access_token = create_access_token(data=data)
@@ -271,7 +279,7 @@ async def switch_org(
     body: SwitchOrg,
     request: Request,
     session: Session,
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[User, Depends(get_current_user_full)],
 ):
     """Alterna a org ativa do usuário, reemitindo o token.
 
@@ -304,7 +312,7 @@ async def dev_login(
     user_id: int,
     session: Session,
     request: Request,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     """
     Endpoint exclusivo para desenvolvimento.
@@ -21,6 +21,7 @@ from fcontrol_api.schemas.cegep.comiss import (
     ComissFechamento,
     ComissLogOut,
     ComissMissaoPreview,
+    ComissModuloJanela,
     ComissPublic,
     ComissSchema,
     ComissSummaryResponse,
@@ -31,23 +32,29 @@ from fcontrol_api.schemas.response import ApiResponse, ResponseStatus
 from fcontrol_api.schemas.users import UserPublic
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     ensure_org_permission_or_owner,
     get_current_user,
     permission_checker,
 )
 from fcontrol_api.services.comis import (
+    afastamentos_continuos,
     filtro_missoes_periodo,
     recalcular_cache_comiss,
     validar_fechamento_comiss,
     verificar_conflito_comiss,
 )
 from fcontrol_api.services.custos import custo_missao
-from fcontrol_api.services.logs import log_user_action, missao_snapshot
+from fcontrol_api.services.logs import (
+    log_snapshot_action,
+    log_user_action,
+    missao_snapshot,
+)
 from fcontrol_api.services.missao import verificar_integridade_missao
 from fcontrol_api.utils.responses import success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/comiss', tags=['CEGEP'])
 
@@ -381,6 +388,10 @@ async def get_cmto_by_id(
         or abs(diarias_live - cache.get('diarias_comp', 0)) > 0.01
     )
 
+    afastamentos = afastamentos_continuos(
+        (m.afast.date(), m.regres.date()) for m in missoes
+    )
+
     logs_query = (
         select(UserActionLog)
         .options(selectinload(UserActionLog.user))
@@ -438,6 +449,13 @@ async def get_cmto_by_id(
         cache_inconsistente=cache_inconsistente,
         missoes=missoes,
         logs=logs,
+        maior_afastamento=afastamentos.maior,
+        modulos=[
+            ComissModuloJanela(
+                inicio=inicio, fim=fim, dias=(fim - inicio).days + 1
+            )
+            for inicio, fim in afastamentos.janelas
+        ],
     )
 
     return success_response(data=detail)
@@ -764,7 +782,7 @@ async def delete_cmto(
         )
         missao_carregada = missoes_carregadas[frag_id]
         if remaining == 0:
-            await log_user_action(
+            await log_snapshot_action(
                 session=session,
                 user_id=current_user.id,
                 action='delete',
@@ -782,7 +800,7 @@ async def delete_cmto(
                 missao_carregada.pernoites,
                 missao_carregada.etiquetas,
             )
-            await log_user_action(
+            await log_snapshot_action(
                 session=session,
                 user_id=current_user.id,
                 action='update',
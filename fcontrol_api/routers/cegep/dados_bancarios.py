@@ -1,16 +1,17 @@
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from http import HTTPStatus
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from pydantic import BaseModel, Field, model_validator
 from sqlalchemy import delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from fcontrol_api.database import get_session
 from fcontrol_api.models.cegep.dados_bancarios import DadosBancarios
+from fcontrol_api.models.cegep.portal import SyncPortalJob
 from fcontrol_api.models.shared.users import User
 from fcontrol_api.schemas.cegep.dados_bancarios import (
     DadosBancariosBulkDelete,
@@ -24,15 +25,23 @@ from fcontrol_api.schemas.cegep.dados_bancarios import (
 from fcontrol_api.schemas.response import ApiResponse
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     ensure_org_permission_or_owner,
     get_current_user,
     permission_checker,
 )
-from fcontrol_api.services.portal_transparencia import buscar_remuneracao
+from fcontrol_api.services.sync_remuneracao import (
+    MAX_MESES,
+    consultar_remuneracao,
+    executar_sync,
+    interrompido,
+    meses_do_intervalo,
+    reservar_sync,
+)
 from fcontrol_api.utils.responses import success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/dados-bancarios', tags=['CEGEP'])
 
@@ -58,6 +67,49 @@ class SyncRemuneracaoResponse(BaseModel):
     remuneracao_liquida: Optional[Decimal] = None
 
 
+class SyncLoteRequest(BaseModel):
+    mes_inicio: date = Field(description='Primeiro mes (qualquer dia)')
+    mes_fim: date = Field(description='Ultimo mes (qualquer dia)')
+
+    @model_validator(mode='after')
+    def intervalo_valido(self) -> 'SyncLoteRequest':
+        meses = len(meses_do_intervalo(self.mes_inicio, self.mes_fim))
+        if meses == 0:
+            raise ValueError('mes_fim nao pode ser anterior a mes_inicio')
+        if meses > MAX_MESES:
+            raise ValueError(f'Intervalo maximo de {MAX_MESES} meses')
+        return self
+
+
+class SyncLoteResponse(BaseModel):
+    id: int
+    mes_inicio: date
+    mes_fim: date
+    # executando | interrompido | concluido | erro
+    status: str
+    total: int
+    processados: int
+    falhas: int
+    erro: Optional[str] = None
+    created_at: datetime
+    concluido_em: Optional[datetime] = None
+
+
+def _lote_dict(job: SyncPortalJob) -> dict:
+    return {
+        'id': job.id,
+        'mes_inicio': job.mes_inicio,
+        'mes_fim': job.mes_fim,
+        'status': 'interrompido' if interrompido(job) else job.status,
+        'total': job.total,
+        'processados': job.processados,
+        'falhas': job.falhas,
+        'erro': job.erro,
+        'created_at': job.created_at,
+        'concluido_em': job.concluido_em,
+    }
+
+
 @router.get(
     '/',
     response_model=ApiResponse[list[DadosBancariosWithUser]],
@@ -287,7 +339,9 @@ async def sync_remuneracao_portal(
     """Consulta o Portal da Transparencia para um usuario+mes.
 
     Funciona em modo create (sem registro ainda) e edit. NAO persiste
-    no banco — o frontend decide se preenche o formulario e salva.
+    nos dados bancarios — o frontend decide se preenche o formulario e
+    salva. O resultado fica no cache de consultas do Portal: repetir a
+    consulta (ou consultar um mes ja sincronizado em lote) nao gasta cota.
     """
     user = await session.scalar(
         select(User).where(
@@ -305,7 +359,7 @@ async def sync_remuneracao_portal(
             detail='Usuário sem CPF cadastrado',
         )
 
-    resultado = await buscar_remuneracao(user.cpf, payload.mes_ano)
+    resultado = await consultar_remuneracao(session, user.cpf, payload.mes_ano)
 
     return success_response(
         data=SyncRemuneracaoResponse(
@@ -318,6 +372,69 @@ async def sync_remuneracao_portal(
     )
 
 
+@router.post(
+    '/sync-remuneracao/lote',
+    status_code=HTTPStatus.ACCEPTED,
+    response_model=ApiResponse[SyncLoteResponse],
+    dependencies=[ViewBanco],
+)
+async def sync_remuneracao_lote(
+    session: Session,
+    active_org: ActiveOrg,
+    user: CurrentUser,
+    payload: SyncLoteRequest,
+    background_tasks: BackgroundTasks,
+):
+    """Sincroniza com o Portal todos os militares da org x meses.
+
+    Roda em background, respeitando o limite do Portal; o progresso vem
+    em `GET /sync-remuneracao/lote/{id}`. Com um lote da org em
+    andamento, devolve esse. Pedir de novo o mesmo intervalo retoma de
+    onde parou — o ja consultado nao e consultado outra vez.
+    """
+    job, executar = await reservar_sync(
+        session,
+        uae=active_org,
+        mes_inicio=payload.mes_inicio,
+        mes_fim=payload.mes_fim,
+        user_id=user.id,
+    )
+    await session.commit()
+    if executar:
+        background_tasks.add_task(executar_sync, session, job.id)
+
+    return success_response(
+        data=_lote_dict(job),
+        message=(
+            'Sincronização iniciada'
+            if executar
+            else 'Sincronização já em andamento'
+        ),
+    )
+
+
+@router.get(
+    '/sync-remuneracao/lote/{job_id}',
+    response_model=ApiResponse[SyncLoteResponse],
+    dependencies=[ViewBanco],
+)
+async def status_sync_remuneracao_lote(
+    job_id: int, session: Session, active_org: ActiveOrg
+):
+    """Progresso de um lote de sincronizacao da org."""
+    job = await session.scalar(
+        select(SyncPortalJob).where(
+            SyncPortalJob.id == job_id, SyncPortalJob.uae == active_org
+        )
+    )
+    if not job:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='Sincronização não encontrada',
+        )
+    return success_response(data=_lote_dict(job))
+
+
 @router.post(
     '/',
     status_code=HTTPStatus.CREATED,
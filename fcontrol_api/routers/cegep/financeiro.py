@@ -17,6 +17,7 @@ from fcontrol_api.schemas.cegep.missoes import (
 from fcontrol_api.schemas.response import ApiPaginatedResponse
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     ensure_org_permission_or_owner,
     get_current_user,
 )
@@ -24,7 +25,7 @@ from fcontrol_api.services.custos import custo_missao
 from fcontrol_api.utils.responses import paginated_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/financeiro', tags=['CEGEP'])
 
@@ -1,4 +1,3 @@
-import json
 from datetime import date, datetime, time
 from http import HTTPStatus
 from typing import Annotated
@@ -34,14 +33,19 @@ from fcontrol_api.schemas.response import (
 from fcontrol_api.schemas.users import UserPublic
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     get_current_user,
     permission_checker,
 )
 from fcontrol_api.services.comis import (
-    recalcular_comiss_afetados,
+    atualizar_comiss_da_missao,
     verificar_usrs_comiss,
 )
-from fcontrol_api.services.logs import log_user_action, missao_snapshot
+from fcontrol_api.services.logs import (
+    log_snapshot_action,
+    missao_snapshot,
+    snapshot_views,
+)
 from fcontrol_api.services.missao import (
     adicionar_missao,
     sincronizar_custos_missao,
@@ -52,7 +56,7 @@ from fcontrol_api.services.missao import (
 from fcontrol_api.utils.responses import paginated_response, success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/missoes', tags=['CEGEP'])
 
@@ -311,15 +315,11 @@ async def get_missao(id: int, session: Session, active_org: ActiveOrg):
     )
 
     logs = []
-    for log in logs_result.all():
-        try:
-            before = json.loads(log.before) if log.before else None
-        except (json.JSONDecodeError, TypeError):
-            before = None
-        try:
-            after = json.loads(log.after) if log.after else None
-        except (json.JSONDecodeError, TypeError):
-            after = None
+    logs_missao = logs_result.all()
+    # Snapshots guardados como diff: reconstrói before/after completos.
+    views = await snapshot_views(session, logs_missao)
+    for log in logs_missao:
+        before, after = views[log.id]
         logs.append(
             MissaoLogOut(
                 id=log.id,
@@ -435,7 +435,7 @@ async def create_or_update_missao(
         missao, payload.users, payload.pernoites, payload.etiquetas
     )
     if not payload.id or before_snapshot != after_snapshot:
-        await log_user_action(
+        await log_snapshot_action(
             session=session,
             user_id=current_user.id,
             action='update' if payload.id else 'create',
@@ -490,11 +490,22 @@ async def delete_fragmis(
     )
     await session.execute(delete(UserFrag).where(UserFrag.frag_id == id))
 
+    # Retira a missão dos caches dos comissionamentos (por diferença)
+    # antes de removê-la: a contribuição gravada some junto com ela.
+    await atualizar_comiss_da_missao(
+        id,
+        [
+            (user_id, active_org, afast, regres)
+            for user_id, afast, regres in comiss_users
+        ],
+        session,
+    )
+
     await session.delete(db_frag)
 
     # Registra a exclusão. Os logs anteriores da missão são preservados
     # para manter a trilha de auditoria mesmo após a remoção.
-    await log_user_action(
+    await log_snapshot_action(
         session=session,
         user_id=current_user.id,
         action='delete',
@@ -504,12 +515,6 @@ async def delete_fragmis(
         after=None,
     )
 
-    # Recalcular cache dos comissionamentos afetados após deletar
-    for user_id, afast, regres in comiss_users:
-        await recalcular_comiss_afetados(
-            user_id, afast, regres, session, active_org
-        )
-
     await session.commit()
 
     return success_response(message='Missão removida com sucesso')
@@ -9,11 +9,11 @@ from sqlalchemy.future import select
 
 from fcontrol_api.database import get_session
 from fcontrol_api.models.cegep.missoes import Etiqueta
-from fcontrol_api.models.shared.users import User
 from fcontrol_api.schemas.etiquetas import EtiquetaInput, EtiquetaSchema
 from fcontrol_api.schemas.response import ApiResponse
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     get_current_user,
     permission_checker,
 )
@@ -21,7 +21,7 @@ from fcontrol_api.services.logs import log_user_action
 from fcontrol_api.utils.responses import success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/missoes/etiquetas', tags=['CEGEP'])
 
@@ -10,7 +10,6 @@ from sqlalchemy.orm import selectinload
 from fcontrol_api.database import get_session
 from fcontrol_api.models.cegep.orcamento import OrcamentoAnual
 from fcontrol_api.models.security.logs import UserActionLog
-from fcontrol_api.models.shared.users import User
 from fcontrol_api.schemas.cegep.orcamento import (
     OrcamentoAnualCreate,
     OrcamentoAnualOut,
@@ -20,6 +19,7 @@ from fcontrol_api.schemas.cegep.orcamento import (
 from fcontrol_api.schemas.response import ApiResponse
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     get_current_user,
     permission_checker,
 )
@@ -27,7 +27,7 @@ from fcontrol_api.services.logs import log_user_action
 from fcontrol_api.utils.responses import success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/orcamento', tags=['CEGEP'])
 
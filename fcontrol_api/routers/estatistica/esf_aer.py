@@ -3,7 +3,7 @@ from http import HTTPStatus
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import case, extract, func, or_, select
+from sqlalchemy import case, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fcontrol_api.database import get_session
@@ -12,7 +12,7 @@ from fcontrol_api.models.estatistica.esf_aer import (
     EsfAerAlocHist,
     EsforcoAereo,
 )
-from fcontrol_api.models.estatistica.etapa import Etapa, Missao, OIEtapa
+from fcontrol_api.models.estatistica.horas_mes import HorasMesOI
 from fcontrol_api.schemas.estatistica.esf_aer import (
     EsfAerDiffRow,
     EsfAerHistorico,
@@ -78,23 +78,22 @@ async def get_esf_aer_resumo(
 ):
     """Resumo de Esforco Aereo do ano para a unidade ativa.
 
-    Quando `simulador` e False, os programas de simulador (descricao contendo
-    'SML') sao excluidos tanto dos itens quanto dos totais. Todo o calculo —
-    inclusive a subtracao das horas do simulador — e feito aqui; o frontend
-    apenas exibe o resultado.
+    Quando `simulador` e False, os programas de simulador (`is_sim`:
+    descricao contendo 'SML') sao excluidos tanto dos itens quanto dos
+    totais. Todo o calculo — inclusive a subtracao das horas do simulador
+    — e feito aqui; o frontend apenas exibe o resultado.
     """
-    # Subquery: OIEtapa filtrada por ano e pela unidade ativa (via Missao).
+    # Subquery: horas das OIs do ano da unidade ativa, do consolidado
+    # mensal (uma linha por mes/aeronave/regime, nao por OI).
     oi_sub = (
         select(
-            OIEtapa.esf_aer_id,
-            OIEtapa.tvoo,
-            extract('month', Etapa.data).label('mes'),
+            HorasMesOI.esf_aer_id,
+            HorasMesOI.tvoo,
+            HorasMesOI.mes,
         )
-        .join(Etapa, Etapa.id == OIEtapa.etapa_id)
-        .join(Missao, Missao.id == Etapa.missao_id)
         .where(
-            extract('year', Etapa.data) == ano_ref,
-            Missao.uae == active_org,
+            HorasMesOI.ano == ano_ref,
+            HorasMesOI.uae == active_org,
         )
         .subquery('oi_ano')
     )
@@ -141,7 +140,7 @@ async def get_esf_aer_resumo(
     )
 
     if not simulador:
-        query = query.where(EsforcoAereo.descricao.notlike('%SML%'))
+        query = query.where(EsforcoAereo.is_sim.is_(False))
 
     query = (
         query
@@ -422,12 +421,7 @@ async def update_esf_aer(
     total_antes = sum(
         a.alocado
         for a in aloc_rows
-        if 'SML'
-        not in (
-            id_to_esf[a.esfaer_id].descricao
-            if a.esfaer_id in id_to_esf
-            else ''
-        )
+        if a.esfaer_id not in id_to_esf or not id_to_esf[a.esfaer_id].is_sim
     )
 
     # 3. Processar cada item do payload
@@ -578,7 +572,7 @@ async def update_esf_aer(
         if aloc.id in removed_set:
             continue
         esf = all_esf.get(eid)
-        if esf and 'SML' in esf.descricao:
+        if esf and esf.is_sim:
             continue
         total_depois += aloc.alocado
 
@@ -1,12 +1,19 @@
 from datetime import date, datetime
 from http import HTTPStatus
-from typing import Annotated
-
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from typing import Annotated, Literal
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+)
 from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, select
 from sqlalchemy import delete as sa_delete
 from sqlalchemy import func as sql_func
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fcontrol_api.database import get_session
@@ -21,6 +28,7 @@ from fcontrol_api.models.estatistica.etapa import (
     TipoMissao,
     TripEtapa,
 )
+from fcontrol_api.models.shared.exportacoes import ExportJob
 from fcontrol_api.models.shared.organizacao import Organizacao
 from fcontrol_api.models.shared.tripulantes import Tripulante
 from fcontrol_api.models.shared.users import User
@@ -34,11 +42,24 @@ from fcontrol_api.schemas.estatistica.etapa import (
     EtapaUpdate,
     MissaoComEtapasOut,
 )
+from fcontrol_api.schemas.exportacoes import ExportJobPublic
 from fcontrol_api.schemas.response import (
     ApiPaginatedResponse,
     ApiResponse,
 )
-from fcontrol_api.security import ActiveOrg, permission_checker
+from fcontrol_api.security import (
+    ActiveOrg,
+    Principal,
+    get_current_user,
+    permission_checker,
+)
+from fcontrol_api.services.dados_etapas import (
+    ARROW_MEDIA_TYPE,
+    CSV_MEDIA_TYPE,
+    stream_etapas_arrow,
+    stream_etapas_csv,
+)
+from fcontrol_api.services.documentos import VagaDocumento, documentos
 from fcontrol_api.services.etapas import (
     add_especificos,
     assert_anv_simulador_consistency,
@@ -52,10 +73,21 @@ from fcontrol_api.services.etapas import (
     like_safe,
     list_etapas_flat,
 )
-from fcontrol_api.services.excel_etapas import generate_etapas_xlsx
+from fcontrol_api.services.excel_etapas import stream_etapas_xlsx
+from fcontrol_api.services.exportacoes import (
+    XLSX_MEDIA_TYPE,
+    chave_export,
+    gerar_export_etapas,
+    reservar_job,
+    situacao,
+    url_do_job,
+    versao_etapas,
+)
+from fcontrol_api.services.horas_mes import atualizar_horas_mes, mes_da_etapa
 from fcontrol_api.utils.responses import success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 EtapaId = Annotated[int, Path()]
 
@@ -433,6 +465,8 @@ async def create_etapa(
         heavy_cds=data.heavy_cds,
     )
 
+    await atualizar_horas_mes(session, {mes_da_etapa(missao.uae, etapa.data)})
+
     await session.commit()
     await session.refresh(etapa)
     return success_response(
@@ -469,6 +503,7 @@ async def update_etapa(
             detail='Etapa nao encontrada',
         )
     etapa, is_simulador = row
+    mes_antigo = mes_da_etapa(active_org, etapa.data)
 
     new_data = data.data if data.data is not None else etapa.data
     new_anv = data.anv if data.anv is not None else etapa.anv
@@ -621,6 +656,10 @@ async def update_etapa(
             heavy_cds=data.heavy_cds or [],
         )
 
+    await atualizar_horas_mes(
+        session, {mes_antigo, mes_da_etapa(active_org, etapa.data)}
+    )
+
     await session.commit()
     await session.refresh(etapa)
     return success_response(
@@ -656,50 +695,40 @@ async def delete_etapa(
     await session.execute(sa_delete(REVOEtapa).where(REVOEtapa.etapa_id == id))
     await session.execute(sa_delete(HeavyCDS).where(HeavyCDS.etapa_id == id))
 
+    mes = mes_da_etapa(active_org, etapa.data)
     await session.delete(etapa)
+    await atualizar_horas_mes(session, {mes})
     await session.commit()
     return success_response(
         message='Etapa excluida com sucesso',
     )
 
 
-@router.post('/export', dependencies=[ViewEtapa])
-async def export_etapas(
-    data: EtapaExportRequest,
-    session: Session,
-    active_org: ActiveOrg,
-) -> StreamingResponse:
-    """Exporta etapas selecionadas para Excel (escopadas pela org ativa)."""
-    etapas_result = await session.scalars(
-        select(Etapa)
-        .join(Missao, Missao.id == Etapa.missao_id)
-        .where(Etapa.id.in_(data.ids), Missao.uae == active_org)
-        .order_by(Etapa.data, Etapa.dep, Etapa.id)
-    )
-    etapas = list(etapas_result.all())
+async def _preparar_export(
+    session: AsyncSession, data: EtapaExportRequest, active_org: str
+) -> dict:
+    """Filtro, agregados, colunas e label do export (sincrono ou job).
 
-    if not etapas:
+    Levanta 404 quando nenhuma das etapas pedidas e da org ativa.
+    """
+    filtro = and_(Etapa.id.in_(data.ids), Missao.uae == active_org)
+    total, total_tvoo = (
+        await session.execute(
+            select(
+                sql_func.count(Etapa.id),
+                sql_func.coalesce(sql_func.sum(Etapa.tvoo), 0),
+            )
+            .join(Missao, Missao.id == Etapa.missao_id)
+            .where(filtro)
+        )
+    ).one()
+
+    if not total:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='Nenhuma etapa encontrada',
         )
 
-    etapa_ids = [e.id for e in etapas]
-
-    oi_data = None
-    if data.esforco_aereo:
-        oi_data = await fetch_oi_detail_data(
-            session,
-            etapa_ids,
-        )
-
-    trip_data = None
-    if data.tripulantes:
-        trip_data = await fetch_trip_data(
-            session,
-            etapa_ids,
-        )
-
     columns = {
         'pousos': data.pousos,
         'nivel': data.nivel,
@@ -719,24 +748,159 @@ async def export_etapas(
     )
     org_label = (org.alias or org.nome) if org else active_org
 
-    buffer = generate_etapas_xlsx(
-        etapas=etapas,
-        oi_data=oi_data,
-        trip_data=trip_data,
-        columns=columns,
-        org_label=org_label,
-    )
+    return {
+        'filtro': filtro,
+        'total': total,
+        'total_tvoo': total_tvoo,
+        'columns': columns,
+        'org_label': org_label,
+    }
 
-    now = datetime.now()
+
+def _nome_export(active_org: str) -> str:
     slug = ''.join(c for c in active_org if c.isalnum()).upper() or 'ORG'
-    filename = f'etapas_{slug}_{now:%d%m%Y}.xlsx'
+    return f'etapas_{slug}_{datetime.now():%d%m%Y}.xlsx'
+
+
+def _job_dict(job: ExportJob) -> dict:
+    return {
+        'id': job.id,
+        'status': situacao(job),
+        'file_name': job.file_name,
+        'expira_em': job.expira_em,
+        'erro': job.erro,
+    }
+
+
+# Formatos do export sincrono: planilha formatada ou dados brutos.
+_EXPORT_DADOS = {
+    'csv': (stream_etapas_csv, CSV_MEDIA_TYPE, 'csv'),
+    'arrow': (stream_etapas_arrow, ARROW_MEDIA_TYPE, 'arrows'),
+}
+
+
+@router.post('/export', dependencies=[ViewEtapa, VagaDocumento])
+async def export_etapas(
+    data: EtapaExportRequest,
+    session: Session,
+    active_org: ActiveOrg,
+    formato: Annotated[
+        Literal['xlsx', 'csv', 'arrow'], Query(alias='format')
+    ] = 'xlsx',
+) -> StreamingResponse:
+    """Exporta etapas selecionadas (escopadas pela org ativa).
+
+    `format=xlsx` (padrao) gera a planilha formatada; `csv` e `arrow`
+    (stream IPC do Arrow) dao os dados brutos, sem custo de estilo.
+    Todos saem em streaming, lote a lote, com memoria constante.
+    """
+    export = await _preparar_export(session, data, active_org)
+    filename = _nome_export(active_org)
+
+    if formato == 'xlsx':
+        content = stream_etapas_xlsx(session, **export)
+        media_type = XLSX_MEDIA_TYPE
+    else:
+        gerar, media_type, ext = _EXPORT_DADOS[formato]
+        content = gerar(session, export['filtro'], export['columns'])
+        filename = filename.removesuffix('.xlsx') + f'.{ext}'
 
     return StreamingResponse(
-        content=buffer,
-        media_type=(
-            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        ),
+        content=content,
+        media_type=media_type,
         headers={
             'Content-Disposition': (f'attachment; filename="{filename}"'),
         },
     )
+
+
+@router.post(
+    '/export/jobs',
+    status_code=HTTPStatus.ACCEPTED,
+    response_model=ApiResponse[ExportJobPublic],
+    dependencies=[ViewEtapa],
+)
+async def criar_export_job(
+    data: EtapaExportRequest,
+    session: Session,
+    active_org: ActiveOrg,
+    user: CurrentUser,
+    background_tasks: BackgroundTasks,
+):
+    """Export de etapas em background; o arquivo fica no storage.
+
+    Responde na hora com o job. Se o mesmo export (mesmo filtro, sem
+    etapa da org editada desde entao) ja foi pedido, devolve o job
+    existente — pronto, com `url`, ou ainda gerando — sem gerar de novo.
+    Acompanhar por `GET /export/jobs/{job_id}`.
+    """
+    export = await _preparar_export(session, data, active_org)
+    versao = await versao_etapas(session, active_org)
+    chave = chave_export(
+        'etapas',
+        active_org,
+        versao,
+        {**export['columns'], 'ids': sorted(set(data.ids))},
+    )
+    job, gerar = await reservar_job(
+        session,
+        tipo='etapas',
+        uae=active_org,
+        chave=chave,
+        file_name=_nome_export(active_org),
+        user_id=user.id,
+    )
+    if not gerar:
+        await session.commit()
+        return success_response(
+            data=ExportJobPublic(**_job_dict(job), url=await url_do_job(job))
+        )
+
+    # 503 + Retry-After com o pool cheio; o rollback desfaz a reserva.
+    # A vaga e devolvida pela propria geracao, ao terminar — entao, ate a
+    # task estar agendada, qualquer falha devolve a vaga aqui (senao ela
+    # vaza e, apos DOCS_MAX_JOBS falhas, todo export responde 503). A
+    # resposta e montada antes do agendamento: se ela falhasse depois,
+    # a task nao rodaria.
+    documentos.admitir()
+    try:
+        await session.commit()
+        resposta = success_response(
+            data=ExportJobPublic(**_job_dict(job), url=await url_do_job(job))
+        )
+        background_tasks.add_task(
+            gerar_export_etapas, session, job.id, **export
+        )
+    except BaseException:
+        documentos.liberar()
+        raise
+    return resposta
+
+
+@router.get(
+    '/export/jobs/{job_id}',
+    response_model=ApiResponse[ExportJobPublic],
+    dependencies=[ViewEtapa],
+)
+async def status_export_job(
+    job_id: int,
+    session: Session,
+    active_org: ActiveOrg,
+):
+    """Status do export; `url` assinada quando o arquivo esta pronto."""
+    job = await session.scalar(
+        select(ExportJob).where(
+            ExportJob.id == job_id,
+            ExportJob.tipo == 'etapas',
+            ExportJob.uae == active_org,
+        )
+    )
+    if job is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='Export nao encontrado',
+        )
+
+    return success_response(
+        data=ExportJobPublic(**_job_dict(job), url=await url_do_job(job))
+    )
@@ -2,17 +2,16 @@ from http import HTTPStatus
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import extract, func, or_, select
+from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fcontrol_api.database import get_session
 from fcontrol_api.models.estatistica.esf_aer import (
     EsforcoAereo,
 )
-from fcontrol_api.models.estatistica.etapa import (
-    Etapa,
-    Missao,
-    OIEtapa,
+from fcontrol_api.models.estatistica.horas_mes import (
+    HorasMesAnv,
+    HorasMesOI,
 )
 from fcontrol_api.models.shared.aeronaves import Aeronave, TenantProjeto
 from fcontrol_api.schemas.estatistica.horas_anv import (
@@ -47,23 +46,15 @@ async def get_horas_anv(
 
     # ANVs com voo nao-GTT no ano, nas missoes DESTA org
     not_gtt_anvs = (
-        select(Etapa.anv)
-        .join(
-            Missao,
-            Missao.id == Etapa.missao_id,
-        )
-        .join(
-            OIEtapa,
-            OIEtapa.etapa_id == Etapa.id,
-        )
+        select(HorasMesOI.anv)
         .join(
             EsforcoAereo,
-            EsforcoAereo.id == OIEtapa.esf_aer_id,
+            EsforcoAereo.id == HorasMesOI.esf_aer_id,
         )
         .where(
-            Missao.uae == active_org,
-            extract('year', Etapa.data) == ano_ref,
-            ~EsforcoAereo.descricao.contains('GTT'),
+            HorasMesOI.uae == active_org,
+            HorasMesOI.ano == ano_ref,
+            EsforcoAereo.is_gtt.is_(False),
         )
         .distinct()
         .scalar_subquery()
@@ -96,23 +87,20 @@ async def get_horas_anv(
             )
         )
 
-    # Agregar etapas por ANV e mes
-    mes_col = extract('month', Etapa.data).label('mes')
-
+    # Horas por ANV e mes, do consolidado mensal (ja agregado por org).
     agg = await session.execute(
         select(
-            Etapa.anv,
-            mes_col,
-            func.coalesce(func.sum(Etapa.tvoo), 0).label('tvoo'),
-            func.coalesce(func.sum(Etapa.pousos), 0).label('pousos'),
+            HorasMesAnv.anv,
+            HorasMesAnv.mes,
+            func.coalesce(func.sum(HorasMesAnv.tvoo), 0).label('tvoo'),
+            func.coalesce(func.sum(HorasMesAnv.pousos), 0).label('pousos'),
         )
-        .join(Missao, Missao.id == Etapa.missao_id)
         .where(
-            Missao.uae == active_org,
-            extract('year', Etapa.data) == ano_ref,
-            Etapa.anv.in_(valid_anvs),
+            HorasMesAnv.uae == active_org,
+            HorasMesAnv.ano == ano_ref,
+            HorasMesAnv.anv.in_(valid_anvs),
         )
-        .group_by(Etapa.anv, mes_col)
+        .group_by(HorasMesAnv.anv, HorasMesAnv.mes)
     )
 
     lookup: dict[tuple[str, int], tuple[int, int]] = {
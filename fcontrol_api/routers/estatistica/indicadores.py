@@ -1,4 +1,3 @@
-from datetime import date
 from decimal import Decimal
 from http import HTTPStatus
 from typing import Annotated
@@ -17,8 +16,8 @@ from fcontrol_api.models.estatistica.etapa import (
     REVOEtapa,
     TipoMissao,
 )
+from fcontrol_api.models.estatistica.horas_mes import HorasMesAnv, HorasMesOI
 from fcontrol_api.models.shared.aeronaves import Aeronave
-from fcontrol_api.models.shared.users import User
 from fcontrol_api.schemas.estatistica.indicadores import (
     AeronaveLinha,
     IndicadoresResponse,
@@ -30,7 +29,8 @@ from fcontrol_api.schemas.estatistica.indicadores import (
     TipoMissaoLinha,
 )
 from fcontrol_api.schemas.response import ApiResponse
-from fcontrol_api.security import ActiveOrg, permission_checker
+from fcontrol_api.security import ActiveOrg, Principal, permission_checker
+from fcontrol_api.utils.datas import intervalo_ano
 from fcontrol_api.utils.responses import success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
@@ -42,6 +42,21 @@ ViewIndicadores = Depends(
 router = APIRouter(prefix='/indicadores', tags=['estatistica'])
 
 
+def _recorte_consolidado(
+    model, query, *, uae: str, ano_ref: int, projeto: str | None
+):
+    """Recorte do painel (org, ano, nao-simulador e, opcionalmente,
+    projeto) sobre uma tabela do consolidado mensal de horas."""
+    query = query.join(Aeronave, Aeronave.matricula == model.anv).where(
+        model.uae == uae,
+        model.ano == ano_ref,
+        model.is_simulador.is_(False),
+    )
+    if projeto:
+        query = query.where(Aeronave.projeto == projeto)
+    return query
+
+
 @router.get(
     '/',
     status_code=HTTPStatus.OK,
@@ -51,7 +66,7 @@ async def get_indicadores(
     session: Session,
     active_org: ActiveOrg,
     ano_ref: AnoRef,
-    _: Annotated[User, ViewIndicadores],
+    _: Annotated[Principal, ViewIndicadores],
     projeto: Annotated[str | None, Query(max_length=2)] = None,
 ):
     """Painel anual de indicadores das etapas voadas da org ativa.
@@ -65,22 +80,19 @@ async def get_indicadores(
     real). As flags `sagem`/`parte1` nao filtram nada: o painel soma
     tudo que foi registrado.
     """
-    # CTE de escopo: uma linha por etapa, nunca mais. Toda agregacao
-    # abaixo parte daqui e toca no maximo UMA tabela filha 1:N por vez —
-    # do contrario o produto cartesiano entre OIEtapa, PqdEtapa,
-    # REVOEtapa e HeavyCDS inflaria carga, pax e comb.
+    # Metricas da propria etapa e horas por OI saem do consolidado
+    # mensal (`horas_mes_*`), no grao certo de cada uma.
+    recorte = {'uae': active_org, 'ano_ref': ano_ref, 'projeto': projeto}
+    inicio, fim = intervalo_ano(ano_ref)
+
+    # CTE de escopo para as filhas sem consolidado (PQD, REVO, cargas,
+    # tipo de missao): uma linha por etapa, nunca mais. Cada agregacao
+    # abaixo toca no maximo UMA tabela filha 1:N por vez — do contrario
+    # o produto cartesiano entre as filhas inflaria as somas.
     escopo = (
         select(
             Etapa.id.label('id'),
-            Etapa.anv.label('anv'),
-            Aeronave.projeto.label('projeto'),
             extract('month', Etapa.data).label('mes'),
-            Etapa.tvoo.label('tvoo'),
-            Etapa.pousos.label('pousos'),
-            Etapa.pax.label('pax'),
-            Etapa.carga.label('carga'),
-            Etapa.comb.label('comb'),
-            Etapa.lub.label('lub'),
         )
         .join(Missao, Missao.id == Etapa.missao_id)
         # 1:1 por matricula — nao duplica a linha da etapa.
@@ -88,12 +100,9 @@ async def get_indicadores(
         .where(
             Missao.uae == active_org,
             Missao.is_simulador.is_(False),
-            # `between` no lugar de extract('year', ...): mesmo recorte,
-            # mas sargable — nao fecha a porta para um indice futuro.
-            Etapa.data.between(
-                date(ano_ref, 1, 1),
-                date(ano_ref, 12, 31),
-            ),
+            # Intervalo semiaberto: usa `ix_etapas_missao_id_data`.
+            Etapa.data >= inicio,
+            Etapa.data < fim,
         )
     )
 
@@ -105,16 +114,20 @@ async def get_indicadores(
 
     # 1. Base mensal: so a propria etapa, sem filha nenhuma.
     base_mes = await session.execute(
-        select(
-            col.mes,
-            func.count().label('etapas'),
-            func.coalesce(func.sum(col.tvoo), 0).label('tvoo'),
-            func.coalesce(func.sum(col.pousos), 0).label('pousos'),
-            func.coalesce(func.sum(col.pax), 0).label('pax'),
-            func.coalesce(func.sum(col.carga), 0).label('carga'),
-            func.coalesce(func.sum(col.comb), 0).label('comb'),
-            func.coalesce(func.sum(col.lub), 0).label('lub'),
-        ).group_by(col.mes)
+        _recorte_consolidado(
+            HorasMesAnv,
+            select(
+                HorasMesAnv.mes,
+                func.sum(HorasMesAnv.etapas).label('etapas'),
+                func.sum(HorasMesAnv.tvoo).label('tvoo'),
+                func.sum(HorasMesAnv.pousos).label('pousos'),
+                func.sum(HorasMesAnv.pax).label('pax'),
+                func.sum(HorasMesAnv.carga).label('carga'),
+                func.sum(HorasMesAnv.comb).label('comb'),
+                func.sum(HorasMesAnv.lub).label('lub'),
+            ),
+            **recorte,
+        ).group_by(HorasMesAnv.mes)
     )
 
     # 2. PQD lancados: mes x tipo.
@@ -162,14 +175,16 @@ async def get_indicadores(
     # e o rateio do tempo da etapa entre os OIs (create_etapa valida
     # que a soma fecha com Etapa.tvoo). Carga/pax/comb nao tem rateio.
     base_reg = await session.execute(
-        select(
-            OIEtapa.reg,
-            func.coalesce(func.sum(OIEtapa.tvoo), 0).label('tvoo'),
+        _recorte_consolidado(
+            HorasMesOI,
+            select(
+                HorasMesOI.reg,
+                func.sum(HorasMesOI.tvoo).label('tvoo'),
+            ),
+            **recorte,
         )
-        .select_from(OIEtapa)
-        .join(cte, col.id == OIEtapa.etapa_id)
-        .group_by(OIEtapa.reg)
-        .order_by(OIEtapa.reg)
+        .group_by(HorasMesOI.reg)
+        .order_by(HorasMesOI.reg)
     )
 
     base_tipo_mis = await session.execute(
@@ -188,17 +203,21 @@ async def get_indicadores(
 
     # 6. Producao por aeronave.
     base_anv = await session.execute(
-        select(
-            col.anv,
-            col.projeto,
-            func.count().label('etapas'),
-            func.coalesce(func.sum(col.tvoo), 0).label('tvoo'),
-            func.coalesce(func.sum(col.pousos), 0).label('pousos'),
-            func.coalesce(func.sum(col.carga), 0).label('carga'),
-            func.coalesce(func.sum(col.pax), 0).label('pax'),
+        _recorte_consolidado(
+            HorasMesAnv,
+            select(
+                HorasMesAnv.anv,
+                Aeronave.projeto,
+                func.sum(HorasMesAnv.etapas).label('etapas'),
+                func.sum(HorasMesAnv.tvoo).label('tvoo'),
+                func.sum(HorasMesAnv.pousos).label('pousos'),
+                func.sum(HorasMesAnv.carga).label('carga'),
+                func.sum(HorasMesAnv.pax).label('pax'),
+            ),
+            **recorte,
         )
-        .group_by(col.anv, col.projeto)
-        .order_by(func.sum(col.tvoo).desc(), col.anv)
+        .group_by(HorasMesAnv.anv, Aeronave.projeto)
+        .order_by(func.sum(HorasMesAnv.tvoo).desc(), HorasMesAnv.anv)
     )
 
     # Indexa por mes; a serie sai sempre com 12 posicoes (o front nunca
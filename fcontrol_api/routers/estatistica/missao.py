@@ -44,6 +44,11 @@ from fcontrol_api.services.etapas import (
     fetch_trip_data,
     find_collision,
 )
+from fcontrol_api.services.horas_mes import (
+    atualizar_horas_mes,
+    mes_da_etapa,
+    meses_das_etapas,
+)
 from fcontrol_api.utils.responses import success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
@@ -288,6 +293,10 @@ async def create_missao_with_etapas(
             heavy_cds=etapa_in.heavy_cds,
         )
 
+    await atualizar_horas_mes(
+        session, {mes_da_etapa(active_org, e.data) for e in data.etapas}
+    )
+
     await session.commit()
     await session.refresh(new_missao)
 
@@ -464,6 +473,13 @@ async def update_missao_with_etapas(
                 detail=f'{label}: {exc}',
             ) from exc
 
+    # Meses do consolidado de horas tocados: onde as etapas removidas ou
+    # editadas estavam e onde as editadas/criadas passam a estar.
+    meses_horas = await meses_das_etapas(session, payload_ids)
+    meses_horas |= {
+        mes_da_etapa(active_org, e.data) for _, e in payload_etapas
+    }
+
     # 4. Patch direto (cliente sempre envia titulo/obs;
     #    semantica: PUT substitui, inclusive limpa pra None).
     missao.titulo = payload.titulo
@@ -614,6 +630,8 @@ async def update_missao_with_etapas(
             heavy_cds=e.heavy_cds,
         )
 
+    await atualizar_horas_mes(session, meses_horas)
+
     # 8. Capturar campos da missao em locais ANTES do commit
     #    para evitar lazy-load (expire_on_commit default).
     resp_id = missao.id
@@ -721,6 +739,8 @@ async def delete_missao_com_etapas(
         )
     )
 
+    meses_horas = await meses_das_etapas(session, etapa_ids)
+
     if etapa_ids:
         await session.execute(
             sa_delete(OIEtapa).where(OIEtapa.etapa_id.in_(etapa_ids))
@@ -740,6 +760,7 @@ async def delete_missao_com_etapas(
         await session.execute(sa_delete(Etapa).where(Etapa.id.in_(etapa_ids)))
 
     await session.delete(missao)
+    await atualizar_horas_mes(session, meses_horas)
     await session.commit()
 
     return success_response(
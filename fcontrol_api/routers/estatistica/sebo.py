@@ -3,14 +3,13 @@ from http import HTTPStatus
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy import and_, select, text
 from sqlalchemy import func as sql_func
-from sqlalchemy import select, text, true
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fcontrol_api.database import get_session
 from fcontrol_api.models.aeromedica.cartoes import CartaoSaude
-from fcontrol_api.models.estatistica.esf_aer import EsforcoAereo
-from fcontrol_api.models.estatistica.etapa import Etapa, OIEtapa, TripEtapa
+from fcontrol_api.models.estatistica.horas_mes import HorasMesTrip
 from fcontrol_api.models.instrucao.cartoes import Cartao
 from fcontrol_api.models.inteligencia.passaportes import Passaporte
 from fcontrol_api.models.seg_voo.crm import CrmCertificado
@@ -48,36 +47,27 @@ async def list_sebo(
     oper_list = parse_str_list(oper, 'oper')
     func_bordo_list = parse_str_list(func_bordo, 'func_bordo')
     ref_ano = ano or date.today().year
-    jan1 = date(ref_ano, 1, 1)
-    dec31 = date(ref_ano, 12, 31)
 
-    sim_etapa_ids = (
-        select(OIEtapa.etapa_id)
-        .join(EsforcoAereo, EsforcoAereo.id == OIEtapa.esf_aer_id)
-        .where(EsforcoAereo.descricao.contains('SML'))
-        .scalar_subquery()
-    )
-
-    nao_sim = ~Etapa.id.in_(sim_etapa_ids)
+    # Voos do consolidado mensal ate o fim do ano de referencia, sem
+    # simulador (`Etapa.is_sim`), na(s) funcao(oes) a bordo pedidas.
+    voos = [
+        HorasMesTrip.trip_id == Tripulante.id,
+        HorasMesTrip.sml.is_(False),
+        HorasMesTrip.ano <= ref_ano,
+    ]
+    if func_bordo_list:
+        voos.append(HorasMesTrip.func_bordo.in_(func_bordo_list))
 
     h_ano = sql_func.coalesce(
-        sql_func.sum(Etapa.tvoo).filter(
-            (Etapa.data >= jan1) & (Etapa.data <= dec31) & nao_sim
-        ),
+        sql_func.sum(HorasMesTrip.tvoo).filter(HorasMesTrip.ano == ref_ano),
         0,
     ).label('h_ano')
 
     dsv = (
-        sql_func.current_date()
-        - sql_func.max(Etapa.data).filter((Etapa.data <= dec31) & nao_sim)
+        sql_func.current_date() - sql_func.max(HorasMesTrip.ultimo_voo)
     ).label('dsv')
 
-    data_ult_voo = (
-        sql_func
-        .max(Etapa.data)
-        .filter((Etapa.data <= dec31) & nao_sim)
-        .label('data_ult_voo')
-    )
+    data_ult_voo = sql_func.max(HorasMesTrip.ultimo_voo).label('data_ult_voo')
 
     query = (
         select(
@@ -117,19 +107,7 @@ async def list_sebo(
             Cartao,
             Cartao.user_id == User.id,
         )
-        .outerjoin(
-            TripEtapa,
-            (TripEtapa.trip_id == Tripulante.id)
-            & (
-                TripEtapa.func_bordo.in_(func_bordo_list)
-                if func_bordo_list
-                else true()
-            ),
-        )
-        .outerjoin(
-            Etapa,
-            Etapa.id == TripEtapa.etapa_id,
-        )
+        .outerjoin(HorasMesTrip, and_(*voos))
         .where(
             Tripulante.active.is_(True),
             Tripulante.uae == active_org,
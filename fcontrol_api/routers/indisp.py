@@ -13,8 +13,7 @@ from sqlalchemy.orm import selectinload
 
 from fcontrol_api.database import get_session
 from fcontrol_api.models.aeromedica.cartoes import CartaoSaude
-from fcontrol_api.models.estatistica.esf_aer import EsforcoAereo
-from fcontrol_api.models.estatistica.etapa import Etapa, OIEtapa, TripEtapa
+from fcontrol_api.models.estatistica.etapa import Etapa, TripEtapa
 from fcontrol_api.models.shared.indisp import Indisp
 from fcontrol_api.models.shared.posto_grad import PostoGrad
 from fcontrol_api.models.shared.tripulantes import Tripulante
@@ -30,6 +29,7 @@ from fcontrol_api.schemas.response import ApiResponse
 from fcontrol_api.schemas.users import UserPublic
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     ensure_org_permission_or_owner,
     get_current_user,
     has_org_permission,
@@ -38,7 +38,7 @@ from fcontrol_api.services.logs import log_user_action
 from fcontrol_api.utils.responses import success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/indisp', tags=['indisp'])
 
@@ -144,19 +144,13 @@ async def get_crew_indisp(
     trip_ids = [trip.id for trip in tripulantes]
 
     # 3. Query batch para cemal + data_ult_voo (excluindo simuladores)
-    sim_etapa_ids = (
-        select(OIEtapa.etapa_id)
-        .join(EsforcoAereo, EsforcoAereo.id == OIEtapa.esf_aer_id)
-        .where(EsforcoAereo.descricao.contains('SML'))
-        .scalar_subquery()
-    )
     cemal_voo_query = (
         select(
             Tripulante.id.label('trip_id'),
             CartaoSaude.cemal,
             sql_func
             .max(Etapa.data)
-            .filter(~Etapa.id.in_(sim_etapa_ids))
+            .filter(Etapa.is_sim.is_(False))
             .label('data_ult_voo'),
         )
         .select_from(Tripulante)
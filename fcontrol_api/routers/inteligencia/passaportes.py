@@ -27,6 +27,7 @@ from fcontrol_api.schemas.inteligencia.passaportes import (
 from fcontrol_api.schemas.response import ApiResponse
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     ensure_org_permission_or_owner,
     get_current_user,
     has_org_permission,
@@ -125,7 +126,7 @@ def _nome_ascii(nome_guerra: str) -> str:
 )
 async def list_passaportes(
     session: Session,
-    user: Annotated[User, ViewPassaportes],
+    user: Annotated[Principal, ViewPassaportes],
     active_org: ActiveOrg,
     p_g: Annotated[str | None, Query()] = None,
     funcao: Annotated[str | None, Query()] = None,
@@ -229,7 +230,7 @@ async def list_passaportes(
 async def get_passaporte_by_user(
     user_id: int,
     session: Session,
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
     active_org: ActiveOrg,
 ):
     # Self-service: o próprio militar vê o seu passaporte (portal FatBird),
@@ -273,7 +274,7 @@ async def upsert_passaporte(
     session: Session,
     dados: PassaporteUpdate,
     active_org: ActiveOrg,
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ):
     """Cria ou atualiza passaporte de um tripulante."""
     tripulante = await session.scalar(
@@ -336,7 +337,7 @@ async def upload_imagem_passaporte(
     file: UploadFile,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ):
     """Faz upload (JPG/PNG normalizado p/ JPEG) da imagem do tipo dado."""
     tripulante = await session.scalar(
@@ -480,7 +481,7 @@ async def delete_imagem_passaporte(
     tipo: TipoImagem,
     session: Session,
     active_org: ActiveOrg,
-    _: Annotated[User, DeleteImgPassaporte],
+    _: Annotated[Principal, DeleteImgPassaporte],
 ):
     """Remove a imagem do tipo dado do bucket e zera a coluna."""
     tripulante = await session.scalar(
@@ -647,7 +648,7 @@ async def delete_passaporte(
     trip_id: int,
     session: Session,
     active_org: ActiveOrg,
-    _: Annotated[User, DeletePassaportes],
+    _: Annotated[Principal, DeletePassaportes],
 ):
     """Remove passaporte de um tripulante."""
     tripulante = await session.scalar(
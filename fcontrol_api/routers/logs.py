@@ -10,9 +10,14 @@ from sqlalchemy.orm import selectinload
 from fcontrol_api.database import get_session
 from fcontrol_api.models.security.logs import UserActionLog
 from fcontrol_api.models.shared.users import User
-from fcontrol_api.schemas.logs import UserActionLogOut
+from fcontrol_api.schemas.logs import (
+    UserActionLogDetail,
+    UserActionLogOut,
+    UserSummary,
+)
 from fcontrol_api.schemas.response import ApiPaginatedResponse, ApiResponse
 from fcontrol_api.security import require_system_admin
+from fcontrol_api.services.logs import remover_log, snapshot_views
 from fcontrol_api.utils.responses import paginated_response, success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
@@ -100,6 +105,34 @@ async def listar_logs(
     )
 
 
+@router.get(
+    '/user-actions/{log_id}',
+    response_model=ApiResponse[UserActionLogDetail],
+)
+async def detalhar_log(log_id: int, session: Session):
+    log = await session.get(UserActionLog, log_id)
+
+    if not log:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='Log não encontrado',
+        )
+
+    before, after = (await snapshot_views(session, [log]))[log.id]
+    return success_response(
+        data=UserActionLogDetail(
+            id=log.id,
+            user=UserSummary.model_validate(log.user, from_attributes=True),
+            action=log.action,
+            resource=log.resource,
+            resource_id=log.resource_id,
+            timestamp=log.timestamp,
+            before=before,
+            after=after,
+        )
+    )
+
+
 @router.delete(
     '/user-actions/{log_id}',
     response_model=ApiResponse[None],
@@ -117,7 +150,7 @@ async def excluir_log(
             detail='Log não encontrado',
         )
 
-    await session.delete(log)
+    await remover_log(session, log)
     await session.commit()
 
     return success_response(message='Log excluído com sucesso')
@@ -12,7 +12,6 @@ from fcontrol_api.models.shared.aeronaves import (
     ProjetoAnv,
     TenantProjeto,
 )
-from fcontrol_api.models.shared.users import User
 from fcontrol_api.schemas.ops.aeronave import (
     AeronaveCreate,
     AeronavePublic,
@@ -23,7 +22,7 @@ from fcontrol_api.schemas.response import (
     ApiPaginatedResponse,
     ApiResponse,
 )
-from fcontrol_api.security import ActiveOrg, permission_checker
+from fcontrol_api.security import ActiveOrg, Principal, permission_checker
 from fcontrol_api.utils.responses import (
     paginated_response,
     success_response,
@@ -48,7 +47,9 @@ async def create_aeronave(
     aeronave: AeronaveCreate,
     session: Session,
     active_org: ActiveOrg,
-    _: Annotated[User, Depends(permission_checker('ops.aeronaves', 'create'))],
+    _: Annotated[
+        Principal, Depends(permission_checker('ops.aeronaves', 'create'))
+    ],
 ):
     db_aeronave = await session.scalar(
         select(Aeronave).where(Aeronave.matricula == aeronave.matricula)
@@ -201,7 +202,9 @@ async def update_aeronave(
     aeronave: AeronaveUpdate,
     session: Session,
     active_org: ActiveOrg,
-    _: Annotated[User, Depends(permission_checker('ops.aeronaves', 'update'))],
+    _: Annotated[
+        Principal, Depends(permission_checker('ops.aeronaves', 'update'))
+    ],
 ):
     db_aeronave = await session.scalar(
         select(Aeronave).where(
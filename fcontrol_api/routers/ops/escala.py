@@ -4,20 +4,13 @@ from http import HTTPStatus
 from typing import Annotated, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import extract
 from sqlalchemy import func as sql_func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from fcontrol_api.database import get_session
 from fcontrol_api.models.aeromedica.cartoes import CartaoSaude
-from fcontrol_api.models.estatistica.esf_aer import EsforcoAereo
-from fcontrol_api.models.estatistica.etapa import (
-    Etapa,
-    Missao,
-    OIEtapa,
-    TripEtapa,
-)
+from fcontrol_api.models.estatistica.horas_mes import HorasMesTrip
 from fcontrol_api.models.shared.aeronaves import Aeronave, ProjetoAnv
 from fcontrol_api.models.shared.indisp import Indisp
 from fcontrol_api.models.shared.posto_grad import PostoGrad
@@ -81,29 +74,20 @@ async def get_escala_disponiveis(
     # 2. Subquery data_ult_voo (excluindo simulador SML). Mesmo escopo do
     # tvoo_year: só missões da org ativa, só o projeto filtrado e só as
     # etapas voadas na própria função do tripulante — voo como O3 não
-    # renova a data do piloto.
-    sim_etapa_ids = (
-        select(OIEtapa.etapa_id)
-        .join(EsforcoAereo, EsforcoAereo.id == OIEtapa.esf_aer_id)
-        .where(EsforcoAereo.descricao.contains('SML'))
-        .scalar_subquery()
-    )
-    nao_sim = ~Etapa.id.in_(sim_etapa_ids)
+    # renova a data do piloto. Lida do consolidado mensal de horas.
     data_ult_voo_select = (
         select(
-            TripEtapa.trip_id.label('trip_id'),
-            TripEtapa.func.label('func'),
-            sql_func.max(Etapa.data).label('data_ult_voo'),
+            HorasMesTrip.trip_id.label('trip_id'),
+            HorasMesTrip.func.label('func'),
+            sql_func.max(HorasMesTrip.ultimo_voo).label('data_ult_voo'),
         )
-        .join(Etapa, Etapa.id == TripEtapa.etapa_id)
-        .join(Missao, Missao.id == Etapa.missao_id)
-        .where(nao_sim, Missao.uae == active_org)
-        .group_by(TripEtapa.trip_id, TripEtapa.func)
+        .where(HorasMesTrip.sml.is_(False), HorasMesTrip.uae == active_org)
+        .group_by(HorasMesTrip.trip_id, HorasMesTrip.func)
     )
 
     if proj_param:
         data_ult_voo_select = data_ult_voo_select.join(
-            Aeronave, Aeronave.matricula == Etapa.anv
+            Aeronave, Aeronave.matricula == HorasMesTrip.anv
         ).join(
             ProjetoAnv,
             (ProjetoAnv.id_projeto == Aeronave.projeto)
@@ -135,23 +119,23 @@ async def get_escala_disponiveis(
     ano_ref = date_end.year
     tvoo_year_select = (
         select(
-            TripEtapa.trip_id.label('trip_id'),
-            TripEtapa.func.label('func'),
-            sql_func.coalesce(sql_func.sum(Etapa.tvoo), 0).label('tvoo_year'),
+            HorasMesTrip.trip_id.label('trip_id'),
+            HorasMesTrip.func.label('func'),
+            sql_func.coalesce(sql_func.sum(HorasMesTrip.tvoo), 0).label(
+                'tvoo_year'
+            ),
         )
-        .join(Etapa, Etapa.id == TripEtapa.etapa_id)
-        .join(Missao, Missao.id == Etapa.missao_id)
         .where(
-            nao_sim,
-            extract('year', Etapa.data) == ano_ref,
-            Missao.uae == active_org,
+            HorasMesTrip.sml.is_(False),
+            HorasMesTrip.ano == ano_ref,
+            HorasMesTrip.uae == active_org,
         )
-        .group_by(TripEtapa.trip_id, TripEtapa.func)
+        .group_by(HorasMesTrip.trip_id, HorasMesTrip.func)
     )
 
     if proj_param:
         tvoo_year_select = tvoo_year_select.join(
-            Aeronave, Aeronave.matricula == Etapa.anv
+            Aeronave, Aeronave.matricula == HorasMesTrip.anv
         ).join(
             ProjetoAnv,
             (ProjetoAnv.id_projeto == Aeronave.projeto)
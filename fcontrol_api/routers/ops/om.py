@@ -5,7 +5,7 @@ from http import HTTPStatus
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import Date, Integer, cast, extract, func
+from sqlalchemy import Date, Integer, and_, cast, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
@@ -30,20 +30,25 @@ from fcontrol_api.schemas.ops.om import (
 from fcontrol_api.schemas.response import ApiPaginatedResponse, ApiResponse
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     get_current_user,
     has_org_permission,
     permission_checker,
 )
-from fcontrol_api.services.logs import log_user_action, ordem_snapshot
+from fcontrol_api.services.logs import (
+    log_snapshot_action,
+    ordem_snapshot,
+)
 from fcontrol_api.services.om import (
     criar_tripulacao_batch,
     validar_integridade_etapas,
 )
+from fcontrol_api.utils.datas import intervalo_ano
 from fcontrol_api.utils.responses import paginated_response, success_response
 from fcontrol_api.utils.strings import escape_like
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/om', tags=['ordens-missao'])
 
@@ -67,6 +72,12 @@ DeleteOM = Depends(permission_checker('ops.ordem_missao', 'delete'))
 RESOURCE = 'ops.ordem_missao'
 
 
+def _data_saida_no_ano(ano: int):
+    """Numeracao por ano: intervalo semiaberto em vez de extract('year')."""
+    inicio, fim = intervalo_ano(ano)
+    return and_(OrdemMissao.data_saida >= inicio, OrdemMissao.data_saida < fim)
+
+
 @router.get(
     '/',
     status_code=HTTPStatus.OK,
@@ -321,7 +332,7 @@ async def create_ordem(
     session: Session,
     current_user: CurrentUser,
     active_org: ActiveOrg,
-    _: Annotated[User, CreateOM],
+    _: Annotated[Principal, CreateOM],
 ):
     """Cria uma nova ordem de missão"""
 
@@ -398,7 +409,7 @@ async def create_ordem(
     # Auditoria no mesmo commit da mutação. As etapas saem do payload e a
     # tripulação das linhas devolvidas pelo batch (com `.tripulante` já
     # carregado): as coleções de `ordem` nunca receberam essas linhas.
-    await log_user_action(
+    await log_snapshot_action(
         session=session,
         user_id=current_user.id,
         action='create',
@@ -443,7 +454,7 @@ async def update_ordem(
     session: Session,
     current_user: CurrentUser,
     active_org: ActiveOrg,
-    _: Annotated[User, UpdateOM],
+    _: Annotated[Principal, UpdateOM],
 ):
     """Atualiza uma ordem de missão existente"""
     ordem = await session.scalar(
@@ -513,7 +524,7 @@ async def update_ordem(
         # Cancelamento: atualizar apenas o status
         ordem.status = 'cancelada'
 
-        await log_user_action(
+        await log_snapshot_action(
             session=session,
             user_id=current_user.id,
             action='update',
@@ -602,7 +613,7 @@ async def update_ordem(
             select(func.max(cast(OrdemMissao.numero, Integer))).where(
                 OrdemMissao.numero.op('~')('^[0-9]+$'),
                 OrdemMissao.deleted_at.is_(None),
-                extract('year', OrdemMissao.data_saida) == year,
+                _data_saida_no_ano(year),
                 OrdemMissao.uae == target_uae,
             )
         )
@@ -625,7 +636,7 @@ async def update_ordem(
                     OrdemMissao.numero == ordem.numero,
                     OrdemMissao.id != id,
                     OrdemMissao.deleted_at.is_(None),
-                    extract('year', OrdemMissao.data_saida) == target_year,
+                    _data_saida_no_ano(target_year),
                     OrdemMissao.uae == target_uae,
                 )
             )
@@ -687,7 +698,7 @@ async def update_ordem(
                     OrdemMissao.numero == ordem_data.numero,
                     OrdemMissao.id != id,
                     OrdemMissao.deleted_at.is_(None),
-                    extract('year', OrdemMissao.data_saida) == target_year,
+                    _data_saida_no_ano(target_year),
                     OrdemMissao.uae == target_uae,
                 )
             )
@@ -789,7 +800,7 @@ async def update_ordem(
         ordem, etapas_log, tripulacao_log, ordem.etiquetas
     )
     if before_snapshot != after_snapshot:
-        await log_user_action(
+        await log_snapshot_action(
             session=session,
             user_id=current_user.id,
             action='update',
@@ -830,7 +841,7 @@ async def delete_ordem(
     session: Session,
     current_user: CurrentUser,
     active_org: ActiveOrg,
-    _: Annotated[User, DeleteOM],
+    _: Annotated[Principal, DeleteOM],
 ):
     """Soft delete de uma ordem de missão"""
     ordem = await session.scalar(
@@ -867,7 +878,7 @@ async def delete_ordem(
 
     ordem.deleted_at = datetime.now(timezone.utc)
 
-    await log_user_action(
+    await log_snapshot_action(
         session=session,
         user_id=current_user.id,
         action='delete',
@@ -9,7 +9,6 @@ from sqlalchemy.future import select
 
 from fcontrol_api.database import get_session
 from fcontrol_api.models.shared.om import Etiqueta
-from fcontrol_api.models.shared.users import User
 from fcontrol_api.schemas.etiquetas import (
     EtiquetaCreate,
     EtiquetaSchema,
@@ -18,6 +17,7 @@ from fcontrol_api.schemas.etiquetas import (
 from fcontrol_api.schemas.response import ApiResponse
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     get_current_user,
     permission_checker,
 )
@@ -25,7 +25,7 @@ from fcontrol_api.services.logs import log_user_action
 from fcontrol_api.utils.responses import success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/om/etiquetas', tags=['ordens-missao'])
 
@@ -62,7 +62,7 @@ async def create_etiqueta(
     session: Session,
     current_user: CurrentUser,
     active_org: ActiveOrg,
-    _: Annotated[User, CreateOM],
+    _: Annotated[Principal, CreateOM],
 ):
     """Cria uma nova etiqueta"""
     etiqueta = Etiqueta(
@@ -103,7 +103,7 @@ async def update_etiqueta(
     session: Session,
     current_user: CurrentUser,
     active_org: ActiveOrg,
-    _: Annotated[User, UpdateOM],
+    _: Annotated[Principal, UpdateOM],
 ):
     """Atualiza uma etiqueta existente"""
     etiqueta = await session.scalar(
@@ -158,7 +158,7 @@ async def delete_etiqueta(
     session: Session,
     current_user: CurrentUser,
     active_org: ActiveOrg,
-    _: Annotated[User, DeleteOM],
+    _: Annotated[Principal, DeleteOM],
 ):
     """Remove uma etiqueta"""
     etiqueta = await session.scalar(
@@ -49,7 +49,7 @@ from fcontrol_api.schemas.ops.operacao import (
 )
 from fcontrol_api.schemas.response import ApiResponse
 from fcontrol_api.schemas.users import UserPublic
-from fcontrol_api.security import ActiveOrg, permission_checker
+from fcontrol_api.security import ActiveOrg, Principal, permission_checker
 from fcontrol_api.services.logs import log_user_action
 from fcontrol_api.utils.responses import success_response
 
@@ -246,7 +246,7 @@ async def create_operacao(
     payload: OperacaoCreate,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, CreateOper],
+    user: Annotated[Principal, CreateOper],
 ):
     # `numero` é max+1 por org: creates concorrentes podem colidir no
     # uq_operacao_uae_numero — nesse caso recalcula e tenta de novo.
@@ -440,7 +440,7 @@ async def update_operacao(
     payload: OperacaoUpdate,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, CreateOper],
+    user: Annotated[Principal, CreateOper],
 ):
     op = await _get_op(session, op_id, active_org)
     changes = payload.model_dump(exclude_unset=True)
@@ -505,7 +505,7 @@ async def delete_operacao(
     op_id: int,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, DeleteOper],
+    user: Annotated[Principal, DeleteOper],
 ):
     op = await _get_op(session, op_id, active_org)
     # Hard delete: o ON DELETE CASCADE remove vínculos de etapa e o
@@ -620,7 +620,7 @@ async def associar_etapas(
     payload: AssociarEtapas,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, CreateEtapaOper],
+    user: Annotated[Principal, CreateEtapaOper],
 ):
     op = await _get_op(session, op_id, active_org)
 
@@ -699,7 +699,7 @@ async def desassociar_etapa(
     etapa_id: int,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, DeleteEtapaOper],
+    user: Annotated[Principal, DeleteEtapaOper],
 ):
     op = await _get_op(session, op_id, active_org)
     result = await session.execute(
@@ -773,7 +773,7 @@ async def add_pessoal(
     payload: OperacaoPessoalIn,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, CreateMilitarOper],
+    user: Annotated[Principal, CreateMilitarOper],
 ):
     op = await _get_op(session, op_id, active_org)
     pessoa = OperacaoPessoal(
@@ -812,7 +812,7 @@ async def update_pessoal(
     payload: OperacaoPessoalIn,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, CreateMilitarOper],
+    user: Annotated[Principal, CreateMilitarOper],
 ):
     op = await _get_op(session, op_id, active_org)
     pessoa = await session.scalar(
@@ -855,7 +855,7 @@ async def remove_pessoal(
     pessoal_id: int,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, DeleteMilitarOper],
+    user: Annotated[Principal, DeleteMilitarOper],
 ):
     op = await _get_op(session, op_id, active_org)
     pessoa = await session.scalar(
@@ -39,7 +39,7 @@ from fcontrol_api.schemas.ops.quads import (
     TripQuadInfo,
 )
 from fcontrol_api.schemas.response import ApiResponse
-from fcontrol_api.security import ActiveOrg, permission_checker
+from fcontrol_api.security import ActiveOrg, Principal, permission_checker
 from fcontrol_api.utils.responses import success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
@@ -58,7 +58,7 @@ async def create_quad(
     quads: list[QuadSchema],
     session: Session,
     active_org: ActiveOrg,
-    _: Annotated[User, ManageQuads],
+    _: Annotated[Principal, ManageQuads],
 ):
     # Escopo multi-tenant: todo trip_id do lote deve ser de tripulante da
     # org ativa — bloqueia gravar quadrinho em tripulante de outra unidade.
@@ -333,7 +333,7 @@ async def delete_quads(
     body: QuadBatchDelete,
     session: Session,
     active_org: ActiveOrg,
-    _: Annotated[User, DeleteQuads],
+    _: Annotated[Principal, DeleteQuads],
 ):
     # Só remove quadrinhos de tripulantes da org ativa: ids de outra
     # unidade são ignorados (não entram no rowcount) -> 404 se nenhum casa.
@@ -364,7 +364,7 @@ async def update_quad(
     quad: QuadUpdate,
     session: Session,
     active_org: ActiveOrg,
-    _: Annotated[User, UpdateQuads],
+    _: Annotated[Principal, UpdateQuads],
 ):
     # Escopo: o quadrinho deve pertencer a tripulante da org ativa.
     db_quad = await session.scalar(
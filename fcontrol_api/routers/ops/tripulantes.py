@@ -23,6 +23,7 @@ from fcontrol_api.schemas.ops.tripulantes import (
 from fcontrol_api.schemas.response import ApiPaginatedResponse, ApiResponse
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     get_current_user,
     permission_checker,
 )
@@ -30,7 +31,7 @@ from fcontrol_api.services.logs import log_user_action
 from fcontrol_api.utils.responses import paginated_response, success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/trips', tags=['trips'])
 
@@ -45,7 +46,7 @@ async def create_trip(
     trip: TripCreate,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, CreateTrip],
+    user: Annotated[Principal, CreateTrip],
 ):
     db_trig = await session.scalar(
         select(Tripulante).where(
@@ -312,7 +313,7 @@ async def update_trip(
     trip: BaseTrip,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, UpdateTrip],
+    user: Annotated[Principal, UpdateTrip],
 ):
     query = select(Tripulante).where(
         Tripulante.id == id, Tripulante.uae == active_org
@@ -418,7 +419,7 @@ async def patch_trip(
     trip: TripUpdate,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, UpdateTrip],
+    user: Annotated[Principal, UpdateTrip],
 ):
     query = select(Tripulante).where(
         Tripulante.id == id, Tripulante.uae == active_org
@@ -22,6 +22,7 @@ from fcontrol_api.schemas.seg_voo.crm import (
 )
 from fcontrol_api.security import (
     ActiveOrg,
+    Principal,
     ensure_org_permission_or_owner,
     get_current_user,
     permission_checker,
@@ -29,7 +30,7 @@ from fcontrol_api.security import (
 from fcontrol_api.utils.responses import success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 router = APIRouter(prefix='/crm', tags=['Seguranca de Voo'])
 
@@ -28,9 +28,11 @@ from fcontrol_api.schemas.users import (
 from fcontrol_api.security import (
     ActiveOrg,
     ActiveOrgOptional,
+    Principal,
     ensure_org_permission_or_owner,
     get_current_user,
-    get_password_hash,
+    get_current_user_full,
+    hash_password,
     permission_checker,
     require_admin,
 )
@@ -44,7 +46,8 @@ from fcontrol_api.settings import Settings
 from fcontrol_api.utils.responses import paginated_response, success_response
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+CurrentUserFull = Annotated[User, Depends(get_current_user_full)]
 
 router = APIRouter(prefix='/users', tags=['users'])
 
@@ -70,7 +73,7 @@ def _ensure_user_in_active_org(
 async def read_users_me(
     request: Request,
     session: Session,
-    current_user: CurrentUser,
+    current_user: CurrentUserFull,
 ):
     active_org = getattr(request.state, 'active_org', None)
     app_client = getattr(request.state, 'app_client', None)
@@ -99,10 +102,10 @@ async def read_users_me(
 async def change_pwd(
     pwd_schema: PwdSchema,
     session: Session,
-    current_user: CurrentUser,
+    current_user: CurrentUserFull,
 ):
     current_user.first_login = False
-    current_user.password = get_password_hash(pwd_schema.new_pwd)
+    current_user.password = await hash_password(pwd_schema.new_pwd)
 
     await log_user_action(
         session=session,
@@ -124,7 +127,7 @@ async def reset_pwd(
     user_id: int,
     session: Session,
     active_org: ActiveOrgOptional,
-    current_user: Annotated[User, Depends(require_admin)],
+    current_user: Annotated[Principal, Depends(require_admin)],
 ):
     db_user = await session.scalar(select(User).where(User.id == user_id))
     if not db_user:
@@ -138,7 +141,7 @@ async def reset_pwd(
     # Admin de unidade só reseta senha de usuário da própria org ativa.
     _ensure_user_in_active_org(db_user, active_org, current_user)
 
-    hashed_password = get_password_hash(Settings().DEFAULT_USER_PASSWORD)  # type: ignore
+    hashed_password = await hash_password(Settings().DEFAULT_USER_PASSWORD)  # type: ignore
     db_user.first_login = True
     db_user.password = hashed_password
 
@@ -166,7 +169,7 @@ async def create_user(
     payload: UserSchema,
     session: Session,
     active_org: ActiveOrg,
-    user: Annotated[User, Depends(permission_checker('users', 'create'))],
+    user: Annotated[Principal, Depends(permission_checker('users', 'create'))],
 ):
     # Verifica conflitos de unicidade
     await check_user_conflicts(
@@ -178,7 +181,7 @@ async def create_user(
         email_pess=payload.email_pess,
     )
 
-    hashed_password = get_password_hash(Settings().DEFAULT_USER_PASSWORD)
+    hashed_password = await hash_password(Settings().DEFAULT_USER_PASSWORD)
 
     db_user = User(
         p_g=payload.p_g,
@@ -228,7 +231,7 @@ async def create_user(
 async def read_users(
     session: Session,
     active_org: ActiveOrgOptional,
-    _: Annotated[User, Depends(permission_checker('users', 'view'))],
+    _: Annotated[Principal, Depends(permission_checker('users', 'view'))],
     search: str | None = None,
     p_g: str | None = None,
     quadro: QuadroEnum | None = None,
@@ -433,7 +436,7 @@ async def delete_user(
     user_id: int,
     session: Session,
     active_org: ActiveOrgOptional,
-    user: Annotated[User, Depends(permission_checker('users', 'delete'))],
+    user: Annotated[Principal, Depends(permission_checker('users', 'delete'))],
 ):
     db_user = await session.scalar(select(User).where(User.id == user_id))
 
@@ -517,7 +520,7 @@ async def create_user_promo(
     payload: UserPromoCreate,
     session: Session,
     active_org: ActiveOrgOptional,
-    user: Annotated[User, Depends(permission_checker('users', 'update'))],
+    user: Annotated[Principal, Depends(permission_checker('users', 'update'))],
 ):
     db_user = await session.scalar(select(User).where(User.id == user_id))
     if not db_user:
@@ -571,7 +574,7 @@ async def delete_user_promo(
     promo_id: int,
     session: Session,
     active_org: ActiveOrgOptional,
-    user: Annotated[User, Depends(permission_checker('users', 'update'))],
+    user: Annotated[Principal, Depends(permission_checker('users', 'update'))],
 ):
     db_user = await session.scalar(select(User).where(User.id == user_id))
     if not db_user:
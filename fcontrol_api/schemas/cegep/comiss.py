@@ -72,11 +72,22 @@ class ComissPublic(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ComissModuloJanela(BaseModel):
+    """Afastamento contínuo que caracteriza um módulo (datas inclusivas)."""
+
+    inicio: date
+    fim: date
+    dias: int
+
+
 class ComissDetail(ComissPublic):
     """ComissPublic com missões e histórico de auditoria."""
 
     missoes: list[FragMisEmbed] = []
     logs: list[ComissLogOut] = []
+    # Maior afastamento contínuo (dias) e as janelas que formam módulo.
+    maior_afastamento: int = 0
+    modulos: list[ComissModuloJanela] = []
 
 
 class ComissFechamento(BaseModel):
@@ -19,6 +19,7 @@ class CleanupTaskResultOut(BaseModel):
     duration_seconds: float
     errors: list[str]
     details: dict
+    batches: list[dict] = []
 
 
 class CleanupRunResponse(BaseModel):
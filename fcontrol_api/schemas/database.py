@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+class PoolStatusPublic(BaseModel):
+    mode: str
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    # Aquisições de conexão desde o boot do processo; no modo 'null' cada
+    # aquisição é um connect completo, então a espera inclui o handshake.
+    acquired: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_p95_ms: float
+    wait_max_ms: float
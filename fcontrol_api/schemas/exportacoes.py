@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ExportJobPublic(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    # pendente | pronto | erro | expirado
+    status: str
+    file_name: str
+    expira_em: datetime
+    # URL assinada (curta) do arquivo; só quando `status == 'pronto'`.
+    url: str | None = None
+    erro: str | None = None
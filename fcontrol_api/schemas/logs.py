@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel
 
@@ -13,11 +14,33 @@ class UserSummary(BaseModel):
 
 
 class UserActionLogOut(BaseModel):
+    """Item da listagem: só metadados. O conteúdo (before/after) sai em
+    `GET /logs/user-actions/{id}`."""
+
     id: int
     user: UserSummary
     action: str
     resource: str
     resource_id: int | None
-    before: str | None
-    after: str | None
     timestamp: datetime
+
+
+class UserActionLogDetail(UserActionLogOut):
+    # JSON decodificado; nos logs de snapshot, reconstruído do diff.
+    before: Any
+    after: Any
+
+
+class AuditoriaBufferPublic(BaseModel):
+    max_lote: int
+    intervalo_s: float
+    max_pendentes: int
+    # Entradas na fila agora, esperando o próximo lote.
+    pendentes: int
+    # Contadores desde o boot do processo; `falhas` são lotes que
+    # voltaram para a fila e `descartados`, entradas perdidas pelo teto.
+    registrados: int
+    gravados: int
+    lotes: int
+    falhas: int
+    descartados: int
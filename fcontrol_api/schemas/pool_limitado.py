@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+
+class PoolLimitadoPublic(BaseModel):
+    max_workers: int
+    max_jobs: int
+    # Operações admitidas agora (cada uma segura a vaga até terminar) e
+    # passos de CPU esperando/rodando no pool de threads.
+    jobs_ativos: int
+    na_fila: int
+    em_execucao: int
+    # Contadores desde o boot do processo; `rejeitados` são os 503.
+    iniciadas: int
+    concluidas: int
+    rejeitados: int
+    espera_avg_ms: float
+    espera_p95_ms: float
+    espera_max_ms: float
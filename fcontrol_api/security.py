@@ -8,6 +8,7 @@ from zoneinfo import ZoneInfo
 from fastapi import Depends, HTTPException, Request
 from jwt import encode
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
@@ -15,15 +16,25 @@ from sqlalchemy.orm import joinedload
 from fcontrol_api.database import get_session
 from fcontrol_api.models.security.resources import UserRole
 from fcontrol_api.models.shared.users import User
+from fcontrol_api.services.auditoria import auditoria
 from fcontrol_api.services.auth import (
+    get_principal,
+    get_user_authz,
     get_user_roles,
-    validate_user_client_access,
+    raise_client_access_denied,
 )
-from fcontrol_api.services.logs import log_user_action
+from fcontrol_api.services.authz_cache import Principal
+from fcontrol_api.services.senhas import processar
 from fcontrol_api.settings import Settings
 
 settings = Settings()
-pwd_context = PasswordHash.recommended()
+pwd_context = PasswordHash((
+    Argon2Hasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    ),
+))
 
 Session = Annotated[AsyncSession, Depends(get_session)]
 
@@ -36,6 +47,25 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password(password: str) -> str:
+    """`get_password_hash` no pool de senhas, fora do event loop."""
+    return await processar(get_password_hash, password)
+
+
+async def check_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verifica a senha no pool de senhas, fora do event loop.
+
+    Devolve (confere, novo_hash). `novo_hash` vem quando o hash guardado
+    foi gerado com outros parâmetros do Argon2: quem chamou grava o novo
+    no lugar (rehash no login).
+    """
+    return await processar(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 def verify_pkce_challenge(code_verifier: str, code_challenge: str) -> bool:
     sha256_hash = hashlib.sha256(code_verifier.encode()).digest()
     code = base64.urlsafe_b64encode(sha256_hash).rstrip(b'=').decode()
@@ -82,7 +112,13 @@ def create_access_token(data: dict, dev: bool = False):
     return encoded_jwt
 
 
-async def get_current_user(request: Request, session: Session):
+async def get_current_user(request: Request, session: Session) -> Principal:
+    """Principal autenticado (projeção enxuta, ver `services.auth`).
+
+    Uma consulta resolve usuário, `active` e o acesso mínimo ao cliente do
+    token — e o resultado fica em cache curto. Handlers que precisam do
+    `User` ORM completo dependem de `get_current_user_full`.
+    """
     # Verificar se middleware processou a autenticação
     if not hasattr(request.state, 'user_id'):
         raise HTTPException(
@@ -90,37 +126,49 @@ async def get_current_user(request: Request, session: Session):
         )
 
     user_id = request.state.user_id
+    app_client = request.state.app_client
 
-    # Buscar usuário no banco
-    stmt = select(User).where(User.id == user_id)
-    user = await session.scalar(stmt)
+    loaded = await get_principal(user_id, app_client, session)
 
-    if not user:
+    if not loaded:
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Usuário não encontrado',
         )
 
-    if not user.active:
+    principal, has_access = loaded
+
+    if not principal.active:
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail='Usuário inativo'
         )
 
     # Verificar permissões mínimas a cada requisição
-    app_client = request.state.app_client
-    if app_client:
-        await validate_user_client_access(user.id, app_client, session)
+    if app_client and not has_access:
+        raise_client_access_denied(app_client)
 
-    # Armazenar User em request.state
-    request.state.current_user = user
+    # Armazenar o principal em request.state
+    request.state.current_user = principal
 
-    return user
+    return principal
+
+
+async def get_current_user_full(
+    session: Session,
+    principal: Annotated[Principal, Depends(get_current_user)],
+) -> User:
+    """`User` ORM completo do usuário autenticado (com `posto`/promoções).
+
+    Para os poucos handlers que leem além da projeção do principal ou
+    alteram o próprio usuário (perfil, reemissão de token, troca de senha).
+    """
+    return await session.scalar(select(User).where(User.id == principal.id))
 
 
 async def require_admin(
     request: Request,
     session: Session,
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ):
     """Valida se o usuário é admin **na organização ativa** (do token).
 
@@ -179,7 +227,7 @@ async def is_system_admin(
 async def require_system_admin(
     request: Request,
     session: Session,
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ):
     """Valida admin com escopo de SISTEMA na org ativa (ver is_system_admin).
 
@@ -203,7 +251,7 @@ class AdminScope:
     caso contrário, `active_org` é a unidade à qual o admin está restrito.
     """
 
-    def __init__(self, user: User, active_org: str | None):
+    def __init__(self, user: Principal, active_org: str | None):
         self.user = user
         self.active_org = active_org
 
@@ -214,7 +262,7 @@ class AdminScope:
 
 async def get_admin_scope(
     request: Request,
-    user: Annotated[User, Depends(require_admin)],
+    user: Annotated[Principal, Depends(require_admin)],
 ) -> AdminScope:
     """Entrega o escopo do admin atual (reusa `require_admin` já validado)."""
     active_org = getattr(request.state, 'active_org', None)
@@ -249,7 +297,7 @@ ActiveOrg = Annotated[str, Depends(require_active_org)]
 
 
 async def has_permission(
-    user: User,
+    user: Principal,
     session: AsyncSession,
     resource: str,
     action: str,
@@ -265,7 +313,7 @@ async def has_permission(
 
 
 async def has_org_permission(
-    user: User,
+    user: Principal,
     session: AsyncSession,
     active_org: str | None,
     resource: str,
@@ -279,47 +327,35 @@ async def has_org_permission(
     Use dentro do handler quando o gate depende do payload — ex.: exigir
     `ordem_missao.status.update` apenas quando há troca de status.
     """
-    roles = await get_user_roles(user.id, session, active_org)
-    if roles.get('role') == 'admin':
-        return True
-    return any(
-        perm['resource'] == resource and perm['name'] == action
-        for perm in roles.get('perms', [])
-    )
+    authz = await get_user_authz(user.id, session, active_org)
+    return authz.is_admin or authz.has(resource, action)
 
 
 def permission_checker(resource: str, action: str):
     async def check_permission(
         session: Session,
         active_org: ActiveOrgOptional,
-        user: User = Depends(get_current_user),
-    ) -> User:
+        user: Principal = Depends(get_current_user),
+    ) -> Principal:
         "Verifica se usuário tem permissão necessária."
 
         # Admin da organização ativa tem acesso total ao escopo dela: os
         # handlers de data-plane já filtram por `active_org`, então o
         # bypass não vaza dados de outras unidades. Resolve o vínculo pela
         # org ativa (não o de sistema), garantindo "só da org dele".
-        roles = await get_user_roles(user.id, session, active_org)
-        if roles.get('role') == 'admin':
+        authz = await get_user_authz(user.id, session, active_org)
+        if authz.is_admin:
             return user
 
         # Checa a permissão no MESMO vínculo resolvido pela org ativa.
         # `has_permission` re-consultaria sem org e o fallback de
         # `get_user_roles` aceitaria vínculo de outra organização —
         # permissão da org A autorizaria escrita na org B.
-        allowed = any(
-            perm['resource'] == resource and perm['name'] == action
-            for perm in roles.get('perms', [])
-        )
-        if not allowed:
-            await log_user_action(
-                session=session,
+        if not authz.has(resource, action):
+            auditoria.registrar(
                 user_id=user.id,
                 action='access_denied',
                 resource=resource,
-                resource_id=None,
-                before=None,
                 after=f"Tentou ação '{action}' sem permissão",
             )
 
@@ -333,26 +369,24 @@ def permission_checker(resource: str, action: str):
     return check_permission
 
 
-async def _deny_access(
-    session: AsyncSession,
-    user: User,
+def _deny_access(
+    user: Principal,
     resource: str,
     action: str,
     owner_id: int | None = None,
 ) -> None:
-    """Registra a negação (auditoria `access_denied`) e levanta 403.
+    """Registra a negação (auditoria `access_denied`, em buffer) e
+    levanta 403.
 
     Núcleo compartilhado pelos guards `ensure_permission_or_owner` e
     `ensure_org_permission_or_owner` — mantém uma única mensagem de log e um
     único formato de erro entre eles, evitando drift.
     """
-    await log_user_action(
-        session=session,
+    auditoria.registrar(
         user_id=user.id,
         action='access_denied',
         resource=resource,
         resource_id=owner_id,
-        before=None,
         after=f"Tentou ação '{action}' sem permissão (owner_id={owner_id})",
     )
 
@@ -363,7 +397,7 @@ async def _deny_access(
 
 
 async def ensure_permission_or_owner(
-    user: User,
+    user: Principal,
     session: AsyncSession,
     resource: str,
     action: str,
@@ -381,11 +415,11 @@ async def ensure_permission_or_owner(
     if await has_permission(user, session, resource, action):
         return
 
-    await _deny_access(session, user, resource, action, owner_id)
+    _deny_access(user, resource, action, owner_id)
 
 
 async def ensure_org_permission_or_owner(
-    user: User,
+    user: Principal,
     session: AsyncSession,
     active_org: str | None,
     resource: str,
@@ -408,4 +442,4 @@ async def ensure_org_permission_or_owner(
     if await has_org_permission(user, session, active_org, resource, action):
         return
 
-    await _deny_access(session, user, resource, action, owner_id)
+    _deny_access(user, resource, action, owner_id)
@@ -0,0 +1,236 @@
+"""Escrita do formato IPC de stream do Arrow, sem dependências.
+
+Só o que o export de etapas usa: schema plano e record batches com
+colunas `int` (int32), `float` (float64), `date` (date32, dias) e `str`
+(utf8), todas anuláveis. O metadado de cada mensagem é um flatbuffer
+(Message.fbs/Schema.fbs do Arrow) montado à mão; o corpo são os
+buffers de cada coluna (validade, offsets, dados) alinhados em 8 bytes.
+
+Stream = `schema(...)`, um `record_batch(...)` por lote e `FIM_STREAM`.
+"""
+
+import struct
+from datetime import date
+
+FIM_STREAM = b'\xff\xff\xff\xff\x00\x00\x00\x00'
+
+_CONTINUACAO = b'\xff\xff\xff\xff'
+_EPOCH = date(1970, 1, 1)
+
+# Enums do Schema.fbs / Message.fbs
+_METADATA_V5 = 4
+_HEADER_SCHEMA = 1
+_HEADER_RECORD_BATCH = 3
+_TIPO_INT = 2
+_TIPO_FLOAT = 3
+_TIPO_UTF8 = 5
+_TIPO_DATE = 8
+_PRECISAO_DOUBLE = 2
+_DATE_DIA = 0
+
+# tipo -> (formato struct do valor, valor no lugar do nulo)
+_FIXOS = {
+    'int': ('<i', 0),
+    'float': ('<d', 0.0),
+    'date': ('<i', 0),
+}
+
+
+class _Tabela:
+    """Tabela flatbuffer: `campos[i]` é o slot i do schema (ou None).
+
+    Cada campo é `(formato, valor)` para escalares ou `('off', filho)`
+    para referências: filho `_Tabela`, `str`, lista de `_Tabela` ou
+    `_Structs`.
+    """
+
+    def __init__(self, *campos):
+        self.campos = campos
+
+
+class _Structs:
+    """Vetor de structs de int64 (FieldNode, Buffer)."""
+
+    def __init__(self, valores: list[tuple[int, ...]]):
+        self.valores = valores
+
+
+def _alinhar(buf: bytearray, alinhamento: int, deslocamento: int = 0):
+    while (len(buf) + deslocamento) % alinhamento:
+        buf.append(0)
+
+
+def _escrever(buf: bytearray, obj) -> int:
+    """Escreve `obj` no fim de `buf` e devolve a posição para os uoffset.
+
+    Monta de frente para trás: referências sempre apontam adiante e
+    são corrigidas depois que o filho é escrito.
+    """
+    if isinstance(obj, str):
+        dados = obj.encode()
+        _alinhar(buf, 4)
+        pos = len(buf)
+        buf += struct.pack('<I', len(dados)) + dados + b'\x00'
+        return pos
+
+    if isinstance(obj, _Structs):
+        _alinhar(buf, 8, 4)
+        pos = len(buf)
+        buf += struct.pack('<I', len(obj.valores))
+        for valores in obj.valores:
+            buf += struct.pack(f'<{len(valores)}q', *valores)
+        return pos
+
+    if isinstance(obj, list):
+        _alinhar(buf, 4)
+        pos = len(buf)
+        buf += struct.pack('<I', len(obj))
+        slots = []
+        for _ in obj:
+            slots.append(len(buf))
+            buf += b'\x00\x00\x00\x00'
+        for slot, filho in zip(slots, obj):
+            _corrigir(buf, slot, _escrever(buf, filho))
+        return pos
+
+    # Tabela: [soffset][pad][escalares em ordem de tamanho decrescente].
+    # Começa alinhada em 8 para os int64 ficarem alinhados também.
+    presentes = [
+        (i, formato, valor)
+        for i, campo in enumerate(obj.campos)
+        if campo is not None
+        for formato, valor in [campo]
+    ]
+    presentes.sort(key=lambda c: -_tamanho(c[1]))
+    deslocamentos = {}
+    inline = 8
+    for i, formato, _ in presentes:
+        tamanho = _tamanho(formato)
+        inline += -inline % tamanho
+        deslocamentos[i] = inline
+        inline += tamanho
+    inline += -inline % 4
+
+    vtable = struct.pack(
+        f'<{2 + len(obj.campos)}H',
+        4 + 2 * len(obj.campos),
+        inline,
+        *(deslocamentos.get(i, 0) for i in range(len(obj.campos))),
+    )
+    _alinhar(buf, 8, len(vtable))
+    inicio_vtable = len(buf)
+    buf += vtable
+    pos = len(buf)
+    corpo = bytearray(inline)
+    struct.pack_into('<i', corpo, 0, pos - inicio_vtable)
+    for i, formato, valor in presentes:
+        if formato != 'off':
+            struct.pack_into(formato, corpo, deslocamentos[i], valor)
+    buf += corpo
+    for i, formato, valor in presentes:
+        if formato == 'off':
+            slot = pos + deslocamentos[i]
+            _corrigir(buf, slot, _escrever(buf, valor))
+    return pos
+
+
+def _tamanho(formato: str) -> int:
+    return 4 if formato == 'off' else struct.calcsize(formato)
+
+
+def _corrigir(buf: bytearray, slot: int, alvo: int):
+    struct.pack_into('<I', buf, slot, alvo - slot)
+
+
+def _mensagem(tipo_header: int, header: _Tabela, corpo: bytes) -> bytes:
+    mensagem = _Tabela(
+        ('<h', _METADATA_V5),
+        ('<B', tipo_header),
+        ('off', header),
+        ('<q', len(corpo)),
+    )
+    buf = bytearray(4)
+    _corrigir(buf, 0, _escrever(buf, mensagem))
+    _alinhar(buf, 8)
+    return _CONTINUACAO + struct.pack('<i', len(buf)) + bytes(buf) + corpo
+
+
+def _tipo(tipo: str) -> tuple[int, _Tabela]:
+    if tipo == 'int':
+        return _TIPO_INT, _Tabela(('<i', 32), ('<B', 1))
+    if tipo == 'float':
+        return _TIPO_FLOAT, _Tabela(('<h', _PRECISAO_DOUBLE))
+    if tipo == 'date':
+        return _TIPO_DATE, _Tabela(('<h', _DATE_DIA))
+    return _TIPO_UTF8, _Tabela()
+
+
+def schema(colunas: list[tuple[str, str]]) -> bytes:
+    """Mensagem de schema para `colunas` [(nome, tipo)]."""
+    campos = []
+    for nome, tipo in colunas:
+        tipo_id, tipo_tabela = _tipo(tipo)
+        campos.append(
+            _Tabela(
+                ('off', nome),
+                ('<B', 1),
+                ('<B', tipo_id),
+                ('off', tipo_tabela),
+                None,
+                ('off', []),
+            )
+        )
+    header = _Tabela(('<h', 0), ('off', campos))
+    return _mensagem(_HEADER_SCHEMA, header, b'')
+
+
+def _validade(valores: list) -> bytes:
+    mapa = bytearray((len(valores) + 7) // 8)
+    for i, valor in enumerate(valores):
+        if valor is not None:
+            mapa[i // 8] |= 1 << (i % 8)
+    return bytes(mapa)
+
+
+def _buffers_coluna(tipo: str, valores: list) -> list[bytes]:
+    nulos = valores.count(None)
+    validade = _validade(valores) if nulos else b''
+    if tipo == 'date':
+        valores = [None if v is None else (v - _EPOCH).days for v in valores]
+    if tipo in _FIXOS:
+        formato, vazio = _FIXOS[tipo]
+        dados = struct.pack(
+            f'<{len(valores)}{formato[1]}',
+            *(vazio if v is None else v for v in valores),
+        )
+        return [validade, dados]
+
+    textos = [b'' if v is None else v.encode() for v in valores]
+    offsets = [0]
+    for texto in textos:
+        offsets.append(offsets[-1] + len(texto))
+    return [
+        validade,
+        struct.pack(f'<{len(offsets)}i', *offsets),
+        b''.join(textos),
+    ]
+
+
+def record_batch(colunas: list[tuple[str, str]], linhas: list[list]) -> bytes:
+    """Mensagem de record batch com `linhas`, na ordem de `colunas`."""
+    nodes = []
+    buffers = []
+    corpo = bytearray()
+    for i, (_, tipo) in enumerate(colunas):
+        valores = [linha[i] for linha in linhas]
+        nodes.append((len(valores), valores.count(None)))
+        for dados in _buffers_coluna(tipo, valores):
+            buffers.append((len(corpo), len(dados)))
+            corpo += dados
+            _alinhar(corpo, 8)
+    header = _Tabela(
+        ('<q', len(linhas)),
+        ('off', _Structs(nodes)),
+        ('off', _Structs(buffers)),
+    )
+    return _mensagem(_HEADER_RECORD_BATCH, header, bytes(corpo))
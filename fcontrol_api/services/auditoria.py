@@ -0,0 +1,216 @@
+"""Auditoria em buffer para eventos de alto volume (access_denied, login).
+
+`services.logs.log_user_action` grava na transação da própria requisição:
+é o certo para mutações de negócio (o log some junto com o rollback da
+alteração), mas no caminho de autorização ele pesa — e o `access_denied`
+nem chegava ao banco, porque a sessão da requisição negada é fechada
+sem commit.
+
+Aqui os eventos vão para uma fila em memória e são gravados em lote, numa
+sessão própria, fora da requisição:
+
+- `registrar` só enfileira (sem I/O, sem `json.dumps`) e devolve;
+- um lote sai quando a fila junta `AUDIT_BATCH_SIZE` entradas ou
+  `AUDIT_FLUSH_SECONDS` depois da primeira pendente — um INSERT de
+  várias linhas por lote;
+- falha ao gravar devolve o lote para a fila e tenta de novo no próximo
+  intervalo; acima de `AUDIT_MAX_PENDING` as entradas mais antigas são
+  descartadas (e contadas em `descartados`);
+- no desligamento do processo, `encerrar` grava o que restou (ver o
+  lifespan em app.py).
+
+O `timestamp` é o do evento, não o da gravação do lote.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from fcontrol_api.database import engine
+from fcontrol_api.models.security.logs import UserActionLog
+from fcontrol_api.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+settings = Settings()
+
+
+def _json(valor):
+    return json.dumps(valor) if valor is not None else None
+
+
+class AuditoriaBuffer:
+    """Fila de `UserActionLog` gravada em lotes (por processo)."""
+
+    def __init__(
+        self,
+        *,
+        max_lote: int,
+        intervalo: float,
+        max_pendentes: int,
+        bind: AsyncEngine | AsyncConnection | None = None,
+    ):
+        # `bind`: onde gravar; sem ele, o engine da aplicação.
+        self.bind = bind
+        self.max_lote = max_lote
+        self.intervalo = intervalo
+        self.max_pendentes = max_pendentes
+        self._pendentes: deque[dict] = deque()
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_loop: asyncio.AbstractEventLoop | None = None
+        self._tarefas: set[asyncio.Task] = set()
+        self.reset()
+
+    def reset(self) -> None:
+        """Descarta o pendente e zera os contadores (testes)."""
+        self._cancelar_timer()
+        self._pendentes.clear()
+        self.registrados = 0
+        self.gravados = 0
+        self.lotes = 0
+        self.falhas = 0
+        self.descartados = 0
+
+    def registrar(
+        self,
+        user_id: int,
+        action: str,
+        resource: str,
+        resource_id: int | None = None,
+        before: dict | str | None = None,
+        after: dict | str | None = None,
+    ) -> None:
+        """Enfileira o evento. `before`/`after` são serializados só na
+        gravação: não os altere depois de registrar."""
+        if len(self._pendentes) >= self.max_pendentes:
+            self._pendentes.popleft()
+            self.descartados += 1
+        self._pendentes.append({
+            'user_id': user_id,
+            'action': action,
+            'resource': resource,
+            'resource_id': resource_id,
+            'before': before,
+            'after': after,
+            # Coluna sem fuso: UTC naive, como nas tarefas de limpeza.
+            'timestamp': datetime.now(timezone.utc).replace(tzinfo=None),
+        })
+        self.registrados += 1
+
+        if len(self._pendentes) >= self.max_lote:
+            self._disparar()
+        else:
+            self._agendar()
+
+    def _agendar(self) -> None:
+        # O timer pertence ao loop em que foi criado: num loop novo
+        # (testes, reinício do worker) ele nunca dispararia.
+        loop = asyncio.get_running_loop()
+        if self._timer is None or self._timer_loop is not loop:
+            self._timer = loop.call_later(self.intervalo, self._disparar)
+            self._timer_loop = loop
+
+    def _cancelar_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        self._timer_loop = None
+
+    def _disparar(self) -> None:
+        self._cancelar_timer()
+        tarefa = asyncio.get_running_loop().create_task(self._em_segundo())
+        # Referência forte: o loop só guarda referência fraca das tasks.
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._tarefas.discard)
+
+    async def _em_segundo(self) -> None:
+        await self.descarregar()
+        if self._pendentes:
+            self._agendar()
+
+    async def descarregar(self, session: AsyncSession | None = None) -> int:
+        """Grava o que está pendente, em lotes de `max_lote`.
+
+        Sem `session`, cada lote é gravado e commitado numa sessão
+        própria. Com `session`, os INSERTs entram nela e o commit fica
+        com quem chamou. Devolve quantas entradas foram gravadas; para no
+        primeiro lote que falhar, que volta para a fila.
+        """
+        gravados = 0
+        while self._pendentes:
+            lote = [
+                self._pendentes.popleft()
+                for _ in range(min(self.max_lote, len(self._pendentes)))
+            ]
+            try:
+                await self._gravar(lote, session)
+            except Exception:
+                logger.exception(
+                    'Falha ao gravar %d entradas de auditoria', len(lote)
+                )
+                self.falhas += 1
+                self._devolver(lote)
+                break
+            gravados += len(lote)
+            self.gravados += len(lote)
+            self.lotes += 1
+        return gravados
+
+    async def _gravar(self, lote: list[dict], session: AsyncSession | None):
+        linhas = [
+            {**e, 'before': _json(e['before']), 'after': _json(e['after'])}
+            for e in lote
+        ]
+        if session is not None:
+            await session.execute(insert(UserActionLog), linhas)
+            return
+        async with AsyncSession(self.bind or engine) as propria:
+            await propria.execute(insert(UserActionLog), linhas)
+            await propria.commit()
+
+    def _devolver(self, lote: list[dict]) -> None:
+        # O lote volta à frente da fila, na ordem original; o que passar
+        # do teto sai pelas entradas mais antigas.
+        self._pendentes.extendleft(reversed(lote))
+        while len(self._pendentes) > self.max_pendentes:
+            self._pendentes.popleft()
+            self.descartados += 1
+
+    async def encerrar(self) -> None:
+        """Desligamento: espera os lotes em andamento e grava o resto."""
+        self._cancelar_timer()
+        loop = asyncio.get_running_loop()
+        tarefas = [t for t in self._tarefas if t.get_loop() is loop]
+        if tarefas:
+            await asyncio.gather(*tarefas, return_exceptions=True)
+        await self.descarregar()
+        if self._pendentes:
+            logger.error(
+                '%d entradas de auditoria perdidas no desligamento',
+                len(self._pendentes),
+            )
+
+    def status(self) -> dict:
+        return {
+            'max_lote': self.max_lote,
+            'intervalo_s': self.intervalo,
+            'max_pendentes': self.max_pendentes,
+            'pendentes': len(self._pendentes),
+            'registrados': self.registrados,
+            'gravados': self.gravados,
+            'lotes': self.lotes,
+            'falhas': self.falhas,
+            'descartados': self.descartados,
+        }
+
+
+auditoria = AuditoriaBuffer(
+    max_lote=settings.AUDIT_BATCH_SIZE,
+    intervalo=settings.AUDIT_FLUSH_SECONDS,
+    max_pendentes=settings.AUDIT_MAX_PENDING,
+)
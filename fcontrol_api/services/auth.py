@@ -2,7 +2,7 @@ from http import HTTPStatus
 from typing import Annotated
 
 from fastapi import Depends, HTTPException
-from sqlalchemy import case, func
+from sqlalchemy import case, exists, func, true
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
@@ -17,7 +17,16 @@ from fcontrol_api.models.security.resources import (
 from fcontrol_api.models.shared.organizacao import Organizacao
 from fcontrol_api.models.shared.tenant import Tenant
 from fcontrol_api.models.shared.tripulantes import Tripulante
+from fcontrol_api.models.shared.users import User
 from fcontrol_api.schemas.users import OrgScope
+from fcontrol_api.services.authz_cache import (
+    Principal,
+    UserAuthz,
+    authz_version,
+    get_cached_authz,
+    principal_cache,
+    store_authz,
+)
 
 Session = Annotated[AsyncSession, Depends(get_session)]
 
@@ -156,14 +165,12 @@ async def list_user_orgs(
     ]
 
 
-async def get_user_roles(
+async def _load_user_authz(
     user_id: int,
-    session: Session,
-    active_org: str | None = None,
-    app_client: str | None = None,
-):
-    role_data = {'role': None, 'perms': []}
-
+    session: AsyncSession,
+    active_org: str | None,
+    app_client: str | None,
+) -> UserAuthz:
     perms_load = (
         joinedload(UserRole.role)
         .joinedload(Roles.permissions)
@@ -199,21 +206,77 @@ async def get_user_roles(
         )
 
     if not result:
-        return role_data
+        return UserAuthz(role=None, perms=frozenset())
 
     user_role = result.role
-    perms = [
-        {
-            'resource': perm.permission.resource.name,
-            'name': perm.permission.name,
-        }
+    pairs = tuple(
+        (perm.permission.resource.name, perm.permission.name)
         for perm in user_role.permissions
-    ]
+    )
+
+    return UserAuthz(
+        role=user_role.name,
+        perms=frozenset(f'{res}.{name}' for res, name in pairs),
+        perm_pairs=pairs,
+    )
+
+
+async def get_user_authz(
+    user_id: int,
+    session: AsyncSession,
+    active_org: str | None = None,
+    app_client: str | None = None,
+) -> UserAuthz:
+    """Role e permissões do vínculo (user, org ativa), com cache.
+
+    Ver `services/authz_cache`: a resposta fica em memória até a próxima
+    escrita de RBAC (ou o TTL), poupando o joinedload de quatro níveis nas
+    várias checagens de uma mesma requisição e entre requisições.
+    """
+    key = (user_id, active_org, app_client)
+    cached = get_cached_authz(key)
+    if cached is not None:
+        return cached
+
+    version = authz_version()
+    authz = await _load_user_authz(user_id, session, active_org, app_client)
+    store_authz(key, version, authz)
+    return authz
+
+
+async def get_user_roles(
+    user_id: int,
+    session: Session,
+    active_org: str | None = None,
+    app_client: str | None = None,
+):
+    authz = await get_user_authz(user_id, session, active_org, app_client)
+    return authz.as_role_data()
+
 
-    role_data['role'] = user_role.name
-    role_data['perms'] = perms
+def _client_access_clause(user_id, client_id: str | None):
+    """Condição SQL do acesso mínimo ao cliente (None = sem exigência).
 
-    return role_data
+    Regras de negócio baseadas em Zero Trust:
+    - FATCONTROL: usuário deve ter pelo menos uma role cadastrada
+    - FATBIRD: usuário deve ser um tripulante ativo
+
+    `user_id` pode ser um valor ou uma coluna (correlação com `User.id`).
+    """
+    if client_id == 'fatcontrol':
+        return exists().where(UserRole.user_id == user_id)
+    if client_id == FATBIRD_CLIENT:
+        return exists().where(Tripulante.user_id == user_id, Tripulante.active)
+    return None
+
+
+def raise_client_access_denied(client_id: str) -> None:
+    detail = (
+        'Apenas tripulantes ativos podem acessar o FATBIRD'
+        if client_id == FATBIRD_CLIENT
+        else 'Usuário sem permissões cadastradas para o FATCONTROL'
+    )
+    raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail=detail)
 
 
 async def validate_user_client_access(
@@ -222,9 +285,8 @@ async def validate_user_client_access(
     """
     Valida se usuário tem permissões mínimas para acessar o cliente.
 
-    Regras de negócio baseadas em Zero Trust:
-    - FATCONTROL: usuário deve ter pelo menos uma role cadastrada
-    - FATBIRD: usuário deve ser um tripulante ativo
+    Regras em `_client_access_clause`. No caminho de toda requisição, a
+    mesma checagem roda embutida em `get_principal`.
 
     Args:
         user_id: ID do usuário a ser validado
@@ -234,25 +296,62 @@ async def validate_user_client_access(
     Raises:
         HTTPException (403): Se não atender os requisitos mínimos
     """
-    if client_id == 'fatcontrol':
-        # FATCONTROL: usuário deve ter pelo menos uma role cadastrada
-        user_role = await session.scalar(
-            select(UserRole).where(UserRole.user_id == user_id)
-        )
-        if not user_role:
-            raise HTTPException(
-                status_code=HTTPStatus.FORBIDDEN,
-                detail='Usuário sem permissões cadastradas para o FATCONTROL',
-            )
-    elif client_id == 'fatbird':
-        # FATBIRD: usuário deve ser um tripulante ativo
-        tripulante = await session.scalar(
-            select(Tripulante).where(
-                Tripulante.user_id == user_id, Tripulante.active
-            )
+    clause = _client_access_clause(user_id, client_id)
+    if clause is None:
+        return
+
+    if not await session.scalar(select(clause)):
+        raise_client_access_denied(client_id)
+
+
+async def _load_principal(
+    user_id: int, app_client: str | None, session: AsyncSession
+) -> tuple[Principal, bool] | None:
+    clause = _client_access_clause(User.id, app_client)
+    access_col = true() if clause is None else clause
+
+    row = (
+        await session.execute(
+            select(
+                User.id,
+                User.active,
+                User.first_login,
+                User.p_g,
+                access_col.label('has_access'),
+            ).where(User.id == user_id)
         )
-        if not tripulante:
-            raise HTTPException(
-                status_code=HTTPStatus.FORBIDDEN,
-                detail='Apenas tripulantes ativos podem acessar o FATBIRD',
-            )
+    ).one_or_none()
+
+    if row is None:
+        return None
+
+    principal = Principal(
+        id=row.id,
+        active=row.active,
+        first_login=row.first_login,
+        p_g=row.p_g,
+    )
+    return principal, bool(row.has_access)
+
+
+async def get_principal(
+    user_id: int, app_client: str | None, session: AsyncSession
+) -> tuple[Principal, bool] | None:
+    """Principal + veredito de acesso ao cliente, numa só consulta.
+
+    Substitui o `select(User)` (com a cascata selectin de `posto` e
+    `promocoes`) seguido de `validate_user_client_access` em toda
+    requisição. Fica em cache curto por `(user_id, app_client)`,
+    invalidado por escrita em users/user_roles/tripulantes (ver
+    `services/authz_cache`). None = usuário inexistente (não cacheado).
+    """
+    key = (user_id, app_client)
+    cached = principal_cache.get(key)
+    if cached is not None:
+        return cached
+
+    version = principal_cache.version
+    loaded = await _load_principal(user_id, app_client, session)
+    if loaded is not None:
+        principal_cache.put(key, version, loaded)
+    return loaded
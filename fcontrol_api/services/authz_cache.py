@@ -0,0 +1,211 @@
+"""Caches em processo da autenticação/autorização por requisição.
+
+Dois caches com a mesma mecânica (`VersionedCache`):
+
+- `authz_cache`: autorização resolvida do vínculo. `get_user_roles` roda
+  em toda requisição protegida — e de novo quando o handler chama
+  `has_org_permission`/`ensure_org_permission_or_owner` — sempre com o
+  mesmo joinedload de quatro níveis (UserRole -> Roles -> RolePermissions
+  -> Permissions -> Resources). Chave `(user_id, active_org, app_client)`;
+  valor: o nome da role e o frozenset de `resource.action`.
+- `principal_cache`: o principal de `get_current_user` (projeção enxuta do
+  usuário + veredito de acesso ao cliente). Chave `(user_id, app_client)`.
+
+Invalidação por versão: escritas nas tabelas de que cada cache depende
+incrementam a versão dele, detectadas pelos eventos de flush/commit da
+Session. Isso cobre os routers de `routers/security`, a desativação de
+usuário, scripts e fixtures de teste sem que cada caminho de escrita
+precise lembrar de invalidar. Entradas carregadas numa versão anterior são
+descartadas na leitura.
+
+A versão é por processo. O TTL limita a defasagem entre máquinas; TTL 0
+desliga o cache.
+"""
+
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from fcontrol_api.models.security.resources import (
+    Permissions,
+    Resources,
+    RolePermissions,
+    Roles,
+    UserRole,
+)
+from fcontrol_api.models.shared.tripulantes import Tripulante
+from fcontrol_api.models.shared.users import User
+from fcontrol_api.settings import Settings
+
+settings = Settings()
+
+
+@dataclass(frozen=True, slots=True)
+class UserAuthz:
+    """Autorização resolvida do vínculo (user, org ativa, cliente)."""
+
+    role: str | None
+    perms: frozenset[str]
+    # Pares (resource, action) na ordem do banco, para o contrato de
+    # `get_user_roles` (lista de dicts) consumido pelo /users/me.
+    perm_pairs: tuple[tuple[str, str], ...] = ()
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == 'admin'
+
+    def has(self, resource: str, action: str) -> bool:
+        """Grant explícito de `resource.action` (sem bypass de admin)."""
+        return f'{resource}.{action}' in self.perms
+
+    def as_role_data(self) -> dict:
+        """Formato legado de `get_user_roles`: {'role', 'perms'}."""
+        return {
+            'role': self.role,
+            'perms': [
+                {'resource': resource, 'name': name}
+                for resource, name in self.perm_pairs
+            ],
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Projeção enxuta do usuário autenticado (ver `get_current_user`).
+
+    Só o que a autenticação e os gates precisam; quem precisa do `User`
+    completo (perfil, token, troca de senha) pede `get_current_user_full`.
+    """
+
+    id: int
+    active: bool
+    first_login: bool
+    p_g: str
+
+
+class VersionedCache:
+    """Dicionário com TTL, invalidado em bloco por versão monotônica.
+
+    `models` são as classes ORM cujas escritas invalidam o cache;
+    `ttl_setting` é o nome do campo de `Settings` com o TTL em segundos
+    (lido a cada uso, para respeitar override em teste).
+    """
+
+    def __init__(self, name: str, models: tuple[type, ...], ttl_setting: str):
+        self.name = name
+        self.models = models
+        self.ttl_setting = ttl_setting
+        self.version = 0
+        self._entries: dict[tuple, tuple[int, float, object]] = {}
+
+    @property
+    def ttl(self) -> int:
+        return getattr(settings, self.ttl_setting)
+
+    def get(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        version, loaded_at, value = entry
+        if version != self.version or time.monotonic() - loaded_at > self.ttl:
+            self._entries.pop(key, None)
+            return None
+
+        return value
+
+    def put(self, key: tuple, version: int, value) -> None:
+        """Guarda `value` carregado na versão `version`.
+
+        `version` deve ser lida ANTES da consulta: se uma escrita terminar
+        durante o carregamento, a versão já avançou e o resultado
+        (possivelmente velho) é descartado em vez de ficar em cache.
+        """
+        if self.ttl <= 0 or version != self.version:
+            return
+        self._entries[key] = (version, time.monotonic(), value)
+
+    def bump(self) -> None:
+        self.version += 1
+        self._entries.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def session_flag(self) -> str:
+        # Flag em `session.info`: a transação escreveu em tabela do cache.
+        return f'{self.name}_dirty'
+
+
+authz_cache = VersionedCache(
+    'authz',
+    (Resources, Permissions, RolePermissions, Roles, UserRole),
+    'AUTHZ_CACHE_TTL_SECONDS',
+)
+principal_cache = VersionedCache(
+    'principal',
+    (User, UserRole, Tripulante),
+    'PRINCIPAL_CACHE_TTL_SECONDS',
+)
+_CACHES = (authz_cache, principal_cache)
+
+AuthzKey = tuple[int, str | None, str | None]
+
+
+def authz_version() -> int:
+    return authz_cache.version
+
+
+def bump_authz_version() -> None:
+    """Invalida todas as autorizações em cache."""
+    authz_cache.bump()
+
+
+def get_cached_authz(key: AuthzKey) -> UserAuthz | None:
+    return authz_cache.get(key)
+
+
+def store_authz(key: AuthzKey, version: int, authz: UserAuthz) -> None:
+    authz_cache.put(key, version, authz)
+
+
+def clear_authz_cache() -> None:
+    for cache in _CACHES:
+        cache.clear()
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_writes(session, flush_context):
+    touched = (*session.new, *session.dirty, *session.deleted)
+    for cache in _CACHES:
+        if any(isinstance(obj, cache.models) for obj in touched):
+            session.info[cache.session_flag] = True
+            # Invalida já no flush: leituras na própria transação (ex.: o
+            # handler que concedeu a permissão) enxergam o dado novo.
+            cache.bump()
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_bulk_writes(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    for cache in _CACHES:
+        if issubclass(mapper.class_, cache.models):
+            orm_execute_state.session.info[cache.session_flag] = True
+            cache.bump()
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _bump_on_transaction_end(session):
+    # Segundo bump no fim da transação: requisições concorrentes podem ter
+    # recarregado o estado pré-commit entre o flush e o commit.
+    for cache in _CACHES:
+        if session.info.pop(cache.session_flag, False):
+            cache.bump()
@@ -1,16 +1,19 @@
-from datetime import date, datetime, time
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
 from http import HTTPStatus
 
 from fastapi import HTTPException
-from sqlalchemy import and_, func
+from sqlalchemy import and_, delete, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from fcontrol_api.models.cegep.comiss import Comissionamento
+from fcontrol_api.models.cegep.comiss import ComissContrib, Comissionamento
 from fcontrol_api.models.cegep.missoes import FragMis, PernoiteFrag, UserFrag
 from fcontrol_api.schemas.cegep.missoes import UserFragMis
 from fcontrol_api.services.custos import custo_totais
-from fcontrol_api.utils.datas import listar_datas_entre
+from fcontrol_api.utils.orm import atualizar_coluna_por_id
 
 
 async def verificar_usrs_comiss(
@@ -142,41 +145,71 @@ def filtro_missoes_periodo(uae, data_ab, data_fc):
     )
 
 
+# Afastamento mínimo, em dias corridos, que caracteriza o módulo.
+DIAS_MODULO = 16
+
+
 def verificar_modulo(missoes: list[dict]) -> bool:
     """Recebe uma lista de missões e verifica
     se houve um afastamento de 16 dias ou mais
     em alguma delas.
     """
-    DIAS_MODULO = 16
+    return (
+        afastamentos_continuos(
+            (m['afast'].date(), m['regres'].date()) for m in missoes
+        ).maior
+        >= DIAS_MODULO
+    )
 
-    datas_set: set[date] = set()
-    for m in missoes:
-        datas_set.update(
-            listar_datas_entre(m['afast'].date(), m['regres'].date())
-        )
-    # Dedup obrigatório: missões encadeadas no mesmo dia (regresso de uma
-    # no dia do afastamento da outra) repetem a data e, sem o set, o
-    # dif == 0 resetava a contagem de dias consecutivos — módulos reais
-    # de 16+ dias passavam despercebidos.
-    datas = sorted(datas_set)
 
-    dias_consec = 1
-    for i, _ in enumerate(datas):
-        anterior = datas[i - 1]
-        atual = datas[i]
+@dataclass(frozen=True, slots=True)
+class Afastamentos:
+    """Afastamentos contínuos de um conjunto de missões.
+
+    `maior` é a duração, em dias, do maior afastamento; `janelas` são os
+    afastamentos `(inicio, fim)` (inclusivos) com pelo menos o mínimo
+    pedido de dias — com `DIAS_MODULO`, os módulos.
+    """
 
-        dif = (atual - anterior).days
+    maior: int
+    janelas: list[tuple[date, date]]
 
-        if dif != 1:
-            dias_consec = 1
-            continue
 
-        dias_consec += 1
+def afastamentos_continuos(
+    intervalos: Iterable[tuple[date, date]], minimo: int = DIAS_MODULO
+) -> Afastamentos:
+    """Une os intervalos `(afast, regres)` (inclusivos) que se sobrepõem
+    ou se encadeiam — regresso de uma missão no dia do afastamento da
+    outra, ou no dia anterior — e mede os blocos resultantes.
+
+    Trabalha sobre os ordinais dos dias (`date.toordinal()`): ordena os
+    intervalos e os funde numa única passada, sem materializar cada dia
+    do afastamento. Roda em todo recálculo de comissionamento.
+    """
+    ordinais = sorted(
+        (ini.toordinal(), fim.toordinal()) for ini, fim in intervalos
+    )
 
-        if dias_consec >= DIAS_MODULO:
-            return True
+    blocos: list[list[int]] = []
+    for ini, fim in ordinais:
+        if blocos and ini <= blocos[-1][1] + 1:
+            blocos[-1][1] = max(blocos[-1][1], fim)
+        else:
+            blocos.append([ini, fim])
 
-    return False
+    maior = max((fim - ini + 1 for ini, fim in blocos), default=0)
+    janelas = [
+        (date.fromordinal(ini), date.fromordinal(fim))
+        for ini, fim in blocos
+        if fim - ini + 1 >= minimo
+    ]
+    return Afastamentos(maior, janelas)
+
+
+def contar_modulos(intervalos: Iterable[tuple[date, date]]) -> int:
+    """Quantidade de afastamentos contínuos de `DIAS_MODULO` dias ou mais
+    (ver `afastamentos_continuos`)."""
+    return len(afastamentos_continuos(intervalos).janelas)
 
 
 async def recalcular_cache_comiss(
@@ -202,17 +235,142 @@ async def recalcular_cache_de(
     Evita reler do banco um por um quando o chamador já os carregou em
     lote (ver `recalcular_custos_missoes`).
     """
-    # Só as colunas que o cálculo usa. Carregar as entidades FragMis
-    # inteiras e serializá-las com Pydantic custava ~12 queries por
-    # comissionamento em lazy loads (users -> posto_grad/promo_users,
-    # pernoites -> cidades) — tudo descartado em seguida, já que o cache
-    # guarda apenas agregados.
+    query = _query_missoes_comiss().where(
+        UserFrag.user_id == comiss.user_id,
+        filtro_missoes_periodo(comiss.uae, comiss.data_ab, comiss.data_fc),
+    )
+    contribs = [
+        _contribuicao(registro) for registro in await session.execute(query)
+    ]
+
+    cache_data = _montar_cache_comiss(comiss, contribs)
+
+    # Atualizar no banco
+    comiss.cache_calc = cache_data
+    await session.flush()
+    await _regravar_contribuicoes({comiss.id: contribs}, session)
+
+    return cache_data
+
+
+async def recalcular_caches_comiss(
+    comiss_ids: set[int],
+    session: AsyncSession,
+) -> int:
+    """Versão em lote de `recalcular_cache_de`, para muitos
+    comissionamentos de uma vez.
+
+    As missões de TODOS os comissionamentos vêm numa única consulta
+    (join correlacionado pelo período de cada um, via
+    `filtro_missoes_periodo` sobre as colunas de `Comissionamento`),
+    agrupadas aqui por comissionamento; os caches são gravados num único
+    executemany. Chamar `recalcular_cache_de` num laço custava uma
+    consulta de agregação e um UPDATE por comissionamento.
+
+    Retorna a quantidade de comissionamentos recalculados.
+    """
+    if not comiss_ids:
+        return 0
+
+    comissionamentos = (
+        await session.execute(
+            select(
+                Comissionamento.id,
+                Comissionamento.dias_cumprir,
+                Comissionamento.valor_aj_ab,
+                Comissionamento.valor_aj_fc,
+            ).where(Comissionamento.id.in_(comiss_ids))
+        )
+    ).all()
+
+    contribs = await _contribuicoes_ao_vivo(comiss_ids, session)
+    caches = {
+        comiss.id: _montar_cache_comiss(comiss, contribs.get(comiss.id, []))
+        for comiss in comissionamentos
+    }
+    await atualizar_coluna_por_id(
+        session, Comissionamento, 'cache_calc', caches
+    )
+    await _regravar_contribuicoes(
+        {comiss_id: contribs.get(comiss_id, []) for comiss_id in caches},
+        session,
+    )
+
+    return len(caches)
+
+
+async def _registros_ao_vivo(
+    comiss_ids: Iterable[int], session: AsyncSession
+) -> dict[int, list]:
+    """Linhas de `_query_missoes_comiss` de cada comissionamento, numa
+    única consulta (não lê a tabela `ComissContrib`)."""
+    query = (
+        _query_missoes_comiss()
+        .add_columns(Comissionamento.id)
+        .join(
+            Comissionamento,
+            and_(
+                Comissionamento.user_id == UserFrag.user_id,
+                filtro_missoes_periodo(
+                    Comissionamento.uae,
+                    Comissionamento.data_ab,
+                    Comissionamento.data_fc,
+                ),
+            ),
+        )
+        .where(Comissionamento.id.in_(comiss_ids))
+    )
+    registros: dict[int, list] = {}
+    for *registro, comiss_id in await session.execute(query):
+        registros.setdefault(comiss_id, []).append(registro)
+    return registros
+
+
+async def _contribuicoes_ao_vivo(
+    comiss_ids: Iterable[int], session: AsyncSession
+) -> dict[int, list[dict]]:
+    """Contribuições de cada comissionamento calculadas a partir das
+    missões."""
+    registros = await _registros_ao_vivo(comiss_ids, session)
+    return {
+        comiss_id: [_contribuicao(r) for r in lista]
+        for comiss_id, lista in registros.items()
+    }
+
+
+async def _regravar_contribuicoes(
+    contribs: dict[int, list[dict]], session: AsyncSession
+) -> None:
+    """Substitui as contribuições gravadas dos comissionamentos dados."""
+    if not contribs:
+        return
+    await session.execute(
+        delete(ComissContrib).where(ComissContrib.comiss_id.in_(contribs))
+    )
+    linhas = [
+        {'comiss_id': comiss_id, **contrib}
+        for comiss_id, lista in contribs.items()
+        for contrib in lista
+    ]
+    if linhas:
+        await session.execute(insert(ComissContrib), linhas)
+
+
+def _query_missoes_comiss():
+    """Missões (sit='c') que entram no cache de um comissionamento.
+
+    Só as colunas que o cálculo usa. Carregar as entidades FragMis
+    inteiras e serializá-las com Pydantic custava ~12 queries por
+    comissionamento em lazy loads (users -> posto_grad/promo_users,
+    pernoites -> cidades) — tudo descartado em seguida, já que o cache
+    guarda apenas agregados. O chamador restringe o militar e o período.
+    """
     n_pernoites = (
         select(func.count(PernoiteFrag.id))
         .where(PernoiteFrag.frag_id == FragMis.id)
         .scalar_subquery()
     )
-    query = (
+    return (
         select(
             FragMis.id,
             FragMis.n_doc,
@@ -225,46 +383,67 @@ async def recalcular_cache_de(
         )
         .join(
             UserFrag,
-            and_(
-                UserFrag.user_id == comiss.user_id,
-                UserFrag.sit == 'c',
-                UserFrag.frag_id == FragMis.id,
-            ),
-        )
-        .where(
-            filtro_missoes_periodo(comiss.uae, comiss.data_ab, comiss.data_fc)
+            and_(UserFrag.sit == 'c', UserFrag.frag_id == FragMis.id),
         )
         .order_by(FragMis.afast)
     )
 
-    registros = (await session.execute(query)).all()
-
-    # Inicializar acumuladores
-    dias_comp = 0
-    diarias_comp = 0
-    vals_comp = 0
-    missoes_data = []
-
-    for mis_id, n_doc, afast, regres, custos, p_g, sit, qtd_pnt in registros:
-        totais = custo_totais(
-            p_g,
-            sit,
-            custos,
-            tem_pernoites=qtd_pnt > 0,
-            missao_id=mis_id,
-            n_doc=n_doc,
-        )
 
-        # Acumular valores
-        diarias_comp += totais['diarias']
-        dias_comp += totais['dias']
-        vals_comp += totais['valor_total']
-        # `verificar_modulo` só olha as datas.
-        missoes_data.append({'afast': afast, 'regres': regres})
+def _contribuicao(registro) -> dict:
+    """O que uma missão soma no cache do comissionamento, no formato de
+    `ComissContrib`. `registro` é uma linha de `_query_missoes_comiss`."""
+    mis_id, n_doc, afast, regres, custos, p_g, sit, qtd_pnt = registro
+    totais = custo_totais(
+        p_g,
+        sit,
+        custos,
+        tem_pernoites=qtd_pnt > 0,
+        missao_id=mis_id,
+        n_doc=n_doc,
+    )
+    return {
+        'frag_id': mis_id,
+        'data_afast': afast.date(),
+        'data_regres': regres.date(),
+        'dias': totais['dias'],
+        'diarias': totais['diarias'],
+        'valor': totais['valor_total'],
+    }
+
+
+def _montar_cache_comiss(comiss, contribs: list[dict]) -> dict:
+    """Agrega as contribuições das missões no dict de `cache_calc`.
 
-    # Calcular módulo
-    modulo = verificar_modulo(missoes_data) if missoes_data else False
+    `comiss` só precisa de `dias_cumprir`, `valor_aj_ab` e `valor_aj_fc`.
+    """
+    return _cache_comiss(
+        comiss,
+        dias_comp=sum(c['dias'] for c in contribs),
+        diarias_comp=sum(c['diarias'] for c in contribs),
+        vals_comp=sum(c['valor'] for c in contribs),
+        modulos=contar_modulos(
+            (c['data_afast'], c['data_regres']) for c in contribs
+        ),
+        missoes_count=len(contribs),
+    )
+
+
+def _cache_comiss(
+    comiss,
+    *,
+    dias_comp,
+    diarias_comp,
+    vals_comp,
+    modulos: int,
+    missoes_count: int,
+) -> dict:
+    """Monta o `cache_calc` a partir dos totais (completude inclusa).
 
+    `modulos` (quantos afastamentos de 16+ dias) é o que permite manter
+    `modulo` por diferença: uma edição só altera os blocos vizinhos.
+    Cache sem essa chave foi gravado antes da manutenção incremental e
+    é reconstruído por inteiro no próximo toque.
+    """
     # Calcular completude
     if comiss.dias_cumprir:
         completude = (
@@ -278,22 +457,17 @@ async def recalcular_cache_de(
     completude = round(completude * 100, 1)  # Retorna já em percentual (0-100)
 
     # Montar cache
-    cache_data = {
+    return {
         'dias_comp': dias_comp,
         'diarias_comp': diarias_comp,
         'vals_comp': round(vals_comp, 2),
-        'modulo': modulo,
+        'modulo': modulos > 0,
+        'modulos': modulos,
         'completude': completude,
-        'missoes_count': len(missoes_data),
+        'missoes_count': missoes_count,
         'updated_at': datetime.now().isoformat(),
     }
 
-    # Atualizar no banco
-    comiss.cache_calc = cache_data
-    await session.flush()
-
-    return cache_data
-
 
 async def validar_fechamento_comiss(
     comiss: Comissionamento,
@@ -451,11 +625,385 @@ async def recalcular_comiss_afetados(
     Recalcula todos os comissionamentos afetados por uma missão.
     Retorna a quantidade de comissionamentos recalculados.
     """
-    comiss_ids = await localizar_comiss_por_missao(
-        user_id, data_afast, data_regres, session, uae
+    return await recalcular_comiss_por_footprints(
+        [(user_id, uae, data_afast, data_regres)], session
+    )
+
+
+async def recalcular_comiss_por_footprints(
+    footprints: list[tuple[int, str, date, date]],
+    session: AsyncSession,
+) -> int:
+    """Recalcula os comissionamentos afetados por um conjunto de pegadas
+    `(user_id, uae, afast, regres)` — todos os militares de uma missão,
+    com as datas novas e as antigas.
+
+    Custo fixo, independente de quantos militares ou comissionamentos:
+    uma query localiza (`localizar_comiss_por_footprints`), uma carrega e
+    uma agregação agrupada recalcula todos os caches
+    (`recalcular_caches_comiss`). O laço antigo — localizar por militar e
+    recalcular por comissionamento, relendo cada um — custava dezenas de
+    round-trips para salvar uma missão com a tripulação comissionada.
+    Retorna a quantidade de comissionamentos recalculados.
+    """
+    comiss_ids = await localizar_comiss_por_footprints(footprints, session)
+    return await recalcular_caches_comiss(comiss_ids, session)
+
+
+async def atualizar_comiss_da_missao(
+    frag_id: int,
+    footprints: list[tuple[int, str, date, date]],
+    session: AsyncSession,
+    *,
+    missao: FragMis | None = None,
+    users_frag: Sequence[UserFrag] = (),
+    tem_pernoites: bool = False,
+) -> int:
+    """Aplica ao cache dos comissionamentos a mudança de UMA missão.
+
+    Em vez de reagregar todas as missões do período (`recalcular_*`), lê
+    a contribuição gravada da missão (`ComissContrib`), calcula a nova e
+    soma só a diferença nos totais. `modulo` é revisto apenas na
+    vizinhança das datas antiga e nova (ver `_delta_modulos`). O custo
+    não depende de quantas missões o comissionamento já tem.
+
+    `missao=None` é a exclusão: chamar ANTES de remover a missão.
+    `footprints` são as pegadas `(user_id, uae, afast, regres)` antigas e
+    novas, como em `localizar_comiss_por_footprints`; os
+    comissionamentos cujo cache ainda não é incremental (sem `modulos`)
+    são recalculados por inteiro. Retorna quantos foram atualizados.
+    """
+    comiss_ids = await localizar_comiss_por_footprints(footprints, session)
+    comiss_ids.update(
+        await session.scalars(
+            select(ComissContrib.comiss_id).where(
+                ComissContrib.frag_id == frag_id
+            )
+        )
+    )
+    if not comiss_ids:
+        return 0
+
+    comissionamentos = (
+        await session.execute(
+            select(
+                Comissionamento.id,
+                Comissionamento.user_id,
+                Comissionamento.uae,
+                Comissionamento.data_ab,
+                Comissionamento.data_fc,
+                Comissionamento.dias_cumprir,
+                Comissionamento.valor_aj_ab,
+                Comissionamento.valor_aj_fc,
+                Comissionamento.cache_calc,
+            )
+            .where(Comissionamento.id.in_(comiss_ids))
+            # O delta é somado ao `cache_calc` lido aqui: sem o lock, duas
+            # missões salvas ao mesmo tempo leriam o mesmo cache e uma das
+            # diferenças se perderia. Em ordem de id, para duas transações
+            # com comissionamentos em comum não travarem uma a outra.
+            .order_by(Comissionamento.id)
+            .with_for_update()
+        )
+    ).all()
+
+    completos = {
+        c.id for c in comissionamentos if 'modulos' not in (c.cache_calc or {})
+    }
+    incrementais = [c for c in comissionamentos if c.id not in completos]
+    await recalcular_caches_comiss(completos, session)
+    if not incrementais:
+        return len(completos)
+
+    antigas = {
+        contrib.comiss_id: contrib
+        for contrib in await session.execute(
+            select(
+                ComissContrib.comiss_id,
+                ComissContrib.data_afast,
+                ComissContrib.data_regres,
+                ComissContrib.dias,
+                ComissContrib.diarias,
+                ComissContrib.valor,
+            ).where(
+                ComissContrib.frag_id == frag_id,
+                ComissContrib.comiss_id.in_([c.id for c in incrementais]),
+            )
+        )
+    }
+    novas = {
+        c.id: contrib
+        for c in incrementais
+        if (
+            contrib := _contribuicao_da_missao(
+                c, missao, users_frag, tem_pernoites
+            )
+        )
+    }
+
+    vizinhos = await _vizinhanca_modulo(incrementais, antigas, novas, session)
+
+    caches = {}
+    for comiss in incrementais:
+        antiga = antigas.get(comiss.id)
+        nova = novas.get(comiss.id)
+        if antiga is None and nova is None:
+            continue
+        cache = comiss.cache_calc
+        delta = {
+            campo: (nova[campo] if nova else 0)
+            - (getattr(antiga, campo) if antiga else 0)
+            for campo in ('dias', 'diarias', 'valor')
+        }
+        caches[comiss.id] = _cache_comiss(
+            comiss,
+            dias_comp=cache['dias_comp'] + delta['dias'],
+            diarias_comp=cache['diarias_comp'] + delta['diarias'],
+            vals_comp=cache['vals_comp'] + delta['valor'],
+            modulos=cache['modulos']
+            + _delta_modulos(vizinhos.get(comiss.id, {}), frag_id, nova),
+            missoes_count=cache['missoes_count']
+            + (nova is not None)
+            - (antiga is not None),
+        )
+
+    if removidas := [cid for cid in antigas if cid not in novas]:
+        await session.execute(
+            delete(ComissContrib).where(
+                ComissContrib.frag_id == frag_id,
+                ComissContrib.comiss_id.in_(removidas),
+            )
+        )
+    if novas:
+        stmt = pg_insert(ComissContrib)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    ComissContrib.comiss_id,
+                    ComissContrib.frag_id,
+                ],
+                set_={
+                    campo: stmt.excluded[campo]
+                    for campo in (
+                        'data_afast',
+                        'data_regres',
+                        'dias',
+                        'diarias',
+                        'valor',
+                    )
+                },
+            ),
+            [{'comiss_id': cid, **nova} for cid, nova in novas.items()],
+        )
+    await atualizar_coluna_por_id(
+        session, Comissionamento, 'cache_calc', caches
     )
 
-    for comiss_id in comiss_ids:
-        await recalcular_cache_comiss(comiss_id, session)
+    return len(completos) + len(caches)
+
+
+def _contribuicao_da_missao(
+    comiss, missao, users_frag, tem_pernoites: bool
+) -> dict | None:
+    """Contribuição nova da missão para `comiss`, ou None se ela não
+    entra no cache (mesmo critério de `filtro_missoes_periodo` e do join
+    de `_query_missoes_comiss`)."""
+    if missao is None or missao.uae != comiss.uae:
+        return None
+    if not (
+        comiss.data_ab <= missao.afast.date()
+        and missao.regres.date() <= comiss.data_fc
+    ):
+        return None
+    for uf in users_frag:
+        if uf.user_id == comiss.user_id and uf.sit == 'c':
+            return _contribuicao((
+                missao.id,
+                missao.n_doc,
+                missao.afast,
+                missao.regres,
+                missao.custos,
+                uf.p_g,
+                uf.sit,
+                1 if tem_pernoites else 0,
+            ))
+    return None
+
+
+async def _vizinhanca_modulo(
+    comissionamentos, antigas: dict, novas: dict, session
+) -> dict[int, dict[int, tuple[date, date]]]:
+    """Intervalos `(afast, regres)` gravados, por comissionamento, das
+    missões até `DIAS_MODULO + 1` dias antes ou depois das datas antiga e
+    nova da missão. Uma consulta para todos os comissionamentos."""
+    datas = [(c.data_afast, c.data_regres) for c in antigas.values()]
+    datas.extend((c['data_afast'], c['data_regres']) for c in novas.values())
+    if not datas:
+        return {}
+
+    margem = timedelta(days=DIAS_MODULO + 1)
+    ini = min(d[0] for d in datas) - margem
+    fim = max(d[1] for d in datas) + margem
+
+    vizinhos: dict[int, dict[int, tuple[date, date]]] = {}
+    for comiss_id, vizinho_id, afast, regres in await session.execute(
+        select(
+            ComissContrib.comiss_id,
+            ComissContrib.frag_id,
+            ComissContrib.data_afast,
+            ComissContrib.data_regres,
+        ).where(
+            ComissContrib.comiss_id.in_([c.id for c in comissionamentos]),
+            ComissContrib.data_afast <= fim,
+            ComissContrib.data_regres >= ini,
+        )
+    ):
+        vizinhos.setdefault(comiss_id, {})[vizinho_id] = (afast, regres)
+    return vizinhos
+
+
+def _delta_modulos(
+    vizinhos: dict[int, tuple[date, date]], frag_id: int, nova: dict | None
+) -> int:
+    """Variação na contagem de módulos ao trocar a missão `frag_id` pela
+    contribuição `nova` (None = sai do comissionamento).
+
+    Só os blocos que encostam nas datas da missão podem mudar, e todos
+    cabem na janela de `_vizinhanca_modulo`: um bloco que a ultrapassa
+    tem, dentro dela, mais de `DIAS_MODULO` dias — conta como módulo
+    antes e depois do corte. Blocos longe da missão aparecem iguais nas
+    duas contagens e se cancelam.
+    """
+    depois = {k: v for k, v in vizinhos.items() if k != frag_id}
+    if nova is not None:
+        depois[frag_id] = (nova['data_afast'], nova['data_regres'])
+    return contar_modulos(depois.values()) - contar_modulos(vizinhos.values())
+
+
+# Tolerância para agregados monetários/diárias (ponto flutuante).
+TOL_RECONCILIACAO = 0.01
+
+
+async def reconciliar_caches_comiss(
+    session: AsyncSession,
+    *,
+    corrigir: bool = False,
+    lote: int = 200,
+) -> list[tuple[int, str, list[str]]]:
+    """Compara o `cache_calc` (e as contribuições gravadas) de todos os
+    comissionamentos com o agregado ao vivo das missões.
+
+    Rede de segurança da manutenção incremental
+    (`atualizar_comiss_da_missao`): pega deriva de arredondamento e
+    escritas que não passaram pelo serviço (SQL manual, script). Com
+    `corrigir=True` os divergentes são reconstruídos por inteiro
+    (`recalcular_caches_comiss`). Retorna `(id, uae, motivos)` de cada
+    divergente. Ver scripts/check_comiss_cache.py.
+    """
+    divergentes: list[tuple[int, str, list[str]]] = []
+    ultimo_id = 0
+    while True:
+        comissionamentos = (
+            await session.execute(
+                select(
+                    Comissionamento.id,
+                    Comissionamento.uae,
+                    Comissionamento.dias_cumprir,
+                    Comissionamento.valor_aj_ab,
+                    Comissionamento.valor_aj_fc,
+                    Comissionamento.cache_calc,
+                )
+                .where(Comissionamento.id > ultimo_id)
+                .order_by(Comissionamento.id)
+                .limit(lote)
+            )
+        ).all()
+        if not comissionamentos:
+            break
+        ultimo_id = comissionamentos[-1].id
+        ids = [c.id for c in comissionamentos]
+
+        registros = await _registros_ao_vivo(ids, session)
+        gravadas = {
+            linha.comiss_id: linha
+            for linha in await session.execute(
+                select(
+                    ComissContrib.comiss_id,
+                    func.count().label('missoes_count'),
+                    func.sum(ComissContrib.dias).label('dias_comp'),
+                    func.sum(ComissContrib.diarias).label('diarias_comp'),
+                    func.sum(ComissContrib.valor).label('vals_comp'),
+                )
+                .where(ComissContrib.comiss_id.in_(ids))
+                .group_by(ComissContrib.comiss_id)
+            )
+        }
+
+        lote_divergente = []
+        for comiss in comissionamentos:
+            lista = registros.get(comiss.id, [])
+            vivo = _montar_cache_comiss(
+                comiss, [_contribuicao(r) for r in lista]
+            )
+            vivo['missoes_inconsistentes'] = sum(
+                custo_totais(p_g, sit, custos, tem_pernoites=qtd > 0)[
+                    'custo_inconsistente'
+                ]
+                for _, _, _, _, custos, p_g, sit, qtd in lista
+            )
+            motivos = divergencias_cache_comiss(
+                comiss.cache_calc or {}, vivo, gravadas.get(comiss.id)
+            )
+            if motivos:
+                lote_divergente.append((comiss.id, comiss.uae, motivos))
+
+        if corrigir:
+            await recalcular_caches_comiss(
+                {cid for cid, _, _ in lote_divergente}, session
+            )
+        divergentes.extend(lote_divergente)
+
+    return divergentes
+
+
+def divergencias_cache_comiss(
+    cache: dict, vivo: dict, gravadas=None
+) -> list[str]:
+    """Motivos pelos quais o cache persistido difere do agregado ao vivo
+    (`vivo`, no formato de `cache_calc` mais `missoes_inconsistentes`).
+    `gravadas` são os totais de `ComissContrib` do comissionamento."""
+    motivos: list[str] = []
+
+    if not cache:
+        motivos.append('cache_calc vazio/inexistente')
+    elif 'modulos' not in cache:
+        motivos.append('cache anterior à manutenção incremental')
+
+    if vivo['missoes_inconsistentes'] > 0:
+        motivos.append(
+            f'{vivo["missoes_inconsistentes"]} missão(ões) com '
+            'custo individual desatualizado'
+        )
+
+    for campo, tol in (
+        ('missoes_count', 0),
+        ('dias_comp', 0),
+        ('diarias_comp', TOL_RECONCILIACAO),
+        ('vals_comp', TOL_RECONCILIACAO),
+    ):
+        if abs(vivo[campo] - cache.get(campo, 0)) > tol:
+            motivos.append(
+                f'{campo}: cache={cache.get(campo, 0)} vivo={vivo[campo]}'
+            )
+        gravado = getattr(gravadas, campo, None) or 0
+        if abs(vivo[campo] - gravado) > tol:
+            motivos.append(
+                f'{campo}: contribuições={gravado} vivo={vivo[campo]}'
+            )
+
+    if cache and cache.get('modulo', False) != vivo['modulo']:
+        motivos.append(
+            f'modulo: cache={cache.get("modulo")} vivo={vivo["modulo"]}'
+        )
 
-    return len(comiss_ids)
+    return motivos
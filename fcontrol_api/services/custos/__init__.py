@@ -18,6 +18,7 @@ from fcontrol_api.services.custos.cache_ref import (
     cache_diarias,
     cache_soldos,
     carregar_caches_custo,
+    invalidar_caches_custo,
 )
 from fcontrol_api.services.custos.calculo import calcular_custos_frag_mis
 from fcontrol_api.services.custos.integridade import (
@@ -37,5 +38,6 @@ __all__ = [
     'custo_missao',
     'custo_totais',
     'gerar_hash_custos',
+    'invalidar_caches_custo',
     'verificar_integridade_custos',
 ]
@@ -4,9 +4,26 @@ Carregam de uma vez as tabelas de domínio (diárias, soldos, grupos de pg
 e de cidade) para evitar N+1 durante a materialização do cache de uma
 missão. São dados que mudam pouco e impactam todo o sistema — futura
 detecção de drift por alteração nessas tabelas (fase 2) parte daqui.
+
+`carregar_caches_custo` roda em todo salvamento de missão e em toda
+simulação do FatBird, então o resultado fica em memória no processo,
+compartilhado entre requisições. A validade é decidida pelo banco: o
+contador `cegep.versao_caches` (chave `VERSAO_CUSTOS`) muda por trigger a
+cada escrita em qualquer uma das quatro tabelas — pelo admin de diárias e
+soldos, por script ou por migration — e todos os workers enxergam a mesma
+versão. Custo por chamada: uma leitura por chave primária.
+
+Os valores em cache são compartilhados: são imutáveis (`FaixasVigencia`
+de `Vigencia`, dicionários que ninguém altera) e não objetos ORM, que
+ficariam presos à sessão que os carregou.
 """
 
+from bisect import bisect_right
 from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,38 +32,157 @@ from fcontrol_api.models.cegep.diarias import (
     DiariaValor,
     GrupoCidade,
     GrupoPg,
+    VersaoCache,
 )
 from fcontrol_api.models.shared.posto_grad import Soldo
 
+VERSAO_CUSTOS = 'custos_ref'
+
+
+@dataclass(frozen=True, slots=True)
+class Vigencia:
+    """Faixa de vigência de um valor de referência (diária ou soldo)."""
+
+    data_inicio: date
+    data_fim: date | None
+    valor: Decimal
+
+
+ZERO = Decimal('0')
+UM_DIA = timedelta(days=1)
+
+
+class FaixasVigencia:
+    """Faixas de vigência de uma chave, ordenadas e indexadas pelo início.
+
+    As faixas de uma chave não se sobrepõem (EXCLUDE no banco), então a
+    faixa que cobre um dia é a última com `data_inicio <= dia`: busca
+    binária em vez de varrer a lista a cada dia de cada pernoite.
+    """
+
+    __slots__ = ('_faixas', '_inicios')
+
+    def __init__(self, faixas: Iterable):
+        ordenadas = sorted(
+            (Vigencia(f.data_inicio, f.data_fim, f.valor) for f in faixas),
+            key=lambda v: v.data_inicio,
+        )
+        self._faixas = tuple(ordenadas)
+        self._inicios = [f.data_inicio for f in ordenadas]
+
+    def __iter__(self) -> Iterator[Vigencia]:
+        return iter(self._faixas)
+
+    def __len__(self) -> int:
+        return len(self._faixas)
+
+    def _cobre(self, idx: int, dia: date) -> bool:
+        if idx < 0:
+            return False
+        fim = self._faixas[idx].data_fim
+        return fim is None or dia <= fim
+
+    def valor_em(self, dia: date) -> Decimal:
+        """Valor vigente em `dia`; 0 fora de qualquer faixa."""
+        idx = bisect_right(self._inicios, dia) - 1
+        if self._cobre(idx, dia):
+            return self._faixas[idx].valor
+        return ZERO
+
+    def trechos(
+        self, ini: date, fim: date
+    ) -> Iterator[tuple[date, date, Decimal]]:
+        """Divide [ini, fim] (inclusivo) nas fronteiras das faixas.
+
+        Gera `(de, ate, valor)` com valor constante no trecho; dias fora
+        de qualquer faixa saem como trechos de valor 0. Uma busca binária
+        no início e depois só avança pelas faixas seguintes.
+        """
+        idx = bisect_right(self._inicios, ini) - 1
+        dia = ini
+        while dia <= fim:
+            if self._cobre(idx, dia):
+                faixa = self._faixas[idx]
+                ate = (
+                    fim if faixa.data_fim is None else min(fim, faixa.data_fim)
+                )
+                valor = faixa.valor
+            else:
+                prox = idx + 1
+                ate = (
+                    min(fim, self._inicios[prox] - UM_DIA)
+                    if prox < len(self._inicios)
+                    else fim
+                )
+                valor = ZERO
+            yield dia, ate, valor
+
+            dia = ate + UM_DIA
+            while (
+                idx + 1 < len(self._inicios) and self._inicios[idx + 1] <= dia
+            ):
+                idx += 1
+
+
+SEM_FAIXAS = FaixasVigencia(())
+
 
 async def cache_diarias(session: AsyncSession):
     result = await session.scalars(select(DiariaValor))
     valores = result.all()
 
-    cache = defaultdict(list)
+    agrupado = defaultdict(list)
 
     for v in valores:
         chave = (v.grupo_pg, v.grupo_cid)
-        cache[chave].append(v)
+        agrupado[chave].append(v)
 
-    return cache
+    return {chave: FaixasVigencia(itens) for chave, itens in agrupado.items()}
 
 
 async def cache_soldos(session: AsyncSession):
     result = await session.scalars(select(Soldo))
     soldos = result.all()
 
-    cache = defaultdict(list)
+    agrupado = defaultdict(list)
 
     for s in soldos:
-        cache[s.pg].append(s)
+        agrupado[s.pg].append(s)
 
-    return cache
+    return {pg: FaixasVigencia(itens) for pg, itens in agrupado.items()}
 
 
-async def carregar_caches_custo(session: AsyncSession) -> tuple:
-    """Carrega de uma vez os caches de referência usados no cálculo de
-    custos (diárias, soldos, grupos de pg e de cidade)."""
+class _CacheCustos:
+    """Último carregamento e a versão do banco em que foi feito."""
+
+    def __init__(self):
+        self.versao: int | None = None
+        self.caches: tuple | None = None
+
+    def limpar(self) -> None:
+        self.versao = None
+        self.caches = None
+
+
+_cache = _CacheCustos()
+
+
+def invalidar_caches_custo() -> None:
+    """Descarta o carregamento em memória deste processo.
+
+    Não é preciso chamar após escrever nas tabelas de referência (o
+    trigger já muda a versão); serve a testes e diagnóstico.
+    """
+    _cache.limpar()
+
+
+async def _versao_custos(session: AsyncSession) -> int | None:
+    return await session.scalar(
+        select(VersaoCache.versao).where(VersaoCache.nome == VERSAO_CUSTOS)
+    )
+
+
+async def _carregar(session: AsyncSession) -> tuple:
     valores_cache = await cache_diarias(session)
     soldos_cache = await cache_soldos(session)
     grupos_pg = dict(
@@ -60,3 +196,25 @@ async def carregar_caches_custo(session: AsyncSession) -> tuple:
         ).all()
     )
     return valores_cache, soldos_cache, grupos_pg, grupos_cidade
+
+
+async def carregar_caches_custo(session: AsyncSession) -> tuple:
+    """Caches de referência usados no cálculo de custos (diárias, soldos,
+    grupos de pg e de cidade), reaproveitados enquanto a versão no banco
+    não mudar.
+
+    A versão é lida ANTES das tabelas: se uma escrita for confirmada no
+    meio do carregamento, o resultado fica sob a versão antiga e a próxima
+    chamada recarrega — nunca o contrário (dado velho sob versão nova).
+    Lida na transação do chamador, a versão já reflete escritas dessa
+    mesma transação (ex.: admin altera diária e recalcula as missões).
+    """
+    versao = await _versao_custos(session)
+    if versao is not None and versao == _cache.versao:
+        return _cache.caches
+
+    caches = await _carregar(session)
+    if versao is not None:
+        _cache.versao = versao
+        _cache.caches = caches
+    return caches
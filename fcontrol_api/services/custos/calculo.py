@@ -11,13 +11,16 @@ leitura (`leitura.custo_missao`).
 from datetime import date
 from decimal import ROUND_HALF_UP, Decimal
 
-from fcontrol_api.models.cegep.diarias import DiariaValor
-from fcontrol_api.models.shared.posto_grad import Soldo
 from fcontrol_api.schemas.cegep.custos import (
     CustoFragMisInput,
     CustoPernoiteInput,
     CustoUserFragInput,
 )
+from fcontrol_api.services.custos.cache_ref import (
+    SEM_FAIXAS,
+    UM_DIA,
+    FaixasVigencia,
+)
 from fcontrol_api.services.custos.integridade import (
     chave_pg_sit,
     gerar_hash_custos,
@@ -34,28 +37,34 @@ def _q(valor: Decimal) -> Decimal:
     return valor.quantize(CENTAVO, rounding=ROUND_HALF_UP)
 
 
+def _faixas(cache: dict, chave) -> FaixasVigencia:
+    faixas = cache.get(chave)
+    if faixas is None:
+        return SEM_FAIXAS
+    if not isinstance(faixas, FaixasVigencia):
+        # Caches montados à mão (testes, scripts) chegam como lista.
+        faixas = FaixasVigencia(faixas)
+    return faixas
+
+
 def _buscar_valor_por_dia(
     grupo_pg: int, grupo_cidade: int, data: date, cache: dict
 ) -> Decimal:
-    lista: list[DiariaValor] = cache.get((grupo_pg, grupo_cidade), [])
-
-    for item in lista:
-        if item.data_inicio <= data and (
-            item.data_fim is None or data <= item.data_fim
-        ):
-            return item.valor
-    return Decimal('0')
+    return _faixas(cache, (grupo_pg, grupo_cidade)).valor_em(data)
 
 
 def _buscar_soldo_por_dia(pg: str, data: date, cache: dict) -> Decimal:
-    lista: list[Soldo] = cache.get(pg, [])
+    return _faixas(cache, pg).valor_em(data)
+
 
-    for item in lista:
-        if item.data_inicio <= data and (
-            item.data_fim is None or data <= item.data_fim
-        ):
-            return item.valor
-    return Decimal('0')
+def _acumular(custo: dict, val_ag: dict, valor: Decimal, dias: int) -> None:
+    """Soma `dias` dias a `valor` no histograma {valor: qtd} do pernoite."""
+    if valor not in val_ag:
+        val_ag[valor] = {'valor': valor, 'qtd': 0}
+
+    val_ag[valor]['qtd'] += dias
+    custo['subtotal'] += valor * dias
+    custo['dias'] += dias
 
 
 def _custo_pernoite(
@@ -70,6 +79,13 @@ def _custo_pernoite(
     soldos_cache,
     vals_cache,
 ):
+    """Custo de um pernoite para uma combinação pg+sit.
+
+    Percorre o intervalo por trechos de valor constante (fronteiras das
+    faixas de vigência), não dia a dia: cada trecho entra como valor ×
+    número de dias. O valor diário é quantizado antes da multiplicação,
+    então o resultado é idêntico ao da soma dia a dia.
+    """
     custo = {
         'subtotal': Decimal('0'),
         'ac_desloc': 0,
@@ -78,41 +94,22 @@ def _custo_pernoite(
     }
     val_ag: dict = {}
 
-    dias_validos = listar_datas_entre(ini, fim)
-
     # Para gratificação, processa TODOS os dias (2% do soldo por dia)
     # Para diárias normais, processa todos exceto o último (tratado separado)
     if sit == 'g':
-        for dia in dias_validos:
-            soldo_dia = _buscar_soldo_por_dia(pg, dia, soldos_cache)
-            valor_dia = _q(soldo_dia * Decimal('0.02'))
-
-            key = valor_dia
-            if key not in val_ag:
-                val_ag[key] = {'valor': valor_dia, 'qtd': 0}
-
-            val_ag[key]['qtd'] += 1
-            custo['subtotal'] += valor_dia
-            custo['dias'] += 1
+        for de, ate, soldo in _faixas(soldos_cache, pg).trechos(ini, fim):
+            valor_dia = _q(soldo * Decimal('0.02'))
+            _acumular(custo, val_ag, valor_dia, (ate - de).days + 1)
     else:
-        # Diárias normais: processa todos exceto último
-        for dia in dias_validos[:-1]:
-            valor_dia = _buscar_valor_por_dia(gp_pg, gp_cid, dia, vals_cache)
+        faixas = _faixas(vals_cache, (gp_pg, gp_cid))
 
-            key = valor_dia
-            if key not in val_ag:
-                val_ag[key] = {'valor': valor_dia, 'qtd': 0}
-
-            val_ag[key]['qtd'] += 1
-            custo['subtotal'] += valor_dia
-            custo['dias'] += 1
+        # Diárias normais: processa todos exceto último
+        for de, ate, valor_dia in faixas.trechos(ini, fim - UM_DIA):
+            _acumular(custo, val_ag, valor_dia, (ate - de).days + 1)
 
         # Último dia: meia-diária opcional + acréscimo deslocamento
-        ult_dia = dias_validos[-1]
         if meia_diaria:
-            valor_ultimo = _buscar_valor_por_dia(
-                gp_pg, gp_cid, ult_dia, vals_cache
-            )
+            valor_ultimo = faixas.valor_em(fim)
             key_last = valor_ultimo
             if key_last not in val_ag:
                 val_ag[key_last] = {'valor': valor_ultimo, 'qtd': 0}
@@ -136,8 +133,8 @@ def calcular_custos_frag_mis(
     pernoites: list[CustoPernoiteInput],
     grupos_pg: dict[str, int],
     grupos_cidade: dict[int, int],
-    valores_cache: dict[tuple[int, int], list[DiariaValor]],
-    soldos_cache: dict[str, list[Soldo]],
+    valores_cache: dict[tuple[int, int], FaixasVigencia],
+    soldos_cache: dict[str, FaixasVigencia],
 ) -> dict:
     """
     Calcula e retorna custos pré-processados para FragMis em formato JSONB.
@@ -0,0 +1,165 @@
+"""Export de etapas como dados brutos: CSV e Arrow (colunar).
+
+Para quem leva as etapas para planilha ou notebook e não quer a
+planilha formatada: sem estilos, sem larguras, sem linha de totais.
+Os valores saem crus — data ISO, horários HH:MM, tempo de voo em
+minutos — e as listas da etapa (OIs, tripulantes) juntadas com `|`.
+
+Os dois formatos usam os mesmos lotes do XLSX (`lotes_etapas`, com
+`fetch_oi_detail_data`/`fetch_trip_data` por lote) e emitem um pedaço
+de bytes por lote, com memória constante:
+
+- CSV: UTF-8 com BOM (o Excel reconhece a codificação), separador `,`;
+- Arrow: formato IPC de stream (`.arrows`) — uma mensagem de schema,
+  um record batch por lote e o marcador de fim. Lido por
+  `pyarrow.ipc.open_stream`, `polars.read_ipc_stream`, DuckDB etc.
+  Escrito por `services.arrow_ipc`, sem depender do `pyarrow`.
+"""
+
+import csv
+import io
+from collections.abc import AsyncIterator
+from datetime import date, time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fcontrol_api.services import arrow_ipc
+from fcontrol_api.services.documentos import documentos
+from fcontrol_api.services.excel_etapas import LOTE_EXPORT, lotes_etapas
+
+CSV_MEDIA_TYPE = 'text/csv; charset=utf-8'
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+# (flag, [(coluna, tipo)]) — tipos: str, int, float, date. As colunas
+# base sempre saem; as opcionais seguem as flags do export.
+_BASE = [
+    ('id', 'int'),
+    ('data', 'date'),
+    ('origem', 'str'),
+    ('destino', 'str'),
+    ('dep', 'str'),
+    ('arr', 'str'),
+    ('tvoo_min', 'int'),
+    ('anv', 'str'),
+]
+_OPCIONAIS = [
+    ('pousos', [('pousos', 'int')]),
+    ('nivel', [('nivel', 'str')]),
+    ('tow', [('tow', 'int')]),
+    ('pax', [('pax', 'int')]),
+    ('carga', [('carga', 'int')]),
+    ('comb', [('comb', 'int')]),
+    ('lub', [('lub', 'float')]),
+    (
+        'esforco_aereo',
+        [('cod_oi', 'str'), ('esforco_aereo', 'str'), ('reg', 'str')],
+    ),
+    ('tripulantes', [('tripulantes', 'str')]),
+]
+
+
+def colunas(columns: dict[str, bool]) -> list[tuple[str, str]]:
+    """(nome, tipo) das colunas do export, na ordem de saída."""
+    saida = list(_BASE)
+    for flag, cols in _OPCIONAIS:
+        if columns.get(flag):
+            saida.extend(cols)
+    return saida
+
+
+def _hhmm(t: time | None) -> str | None:
+    return t.strftime('%H:%M') if t else None
+
+
+def linha(
+    etapa, columns: dict[str, bool], oi_data: dict, trip_data: dict
+) -> list:
+    """Valores crus de uma etapa, na ordem de `colunas(columns)`."""
+    valores = [
+        etapa.id,
+        etapa.data,
+        etapa.origem.upper(),
+        etapa.destino.upper(),
+        _hhmm(etapa.dep),
+        _hhmm(etapa.arr),
+        etapa.tvoo,
+        etapa.anv,
+    ]
+    for flag, _ in _OPCIONAIS:
+        if not columns.get(flag):
+            continue
+        if flag == 'esforco_aereo':
+            ois = oi_data.get(etapa.id, [])
+            valores.append('|'.join(oi.tipo_missao_cod for oi in ois))
+            valores.append('|'.join(oi.esf_aer for oi in ois))
+            valores.append('|'.join(oi.reg.upper() for oi in ois))
+        elif flag == 'tripulantes':
+            trips = trip_data.get(etapa.id, [])
+            valores.append('|'.join(t.trig.upper() for t in trips))
+        elif flag == 'lub':
+            valores.append(float(etapa.lub) if etapa.lub is not None else None)
+        else:
+            valores.append(getattr(etapa, flag))
+    return valores
+
+
+def _csv_valor(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+
+def _csv_lote(lote, columns, oi_data, trip_data) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerows(
+        [_csv_valor(v) for v in linha(e, columns, oi_data, trip_data)]
+        for e in lote
+    )
+    return buffer.getvalue().encode()
+
+
+async def stream_etapas_csv(
+    session: AsyncSession,
+    filtro,
+    columns: dict[str, bool],
+    tamanho_lote: int = LOTE_EXPORT,
+) -> AsyncIterator[bytes]:
+    """CSV das etapas do filtro: cabeçalho e depois um pedaço por lote."""
+    cabecalho = ','.join(nome for nome, _ in colunas(columns))
+    yield f'\ufeff{cabecalho}\n'.encode()
+    async for lote, oi_data, trip_data in lotes_etapas(
+        session, filtro, columns, tamanho_lote
+    ):
+        yield await documentos.executar(
+            _csv_lote, lote, columns, oi_data, trip_data
+        )
+
+
+def _arrow_lote(cols, lote, columns, oi_data, trip_data) -> bytes:
+    linhas = [linha(e, columns, oi_data, trip_data) for e in lote]
+    return arrow_ipc.record_batch(cols, linhas)
+
+
+async def stream_etapas_arrow(
+    session: AsyncSession,
+    filtro,
+    columns: dict[str, bool],
+    tamanho_lote: int = LOTE_EXPORT,
+) -> AsyncIterator[bytes]:
+    """Stream IPC do Arrow: schema, um record batch por lote e o fim.
+
+    Cada lote vira uma mensagem IPC independente, então nada além do
+    lote fica em memória.
+    """
+    cols = colunas(columns)
+    yield arrow_ipc.schema(cols)
+    async for lote, oi_data, trip_data in lotes_etapas(
+        session, filtro, columns, tamanho_lote
+    ):
+        yield await documentos.executar(
+            _arrow_lote, cols, lote, columns, oi_data, trip_data
+        )
+    yield arrow_ipc.FIM_STREAM
@@ -0,0 +1,46 @@
+"""Executor limitado para geração de documentos (XLSX, PDF, CSV...).
+
+Serializar e comprimir um documento é trabalho de CPU: feito dentro de
+um handler `async def`, trava o único event loop da máquina (1 vCPU) e
+todas as outras requisições esperam o export terminar. Aqui o trabalho
+vai para um pool de threads dedicado (`DOCS_MAX_WORKERS`) e a entrada é
+controlada por geração, não por tarefa (`services.pool_limitado`):
+
+- `vaga_documento` (dependência) admite até `DOCS_MAX_JOBS` gerações
+  simultâneas; a próxima recebe 503 com `Retry-After`, antes de o
+  handler abrir cursor ou começar a resposta. A vaga é devolvida quando
+  a resposta termina — inclusive streaming e desconexão do cliente;
+- `executar` roda cada passo de CPU da geração no pool. Com o GIL as
+  threads não paralelizam Python puro, mas o loop volta a rodar entre
+  os passos e a cada troca de thread do interpretador.
+
+Os contadores (fila, em execução, rejeições, espera na fila) são por
+processo e saem em /admin/documentos/pool.
+"""
+
+from fastapi import Depends
+
+from fcontrol_api.services.pool_limitado import PoolLimitado
+from fcontrol_api.settings import Settings
+
+settings = Settings()
+
+documentos = PoolLimitado(
+    max_workers=settings.DOCS_MAX_WORKERS,
+    max_jobs=settings.DOCS_MAX_JOBS,
+    retry_after=settings.DOCS_RETRY_AFTER_SECONDS,
+    nome='documentos',
+    ocupado='Geração de documentos ocupada. Tente novamente em instantes.',
+)
+
+
+async def vaga_documento():
+    """Dependência: uma vaga de geração durante toda a resposta."""
+    documentos.admitir()
+    try:
+        yield
+    finally:
+        documentos.liberar()
+
+
+VagaDocumento = Depends(vaga_documento)
@@ -1,9 +1,43 @@
-"""Geração de planilha Excel profissional para etapas."""
-
+"""Geração de planilha Excel profissional para etapas.
+
+A planilha sai em streaming: as etapas vêm do banco em lotes
+(`yield_per`) e cada lote vira XML da planilha comprimido direto no zip
+que está sendo enviado ao cliente. Nada acumula em memória além de um
+lote — exportar anos de etapas com tripulantes cabe na VM de 512 MB.
+
+O SpreadsheetML é escrito à mão (sem openpyxl): o openpyxl só grava o
+arquivo no `save()`, depois de montar tudo, mesmo em modo write-only.
+Por isso também:
+
+- os estilos são nomeados e compilados uma vez em `styles.xml`
+  (`_ESTILOS`); a célula só referencia o índice;
+- strings vão inline na célula (sem tabela de strings compartilhadas,
+  que exigiria conhecer todas antes de fechar o arquivo);
+- larguras das colunas dinâmicas são estimadas pelo primeiro lote,
+  porque `<cols>` vem antes dos dados no XML;
+- total de etapas e TV total da linha de metadados vêm de uma agregação
+  feita antes do primeiro lote.
+"""
+
+import zipfile
+from collections.abc import AsyncIterator, Iterable
 from datetime import date, datetime, time
-from io import BytesIO
+from xml.sax.saxutils import escape
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fcontrol_api.models.estatistica.etapa import Etapa, Missao
+from fcontrol_api.services.documentos import documentos
+from fcontrol_api.services.etapas import (
+    fetch_oi_detail_data,
+    fetch_trip_data,
+)
+
+# Etapas por lote do cursor no servidor (e por fetch de OIs/tripulantes).
+LOTE_EXPORT = 500
 
-# Paleta de cores (stdlib, sem openpyxl — seguras no nível do módulo).
+# Paleta de cores
 _BLUE_DARK = '1F3864'
 _BLUE_MED = '2E5E9E'
 _BLUE_LIGHT = 'D6E4F0'
@@ -11,124 +45,160 @@ _BLUE_ZEBRA = 'F2F6FC'
 _BORDER_CLR = 'D0D5DD'
 _WHITE = 'FFFFFF'
 
-# Placeholders para openpyxl. Inicializados como None para que ruff
-# (F821) enxergue os nomes no nível do módulo; o import real e a
-# construção das constantes acontece em _init_openpyxl(), chamado
-# no começo de generate_etapas_xlsx(). Assim openpyxl (~200ms) só
-# carrega quando o endpoint de export é efetivamente invocado — fora
-# do cold start.
-Workbook = None
-get_column_letter = None
-Alignment = None
-Border = None
-Side = None
-Font = None
-PatternFill = None
-_TITLE_FONT = None
-_TITLE_FILL = None
-_META_FONT = None
-_META_FILL = None
-_HEADER_FONT = None
-_HEADER_FILL = None
-_HEADER_BORDER = None
-_DATA_BORDER = None
-_ZEBRA_FILL = None
-_TOTAL_FILL = None
-_TOTAL_FONT = None
-_CENTER = None
-_CENTER_WRAP = None
-_LEFT_WRAP = None
-_RIGHT = None
-
-_lazy_initialized = False
-
-
-def _init_openpyxl() -> None:
-    """Importa openpyxl e popula as constantes de estilo do módulo.
-
-    Idempotente — chamadas subsequentes são no-op. Deve ser chamada
-    no começo de toda função pública que use os estilos.
-    """
-    if _lazy_initialized:
-        return
-
-    from openpyxl import Workbook
-    from openpyxl.styles import (
-        Alignment,
-        Border,
-        Font,
-        PatternFill,
-        Side,
-    )
-    from openpyxl.utils import get_column_letter
-
-    # Escopo local: os nomes importados acima são locais a esta função;
-    # globals().update() sobrescreve os placeholders `None` no módulo.
-    globals().update({
-        'Workbook': Workbook,
-        'get_column_letter': get_column_letter,
-        'Alignment': Alignment,
-        'Border': Border,
-        'Side': Side,
-        'Font': Font,
-        'PatternFill': PatternFill,
-        '_TITLE_FONT': Font(bold=True, size=14, color=_WHITE),
-        '_TITLE_FILL': PatternFill(
-            start_color=_BLUE_DARK,
-            end_color=_BLUE_DARK,
-            fill_type='solid',
-        ),
-        '_META_FONT': Font(size=10, italic=True, color='4472C4'),
-        '_META_FILL': PatternFill(
-            start_color=_BLUE_LIGHT,
-            end_color=_BLUE_LIGHT,
-            fill_type='solid',
-        ),
-        '_HEADER_FONT': Font(bold=True, size=10, color=_WHITE),
-        '_HEADER_FILL': PatternFill(
-            start_color=_BLUE_MED,
-            end_color=_BLUE_MED,
-            fill_type='solid',
-        ),
-        '_HEADER_BORDER': Border(
-            top=Side(style='thin', color=_BLUE_DARK),
-            bottom=Side(style='thin', color=_BLUE_DARK),
-            left=Side(style='thin', color=_BLUE_DARK),
-            right=Side(style='thin', color=_BLUE_DARK),
-        ),
-        '_DATA_BORDER': Border(
-            top=Side(style='thin', color=_BORDER_CLR),
-            bottom=Side(style='thin', color=_BORDER_CLR),
-            left=Side(style='thin', color=_BORDER_CLR),
-            right=Side(style='thin', color=_BORDER_CLR),
-        ),
-        '_ZEBRA_FILL': PatternFill(
-            start_color=_BLUE_ZEBRA,
-            end_color=_BLUE_ZEBRA,
-            fill_type='solid',
-        ),
-        '_TOTAL_FILL': PatternFill(
-            start_color=_BLUE_LIGHT,
-            end_color=_BLUE_LIGHT,
-            fill_type='solid',
-        ),
-        '_TOTAL_FONT': Font(bold=True, size=10),
-        '_CENTER': Alignment(horizontal='center', vertical='center'),
-        '_CENTER_WRAP': Alignment(
-            horizontal='center',
-            vertical='center',
-            wrap_text=True,
-        ),
-        '_LEFT_WRAP': Alignment(
-            horizontal='left',
-            vertical='center',
-            wrap_text=True,
-        ),
-        '_RIGHT': Alignment(horizontal='right', vertical='center'),
-        # Grava o flag junto dos estilos (via globals) para nao precisar
-        # do statement `global` (PLW0603).
-        '_lazy_initialized': True,
-    })
+_NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_NS_PKG_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# ── Estilos nomeados ───────────────────────────────
+# Fontes, preenchimentos e bordas por nome; cada estilo de célula é a
+# combinação (fonte, fill, borda, alinhamento).
+_FONTES = {
+    'padrao': '<sz val="11"/><name val="Calibri"/>',
+    'titulo': f'<b/><sz val="14"/><color rgb="FF{_WHITE}"/>'
+    '<name val="Calibri"/>',
+    'meta': '<i/><sz val="10"/><color rgb="FF4472C4"/><name val="Calibri"/>',
+    'cabecalho': f'<b/><sz val="10"/><color rgb="FF{_WHITE}"/>'
+    '<name val="Calibri"/>',
+    'total': '<b/><sz val="10"/><name val="Calibri"/>',
+}
+# Os dois primeiros fills são reservados pelo formato (none, gray125).
+_FILLS = {
+    'nenhum': None,
+    'titulo': _BLUE_DARK,
+    'meta': _BLUE_LIGHT,
+    'cabecalho': _BLUE_MED,
+    'zebra': _BLUE_ZEBRA,
+    'total': _BLUE_LIGHT,
+}
+_BORDAS = {
+    'nenhuma': {},
+    'cabecalho': dict.fromkeys(
+        ('left', 'right', 'top', 'bottom'), ('thin', _BLUE_DARK)
+    ),
+    'dado': dict.fromkeys(
+        ('left', 'right', 'top', 'bottom'), ('thin', _BORDER_CLR)
+    ),
+    'total': {
+        'left': ('thin', _BORDER_CLR),
+        'right': ('thin', _BORDER_CLR),
+        'top': ('medium', _BLUE_MED),
+        'bottom': ('medium', _BLUE_MED),
+    },
+}
+_ALINHAMENTOS = {
+    'centro': 'horizontal="center" vertical="center"',
+    'centro_wrap': 'horizontal="center" vertical="center" wrapText="1"',
+    'esq_wrap': 'horizontal="left" vertical="center" wrapText="1"',
+    'dir': 'horizontal="right" vertical="center"',
+}
+
+
+def _estilos_de_dado() -> dict[str, tuple[str, str, str, str | None]]:
+    estilos = {}
+    for alinhamento in _ALINHAMENTOS:
+        estilos[f'dado_{alinhamento}'] = (
+            'padrao',
+            'nenhum',
+            'dado',
+            alinhamento,
+        )
+        estilos[f'dado_{alinhamento}_zebra'] = (
+            'padrao',
+            'zebra',
+            'dado',
+            alinhamento,
+        )
+    return estilos
+
+
+# nome -> (fonte, fill, borda, alinhamento). A ordem define o índice `s`.
+_ESTILOS: dict[str, tuple[str, str, str, str | None]] = {
+    'padrao': ('padrao', 'nenhum', 'nenhuma', None),
+    'titulo': ('titulo', 'titulo', 'nenhuma', 'centro'),
+    'meta': ('meta', 'meta', 'nenhuma', 'centro'),
+    'cabecalho': ('cabecalho', 'cabecalho', 'cabecalho', 'centro_wrap'),
+    **_estilos_de_dado(),
+    'total': ('total', 'total', 'total', 'centro'),
+    'total_dir': ('total', 'total', 'total', 'dir'),
+}
+_ESTILO_IDX = {nome: i for i, nome in enumerate(_ESTILOS)}
+
+# Colunas com wrap_text a esquerda
+_WRAP_HEADERS = frozenset({
+    'Esforço Aéreo',
+    'Tripulantes',
+})
+# Colunas com wrap_text centralizado
+_WRAP_CENTER_HEADERS = frozenset({
+    'Cod OI',
+    'D/N/V',
+})
+# Colunas numericas alinhadas a direita
+_NUM_HEADERS = frozenset({
+    'Pousos',
+    'TOW',
+    'Comb',
+    'Lub',
+})
+
+# Larguras fixas para colunas base (conteudo previsivel)
+_FIXED_WIDTHS = {
+    'Data': 12,
+    'Origem': 9,
+    'Destino': 9,
+    'DEP': 7,
+    'ARR': 7,
+    'TV': 7,
+    'Aeronave': 10,
+    'Pousos': 8,
+    'Nível': 7,
+    'TOW': 7,
+    'PAX': 6,
+    'Carga': 8,
+    'Comb': 7,
+    'Lub': 6,
+    'Cod OI': 9,
+    'D/N/V': 9,
+}
+
+# esforco_aereo gera 3 colunas separadas
+_OPCIONAIS = [
+    ('pousos', ['Pousos']),
+    ('nivel', ['Nível']),
+    ('tow', ['TOW']),
+    ('pax', ['PAX']),
+    ('carga', ['Carga']),
+    ('comb', ['Comb']),
+    ('lub', ['Lub']),
+    ('esforco_aereo', ['Cod OI', 'Esforço Aéreo', 'D/N/V']),
+    ('tripulantes', ['Tripulantes']),
+]
+_BASE_HEADERS = ['Data', 'Origem', 'Destino', 'DEP', 'ARR', 'TV', 'Aeronave']
+# Colunas opcionais com soma na linha de totais
+_SOMADAS = ('pousos', 'pax', 'carga', 'comb', 'lub')
+_REG_MAP = {'d': 'D', 'n': 'N', 'v': 'V'}
+
+_HEADER_ROW = 3
+
+# So as colunas que a planilha le (linhas, nao entidades ORM).
+_COLUNAS = (
+    Etapa.id,
+    Etapa.data,
+    Etapa.origem,
+    Etapa.destino,
+    Etapa.dep,
+    Etapa.arr,
+    Etapa.tvoo,
+    Etapa.anv,
+    Etapa.pousos,
+    Etapa.nivel,
+    Etapa.tow,
+    Etapa.pax,
+    Etapa.carga,
+    Etapa.comb,
+    Etapa.lub,
+)
 
 
 def _min_to_hhmm(minutes: int) -> str:
@@ -159,199 +229,215 @@ def _fmt_val(val, fmt: str = 'int') -> str | int | float:
     return int(val)
 
 
-def _auto_width(
-    ws,
-    col_count: int,
-    header_row: int,
-    wide_cols: frozenset[str] | None = None,
-    skip_cols: frozenset[str] | None = None,
-):
-    """Ajusta largura das colunas baseado no conteudo."""
-    if wide_cols is None:
-        wide_cols = frozenset()
-    if skip_cols is None:
-        skip_cols = frozenset()
-    for col_idx in range(1, col_count + 1):
-        max_len = 0
-        col_letter = get_column_letter(col_idx)
-        hdr_val = str(ws.cell(row=header_row, column=col_idx).value or '')
-        if hdr_val in skip_cols:
-            continue
-        is_wide = hdr_val in wide_cols
-        for row in ws.iter_rows(
-            min_row=header_row,
-            max_row=ws.max_row,
-            min_col=col_idx,
-            max_col=col_idx,
-        ):
-            for cell in row:
-                if cell.value is None:
-                    continue
-                val = str(cell.value)
-                lines = val.split('\n')
-                longest = max(len(ln) for ln in lines)
-                if cell.row == header_row:
-                    longest = int(longest * 1.3) + 3
-                max_len = max(max_len, longest)
-        # Colunas com texto longo: fator extra
-        if is_wide:
-            max_len = int(max_len * 1.2)
-        width = max(max_len + 2, 8)
-        ws.column_dimensions[col_letter].width = width
+def _col_letter(idx: int) -> str:
+    """Indice 1-based -> letra da coluna (1 -> A, 27 -> AA)."""
+    letras = ''
+    while idx:
+        idx, resto = divmod(idx - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _alinhamento(header: str) -> str:
+    if header in _WRAP_HEADERS:
+        return 'esq_wrap'
+    if header in _WRAP_CENTER_HEADERS:
+        return 'centro_wrap'
+    if header in _NUM_HEADERS:
+        return 'dir'
+    return 'centro'
+
+
+def _styles_xml() -> str:
+    fontes = list(_FONTES)
+    fills = list(_FILLS)
+    bordas = list(_BORDAS)
+
+    fonts_xml = ''.join(f'<font>{f}</font>' for f in _FONTES.values())
+    fills_xml = '<fill><patternFill patternType="none"/></fill>'
+    fills_xml += '<fill><patternFill patternType="gray125"/></fill>'
+    for cor in list(_FILLS.values())[1:]:
+        fills_xml += (
+            '<fill><patternFill patternType="solid">'
+            f'<fgColor rgb="FF{cor}"/><bgColor rgb="FF{cor}"/>'
+            '</patternFill></fill>'
+        )
+    borders_xml = ''
+    for lados in _BORDAS.values():
+        borders_xml += '<border>'
+        for lado in ('left', 'right', 'top', 'bottom'):
+            if lado in lados:
+                estilo, cor = lados[lado]
+                borders_xml += (
+                    f'<{lado} style="{estilo}"><color rgb="FF{cor}"/></{lado}>'
+                )
+            else:
+                borders_xml += f'<{lado}/>'
+        borders_xml += '<diagonal/></border>'
+
+    xfs_xml = ''
+    for fonte, fill, borda, alinhamento in _ESTILOS.values():
+        # fill 0 = none; os fills nomeados começam no índice 2
+        fill_id = 0 if fill == 'nenhum' else fills.index(fill) + 1
+        xf = (
+            f'<xf numFmtId="0" fontId="{fontes.index(fonte)}" '
+            f'fillId="{fill_id}" borderId="{bordas.index(borda)}" xfId="0"'
+            ' applyFont="1" applyFill="1" applyBorder="1"'
+        )
+        if alinhamento:
+            xf += (
+                ' applyAlignment="1">'
+                f'<alignment {_ALINHAMENTOS[alinhamento]}/></xf>'
+            )
+        else:
+            xf += '/>'
+        xfs_xml += xf
+
+    return (
+        f'{_XML_DECL}<styleSheet xmlns="{_NS_MAIN}">'
+        f'<fonts count="{len(_FONTES)}">{fonts_xml}</fonts>'
+        f'<fills count="{len(_FILLS) + 1}">{fills_xml}</fills>'
+        f'<borders count="{len(_BORDAS)}">{borders_xml}</borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0"'
+        ' borderId="0"/></cellStyleXfs>'
+        f'<cellXfs count="{len(_ESTILOS)}">{xfs_xml}</cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0"'
+        ' builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    )
 
 
-# Colunas com wrap_text a esquerda
-_WRAP_HEADERS = frozenset({
-    'Esforço Aéreo',
-    'Tripulantes',
-})
-# Colunas com wrap_text centralizado
-_WRAP_CENTER_HEADERS = frozenset({
-    'Cod OI',
-    'D/N/V',
-})
-# Colunas numericas alinhadas a direita
-_NUM_HEADERS = frozenset({
-    'Pousos',
-    'TOW',
-    'Comb',
-    'Lub',
-})
-# Colunas centralizadas
-_CENTER_HEADERS = frozenset({
-    'PAX',
-    'Carga',
-})
+def _content_types_xml() -> str:
+    sml = 'application/vnd.openxmlformats-officedocument.spreadsheetml'
+    return (
+        f'{_XML_DECL}<Types xmlns="http://schemas.openxmlformats.org/'
+        'package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/'
+        'vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml"'
+        f' ContentType="{sml}.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml"'
+        f' ContentType="{sml}.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml"'
+        f' ContentType="{sml}.styles+xml"/>'
+        '</Types>'
+    )
 
 
-def generate_etapas_xlsx(
-    etapas: list,
-    oi_data: dict | None,
-    trip_data: dict | None,
-    columns: dict[str, bool],
-    org_label: str = 'Relatório de Etapas',
-) -> BytesIO:
-    """Gera planilha Excel profissional de etapas.
+def _rels_xml() -> str:
+    return (
+        f'{_XML_DECL}<Relationships xmlns="{_NS_PKG_REL}">'
+        f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument"'
+        ' Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    )
 
-    Args:
-        etapas: lista de rows (Etapa model instances)
-        oi_data: OIEtapaOut agrupados por etapa_id
-        trip_data: TripEtapaOut agrupados por etapa_id
-        columns: flags de colunas opcionais
-        org_label: nome institucional da org ativa (multi-tenant)
-    """
-    _init_openpyxl()
-    wb = Workbook()
-    ws = wb.active
-    ws.title = 'Etapas'
-
-    # ── Montar colunas dinamicamente ───────────────
-    headers = [
-        'Data',
-        'Origem',
-        'Destino',
-        'DEP',
-        'ARR',
-        'TV',
-        'Aeronave',
-    ]
-
-    # esforco_aereo agora gera 3 colunas separadas
-    optional = [
-        ('pousos', ['Pousos']),
-        ('nivel', ['Nível']),
-        ('tow', ['TOW']),
-        ('pax', ['PAX']),
-        ('carga', ['Carga']),
-        ('comb', ['Comb']),
-        ('lub', ['Lub']),
-        (
-            'esforco_aereo',
-            [
-                'Cod OI',
-                'Esforço Aéreo',
-                'D/N/V',
-            ],
-        ),
-        ('tripulantes', ['Tripulantes']),
-    ]
-    active_optional: list[tuple[str, list[str]]] = []
-    for flag, hdrs in optional:
-        if columns.get(flag, False):
-            active_optional.append((flag, hdrs))
-            headers.extend(hdrs)
-
-    col_count = len(headers)
-    last_col = get_column_letter(col_count)
-
-    # ── Linha 1: Titulo institucional ──────────────
-    ws.merge_cells(f'A1:{last_col}1')
-    title_cell = ws['A1']
-    title_cell.value = f'{org_label} — Relatório de Etapas'
-    title_cell.font = _TITLE_FONT
-    title_cell.fill = _TITLE_FILL
-    title_cell.alignment = Alignment(
-        horizontal='center',
-        vertical='center',
+
+def _workbook_rels_xml() -> str:
+    return (
+        f'{_XML_DECL}<Relationships xmlns="{_NS_PKG_REL}">'
+        f'<Relationship Id="rId1" Type="{_NS_REL}/worksheet"'
+        ' Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{_NS_REL}/styles"'
+        ' Target="styles.xml"/>'
+        '</Relationships>'
+    )
+
+
+def _workbook_xml(last_col: str) -> str:
+    return (
+        f'{_XML_DECL}<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">'
+        '<sheets><sheet name="Etapas" sheetId="1" r:id="rId1"/></sheets>'
+        '<definedNames>'
+        '<definedName name="_xlnm._FilterDatabase" localSheetId="0"'
+        f' hidden="1">\'Etapas\'!$A${_HEADER_ROW}:${last_col}${_HEADER_ROW}'
+        '</definedName>'
+        '<definedName name="_xlnm.Print_Titles" localSheetId="0">'
+        f"'Etapas'!$1:${_HEADER_ROW}</definedName>"
+        '</definedNames></workbook>'
     )
-    ws.row_dimensions[1].height = 35
-
-    for col_idx in range(1, col_count + 1):
-        cell = ws.cell(row=1, column=col_idx)
-        cell.fill = _TITLE_FILL
-
-    # ── Linha 2: Metadados ─────────────────────────
-    total_tvoo = sum(e.tvoo for e in etapas)
-    now = datetime.now()
-    meta_text = (
-        f'Exportado em: {now.strftime("%d/%m/%Y %H:%M")}'
-        f'  |  Total de etapas: {len(etapas)}'
-        f'  |  TV total: {_min_to_hhmm(total_tvoo)}'
+
+
+def _cell(ref: str, valor, estilo: str) -> str:
+    s = _ESTILO_IDX[estilo]
+    if valor is None:
+        return f'<c r="{ref}" s="{s}"/>'
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return f'<c r="{ref}" s="{s}"><v>{valor}</v></c>'
+    return (
+        f'<c r="{ref}" s="{s}" t="inlineStr"><is>'
+        f'<t xml:space="preserve">{escape(str(valor))}</t></is></c>'
     )
-    ws.merge_cells(f'A2:{last_col}2')
-    meta_cell = ws['A2']
-    meta_cell.value = meta_text
-    meta_cell.font = _META_FONT
-    meta_cell.fill = _META_FILL
-    meta_cell.alignment = Alignment(
-        horizontal='center',
-        vertical='center',
+
+
+def _row(r: int, valores: Iterable, estilos: Iterable[str], altura=None):
+    attrs = f' ht="{altura}" customHeight="1"' if altura else ''
+    cells = ''.join(
+        _cell(f'{_col_letter(i)}{r}', valor, estilo)
+        for i, (valor, estilo) in enumerate(zip(valores, estilos), start=1)
     )
-    ws.row_dimensions[2].height = 22
-
-    for col_idx in range(1, col_count + 1):
-        cell = ws.cell(row=2, column=col_idx)
-        cell.fill = _META_FILL
-
-    # ── Linha 3: Header da tabela ──────────────────
-    header_row = 3
-    for col_idx, hdr in enumerate(headers, start=1):
-        cell = ws.cell(
-            row=header_row,
-            column=col_idx,
-            value=hdr,
-        )
-        cell.font = _HEADER_FONT
-        cell.fill = _HEADER_FILL
-        cell.border = _HEADER_BORDER
-        cell.alignment = _CENTER_WRAP
-    ws.row_dimensions[header_row].height = 28
-
-    ws.auto_filter.ref = f'A{header_row}:{last_col}{header_row}'
-
-    # ── Dados ──────────────────────────────────────
-    data_start = header_row + 1
-    sum_tvoo = 0
-    sum_pousos = 0
-    sum_pax = 0
-    sum_carga = 0
-    sum_comb = 0
-    sum_lub = 0.0
-
-    for row_idx, etapa in enumerate(etapas):
-        r = data_start + row_idx
-        is_even = row_idx % 2 == 0
+    return f'<row r="{r}"{attrs}>{cells}</row>'
+
+
+def _largura(valores: Iterable, header: str) -> int:
+    """Largura pela linha mais longa do cabecalho e da amostra."""
+    max_len = int(len(header) * 1.3) + 3
+    for valor in valores:
+        for linha in str(valor).split('\n'):
+            max_len = max(max_len, len(linha))
+    # Colunas com texto longo: fator extra
+    if header in _WRAP_HEADERS:
+        max_len = int(max_len * 1.2)
+    return max(max_len + 2, 8)
+
+
+class _Saida:
+    """Destino do zip: acumula os bytes comprimidos ate o proximo yield.
+
+    Sem `seek`/`tell`, o zipfile grava cada membro com data descriptor
+    — o que permite escrever o zip sem voltar no arquivo.
+    """
+
+    def __init__(self):
+        self._partes: list[bytes] = []
+
+    def write(self, dados: bytes) -> int:
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self) -> None:
+        pass
+
+    def drenar(self) -> bytes:
+        dados = b''.join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+class PlanilhaEtapas:
+    """Escritor incremental da planilha de etapas.
+
+    `linhas()` recebe um lote de etapas (com OIs e tripulantes do lote)
+    e devolve o XML das linhas; os totais das opcionais acumulam aqui
+    para a linha de totais de `rodape()`.
+    """
 
+    def __init__(self, columns: dict[str, bool]):
+        self.ativas = [
+            (flag, hdrs) for flag, hdrs in _OPCIONAIS if columns.get(flag)
+        ]
+        self.headers = list(_BASE_HEADERS)
+        for _, hdrs in self.ativas:
+            self.headers.extend(hdrs)
+        self.last_col = _col_letter(len(self.headers))
+        self.alinhamentos = [_alinhamento(h) for h in self.headers]
+        self.proxima_linha = _HEADER_ROW + 1
+        self.sum_tvoo = 0
+        self.somadas = [f for f, _ in self.ativas if f in _SOMADAS]
+        self.somas: dict[str, int | float] = dict.fromkeys(self.somadas, 0)
+
+    def valores(self, etapa, oi_data: dict, trip_data: dict) -> list:
         values = [
             _fmt_date(etapa.data),
             etapa.origem.upper(),
@@ -361,200 +447,237 @@ def generate_etapas_xlsx(
             _min_to_hhmm(etapa.tvoo),
             etapa.anv,
         ]
-        sum_tvoo += etapa.tvoo
-
-        for flag, _ in active_optional:
-            if flag == 'pousos':
-                v = _fmt_val(etapa.pousos)
-                if etapa.pousos is not None:
-                    sum_pousos += etapa.pousos
-                values.append(v)
-            elif flag == 'nivel':
-                v = etapa.nivel if etapa.nivel else '-'
-                values.append(v)
+        for flag, _ in self.ativas:
+            if flag == 'nivel':
+                values.append(etapa.nivel or '-')
             elif flag == 'tow':
                 values.append(_fmt_val(etapa.tow))
-            elif flag == 'pax':
-                v = _fmt_val(etapa.pax)
-                if etapa.pax is not None:
-                    sum_pax += etapa.pax
-                values.append(v)
-            elif flag == 'carga':
-                v = _fmt_val(etapa.carga)
-                if etapa.carga is not None:
-                    sum_carga += etapa.carga
-                values.append(v)
-            elif flag == 'comb':
-                v = _fmt_val(etapa.comb)
-                if etapa.comb is not None:
-                    sum_comb += etapa.comb
-                values.append(v)
             elif flag == 'lub':
-                v = _fmt_val(etapa.lub, 'float')
-                if etapa.lub is not None:
-                    sum_lub += float(etapa.lub)
-                values.append(v)
+                values.append(_fmt_val(etapa.lub, 'float'))
+            elif flag in _SOMADAS:
+                values.append(_fmt_val(getattr(etapa, flag)))
             elif flag == 'esforco_aereo':
-                ois = oi_data.get(etapa.id, []) if oi_data else []
+                ois = oi_data.get(etapa.id, [])
                 if ois:
-                    cod_lines = [oi.tipo_missao_cod for oi in ois]
-                    esf_lines = [oi.esf_aer for oi in ois]
-                    reg_map = {
-                        'd': 'D',
-                        'n': 'N',
-                        'v': 'V',
-                    }
-                    reg_lines = [
-                        reg_map.get(oi.reg, oi.reg.upper()) for oi in ois
-                    ]
-                    values.append('\n'.join(cod_lines))
-                    values.append('\n'.join(esf_lines))
-                    values.append('\n'.join(reg_lines))
+                    values.append('\n'.join(oi.tipo_missao_cod for oi in ois))
+                    values.append('\n'.join(oi.esf_aer for oi in ois))
+                    values.append(
+                        '\n'.join(
+                            _REG_MAP.get(oi.reg, oi.reg.upper()) for oi in ois
+                        )
+                    )
                 else:
                     values.extend(['-', '-', '-'])
             elif flag == 'tripulantes':
-                trips = trip_data.get(etapa.id, []) if trip_data else []
-                if trips:
-                    trigs = [t.trig.upper() for t in trips]
-                    values.append(' / '.join(trigs))
-                else:
-                    values.append('-')
+                trips = trip_data.get(etapa.id, [])
+                values.append(
+                    ' / '.join(t.trig.upper() for t in trips) if trips else '-'
+                )
+        return values
+
+    def cabecalho(
+        self,
+        amostra: list[list],
+        total: int,
+        total_tvoo: int,
+        org_label: str,
+        agora: datetime,
+    ) -> str:
+        """Inicio do sheet1.xml: layout, larguras, titulo, meta e header."""
+        cols = ''
+        for idx, header in enumerate(self.headers, start=1):
+            largura = _FIXED_WIDTHS.get(header) or _largura(
+                (linha[idx - 1] for linha in amostra), header
+            )
+            cols += (
+                f'<col min="{idx}" max="{idx}" width="{largura}"'
+                ' customWidth="1"/>'
+            )
+
+        n = len(self.headers)
+        meta = (
+            f'Exportado em: {agora.strftime("%d/%m/%Y %H:%M")}'
+            f'  |  Total de etapas: {total}'
+            f'  |  TV total: {_min_to_hhmm(total_tvoo)}'
+        )
+        return (
+            f'{_XML_DECL}<worksheet xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">'
+            '<sheetPr><pageSetUpPr fitToPage="1"/></sheetPr>'
+            '<sheetViews><sheetView workbookViewId="0">'
+            f'<pane ySplit="{_HEADER_ROW}" topLeftCell="A{_HEADER_ROW + 1}"'
+            ' activePane="bottomLeft" state="frozen"/>'
+            '<selection pane="bottomLeft"/></sheetView></sheetViews>'
+            '<sheetFormatPr defaultRowHeight="15"/>'
+            f'<cols>{cols}</cols><sheetData>'
+            + _row(
+                1,
+                [f'{org_label} — Relatório de Etapas'] + [None] * (n - 1),
+                ['titulo'] * n,
+                altura=35,
+            )
+            + _row(2, [meta] + [None] * (n - 1), ['meta'] * n, altura=22)
+            + _row(_HEADER_ROW, self.headers, ['cabecalho'] * n, altura=28)
+        )
 
-        for col_idx, val in enumerate(values, start=1):
-            cell = ws.cell(
-                row=r,
-                column=col_idx,
-                value=val,
+    def linhas(self, lote: list, valores: list[list]) -> str:
+        partes = []
+        for etapa, values in zip(lote, valores):
+            r = self.proxima_linha
+            self.proxima_linha += 1
+            self.sum_tvoo += etapa.tvoo
+            for flag in self.somadas:
+                valor = getattr(etapa, flag)
+                if valor is not None:
+                    self.somas[flag] += (
+                        float(valor) if flag == 'lub' else valor
+                    )
+
+            sufixo = '_zebra' if (r - _HEADER_ROW - 1) % 2 == 0 else ''
+            estilos = [f'dado_{a}{sufixo}' for a in self.alinhamentos]
+            # Auto-height: ajusta pela celula com mais linhas
+            max_lines = max(
+                (v.count('\n') + 1 for v in values if isinstance(v, str)),
+                default=1,
             )
-            cell.border = _DATA_BORDER
-
-            if is_even:
-                cell.fill = _ZEBRA_FILL
-
-            hdr_name = headers[col_idx - 1]
-            if hdr_name in _WRAP_HEADERS:
-                cell.alignment = _LEFT_WRAP
-            elif hdr_name in _WRAP_CENTER_HEADERS:
-                cell.alignment = _CENTER_WRAP
-            elif hdr_name in _NUM_HEADERS:
-                cell.alignment = _RIGHT
-            elif hdr_name in _CENTER_HEADERS:
-                cell.alignment = _CENTER
+            altura = max_lines * 15 if max_lines > 1 else None
+            partes.append(_row(r, values, estilos, altura))
+        return ''.join(partes)
+
+    def rodape(self) -> str:
+        """Linha de totais e o fim do sheet1.xml."""
+        values: list = ['TOTAL', None, None, None, None]
+        values += [_min_to_hhmm(self.sum_tvoo), None]
+        estilos = ['total'] * len(values)
+        for flag, hdrs in self.ativas:
+            if flag in _SOMADAS:
+                soma = self.somas[flag]
+                values.append(round(soma, 1) if flag == 'lub' else soma)
+                estilos.append('total_dir')
+                values.extend([None] * (len(hdrs) - 1))
+                estilos.extend(['total'] * (len(hdrs) - 1))
             else:
-                cell.alignment = _CENTER
-
-        # Auto-height: ajusta pela celula com mais linhas
-        max_lines = 1
-        for val in values:
-            if isinstance(val, str) and '\n' in val:
-                max_lines = max(
-                    max_lines,
-                    val.count('\n') + 1,
-                )
-        if max_lines > 1:
-            ws.row_dimensions[r].height = max_lines * 15
-
-    # ── Linha de totais ────────────────────────────
-    total_row = data_start + len(etapas)
-    for col_idx in range(1, col_count + 1):
-        cell = ws.cell(row=total_row, column=col_idx)
-        cell.fill = _TOTAL_FILL
-        cell.font = _TOTAL_FONT
-        cell.border = Border(
-            top=Side(style='medium', color=_BLUE_MED),
-            bottom=Side(
-                style='medium',
-                color=_BLUE_MED,
-            ),
-            left=Side(
-                style='thin',
-                color=_BORDER_CLR,
-            ),
-            right=Side(
-                style='thin',
-                color=_BORDER_CLR,
-            ),
+                values.extend([None] * len(hdrs))
+                estilos.extend(['total'] * len(hdrs))
+
+        return (
+            _row(self.proxima_linha, values, estilos) + '</sheetData>'
+            f'<autoFilter ref="A{_HEADER_ROW}:{self.last_col}{_HEADER_ROW}"/>'
+            '<mergeCells count="2">'
+            f'<mergeCell ref="A1:{self.last_col}1"/>'
+            f'<mergeCell ref="A2:{self.last_col}2"/>'
+            '</mergeCells>'
+            '<pageMargins left="0.75" right="0.75" top="1" bottom="1"'
+            ' header="0.5" footer="0.5"/>'
+            '<pageSetup orientation="landscape" fitToWidth="1"'
+            ' fitToHeight="0"/>'
+            '</worksheet>'
         )
-        cell.alignment = _CENTER
-
-    ws.cell(row=total_row, column=1).value = 'TOTAL'
-    ws.cell(
-        row=total_row,
-        column=1,
-    ).alignment = _CENTER
-
-    ws.cell(
-        row=total_row,
-        column=6,
-    ).value = _min_to_hhmm(sum_tvoo)
-
-    # Totais das opcionais
-    base_count = 7
-    col_offset = 0
-    for flag, hdrs in active_optional:
-        col = base_count + col_offset + 1
-        cell = ws.cell(row=total_row, column=col)
-        if flag == 'pousos':
-            cell.value = sum_pousos
-            cell.alignment = _RIGHT
-        elif flag == 'pax':
-            cell.value = sum_pax
-            cell.alignment = _RIGHT
-        elif flag == 'carga':
-            cell.value = sum_carga
-            cell.alignment = _RIGHT
-        elif flag == 'comb':
-            cell.value = sum_comb
-            cell.alignment = _RIGHT
-        elif flag == 'lub':
-            cell.value = round(sum_lub, 1)
-            cell.alignment = _RIGHT
-        col_offset += len(hdrs)
-
-    # ── Layout e impressao ─────────────────────────
-    ws.freeze_panes = 'A4'
-
-    # Larguras fixas para colunas base (conteudo previsivel)
-    _FIXED_WIDTHS = {
-        'Data': 12,
-        'Origem': 9,
-        'Destino': 9,
-        'DEP': 7,
-        'ARR': 7,
-        'TV': 7,
-        'Aeronave': 10,
-        'Pousos': 8,
-        'Nível': 7,
-        'TOW': 7,
-        'PAX': 6,
-        'Carga': 8,
-        'Comb': 7,
-        'Lub': 6,
-        'Cod OI': 9,
-        'D/N/V': 9,
-    }
-    for col_idx, hdr in enumerate(headers, start=1):
-        fixed = _FIXED_WIDTHS.get(hdr)
-        if fixed:
-            col_letter = get_column_letter(col_idx)
-            ws.column_dimensions[col_letter].width = fixed
-
-    # Auto-width apenas para colunas dinamicas
-    _auto_width(
-        ws,
-        col_count,
-        header_row=header_row,
-        wide_cols=_WRAP_HEADERS,
-        skip_cols=frozenset(_FIXED_WIDTHS.keys()),
+
+
+async def lotes_etapas(
+    session: AsyncSession,
+    filtro,
+    columns: dict[str, bool],
+    tamanho_lote: int = LOTE_EXPORT,
+) -> AsyncIterator[tuple[list, dict, dict]]:
+    """Etapas do filtro em lotes do cursor no servidor, cada lote com as
+    OIs e os tripulantes dele (so quando a coluna foi pedida).
+
+    Ordem da planilha: data, DEP, id. Base de todos os formatos de
+    export (XLSX aqui, CSV e Arrow em `services.dados_etapas`).
+    """
+    stream = await session.stream(
+        select(*_COLUNAS)
+        .join(Missao, Missao.id == Etapa.missao_id)
+        .where(filtro)
+        .order_by(Etapa.data, Etapa.dep, Etapa.id)
+        .execution_options(yield_per=tamanho_lote)
     )
-    ws.page_setup.orientation = 'landscape'
-    ws.page_setup.fitToWidth = 1
-    ws.page_setup.fitToHeight = 0
-    ws.print_title_rows = '1:3'
-    ws.sheet_properties.pageSetUpPr.fitToPage = True
-
-    # ── Salvar ─────────────────────────────────────
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    return buffer
+    async for lote in stream.partitions():
+        ids = [e.id for e in lote]
+        oi_data = {}
+        if columns.get('esforco_aereo'):
+            oi_data = await fetch_oi_detail_data(session, ids)
+        trip_data = {}
+        if columns.get('tripulantes'):
+            trip_data = await fetch_trip_data(session, ids)
+        yield lote, oi_data, trip_data
+
+
+async def stream_etapas_xlsx(
+    session: AsyncSession,
+    filtro,
+    total: int,
+    total_tvoo: int,
+    columns: dict[str, bool],
+    org_label: str = 'Relatório de Etapas',
+    tamanho_lote: int = LOTE_EXPORT,
+) -> AsyncIterator[bytes]:
+    """Gera a planilha de etapas em pedaços de bytes, lote a lote.
+
+    Args:
+        session: sessao aberta durante todo o streaming
+        filtro: clausula WHERE sobre Etapa/Missao (ids + org ativa)
+        total, total_tvoo: agregados do mesmo filtro, para a linha de
+            metadados (escrita antes das etapas)
+        columns: flags de colunas opcionais
+        org_label: nome institucional da org ativa (multi-tenant)
+        tamanho_lote: etapas por lote do cursor no servidor
+    """
+    planilha = PlanilhaEtapas(columns)
+    saida = _Saida()
+    zf = zipfile.ZipFile(saida, 'w', zipfile.ZIP_DEFLATED)
+    zf.writestr('[Content_Types].xml', _content_types_xml())
+    zf.writestr('_rels/.rels', _rels_xml())
+    zf.writestr('xl/workbook.xml', _workbook_xml(planilha.last_col))
+    zf.writestr('xl/_rels/workbook.xml.rels', _workbook_rels_xml())
+    zf.writestr('xl/styles.xml', _styles_xml())
+    yield saida.drenar()
+
+    def _valores(lote, oi_data, trip_data) -> list[list]:
+        return [planilha.valores(e, oi_data, trip_data) for e in lote]
+
+    def _escrever(sheet, gerar, *args) -> None:
+        sheet.write(gerar(*args).encode())
+
+    async def _lotes():
+        async for lote, oi_data, trip_data in lotes_etapas(
+            session, filtro, columns, tamanho_lote
+        ):
+            valores = await documentos.executar(
+                _valores, lote, oi_data, trip_data
+            )
+            yield lote, valores
+
+    lotes = _lotes()
+    # O primeiro lote e a amostra das larguras: <cols> precede os dados.
+    primeiro = await anext(lotes, None)
+    amostra = primeiro[1] if primeiro else []
+
+    # Formatar e comprimir e CPU: cada passo roda no pool de documentos e
+    # o loop atende outras requisicoes entre um lote e outro.
+    with zf.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+        await documentos.executar(
+            _escrever,
+            sheet,
+            planilha.cabecalho,
+            amostra,
+            total,
+            total_tvoo,
+            org_label,
+            datetime.now(),
+        )
+        if primeiro:
+            await documentos.executar(
+                _escrever, sheet, planilha.linhas, *primeiro
+            )
+            yield saida.drenar()
+        async for lote, valores in lotes:
+            await documentos.executar(
+                _escrever, sheet, planilha.linhas, lote, valores
+            )
+            yield saida.drenar()
+        await documentos.executar(_escrever, sheet, planilha.rodape)
+
+    await documentos.executar(zf.close)
+    yield saida.drenar()
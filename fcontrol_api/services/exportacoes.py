@@ -0,0 +1,201 @@
+"""Exports assíncronos com o arquivo guardado no storage.
+
+Um export grande não segura a conexão HTTP: `POST .../export/jobs`
+reserva um job e responde na hora; a geração roda em background task e
+grava o arquivo no bucket `BUCKET`; o status devolve uma URL assinada
+quando o arquivo fica pronto.
+
+O arquivo é endereçado pelo conteúdo: a chave é o hash de (tipo, org,
+versão dos dados, filtro canônico) e o objeto fica em
+`{tipo}/{org}/{chave}{ext}`. Pedir o mesmo export de novo — mesmo
+filtro, nenhuma etapa da org editada desde então — devolve o job
+existente, já pronto ou ainda gerando, sem gerar outra vez. Depois de
+`EXPORT_TTL` o job conta como inexistente e o arquivo é apagado por
+`cleanup/tasks/expired_exports`.
+
+A versão dos dados de etapas é `VersaoEtapas` (incrementada por
+`services.horas_mes` a cada escrita de etapa). Nomes de tripulantes e
+esforços aéreos editados fora das etapas não mudam a versão: o arquivo
+guardado reflete o cadastro do momento em que foi gerado, no máximo
+`EXPORT_TTL` atrás.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import PurePosixPath
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fcontrol_api.models.estatistica.horas_mes import VersaoEtapas
+from fcontrol_api.models.shared.exportacoes import ExportJob
+from fcontrol_api.services.documentos import documentos
+from fcontrol_api.services.excel_etapas import stream_etapas_xlsx
+from fcontrol_api.services.storage import get_signed_url, upload_fileobj
+
+logger = logging.getLogger(__name__)
+
+BUCKET = 'exportacoes'
+EXPORT_TTL = timedelta(hours=24)
+# Job pendente há mais que isso é dado como perdido (máquina reiniciada
+# no meio da geração, p.ex.) e pode ser reaberto.
+GERACAO_TIMEOUT = timedelta(minutes=15)
+XLSX_MEDIA_TYPE = (
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+)
+# Até aqui o arquivo fica em memória antes do upload; acima, em disco.
+_SPOOL_MAX = 8 * 1024 * 1024
+
+
+def chave_export(tipo: str, uae: str, versao: int, filtro: dict) -> str:
+    """Hash do conteúdo do export: mesmo filtro + mesma versão dos dados
+    da org => mesma chave (a ordem das chaves do filtro não importa)."""
+    canonico = json.dumps(
+        filtro, sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(
+        f'{tipo}|{uae}|{versao}|{canonico}'.encode()
+    ).hexdigest()
+
+
+def caminho_export(job: ExportJob) -> str:
+    ext = PurePosixPath(job.file_name).suffix
+    return f'{job.tipo}/{job.uae}/{job.chave}{ext}'
+
+
+async def versao_etapas(session: AsyncSession, uae: str) -> int:
+    versao = await session.scalar(
+        select(VersaoEtapas.versao).where(VersaoEtapas.uae == uae)
+    )
+    return versao or 0
+
+
+def situacao(job: ExportJob, agora: datetime | None = None) -> str:
+    """Status efetivo: 'expirado' para pronto fora do prazo ou pendente
+    além de `GERACAO_TIMEOUT`."""
+    agora = agora or datetime.now(timezone.utc)
+    if job.status == 'pronto' and job.expira_em <= agora:
+        return 'expirado'
+    reservado_em = job.expira_em - EXPORT_TTL
+    if job.status == 'pendente' and reservado_em + GERACAO_TIMEOUT <= agora:
+        return 'expirado'
+    return job.status
+
+
+async def reservar_job(
+    session: AsyncSession,
+    *,
+    tipo: str,
+    uae: str,
+    chave: str,
+    file_name: str,
+    user_id: int | None,
+) -> tuple[ExportJob, bool]:
+    """Job da chave, criado ou reaproveitado, e se precisa ser gerado.
+
+    Pronto ou em andamento (ver `situacao`): reaproveita, sem gerar.
+    Inexistente, expirado ou com erro: (re)abre como pendente — quem
+    chamou agenda a geração e faz o commit. O job volta travado
+    (`FOR UPDATE`) até o commit, então dois pedidos simultâneos da mesma
+    chave não geram duas vezes.
+    """
+    agora = datetime.now(timezone.utc)
+    expira_em = agora + EXPORT_TTL
+    job_id = await session.scalar(
+        pg_insert(ExportJob)
+        .values(
+            tipo=tipo,
+            uae=uae,
+            chave=chave,
+            file_name=file_name,
+            expira_em=expira_em,
+            created_by=user_id,
+            status='pendente',
+        )
+        .on_conflict_do_nothing(index_elements=[ExportJob.chave])
+        .returning(ExportJob.id)
+    )
+    job = await session.scalar(
+        select(ExportJob)
+        .where(ExportJob.chave == chave)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    if job_id is not None:
+        return job, True
+
+    if situacao(job, agora) in {'pronto', 'pendente'}:
+        return job, False
+
+    job.status = 'pendente'
+    job.path = None
+    job.erro = None
+    job.concluido_em = None
+    job.file_name = file_name
+    job.created_by = user_id
+    job.expira_em = expira_em
+    await session.flush()
+    return job, True
+
+
+async def gerar_export_etapas(
+    session: AsyncSession,
+    job_id: int,
+    filtro,
+    total: int,
+    total_tvoo: int,
+    columns: dict[str, bool],
+    org_label: str,
+) -> None:
+    """Background task: gera o XLSX do job e grava no storage.
+
+    Usa a sessão da requisição: a dependência `get_session` só fecha
+    depois da resposta, background tasks incluídas. A vaga do pool de
+    documentos foi reservada na rota (`documentos.admitir`) e é
+    devolvida aqui, dê certo ou não.
+    """
+    try:
+        job = await session.get(ExportJob, job_id)
+        path = caminho_export(job)
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX) as arquivo:
+            async for pedaco in stream_etapas_xlsx(
+                session,
+                filtro,
+                total=total,
+                total_tvoo=total_tvoo,
+                columns=columns,
+                org_label=org_label,
+            ):
+                arquivo.write(pedaco)
+            arquivo.seek(0)
+            await asyncio.to_thread(
+                upload_fileobj, BUCKET, path, arquivo, XLSX_MEDIA_TYPE
+            )
+
+        job.status = 'pronto'
+        job.path = path
+        job.concluido_em = datetime.now(timezone.utc)
+        await session.commit()
+    except Exception as e:
+        logger.exception('Falha ao gerar export %s', job_id)
+        await session.rollback()
+        job = await session.get(ExportJob, job_id)
+        if job is not None:
+            job.status = 'erro'
+            job.erro = str(e)[:500]
+            await session.commit()
+    finally:
+        documentos.liberar()
+
+
+async def url_do_job(job: ExportJob) -> str | None:
+    """URL assinada do arquivo, se o job está pronto e dentro do prazo."""
+    if situacao(job) != 'pronto':
+        return None
+    # get_signed_url é síncrono (boto3).
+    return await asyncio.to_thread(get_signed_url, BUCKET, job.path)
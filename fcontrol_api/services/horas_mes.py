@@ -0,0 +1,274 @@
+"""Manutencao do consolidado mensal de horas voadas.
+
+As rotas que escrevem etapas chamam `atualizar_horas_mes` com os meses
+(org, ano, mes) tocados — antes E depois da edicao — e os meses sao
+reagregados a partir das tabelas brutas na mesma transacao. Reagregar o
+mes inteiro (em vez de aplicar delta) custa pouco, porque um mes de uma
+org e pequeno, e mantem corretos agregados nao somaveis como a data do
+ultimo voo quando uma etapa e excluida.
+
+Como toda escrita de etapa passa por aqui, o mesmo ponto incrementa a
+versao de etapas da org (`VersaoEtapas`), usada como chave de cache
+dos exports.
+"""
+
+from collections.abc import Iterable
+from datetime import date
+
+from sqlalchemy import (
+    SmallInteger,
+    and_,
+    cast,
+    delete,
+    extract,
+    func,
+    insert,
+    or_,
+    select,
+    true,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fcontrol_api.models.estatistica.etapa import (
+    Etapa,
+    Missao,
+    OIEtapa,
+    TripEtapa,
+)
+from fcontrol_api.models.estatistica.horas_mes import (
+    HorasMesAnv,
+    HorasMesOI,
+    HorasMesTrip,
+    VersaoEtapas,
+)
+from fcontrol_api.utils.datas import intervalo_ano, intervalo_mes
+
+# (uae, ano, mes)
+MesOrg = tuple[str, int, int]
+
+
+def mes_da_etapa(uae: str, data: date) -> MesOrg:
+    return (uae, data.year, data.month)
+
+
+def _agregacoes(filtro) -> list[tuple[type, list[str], object]]:
+    """INSERT ... SELECT de cada tabela do consolidado, para as etapas
+    que passam em `filtro` (expressao sobre Etapa/Missao)."""
+    ano = cast(extract('year', Etapa.data), SmallInteger)
+    mes = cast(extract('month', Etapa.data), SmallInteger)
+    por_anv = (
+        select(
+            Missao.uae,
+            ano,
+            mes,
+            Etapa.anv,
+            Missao.is_simulador,
+            func.count(),
+            func.sum(Etapa.tvoo),
+            func.sum(Etapa.pousos),
+            func.coalesce(func.sum(Etapa.pax), 0),
+            func.coalesce(func.sum(Etapa.carga), 0),
+            func.coalesce(func.sum(Etapa.comb), 0),
+            func.coalesce(func.sum(Etapa.lub), 0),
+        )
+        .join(Missao, Missao.id == Etapa.missao_id)
+        .where(filtro)
+        .group_by(Missao.uae, ano, mes, Etapa.anv, Missao.is_simulador)
+    )
+
+    por_oi = (
+        select(
+            Missao.uae,
+            ano,
+            mes,
+            Etapa.anv,
+            Missao.is_simulador,
+            OIEtapa.esf_aer_id,
+            OIEtapa.reg,
+            func.sum(OIEtapa.tvoo),
+        )
+        .join(Etapa, Etapa.id == OIEtapa.etapa_id)
+        .join(Missao, Missao.id == Etapa.missao_id)
+        .where(filtro)
+        .group_by(
+            Missao.uae,
+            ano,
+            mes,
+            Etapa.anv,
+            Missao.is_simulador,
+            OIEtapa.esf_aer_id,
+            OIEtapa.reg,
+        )
+    )
+
+    por_trip = (
+        select(
+            Missao.uae,
+            ano,
+            mes,
+            Etapa.anv,
+            Etapa.is_sim,
+            TripEtapa.trip_id,
+            TripEtapa.func,
+            TripEtapa.func_bordo,
+            func.sum(Etapa.tvoo),
+            func.max(Etapa.data),
+        )
+        .join(Etapa, Etapa.id == TripEtapa.etapa_id)
+        .join(Missao, Missao.id == Etapa.missao_id)
+        .where(filtro)
+        .group_by(
+            Missao.uae,
+            ano,
+            mes,
+            Etapa.anv,
+            Etapa.is_sim,
+            TripEtapa.trip_id,
+            TripEtapa.func,
+            TripEtapa.func_bordo,
+        )
+    )
+
+    chave = ['uae', 'ano', 'mes', 'anv']
+    return [
+        (
+            HorasMesAnv,
+            [
+                *chave,
+                'is_simulador',
+                'etapas',
+                'tvoo',
+                'pousos',
+                'pax',
+                'carga',
+                'comb',
+                'lub',
+            ],
+            por_anv,
+        ),
+        (
+            HorasMesOI,
+            [*chave, 'is_simulador', 'esf_aer_id', 'reg', 'tvoo'],
+            por_oi,
+        ),
+        (
+            HorasMesTrip,
+            [
+                *chave,
+                'sml',
+                'trip_id',
+                'func',
+                'func_bordo',
+                'tvoo',
+                'ultimo_voo',
+            ],
+            por_trip,
+        ),
+    ]
+
+
+async def meses_das_etapas(
+    session: AsyncSession, etapa_ids: Iterable[int]
+) -> set[MesOrg]:
+    """Meses (org, ano, mes) em que as etapas estao hoje no banco."""
+    ids = list(etapa_ids)
+    if not ids:
+        return set()
+    rows = await session.execute(
+        select(Missao.uae, Etapa.data)
+        .join(Missao, Missao.id == Etapa.missao_id)
+        .where(Etapa.id.in_(ids))
+        .distinct()
+    )
+    return {mes_da_etapa(uae, data) for uae, data in rows.all()}
+
+
+async def atualizar_horas_mes(
+    session: AsyncSession, meses: Iterable[MesOrg]
+) -> None:
+    """Reagrega os meses informados no consolidado.
+
+    Chamar DEPOIS das escritas da etapa e ANTES do commit: descarrega
+    o que estiver pendente na sessao e le o estado final das tabelas
+    brutas. Meses sem nenhuma etapa restante ficam sem linha.
+    """
+    meses = set(meses)
+    if not meses:
+        return
+
+    await session.flush()
+
+    # Serializa a reagregacao por mes: sem o lock, duas escritas
+    # simultaneas no mesmo mes nao veem as linhas uma da outra no DELETE
+    # e a segunda esbarra na PK do consolidado. Em ordem, para duas
+    # transacoes com meses em comum nao travarem uma a outra; o advisory
+    # lock transacional e liberado no commit.
+    for uae, ano, mes in sorted(meses):
+        await session.execute(
+            select(
+                func.pg_advisory_xact_lock(
+                    func.hashtextextended(f'horas_mes:{uae}:{ano}:{mes}', 0)
+                )
+            )
+        )
+
+    faixas = []
+    for uae, ano, mes in sorted(meses):
+        inicio, fim = intervalo_mes(ano, mes)
+        faixas.append(
+            and_(Missao.uae == uae, Etapa.data >= inicio, Etapa.data < fim)
+        )
+    filtro = or_(*faixas)
+
+    for model, colunas, consulta in _agregacoes(filtro):
+        await session.execute(
+            delete(model).where(
+                tuple_(model.uae, model.ano, model.mes).in_(meses)
+            )
+        )
+        await session.execute(insert(model).from_select(colunas, consulta))
+
+    await _incrementar_versao(session, {uae for uae, _, _ in meses})
+
+
+async def _incrementar_versao(session: AsyncSession, uaes: set[str]) -> None:
+    stmt = pg_insert(VersaoEtapas).values([
+        {'uae': uae, 'versao': 1} for uae in sorted(uaes)
+    ])
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[VersaoEtapas.uae],
+            set_={'versao': VersaoEtapas.versao + 1},
+        )
+    )
+
+
+async def reconstruir_horas_mes(
+    session: AsyncSession, ano: int | None = None
+) -> dict[str, int]:
+    """Reconstroi o consolidado (um ano ou tudo) a partir do bruto.
+
+    Recuperacao de deriva — ex.: etapas gravadas por SQL/seed, fora das
+    rotas. Devolve quantas linhas cada tabela recebeu.
+    """
+    await session.flush()
+
+    if ano is None:
+        filtro = true()
+    else:
+        inicio, fim = intervalo_ano(ano)
+        filtro = and_(Etapa.data >= inicio, Etapa.data < fim)
+
+    linhas: dict[str, int] = {}
+    for model, colunas, consulta in _agregacoes(filtro):
+        apagar = delete(model)
+        if ano is not None:
+            apagar = apagar.where(model.ano == ano)
+        await session.execute(apagar)
+        result = await session.execute(
+            insert(model).from_select(colunas, consulta)
+        )
+        linhas[model.__tablename__] = result.rowcount
+    return linhas
@@ -1,10 +1,19 @@
 import json
+import logging
 from datetime import datetime, timezone
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fcontrol_api.models.security.logs import UserActionLog
 
+logger = logging.getLogger(__name__)
+
+# Um log de snapshot em cada KEYFRAME_A_CADA (por recurso) guarda o
+# estado completo; os outros, só o diff. Limita o trabalho de reconstruir
+# um log a KEYFRAME_A_CADA aplicações de diff.
+KEYFRAME_A_CADA = 20
+
 
 async def log_user_action(
     session: AsyncSession,
@@ -26,6 +35,205 @@ async def log_user_action(
     session.add(log)
 
 
+def diff_json(antes, depois) -> dict:
+    """Diff estrutural de `antes` para `depois` (valores JSON).
+
+    Dicts são comparados chave a chave (`set`, `del` e `sub` para os
+    dicts aninhados); qualquer outro valor que mudou — listas inclusive —
+    vai inteiro em `val`. Sem mudança, `{}`.
+    """
+    if antes == depois:
+        return {}
+    if not (isinstance(antes, dict) and isinstance(depois, dict)):
+        return {'val': depois}
+
+    patch = {}
+    novos = {}
+    sub = {}
+    for chave, valor in depois.items():
+        if chave not in antes:
+            novos[chave] = valor
+        elif antes[chave] != valor:
+            if isinstance(antes[chave], dict) and isinstance(valor, dict):
+                sub[chave] = diff_json(antes[chave], valor)
+            else:
+                novos[chave] = valor
+    removidos = [chave for chave in antes if chave not in depois]
+    if novos:
+        patch['set'] = novos
+    if removidos:
+        patch['del'] = removidos
+    if sub:
+        patch['sub'] = sub
+    return patch
+
+
+def aplicar_diff(antes, patch: dict):
+    """Inverso de `diff_json`: devolve um valor novo, sem alterar
+    `antes`."""
+    if not patch:
+        return antes
+    if 'val' in patch:
+        return patch['val']
+
+    depois = dict(antes)
+    for chave in patch.get('del', ()):
+        depois.pop(chave, None)
+    depois.update(patch.get('set', {}))
+    for chave, sub in patch.get('sub', {}).items():
+        depois[chave] = aplicar_diff(depois[chave], sub)
+    return depois
+
+
+def _mesmo_mes(a: datetime, b: datetime) -> bool:
+    return (a.year, a.month) == (b.year, b.month)
+
+
+async def log_snapshot_action(
+    session: AsyncSession,
+    user_id: int,
+    action: str,
+    resource: str,
+    resource_id: int,
+    before: dict | None = None,
+    after: dict | None = None,
+):
+    """`log_user_action` para snapshots ricos (`missao_snapshot`,
+    `ordem_snapshot`), guardando só o que mudou.
+
+    O log vira diff sobre o `after` do log de snapshot anterior do mesmo
+    recurso (`base_id`): `snapshot['before']` leva do `after` anterior ao
+    `before` deste (quase sempre `{}`) e `snapshot['after']`, do `before`
+    ao `after`. Keyframe (estado completo, sem `base_id`) no primeiro log
+    do recurso, a cada `KEYFRAME_A_CADA` e na virada do mês — assim a
+    cadeia nunca depende de um log de mês anterior. Leitura com
+    `snapshot_views`.
+    """
+    # Os últimos KEYFRAME_A_CADA logs do recurso: o mais recente é a
+    # base e os demais ficam no identity map para reconstruí-la.
+    recentes = list(
+        await session.scalars(
+            select(UserActionLog)
+            .where(
+                UserActionLog.resource == resource,
+                UserActionLog.resource_id == resource_id,
+                UserActionLog.snapshot.is_not(None),
+            )
+            .order_by(UserActionLog.id.desc())
+            .limit(KEYFRAME_A_CADA)
+        )
+    )
+    base = recentes[0] if recentes else None
+    agora = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    if (
+        base is None
+        or base.snapshot['n'] + 1 >= KEYFRAME_A_CADA
+        or not _mesmo_mes(base.timestamp, agora)
+    ):
+        snapshot = {'n': 0, 'before': before, 'after': after}
+        base_id = None
+    else:
+        _, base_after = (await snapshot_views(session, [base]))[base.id]
+        snapshot = {
+            'n': base.snapshot['n'] + 1,
+            'before': diff_json(base_after, before),
+            'after': diff_json(before, after),
+        }
+        base_id = base.id
+
+    session.add(
+        UserActionLog(
+            user_id=user_id,
+            action=action,
+            resource=resource,
+            resource_id=resource_id,
+            before=None,
+            after=None,
+            snapshot=snapshot,
+            base_id=base_id,
+        )
+    )
+
+
+def _loads(valor: str | None):
+    if not valor:
+        return None
+    try:
+        return json.loads(valor)
+    except (json.JSONDecodeError, TypeError):
+        return valor
+
+
+async def snapshot_views(
+    session: AsyncSession, logs: list[UserActionLog]
+) -> dict[int, tuple]:
+    """`(before, after)` completos de cada log, por id.
+
+    Logs de texto (anteriores ao snapshot delta, ou de `log_user_action`)
+    voltam decodificados. Logs de snapshot são reconstruídos a partir do
+    keyframe; as bases que não estão em `logs` são buscadas por id (o
+    identity map evita repetir as já carregadas). Se a cadeia estiver
+    quebrada, o log volta como `(None, None)`.
+    """
+    estados: dict[int, tuple] = {}
+
+    async def reconstruir(log: UserActionLog) -> tuple:
+        # Sobe até o keyframe (ou a um estado já conhecido) e desce
+        # aplicando os diffs.
+        cadeia = [log]
+        while cadeia[-1].base_id is not None and cadeia[-1].id not in estados:
+            base = await session.get(UserActionLog, cadeia[-1].base_id)
+            if base is None:
+                logger.warning(
+                    'Log %s sem a base %s', cadeia[-1].id, cadeia[-1].base_id
+                )
+                return None, None
+            cadeia.append(base)
+
+        topo = cadeia.pop()
+        if topo.id not in estados:
+            estados[topo.id] = (
+                topo.snapshot['before'],
+                topo.snapshot['after'],
+            )
+        _, anterior = estados[topo.id]
+        for item in reversed(cadeia):
+            before = aplicar_diff(anterior, item.snapshot['before'])
+            after = aplicar_diff(before, item.snapshot['after'])
+            estados[item.id] = (before, after)
+            anterior = after
+        return estados[log.id]
+
+    views = {}
+    for log in logs:
+        if log.snapshot is None:
+            views[log.id] = (_loads(log.before), _loads(log.after))
+        else:
+            views[log.id] = await reconstruir(log)
+    return views
+
+
+async def remover_log(session: AsyncSession, log: UserActionLog) -> None:
+    """Exclui um log sem quebrar a cadeia de snapshots.
+
+    Os logs que usam `log` como base viram keyframes (estado completo)
+    antes da exclusão.
+    """
+    dependentes = list(
+        await session.scalars(
+            select(UserActionLog).where(UserActionLog.base_id == log.id)
+        )
+    )
+    if dependentes:
+        views = await snapshot_views(session, dependentes)
+        for dependente in dependentes:
+            before, after = views[dependente.id]
+            dependente.snapshot = {'n': 0, 'before': before, 'after': after}
+            dependente.base_id = None
+    await session.delete(log)
+
+
 def missao_snapshot(
     m,
     militares,
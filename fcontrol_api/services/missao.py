@@ -1,13 +1,13 @@
+from collections.abc import Callable
 from datetime import date
 from http import HTTPStatus
 
 from fastapi import HTTPException
-from sqlalchemy import and_, delete, or_
+from sqlalchemy import and_, delete, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
-from fcontrol_api.models.cegep.comiss import Comissionamento
 from fcontrol_api.models.cegep.missoes import (
     Etiqueta,
     FragEtiqueta,
@@ -22,16 +22,16 @@ from fcontrol_api.schemas.cegep.custos import (
 )
 from fcontrol_api.schemas.cegep.missoes import FragMisSchema
 from fcontrol_api.services.comis import (
+    atualizar_comiss_da_missao,
     localizar_comiss_por_footprints,
-    localizar_comiss_por_missao,
-    recalcular_cache_comiss,
-    recalcular_cache_de,
+    recalcular_caches_comiss,
 )
 from fcontrol_api.services.custos import (
     calcular_custos_frag_mis,
     carregar_caches_custo,
     verificar_integridade_custos,
 )
+from fcontrol_api.utils.orm import atualizar_coluna_por_id
 
 
 def validar_regras_missao(payload: FragMisSchema) -> None:
@@ -292,13 +292,19 @@ def aplicar_custos_missao(
 ) -> None:
     """Calcula e grava o JSONB `custos` da missão a partir de seus
     militares e pernoites (objetos ORM) e dos caches de referência."""
+    missao.custos = _calcular_custos(missao, users_frag, pernoites, caches)
+
+
+def _calcular_custos(missao, users_frag, pernoites, caches: tuple) -> dict:
+    """JSONB `custos` de uma missão. Aceita objetos ORM ou linhas com os
+    mesmos nomes de atributo (ver `_recalcular_lote`)."""
     valores_cache, soldos_cache, grupos_pg, grupos_cidade = caches
 
     frag_mis_input, users_input, pernoites_input = _inputs_custo(
         missao, users_frag, pernoites
     )
 
-    missao.custos = calcular_custos_frag_mis(
+    return calcular_custos_frag_mis(
         frag_mis_input,
         users_input,
         pernoites_input,
@@ -345,21 +351,28 @@ async def sincronizar_custos_missao(
     afast = missao.afast.date()
     regres = missao.regres.date()
 
-    footprints: list[tuple[int, date, date]] = list(footprints_antigos)
+    footprints = [
+        (user_id, active_org, f_afast, f_regres)
+        for user_id, f_afast, f_regres in footprints_antigos
+    ]
     footprints.extend(
-        (uf.user_id, afast, regres) for uf in users_frag if uf.sit == 'c'
+        (uf.user_id, active_org, afast, regres)
+        for uf in users_frag
+        if uf.sit == 'c'
+    )
+    await atualizar_comiss_da_missao(
+        missao.id,
+        footprints,
+        session,
+        missao=missao,
+        users_frag=users_frag,
+        tem_pernoites=bool(pernoites),
     )
 
-    comiss_ids: set[int] = set()
-    for user_id, f_afast, f_regres in footprints:
-        comiss_ids.update(
-            await localizar_comiss_por_missao(
-                user_id, f_afast, f_regres, session, uae=active_org
-            )
-        )
 
-    for comiss_id in comiss_ids:
-        await recalcular_cache_comiss(comiss_id, session)
+# Missões por lote no recálculo em massa: limita a memória (inputs e JSONB
+# de um lote por vez) e o tamanho de cada executemany.
+LOTE_RECALCULO = 500
 
 
 async def recalcular_custos_missoes(
@@ -368,6 +381,8 @@ async def recalcular_custos_missoes(
     session: AsyncSession,
     *,
     afeta_comiss: bool = True,
+    tamanho_lote: int = LOTE_RECALCULO,
+    progresso: Callable[[int, int], None] | None = None,
 ) -> dict:
     """
     Recalcula custos de missoes com pernoites no periodo.
@@ -380,78 +395,123 @@ async def recalcular_custos_missoes(
     exclusivamente a chave `pg_<p_g>_sit_c` do JSONB, entao nesse caso o
     recalculo sairia identico ao que ja esta gravado — e custa ~13
     queries por comissionamento.
+
+    Uma faixa de diaria/soldo pode cobrir um ano de missoes, entao nada
+    aqui e proporcional a missao: as missoes vem em lotes de
+    `tamanho_lote` por cursor no servidor (`yield_per`), so com as
+    colunas do calculo; cada lote carrega militares e pernoites em duas
+    queries e grava `custos` num executemany. Os comissionamentos
+    afetados sao recalculados no fim, todos de uma vez
+    (`recalcular_caches_comiss`). `progresso(feitas, total)` e chamado
+    a cada lote (ver scripts/recalcular_custos.py).
     """
-    # 1. Buscar missoes afetadas via pernoites no periodo
-    query = (
-        select(FragMis)
-        .join(PernoiteFrag, PernoiteFrag.frag_id == FragMis.id)
-        .where(PernoiteFrag.data_fim >= data_inicio)
+    # 1. Missoes afetadas: com pernoite no periodo
+    com_pernoite = select(PernoiteFrag.frag_id).where(
+        PernoiteFrag.data_fim >= data_inicio
     )
     if data_fim is not None:
-        query = query.where(PernoiteFrag.data_ini <= data_fim)
+        com_pernoite = com_pernoite.where(PernoiteFrag.data_ini <= data_fim)
+    filtro = FragMis.id.in_(com_pernoite)
 
-    query = query.distinct()
-
-    result = await session.scalars(query)
-    missoes: list[FragMis] = list(result.all())
-
-    if not missoes:
+    total = await session.scalar(select(func.count(FragMis.id)).where(filtro))
+    if not total:
         return {'missoes': 0, 'comissionamentos': 0}
 
     # 2. Carregar caches de referencia (1x so)
     caches = await carregar_caches_custo(session)
 
-    # 3. Users de todas as missoes numa query so (lazy='noload' exige
-    # carga explicita). Uma query por missao aqui era o gargalo: contra
-    # banco remoto, o round-trip domina o tempo do request.
-    users_result = await session.scalars(
-        select(UserFrag).where(UserFrag.frag_id.in_([m.id for m in missoes]))
-    )
-    users_por_missao: dict[int, list[UserFrag]] = {}
-    for uf in users_result:
-        users_por_missao.setdefault(uf.frag_id, []).append(uf)
-
     # Pegadas (user, org, afast, regres) dos comissionados, para uma
     # unica busca de comissionamentos afetados no fim.
     footprints: list[tuple[int, str, date, date]] = []
+    feitas = 0
+
+    stream = await session.stream(
+        select(
+            FragMis.id,
+            FragMis.acrec_desloc,
+            FragMis.afast,
+            FragMis.regres,
+            FragMis.uae,
+        )
+        .where(filtro)
+        .order_by(FragMis.id)
+        .execution_options(yield_per=tamanho_lote)
+    )
+    async for lote in stream.partitions():
+        custos, pegadas = await _recalcular_lote(lote, caches, session)
+        await atualizar_coluna_por_id(session, FragMis, 'custos', custos)
+        if afeta_comiss:
+            footprints.extend(pegadas)
 
-    for missao in missoes:
-        users_frag = users_por_missao.get(missao.id, [])
+        feitas += len(lote)
+        if progresso is not None:
+            progresso(feitas, total)
 
-        # Pernoites ja vem via selectin
-        pernoites = missao.pernoites
+    comiss_ids: set[int] = set()
+    if afeta_comiss:
+        comiss_ids = await localizar_comiss_por_footprints(footprints, session)
+        await recalcular_caches_comiss(comiss_ids, session)
 
-        if not users_frag or not pernoites:
-            continue
+    return {
+        'missoes': total,
+        'comissionamentos': len(comiss_ids),
+    }
+
+
+async def _recalcular_lote(
+    lote, caches: tuple, session: AsyncSession
+) -> tuple[dict[int, dict], list[tuple[int, str, date, date]]]:
+    """Custos de um lote de missoes e as pegadas dos comissionados.
+
+    Militares e pernoites do lote inteiro em uma query cada (so as
+    colunas que `_inputs_custo` le). Missoes sem militar ou sem pernoite
+    ficam de fora, com o `custos` atual.
+    """
+    ids = [m.id for m in lote]
+
+    users_por_missao: dict[int, list] = {}
+    for uf in await session.execute(
+        select(
+            UserFrag.frag_id, UserFrag.user_id, UserFrag.p_g, UserFrag.sit
+        ).where(UserFrag.frag_id.in_(ids))
+    ):
+        users_por_missao.setdefault(uf.frag_id, []).append(uf)
 
-        aplicar_custos_missao(missao, users_frag, pernoites, caches)
+    pernoites_por_missao: dict[int, list] = {}
+    for pnt in await session.execute(
+        select(
+            PernoiteFrag.frag_id,
+            PernoiteFrag.id,
+            PernoiteFrag.data_ini,
+            PernoiteFrag.data_fim,
+            PernoiteFrag.meia_diaria,
+            PernoiteFrag.acrec_desloc,
+            PernoiteFrag.cidade_id,
+        )
+        .where(PernoiteFrag.frag_id.in_(ids))
+        .order_by(PernoiteFrag.data_ini)
+    ):
+        pernoites_por_missao.setdefault(pnt.frag_id, []).append(pnt)
+
+    custos: dict[int, dict] = {}
+    pegadas: list[tuple[int, str, date, date]] = []
+    for missao in lote:
+        users_frag = users_por_missao.get(missao.id, [])
+        pernoites = pernoites_por_missao.get(missao.id, [])
 
-        if not afeta_comiss:
+        if not users_frag or not pernoites:
             continue
 
+        custos[missao.id] = _calcular_custos(
+            missao, users_frag, pernoites, caches
+        )
+
         afast_date = missao.afast.date()
         regres_date = missao.regres.date()
-        footprints.extend(
+        pegadas.extend(
             (uf.user_id, missao.uae, afast_date, regres_date)
             for uf in users_frag
             if uf.sit == 'c'
         )
 
-    comiss_ids: set[int] = set()
-    if afeta_comiss:
-        comiss_ids = await localizar_comiss_por_footprints(footprints, session)
-
-        # 4. Recalcular comissionamentos afetados (carregados de uma vez;
-        # `recalcular_cache_comiss` releria um por um).
-        comissionamentos = await session.scalars(
-            select(Comissionamento).where(Comissionamento.id.in_(comiss_ids))
-        )
-        for comiss in comissionamentos:
-            await recalcular_cache_de(comiss, session)
-
-    await session.flush()
-
-    return {
-        'missoes': len(missoes),
-        'comissionamentos': len(comiss_ids),
-    }
+    return custos, pegadas
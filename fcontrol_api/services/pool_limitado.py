@@ -0,0 +1,142 @@
+"""Pool de threads com admissão limitada, para trabalho de CPU.
+
+Trabalho de CPU dentro de um handler `async def` trava o único event
+loop da máquina (1 vCPU). `PoolLimitado` tira esse trabalho do loop e
+limita quanto dele entra:
+
+- `admitir`/`liberar` controlam quantas operações estão em curso (até
+  `max_jobs`); além disso, 503 com `Retry-After` em vez de enfileirar
+  sem limite;
+- `executar` roda cada passo de CPU num pool de threads próprio
+  (`max_workers`), e o loop segue atendendo entre os passos.
+
+Os contadores (fila, em execução, rejeições, espera na fila) são por
+processo e saem em `status()`. Instâncias: `services.documentos` e
+`services.senhas`.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from fastapi import HTTPException
+
+# Janela de amostras de espera na fila usada nos percentis.
+_WAIT_SAMPLES = 1000
+
+
+class PoolLimitado:
+    """Pool de threads + admissão de operações, com métricas.
+
+    `nome` prefixa as threads; `ocupado` é a mensagem do 503.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_jobs: int,
+        retry_after: int,
+        *,
+        nome: str,
+        ocupado: str,
+    ):
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self.retry_after = retry_after
+        self.nome = nome
+        self.ocupado = ocupado
+        self._executor: ThreadPoolExecutor | None = None
+        # Os contadores de fila mudam no loop e nas threads do pool.
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.jobs_ativos = 0
+        self.na_fila = 0
+        self.em_execucao = 0
+        self.iniciadas = 0
+        self.concluidas = 0
+        self.rejeitados = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        self._esperas: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Preguiçoso: as threads nascem na 1ª operação.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=self.nome,
+            )
+        return self._executor
+
+    def admitir(self) -> None:
+        """Reserva uma vaga ou levanta 503 com Retry-After."""
+        if self.jobs_ativos >= self.max_jobs:
+            self.rejeitados += 1
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail=self.ocupado,
+                headers={'Retry-After': str(self.retry_after)},
+            )
+        self.jobs_ativos += 1
+
+    def liberar(self) -> None:
+        self.jobs_ativos -= 1
+
+    async def executar(self, fn: Callable, *args):
+        """Roda `fn(*args)` no pool e devolve o resultado."""
+        enfileirada = time.perf_counter()
+        with self._lock:
+            self.na_fila += 1
+
+        def _tarefa():
+            espera = time.perf_counter() - enfileirada
+            with self._lock:
+                self.na_fila -= 1
+                self.em_execucao += 1
+                self._registrar_espera(espera)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.em_execucao -= 1
+                    self.concluidas += 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), _tarefa)
+
+    def _registrar_espera(self, segundos: float) -> None:
+        self.iniciadas += 1
+        self.espera_total += segundos
+        self.espera_max = max(self.espera_max, segundos)
+        self._esperas.append(segundos)
+
+    def _percentil(self, pct: float) -> float:
+        if not self._esperas:
+            return 0.0
+        ordered = sorted(self._esperas)
+        idx = min(len(ordered) - 1, int(pct / 100 * len(ordered)))
+        return ordered[idx]
+
+    def status(self) -> dict:
+        iniciadas = self.iniciadas
+        return {
+            'max_workers': self.max_workers,
+            'max_jobs': self.max_jobs,
+            'jobs_ativos': self.jobs_ativos,
+            'na_fila': self.na_fila,
+            'em_execucao': self.em_execucao,
+            'iniciadas': self.iniciadas,
+            'concluidas': self.concluidas,
+            'rejeitados': self.rejeitados,
+            'espera_avg_ms': (
+                self.espera_total / iniciadas * 1000 if iniciadas else 0.0
+            ),
+            'espera_p95_ms': self._percentil(95) * 1000,
+            'espera_max_ms': self.espera_max * 1000,
+        }
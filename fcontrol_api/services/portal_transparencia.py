@@ -4,19 +4,26 @@ Endpoint principal:
     GET https://api.portaldatransparencia.gov.br/api-de-dados/servidores/remuneracao
 
 Autenticacao via header `chave-api-dados`. Limite oficial: 90 req/min
-(700 req/min entre 00h e 06h).
+(700 req/min entre 00h e 06h, horario de Brasilia), aplicado aqui por
+`limitador` — um token bucket por processo que troca de taxa sozinho na
+janela da madrugada. Toda consulta passa por ele, a avulsa e a do lote
+(`services.sync_remuneracao`). O limite e por chave: com mais de uma
+maquina, cada uma acha que tem a cota inteira.
 """
 
+import asyncio
 import logging
-from datetime import date
+import time
+from datetime import date, datetime
 from decimal import Decimal
 from functools import lru_cache
 from http import HTTPStatus
 from typing import Optional, TypedDict
+from zoneinfo import ZoneInfo
 
 import httpx
 from fastapi import HTTPException
-from httpx import AsyncClient
+from httpx import AsyncClient, Limits
 
 from fcontrol_api.settings import Settings
 
@@ -24,6 +31,14 @@ logger = logging.getLogger(__name__)
 
 PORTAL_BASE_URL = 'https://api.portaldatransparencia.gov.br'
 
+FUSO_PORTAL = ZoneInfo('America/Sao_Paulo')
+LIMITE_DIA = 90  # req/min
+LIMITE_NOITE = 700  # req/min, de JANELA_NOITE[0] ate JANELA_NOITE[1]
+JANELA_NOITE = (0, 6)
+
+_client: AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
 
 class RemuneracaoPortal(TypedDict):
     """Resposta normalizada do Portal para um servidor em um mes."""
@@ -39,12 +54,68 @@ def _get_settings() -> Settings:
 
 
 def portal_client() -> AsyncClient:
-    settings = _get_settings()
-    return AsyncClient(
-        base_url=PORTAL_BASE_URL,
-        headers={'chave-api-dados': settings.PORTAL_API_KEY},
-        timeout=15,
-    )
+    """Cliente compartilhado (keep-alive), recriado se o event loop
+    mudar — as conexoes do pool pertencem ao loop que as abriu."""
+    global _client, _client_loop  # noqa: PLW0603
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        settings = _get_settings()
+        _client = AsyncClient(
+            base_url=PORTAL_BASE_URL,
+            headers={'chave-api-dados': settings.PORTAL_API_KEY},
+            timeout=15,
+            limits=Limits(max_connections=20, keepalive_expiry=60),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def fechar_cliente() -> None:
+    global _client, _client_loop  # noqa: PLW0603
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def limite_por_minuto(agora: datetime | None = None) -> int:
+    """Cota do Portal no momento: a da madrugada ou a diurna."""
+    agora = (agora or datetime.now(FUSO_PORTAL)).astimezone(FUSO_PORTAL)
+    inicio, fim = JANELA_NOITE
+    return LIMITE_NOITE if inicio <= agora.hour < fim else LIMITE_DIA
+
+
+class LimitadorPortal:
+    """Token bucket com a cota de `limite_por_minuto`.
+
+    Reposicao continua (cota/60 fichas por segundo) e rajada de no maximo
+    um segundo de cota, para nao estourar o minuto logo na virada da
+    janela. Quem nao encontra ficha dorme ate a proxima.
+    """
+
+    def __init__(self):
+        self._fichas = 1.0
+        self._ultimo = time.monotonic()
+
+    def _repor(self, taxa: int) -> None:
+        agora = time.monotonic()
+        capacidade = max(1.0, taxa / 60)
+        self._fichas = min(
+            capacidade, self._fichas + (agora - self._ultimo) * taxa / 60
+        )
+        self._ultimo = agora
+
+    async def adquirir(self) -> None:
+        while True:
+            taxa = limite_por_minuto()
+            self._repor(taxa)
+            if self._fichas >= 1:
+                self._fichas -= 1
+                return
+            await asyncio.sleep((1 - self._fichas) * 60 / taxa)
+
+
+limitador = LimitadorPortal()
 
 
 def _to_decimal(value) -> Optional[Decimal]:
@@ -129,65 +200,66 @@ async def buscar_remuneracao(cpf: str, mes_ano: date) -> RemuneracaoPortal:
     cpf_mask = f'***.***.{cpf[6:9]}-**'
     logger.info('Portal query cpf=%s mesAno=%d', cpf_mask, mes_ano_int)
 
-    async with portal_client() as client:
-        try:
-            response = await client.get(
-                '/api-de-dados/servidores/remuneracao',
-                params={
-                    'cpf': cpf,
-                    'mesAno': mes_ano_int,
-                    'pagina': 1,
-                },
-            )
-            response.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            upstream = e.response.status_code
-            logger.warning(
-                'Portal retornou %d para cpf=%s mesAno=%d',
-                upstream,
-                cpf_mask,
-                mes_ano_int,
-            )
-            if upstream == HTTPStatus.NOT_FOUND:
-                raise HTTPException(
-                    status_code=HTTPStatus.NOT_FOUND,
-                    detail=('CPF não encontrado no Portal da Transparência'),
-                ) from e
-            if upstream in {
-                HTTPStatus.UNAUTHORIZED,
-                HTTPStatus.FORBIDDEN,
-            }:
-                raise HTTPException(
-                    status_code=HTTPStatus.SERVICE_UNAVAILABLE,
-                    detail=(
-                        'Chave de acesso ao Portal da Transparência '
-                        'inválida ou expirada'
-                    ),
-                ) from e
-            if upstream == HTTPStatus.TOO_MANY_REQUESTS:
-                raise HTTPException(
-                    status_code=HTTPStatus.TOO_MANY_REQUESTS,
-                    detail=(
-                        'Limite de requisições ao Portal atingido '
-                        '(90/min). Tente novamente em instantes.'
-                    ),
-                ) from e
+    client = portal_client()
+    await limitador.adquirir()
+    try:
+        response = await client.get(
+            '/api-de-dados/servidores/remuneracao',
+            params={
+                'cpf': cpf,
+                'mesAno': mes_ano_int,
+                'pagina': 1,
+            },
+        )
+        response.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        upstream = e.response.status_code
+        logger.warning(
+            'Portal retornou %d para cpf=%s mesAno=%d',
+            upstream,
+            cpf_mask,
+            mes_ano_int,
+        )
+        if upstream == HTTPStatus.NOT_FOUND:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail=('CPF não encontrado no Portal da Transparência'),
+            ) from e
+        if upstream in {
+            HTTPStatus.UNAUTHORIZED,
+            HTTPStatus.FORBIDDEN,
+        }:
             raise HTTPException(
-                status_code=HTTPStatus.BAD_GATEWAY,
-                detail=f'Portal da Transparência respondeu {upstream}',
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail=(
+                    'Chave de acesso ao Portal da Transparência '
+                    'inválida ou expirada'
+                ),
             ) from e
-        except httpx.RequestError as e:
-            logger.warning(
-                'Falha de rede ao consultar Portal cpf=%s: %s',
-                cpf_mask,
-                e,
-            )
+        if upstream == HTTPStatus.TOO_MANY_REQUESTS:
             raise HTTPException(
-                status_code=HTTPStatus.GATEWAY_TIMEOUT,
-                detail='Falha de rede ao consultar Portal da Transparência',
+                status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                detail=(
+                    'Limite de requisições ao Portal atingido '
+                    '(90/min). Tente novamente em instantes.'
+                ),
             ) from e
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_GATEWAY,
+            detail=f'Portal da Transparência respondeu {upstream}',
+        ) from e
+    except httpx.RequestError as e:
+        logger.warning(
+            'Falha de rede ao consultar Portal cpf=%s: %s',
+            cpf_mask,
+            e,
+        )
+        raise HTTPException(
+            status_code=HTTPStatus.GATEWAY_TIMEOUT,
+            detail='Falha de rede ao consultar Portal da Transparência',
+        ) from e
 
-        data = response.json()
+    data = response.json()
 
     if not data:
         raise HTTPException(
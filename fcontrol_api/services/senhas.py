@@ -0,0 +1,39 @@
+"""Executor limitado para hash e verificação de senha (Argon2).
+
+Cada hash Argon2 custa dezenas de milissegundos de CPU: rodado dentro do
+handler, trava o event loop da máquina (1 vCPU) e uma rajada de logins
+na troca de turno congela todas as outras rotas. Aqui o trabalho vai
+para um `PoolLimitado` próprio, com vagas e threads separadas das dos
+documentos:
+
+- até `SENHAS_MAX_JOBS` operações admitidas (na fila ou rodando); além
+  disso, 503 com `Retry-After` em vez de enfileirar sem limite;
+- `SENHAS_MAX_WORKERS` threads. A argon2-cffi solta o GIL durante o
+  hash, então o loop segue atendendo enquanto o pool trabalha.
+
+Os contadores saem em /admin/senhas/pool.
+"""
+
+from collections.abc import Callable
+
+from fcontrol_api.services.pool_limitado import PoolLimitado
+from fcontrol_api.settings import Settings
+
+settings = Settings()
+
+senhas = PoolLimitado(
+    max_workers=settings.SENHAS_MAX_WORKERS,
+    max_jobs=settings.SENHAS_MAX_JOBS,
+    retry_after=settings.SENHAS_RETRY_AFTER_SECONDS,
+    nome='senhas',
+    ocupado='Muitas autenticações simultâneas. Tente novamente em instantes.',
+)
+
+
+async def processar(fn: Callable, *args):
+    """Admite a operação (ou 503) e roda `fn(*args)` no pool."""
+    senhas.admitir()
+    try:
+        return await senhas.executar(fn, *args)
+    finally:
+        senhas.liberar()
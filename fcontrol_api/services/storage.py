@@ -2,6 +2,7 @@ import logging
 import threading
 from functools import cache
 from io import BytesIO
+from typing import BinaryIO
 
 from botocore.exceptions import ClientError
 
@@ -123,6 +124,24 @@ def upload_file(
     )
 
 
+def upload_fileobj(
+    bucket: str,
+    path: str,
+    fileobj: BinaryIO,
+    content_type: str,
+) -> None:
+    """Como `upload_file`, lendo de um arquivo aberto (ex.: temporário em
+    disco): o boto3 envia em partes, sem o conteúdo inteiro em memória."""
+    ensure_bucket(bucket)
+    client = _get_client()
+    client.upload_fileobj(
+        Fileobj=fileobj,
+        Bucket=bucket,
+        Key=path,
+        ExtraArgs={'ContentType': content_type},
+    )
+
+
 def get_signed_url(bucket: str, path: str, expires: int = 900) -> str:
     client = _get_client()
     return client.generate_presigned_url(
@@ -0,0 +1,301 @@
+"""Sincronização em lote da remuneração com o Portal da Transparência.
+
+O lote cobre os usuários ativos da org com dados bancários e CPF, em
+cada mês do intervalo pedido. Cada consulta passa pelo `limitador` do
+Portal (90 req/min de dia, 700 req/min de madrugada), com até
+`PORTAL_SYNC_WORKERS` consultas em paralelo: disparado à noite, o lote
+de um esquadrão inteiro termina na mesma madrugada.
+
+Os resultados ficam em `ConsultaPortal` por (cpf, mês), que serve de
+cache e de progresso ao mesmo tempo:
+
+- a consulta avulsa (`POST /dados-bancarios/sync-remuneracao`) responde
+  do cache quando pode, sem gastar cota;
+- o lote pula o que já está no cache. Job interrompido (máquina
+  reiniciada, erro fatal) é retomado pedindo de novo o mesmo intervalo;
+  falhas pontuais ficam fora do cache e entram na próxima execução.
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fcontrol_api.models.cegep.dados_bancarios import DadosBancarios
+from fcontrol_api.models.cegep.portal import ConsultaPortal, SyncPortalJob
+from fcontrol_api.models.shared.users import User
+from fcontrol_api.services.portal_transparencia import (
+    RemuneracaoPortal,
+    buscar_remuneracao,
+)
+from fcontrol_api.settings import Settings
+
+logger = logging.getLogger(__name__)
+settings = Settings()
+
+# "Não encontrado" é refeito depois disso (folha do mês ainda não saiu).
+NAO_ENCONTRADO_TTL = timedelta(days=7)
+# Job `executando` sem pulso há mais que isso foi interrompido.
+PULSO_TIMEOUT = timedelta(minutes=10)
+# Consultas gravadas (e progresso atualizado) a cada lote.
+LOTE_SYNC = 50
+MAX_MESES = 24
+
+_MSG_NAO_ENCONTRADO = (
+    'Nenhuma remuneracao encontrada para este CPF/mes no Portal'
+)
+
+
+def meses_do_intervalo(inicio: date, fim: date) -> list[date]:
+    """Primeiro dia de cada mês de `inicio` a `fim`, inclusive."""
+    mes = date(inicio.year, inicio.month, 1)
+    saida = []
+    while mes <= fim:
+        saida.append(mes)
+        mes = date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+    return saida
+
+
+def _cache_valido(agora: datetime):
+    return or_(
+        ConsultaPortal.encontrado.is_(True),
+        ConsultaPortal.consultado_em > agora - NAO_ENCONTRADO_TTL,
+    )
+
+
+async def gravar_consultas(
+    session: AsyncSession, consultas: list[dict]
+) -> None:
+    """Upsert de resultados em `ConsultaPortal` (sem commit)."""
+    if not consultas:
+        return
+    stmt = pg_insert(ConsultaPortal).values(consultas)
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ConsultaPortal.cpf, ConsultaPortal.mes_ano],
+            set_={
+                'encontrado': stmt.excluded.encontrado,
+                'remuneracao_bruta': stmt.excluded.remuneracao_bruta,
+                'remuneracao_liquida': stmt.excluded.remuneracao_liquida,
+                'consultado_em': stmt.excluded.consultado_em,
+            },
+        )
+    )
+
+
+def _consulta(
+    cpf: str, mes: date, resultado: RemuneracaoPortal | None
+) -> dict:
+    return {
+        'cpf': cpf,
+        'mes_ano': mes,
+        'encontrado': resultado is not None,
+        'remuneracao_bruta': resultado and resultado['remuneracao_bruta'],
+        'remuneracao_liquida': resultado and resultado['remuneracao_liquida'],
+        'consultado_em': datetime.now(timezone.utc),
+    }
+
+
+async def consultar_remuneracao(
+    session: AsyncSession, cpf: str, mes_ano: date
+) -> RemuneracaoPortal:
+    """Remuneração de (cpf, mês): do cache ou do Portal, guardando.
+
+    Mesmos erros de `buscar_remuneracao`.
+    """
+    mes = date(mes_ano.year, mes_ano.month, 1)
+    cache = await session.scalar(
+        select(ConsultaPortal).where(
+            ConsultaPortal.cpf == cpf,
+            ConsultaPortal.mes_ano == mes,
+            _cache_valido(datetime.now(timezone.utc)),
+        )
+    )
+    if cache is not None:
+        if not cache.encontrado:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail=_MSG_NAO_ENCONTRADO
+            )
+        return RemuneracaoPortal(
+            mes_ano=cache.mes_ano,
+            remuneracao_bruta=cache.remuneracao_bruta,
+            remuneracao_liquida=cache.remuneracao_liquida,
+        )
+
+    try:
+        resultado = await buscar_remuneracao(cpf, mes)
+    except HTTPException as e:
+        if e.status_code == HTTPStatus.NOT_FOUND:
+            await gravar_consultas(session, [_consulta(cpf, mes, None)])
+            await session.commit()
+        raise
+    await gravar_consultas(session, [_consulta(cpf, mes, resultado)])
+    await session.commit()
+    return resultado
+
+
+def interrompido(job: SyncPortalJob, agora: datetime | None = None) -> bool:
+    agora = agora or datetime.now(timezone.utc)
+    return (
+        job.status == 'executando'
+        and job.atualizado_em + PULSO_TIMEOUT <= agora
+    )
+
+
+async def reservar_sync(
+    session: AsyncSession,
+    *,
+    uae: str,
+    mes_inicio: date,
+    mes_fim: date,
+    user_id: int | None,
+) -> tuple[SyncPortalJob, bool]:
+    """Job de sincronização da org e se precisa ser executado.
+
+    Um lote por org de cada vez: com um em andamento, devolve esse, sem
+    executar. Interrompido com o mesmo intervalo é retomado; com outro
+    intervalo, é encerrado como erro e um novo começa. Quem chamou
+    agenda a execução e faz o commit.
+    """
+    agora = datetime.now(timezone.utc)
+    mes_inicio = date(mes_inicio.year, mes_inicio.month, 1)
+    mes_fim = date(mes_fim.year, mes_fim.month, 1)
+    ativo = await session.scalar(
+        select(SyncPortalJob)
+        .where(
+            SyncPortalJob.uae == uae,
+            SyncPortalJob.status == 'executando',
+        )
+        .order_by(SyncPortalJob.id.desc())
+        .with_for_update()
+    )
+    if ativo is not None:
+        if not interrompido(ativo, agora):
+            return ativo, False
+        if (ativo.mes_inicio, ativo.mes_fim) == (mes_inicio, mes_fim):
+            ativo.atualizado_em = agora
+            ativo.created_by = user_id
+            await session.flush()
+            return ativo, True
+        ativo.status = 'erro'
+        ativo.erro = 'Interrompido'
+        ativo.concluido_em = agora
+
+    job = SyncPortalJob(
+        uae=uae,
+        mes_inicio=mes_inicio,
+        mes_fim=mes_fim,
+        created_by=user_id,
+    )
+    session.add(job)
+    await session.flush()
+    return job, True
+
+
+async def _pendentes(
+    session: AsyncSession, uae: str, meses: list[date]
+) -> tuple[int, list[tuple[str, date]]]:
+    """(total de pares cpf x mês, pares ainda fora do cache)."""
+    cpfs = list(
+        await session.scalars(
+            select(User.cpf)
+            .join(DadosBancarios, DadosBancarios.user_id == User.id)
+            .where(
+                User.unidade == uae,
+                User.active.is_(True),
+                User.cpf.is_not(None),
+            )
+            .order_by(User.cpf)
+            .distinct()
+        )
+    )
+    feitos = set(
+        (
+            await session.execute(
+                select(ConsultaPortal.cpf, ConsultaPortal.mes_ano).where(
+                    ConsultaPortal.cpf.in_(cpfs),
+                    ConsultaPortal.mes_ano.in_(meses),
+                    _cache_valido(datetime.now(timezone.utc)),
+                )
+            )
+        ).all()
+    )
+    pares = [(cpf, mes) for cpf in cpfs for mes in meses]
+    return len(pares), [par for par in pares if par not in feitos]
+
+
+async def _consultar(
+    workers: asyncio.Semaphore, cpf: str, mes: date
+) -> tuple[RemuneracaoPortal | None, HTTPException | None]:
+    """(resultado, None) se encontrado; (None, None) se o Portal não tem
+    o par; (None, erro) nas demais falhas."""
+    async with workers:
+        try:
+            return await buscar_remuneracao(cpf, mes), None
+        except HTTPException as e:
+            if e.status_code == HTTPStatus.NOT_FOUND:
+                return None, None
+            return None, e
+
+
+async def executar_sync(session: AsyncSession, job_id: int) -> None:
+    """Background task: consulta os pares pendentes do job, lote a lote.
+
+    A cada `LOTE_SYNC` consultas grava os resultados, o progresso e o
+    pulso, e faz commit — o que foi gravado sobrevive a uma interrupção.
+    Chave do Portal ausente ou recusada (503) encerra o job como erro.
+    """
+    try:
+        job = await session.get(SyncPortalJob, job_id)
+        meses = meses_do_intervalo(job.mes_inicio, job.mes_fim)
+        total, pendentes = await _pendentes(session, job.uae, meses)
+        job.total = total
+        job.processados = total - len(pendentes)
+        job.falhas = 0
+        job.erro = None
+        await session.commit()
+
+        workers = asyncio.Semaphore(settings.PORTAL_SYNC_WORKERS)
+        for inicio in range(0, len(pendentes), LOTE_SYNC):
+            lote = pendentes[inicio : inicio + LOTE_SYNC]
+            respostas = await asyncio.gather(
+                *(_consultar(workers, cpf, mes) for cpf, mes in lote)
+            )
+
+            consultas = []
+            fatal = None
+            for (cpf, mes), (resultado, erro) in zip(lote, respostas):
+                if erro is None:
+                    consultas.append(_consulta(cpf, mes, resultado))
+                elif erro.status_code == HTTPStatus.SERVICE_UNAVAILABLE:
+                    fatal = erro
+                else:
+                    job.falhas += 1
+            await gravar_consultas(session, consultas)
+            job.processados += len(consultas)
+            job.atualizado_em = datetime.now(timezone.utc)
+            if fatal is not None:
+                job.status = 'erro'
+                job.erro = str(fatal.detail)
+                job.concluido_em = job.atualizado_em
+                await session.commit()
+                return
+            await session.commit()
+
+        job.status = 'concluido'
+        job.concluido_em = datetime.now(timezone.utc)
+        await session.commit()
+    except Exception as e:
+        logger.exception('Falha no sync do Portal %s', job_id)
+        await session.rollback()
+        job = await session.get(SyncPortalJob, job_id)
+        if job is not None:
+            job.status = 'erro'
+            job.erro = str(e)[:500]
+            job.concluido_em = datetime.now(timezone.utc)
+            await session.commit()
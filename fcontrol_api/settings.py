@@ -19,12 +19,69 @@ class Settings(BaseSettings):
     ENV: str = 'production'
     BOOT_PROFILE: bool = False
 
+    # Pool de conexões (ver database.py). Modo: 'queue', 'pgbouncer' (pooler
+    # em modo transação: sem cache de prepared statements) ou 'null'. Sem
+    # valor: 'pgbouncer' em produção, 'queue' fora dela. O teto por máquina
+    # (size + overflow) acompanha o hard_limit do fly.toml.
+    DB_POOL_MODE: str | None = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 10
+    DB_POOL_RECYCLE: int = 1800
+
+    # Caches em processo de services/authz_cache: permissões resolvidas e
+    # principal do get_current_user. Escritas nas tabelas de origem
+    # invalidam na hora; o TTL só limita a defasagem entre máquinas (o do
+    # principal é curto porque cobre desativação de usuário). 0 desliga.
+    AUTHZ_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 15
+
+    # Geração de documentos (export XLSX, relatórios) em services/documentos:
+    # threads dedicadas para o trabalho de CPU sair do event loop. Até
+    # DOCS_MAX_JOBS gerações admitidas por máquina; além disso, 503 com
+    # Retry-After em vez de enfileirar sem limite.
+    DOCS_MAX_WORKERS: int = 1
+    DOCS_MAX_JOBS: int = 4
+    DOCS_RETRY_AFTER_SECONDS: int = 10
+
+    # Hash/verificação de senha (services/senhas.py): pool próprio, com até
+    # SENHAS_MAX_JOBS operações admitidas; além disso, 503 com Retry-After.
+    SENHAS_MAX_WORKERS: int = 1
+    SENHAS_MAX_JOBS: int = 16
+    SENHAS_RETRY_AFTER_SECONDS: int = 2
+    # Parâmetros do Argon2 (padrões da argon2-cffi). Mudá-los não exige
+    # trocar senhas: o hash antigo é refeito no próximo login.
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+
+    # Auditoria em buffer (access_denied e login; services/auditoria):
+    # grava um lote ao juntar AUDIT_BATCH_SIZE entradas ou a cada
+    # AUDIT_FLUSH_SECONDS. Acima de AUDIT_MAX_PENDING pendentes (banco
+    # fora), as mais antigas são descartadas e contadas.
+    AUDIT_BATCH_SIZE: int = 200
+    AUDIT_FLUSH_SECONDS: float = 2.0
+    AUDIT_MAX_PENDING: int = 10000
+
+    # Cleanup (cleanup/batching): deletes em lotes de CLEANUP_BATCH_SIZE
+    # linhas, cada lote na própria transação e com pausa de
+    # CLEANUP_BATCH_SLEEP_SECONDS entre eles. Cada task para ao passar de
+    # CLEANUP_TIME_BUDGET_SECONDS; o resto fica para a próxima execução.
+    # DROP de partição espera lock por no máximo CLEANUP_LOCK_TIMEOUT_MS.
+    CLEANUP_BATCH_SIZE: int = 1000
+    CLEANUP_BATCH_SLEEP_SECONDS: float = 0.05
+    CLEANUP_TIME_BUDGET_SECONDS: float = 120.0
+    CLEANUP_LOCK_TIMEOUT_MS: int = 2000
+
     # AISWEB DECEA
     AISWEB_API_KEY: str = ''
     AISWEB_API_PASS: str = ''
 
     # Portal da Transparência (CGU)
     PORTAL_API_KEY: str = ''
+    # Consultas simultâneas do lote de remuneração; a taxa quem limita é o
+    # token bucket de services.portal_transparencia.
+    PORTAL_SYNC_WORKERS: int = 4
 
     # Storage (MinIO local / Supabase S3 prod). O NOME DO BUCKET não é
     # config: cada domínio declara o seu como constante no próprio router
@@ -6,3 +6,18 @@ def listar_datas_entre(inicio: date, fim: date) -> List[date]:
     if fim < inicio:
         return []
     return [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+
+
+def intervalo_ano(ano: int) -> tuple[date, date]:
+    """Intervalo semiaberto [1/jan, 1/jan do ano seguinte).
+
+    Filtrar por `coluna >= inicio AND coluna < fim` usa o indice da
+    coluna; `extract('year', coluna) == ano` obriga a ler a tabela toda.
+    """
+    return date(ano, 1, 1), date(ano + 1, 1, 1)
+
+
+def intervalo_mes(ano: int, mes: int) -> tuple[date, date]:
+    """Intervalo semiaberto [dia 1, dia 1 do mes seguinte)."""
+    fim = date(ano + 1, 1, 1) if mes == 12 else date(ano, mes + 1, 1)
+    return date(ano, mes, 1), fim
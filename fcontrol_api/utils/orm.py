@@ -0,0 +1,28 @@
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+
+async def atualizar_coluna_por_id(
+    session: AsyncSession, model, coluna: str, valores: dict[int, object]
+) -> None:
+    """UPDATE de uma coluna em várias linhas, por chave primária `id`.
+
+    Um único executemany (ORM bulk UPDATE by primary key) em vez de um
+    UPDATE por instância carregada. Esse caminho não passa pelo identity
+    map, então instâncias que já estejam na sessão recebem o valor novo
+    como estado confirmado — quem as tiver em mãos não lê dado velho.
+    """
+    if not valores:
+        return
+
+    await session.execute(
+        update(model),
+        [{'id': id_, coluna: valor} for id_, valor in valores.items()],
+    )
+
+    for id_, valor in valores.items():
+        obj = session.identity_map.get(identity_key(model, id_))
+        if obj is not None:
+            set_committed_value(obj, coluna, valor)
@@ -0,0 +1,65 @@
+"""contribuicoes das missoes no cache do comissionamento
+
+Revision ID: 4c1e7a9d2f60
+Revises: bb5d9ca5b2ff
+Create Date: 2026-10-17
+
+`cegep.comiss_contrib` guarda, por (comissionamento, missão), o que a
+missão soma no `cache_calc` do comissionamento. Salvar ou excluir uma
+missão passa a aplicar só a diferença, em vez de reler todas as missões
+do período.
+
+A tabela nasce vazia: os caches existentes não têm a chave `modulos` e
+são reconstruídos por inteiro (o que grava as contribuições) no primeiro
+recálculo, ou de uma vez por `scripts/check_comiss_cache.py --corrigir`.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1e7a9d2f60'
+down_revision: Union[str, None] = 'bb5d9ca5b2ff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'comiss_contrib',
+        sa.Column('comiss_id', sa.Integer(), nullable=False),
+        sa.Column('frag_id', sa.Integer(), nullable=False),
+        sa.Column('data_afast', sa.Date(), nullable=False),
+        sa.Column('data_regres', sa.Date(), nullable=False),
+        sa.Column('dias', sa.Integer(), nullable=False),
+        sa.Column('diarias', sa.Float(), nullable=False),
+        sa.Column('valor', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['comiss_id'],
+            ['cegep.comissionamento.id'],
+            ondelete='CASCADE',
+        ),
+        sa.ForeignKeyConstraint(
+            ['frag_id'], ['cegep.frag_mis.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('comiss_id', 'frag_id'),
+        schema='cegep',
+    )
+    op.create_index(
+        op.f('ix_comiss_contrib_frag_id'),
+        'comiss_contrib',
+        ['frag_id'],
+        unique=False,
+        schema='cegep',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_comiss_contrib_frag_id'),
+        table_name='comiss_contrib',
+        schema='cegep',
+    )
+    op.drop_table('comiss_contrib', schema='cegep')
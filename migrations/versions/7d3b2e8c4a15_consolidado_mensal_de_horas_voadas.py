@@ -0,0 +1,143 @@
+"""consolidado mensal de horas voadas
+
+Revision ID: 7d3b2e8c4a15
+Revises: 4c1e7a9d2f60
+Create Date: 2026-10-17
+
+`estatistica.horas_mes_anv`, `horas_mes_oi` e `horas_mes_trip` resumem
+por mes as etapas, as OIs e os tripulantes. Os paineis (esforco aereo,
+horas por aeronave, indicadores, sebo, escala) leem daqui em vez de
+reagregar o historico inteiro a cada requisicao.
+
+A carga inicial abaixo usa o mesmo agrupamento de
+`services.horas_mes._agregacoes`; depois disso as rotas de etapa mantem
+as tabelas, e `scripts/rebuild_horas_mes.py` reconstroi em caso de
+deriva.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3b2e8c4a15'
+down_revision: Union[str, None] = '4c1e7a9d2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _chave() -> list[sa.Column]:
+    return [
+        sa.Column('uae', sa.String(length=20), nullable=False),
+        sa.Column('ano', sa.SmallInteger(), nullable=False),
+        sa.Column('mes', sa.SmallInteger(), nullable=False),
+        sa.Column('anv', sa.String(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'horas_mes_anv',
+        *_chave(),
+        sa.Column('is_simulador', sa.Boolean(), nullable=False),
+        sa.Column('etapas', sa.Integer(), nullable=False),
+        sa.Column('tvoo', sa.Integer(), nullable=False),
+        sa.Column('pousos', sa.Integer(), nullable=False),
+        sa.Column('pax', sa.Integer(), nullable=False),
+        sa.Column('carga', sa.Integer(), nullable=False),
+        sa.Column('comb', sa.Integer(), nullable=False),
+        sa.Column('lub', sa.Numeric(precision=9, scale=1), nullable=False),
+        sa.PrimaryKeyConstraint('uae', 'ano', 'mes', 'anv', 'is_simulador'),
+        schema='estatistica',
+    )
+    op.create_table(
+        'horas_mes_oi',
+        *_chave(),
+        sa.Column('is_simulador', sa.Boolean(), nullable=False),
+        sa.Column('esf_aer_id', sa.SmallInteger(), nullable=False),
+        sa.Column('reg', sa.String(length=1), nullable=False),
+        sa.Column('tvoo', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            'uae', 'ano', 'mes', 'anv', 'is_simulador', 'esf_aer_id', 'reg'
+        ),
+        schema='estatistica',
+    )
+    op.create_table(
+        'horas_mes_trip',
+        *_chave(),
+        sa.Column('sml', sa.Boolean(), nullable=False),
+        sa.Column('trip_id', sa.Integer(), nullable=False),
+        sa.Column('func', sa.String(length=3), nullable=False),
+        sa.Column('func_bordo', sa.String(length=2), nullable=False),
+        sa.Column('tvoo', sa.Integer(), nullable=False),
+        sa.Column('ultimo_voo', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            'uae',
+            'ano',
+            'mes',
+            'anv',
+            'sml',
+            'trip_id',
+            'func',
+            'func_bordo',
+        ),
+        schema='estatistica',
+    )
+    op.create_index(
+        op.f('ix_horas_mes_trip_trip_id'),
+        'horas_mes_trip',
+        ['trip_id'],
+        unique=False,
+        schema='estatistica',
+    )
+
+    op.execute("""
+        INSERT INTO estatistica.horas_mes_anv
+        SELECT m.uae, EXTRACT(YEAR FROM e.data)::smallint,
+               EXTRACT(MONTH FROM e.data)::smallint, e.anv, m.is_simulador,
+               count(*), sum(e.tvoo), sum(e.pousos),
+               coalesce(sum(e.pax), 0), coalesce(sum(e.carga), 0),
+               coalesce(sum(e.comb), 0), coalesce(sum(e.lub), 0)
+        FROM estatistica.etapas e
+        JOIN estatistica.missao m ON m.id = e.missao_id
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+    op.execute("""
+        INSERT INTO estatistica.horas_mes_oi
+        SELECT m.uae, EXTRACT(YEAR FROM e.data)::smallint,
+               EXTRACT(MONTH FROM e.data)::smallint, e.anv, m.is_simulador,
+               oi.esf_aer_id, oi.reg, sum(oi.tvoo)
+        FROM estatistica.oi_etapa oi
+        JOIN estatistica.etapas e ON e.id = oi.etapa_id
+        JOIN estatistica.missao m ON m.id = e.missao_id
+        GROUP BY 1, 2, 3, 4, 5, 6, 7
+    """)
+    op.execute("""
+        INSERT INTO estatistica.horas_mes_trip
+        SELECT m.uae, EXTRACT(YEAR FROM e.data)::smallint,
+               EXTRACT(MONTH FROM e.data)::smallint, e.anv,
+               s.etapa_id IS NOT NULL, t.trip_id, t.func, t.func_bordo,
+               sum(e.tvoo), max(e.data)
+        FROM estatistica.trip_etapa t
+        JOIN estatistica.etapas e ON e.id = t.etapa_id
+        JOIN estatistica.missao m ON m.id = e.missao_id
+        LEFT JOIN (
+            SELECT DISTINCT oi.etapa_id
+            FROM estatistica.oi_etapa oi
+            JOIN estatistica.esf_aer ea ON ea.id = oi.esf_aer_id
+            WHERE ea.descricao LIKE '%SML%'
+        ) s ON s.etapa_id = e.id
+        GROUP BY 1, 2, 3, 4, 5, 6, 7, 8
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_horas_mes_trip_trip_id'),
+        table_name='horas_mes_trip',
+        schema='estatistica',
+    )
+    op.drop_table('horas_mes_trip', schema='estatistica')
+    op.drop_table('horas_mes_oi', schema='estatistica')
+    op.drop_table('horas_mes_anv', schema='estatistica')
@@ -0,0 +1,134 @@
+"""classificacao simulador/GTT do esforco aereo e da etapa
+
+Revision ID: a6f0c3d9e2b7
+Revises: 7d3b2e8c4a15
+Create Date: 2026-10-17
+
+`esf_aer.is_sim` / `is_gtt` sao colunas geradas a partir da mesma
+concatenacao da `descricao` ('SML' / 'GTT'). `etapas.is_sim` marca a
+etapa com alguma OI de programa de simulador e e mantida por trigger
+(por linha) em `oi_etapa` — vale para as rotas, scripts e SQL manual,
+sem depender de cada caminho de escrita lembrar de reclassificar.
+
+Os filtros de simulador (sebo, escala, indisponibilidades, consolidado
+de horas) passam a ser um predicado indexado em vez do anti-join
+`NOT IN (oi_etapa JOIN esf_aer WHERE descricao LIKE '%SML%')`.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6f0c3d9e2b7'
+down_revision: Union[str, None] = '7d3b2e8c4a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DESCRICAO = (
+    "grupo || ' ' || prog || COALESCE(' ' || sub_prog, '')"
+    " || COALESCE(' ' || aplicacao, '')"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'esf_aer',
+        sa.Column(
+            'is_sim',
+            sa.Boolean(),
+            sa.Computed(f"({DESCRICAO}) LIKE '%SML%'", persisted=True),
+            nullable=True,
+        ),
+        schema='estatistica',
+    )
+    op.add_column(
+        'esf_aer',
+        sa.Column(
+            'is_gtt',
+            sa.Boolean(),
+            sa.Computed(f"({DESCRICAO}) LIKE '%GTT%'", persisted=True),
+            nullable=True,
+        ),
+        schema='estatistica',
+    )
+
+    op.add_column(
+        'etapas',
+        sa.Column(
+            'is_sim', sa.Boolean(), server_default='false', nullable=False
+        ),
+        schema='estatistica',
+    )
+    op.execute("""
+        UPDATE estatistica.etapas e
+           SET is_sim = true
+         WHERE EXISTS (
+                SELECT 1
+                  FROM estatistica.oi_etapa oi
+                  JOIN estatistica.esf_aer ea ON ea.id = oi.esf_aer_id
+                 WHERE oi.etapa_id = e.id AND ea.is_sim
+               )
+    """)
+    op.create_index(
+        op.f('ix_etapas_is_sim'),
+        'etapas',
+        ['is_sim'],
+        unique=False,
+        schema='estatistica',
+    )
+
+    op.execute("""
+        CREATE FUNCTION estatistica.classificar_etapa_sim() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            ids integer[] := '{}';
+        BEGIN
+            IF TG_OP <> 'DELETE' THEN
+                ids := ids || NEW.etapa_id;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                ids := ids || OLD.etapa_id;
+            END IF;
+
+            UPDATE estatistica.etapas e
+               SET is_sim = c.is_sim
+              FROM (
+                    SELECT e2.id,
+                           EXISTS (
+                               SELECT 1
+                                 FROM estatistica.oi_etapa oi
+                                 JOIN estatistica.esf_aer ea
+                                   ON ea.id = oi.esf_aer_id
+                                WHERE oi.etapa_id = e2.id AND ea.is_sim
+                           ) AS is_sim
+                      FROM estatistica.etapas e2
+                     WHERE e2.id = ANY (ids)
+                   ) c
+             WHERE e.id = c.id AND e.is_sim IS DISTINCT FROM c.is_sim;
+            RETURN NULL;
+        END $$;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_etapa_is_sim
+        AFTER INSERT OR UPDATE OF etapa_id, esf_aer_id OR DELETE
+        ON estatistica.oi_etapa
+        FOR EACH ROW
+        EXECUTE FUNCTION estatistica.classificar_etapa_sim()
+    """)
+
+
+def downgrade() -> None:
+    op.execute(
+        'DROP TRIGGER IF EXISTS trg_etapa_is_sim ON estatistica.oi_etapa'
+    )
+    op.execute('DROP FUNCTION IF EXISTS estatistica.classificar_etapa_sim()')
+    op.drop_index(
+        op.f('ix_etapas_is_sim'),
+        table_name='etapas',
+        schema='estatistica',
+    )
+    op.drop_column('etapas', 'is_sim', schema='estatistica')
+    op.drop_column('esf_aer', 'is_gtt', schema='estatistica')
+    op.drop_column('esf_aer', 'is_sim', schema='estatistica')
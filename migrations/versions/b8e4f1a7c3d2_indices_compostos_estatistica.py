@@ -0,0 +1,81 @@
+"""indices compostos das consultas de estatistica
+
+Revision ID: b8e4f1a7c3d2
+Revises: a6f0c3d9e2b7
+Create Date: 2026-10-17
+
+Indices para os recortes por org/ano dos paineis e da escala:
+
+- `missao(uae, is_simulador)`: ponto de entrada de todo recorte por org;
+- `etapas(missao_id, data)`: etapas das missoes da org num intervalo
+  semiaberto de datas (os filtros deixaram de usar extract('year'));
+- `trip_etapa(trip_id, func, etapa_id)`: etapas de um tripulante numa
+  funcao, sem ler a tabela inteira;
+- `oi_etapa(esf_aer_id, etapa_id) INCLUDE (tvoo)`: horas por esforco
+  aereo respondidas so pelo indice.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4f1a7c3d2'
+down_revision: Union[str, None] = 'a6f0c3d9e2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_missao_uae_is_simulador',
+        'missao',
+        ['uae', 'is_simulador'],
+        unique=False,
+        schema='estatistica',
+    )
+    op.create_index(
+        'ix_etapas_missao_id_data',
+        'etapas',
+        ['missao_id', 'data'],
+        unique=False,
+        schema='estatistica',
+    )
+    op.create_index(
+        'ix_trip_etapa_trip_id_func_etapa_id',
+        'trip_etapa',
+        ['trip_id', 'func', 'etapa_id'],
+        unique=False,
+        schema='estatistica',
+    )
+    op.create_index(
+        'ix_oi_etapa_esf_aer_id_etapa_id',
+        'oi_etapa',
+        ['esf_aer_id', 'etapa_id'],
+        unique=False,
+        schema='estatistica',
+        postgresql_include=['tvoo'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_oi_etapa_esf_aer_id_etapa_id',
+        table_name='oi_etapa',
+        schema='estatistica',
+    )
+    op.drop_index(
+        'ix_trip_etapa_trip_id_func_etapa_id',
+        table_name='trip_etapa',
+        schema='estatistica',
+    )
+    op.drop_index(
+        'ix_etapas_missao_id_data',
+        table_name='etapas',
+        schema='estatistica',
+    )
+    op.drop_index(
+        'ix_missao_uae_is_simulador',
+        table_name='missao',
+        schema='estatistica',
+    )
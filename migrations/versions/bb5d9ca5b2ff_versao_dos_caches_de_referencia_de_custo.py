@@ -0,0 +1,85 @@
+"""versao dos caches de referencia de custo
+
+Revision ID: bb5d9ca5b2ff
+Revises: 677a102f3335
+Create Date: 2026-10-17
+
+`carregar_caches_custo` passa a manter diárias, soldos, grupos de pg e
+grupos de cidade em memória no processo. Para os workers saberem quando
+recarregar, `cegep.versao_caches` guarda uma versão por cache, trocada por
+trigger (por statement) a cada INSERT/UPDATE/DELETE/TRUNCATE nas tabelas
+de origem — vale para o admin, scripts e SQL manual, sem depender de cada
+caminho de escrita lembrar de invalidar.
+
+A versão nova vem de uma sequence, não de `versao + 1`: se a transação que
+escreveu fizer rollback, o número consumido não volta a ser emitido, então
+um worker que chegou a ver a versão não confirmada nunca a confunde com a
+de outra escrita.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'bb5d9ca5b2ff'
+down_revision: Union[str, None] = '677a102f3335'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# tabela -> cache cuja versão ela invalida
+TABELAS = {
+    'cegep.valor_diarias': 'custos_ref',
+    'cegep.grupos_pg': 'custos_ref',
+    'cegep.grupos_cidade': 'custos_ref',
+    'public.soldos': 'custos_ref',
+}
+
+
+def _trigger(tabela: str) -> str:
+    return f'trg_versao_cache_{tabela.split(".")[1]}'
+
+
+def upgrade() -> None:
+    op.create_table(
+        'versao_caches',
+        sa.Column('nome', sa.String(), nullable=False),
+        sa.Column('versao', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('nome'),
+        schema='cegep',
+    )
+    op.execute('CREATE SEQUENCE cegep.versao_caches_seq')
+
+    for nome in sorted(set(TABELAS.values())):
+        op.execute(
+            'INSERT INTO cegep.versao_caches (nome, versao) '
+            f"VALUES ('{nome}', nextval('cegep.versao_caches_seq'))"
+        )
+
+    op.execute("""
+        CREATE FUNCTION cegep.bump_versao_cache() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE cegep.versao_caches
+               SET versao = nextval('cegep.versao_caches_seq')
+             WHERE nome = TG_ARGV[0];
+            RETURN NULL;
+        END $$;
+    """)
+
+    for tabela, nome in TABELAS.items():
+        op.execute(f"""
+            CREATE TRIGGER {_trigger(tabela)}
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {tabela}
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION cegep.bump_versao_cache('{nome}')
+        """)
+
+
+def downgrade() -> None:
+    for tabela in TABELAS:
+        op.execute(f'DROP TRIGGER IF EXISTS {_trigger(tabela)} ON {tabela}')
+    op.execute('DROP FUNCTION IF EXISTS cegep.bump_versao_cache()')
+    op.execute('DROP SEQUENCE IF EXISTS cegep.versao_caches_seq')
+    op.drop_table('versao_caches', schema='cegep')
@@ -0,0 +1,72 @@
+"""export jobs e versao de etapas
+
+Revision ID: c3a9d5e7f1b4
+Revises: b8e4f1a7c3d2
+Create Date: 2026-10-17
+
+- `export_jobs`: exports gerados em background e guardados no storage
+  (`services.exportacoes`), uma linha por chave de conteudo;
+- `estatistica.versao_etapas`: contador por org incrementado a cada
+  escrita de etapa, parte da chave dos exports. Sem carga inicial:
+  org sem linha esta na versao 0.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9d5e7f1b4'
+down_revision: Union[str, None] = 'b8e4f1a7c3d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'export_jobs',
+        sa.Column(
+            'id', sa.Integer(), sa.Identity(always=False), nullable=False
+        ),
+        sa.Column('tipo', sa.String(length=30), nullable=False),
+        sa.Column('uae', sa.String(length=20), nullable=False),
+        sa.Column('chave', sa.String(length=64), nullable=False),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('expira_em', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('path', sa.String(), nullable=True),
+        sa.Column('erro', sa.String(), nullable=True),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.Column('concluido_em', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['created_by'], ['users.id'], ondelete='SET NULL'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('chave'),
+    )
+    op.create_index(
+        op.f('ix_export_jobs_expira_em'),
+        'export_jobs',
+        ['expira_em'],
+        unique=False,
+    )
+    op.create_table(
+        'versao_etapas',
+        sa.Column('uae', sa.String(length=20), nullable=False),
+        sa.Column('versao', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('uae'),
+        schema='estatistica',
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('versao_etapas', schema='estatistica')
+    op.drop_index(op.f('ix_export_jobs_expira_em'), table_name='export_jobs')
+    op.drop_table('export_jobs')
@@ -0,0 +1,96 @@
+"""consultas e sync do portal da transparencia
+
+Revision ID: d4b8f2a6c1e3
+Revises: c3a9d5e7f1b4
+Create Date: 2026-10-17
+
+- `cegep.consultas_portal`: resultado por (cpf, mes) ja obtido do Portal,
+  cache das consultas avulsas e do lote;
+- `cegep.sync_portal_jobs`: sincronizacao em lote por org, com o
+  progresso (`services.sync_remuneracao`).
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b8f2a6c1e3'
+down_revision: Union[str, None] = 'c3a9d5e7f1b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'consultas_portal',
+        sa.Column('cpf', sa.String(length=11), nullable=False),
+        sa.Column('mes_ano', sa.Date(), nullable=False),
+        sa.Column('encontrado', sa.Boolean(), nullable=False),
+        sa.Column(
+            'remuneracao_bruta',
+            sa.Numeric(precision=14, scale=2),
+            nullable=True,
+        ),
+        sa.Column(
+            'remuneracao_liquida',
+            sa.Numeric(precision=14, scale=2),
+            nullable=True,
+        ),
+        sa.Column(
+            'consultado_em',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint('cpf', 'mes_ano'),
+        schema='cegep',
+    )
+    op.create_table(
+        'sync_portal_jobs',
+        sa.Column(
+            'id', sa.Integer(), sa.Identity(always=False), nullable=False
+        ),
+        sa.Column('uae', sa.String(length=20), nullable=False),
+        sa.Column('mes_inicio', sa.Date(), nullable=False),
+        sa.Column('mes_fim', sa.Date(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('processados', sa.Integer(), nullable=False),
+        sa.Column('falhas', sa.Integer(), nullable=False),
+        sa.Column('erro', sa.String(), nullable=True),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.Column(
+            'atualizado_em', sa.DateTime(timezone=True), nullable=False
+        ),
+        sa.Column('concluido_em', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['created_by'], ['users.id'], ondelete='SET NULL'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        schema='cegep',
+    )
+    op.create_index(
+        op.f('ix_cegep_sync_portal_jobs_uae'),
+        'sync_portal_jobs',
+        ['uae'],
+        unique=False,
+        schema='cegep',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_cegep_sync_portal_jobs_uae'),
+        table_name='sync_portal_jobs',
+        schema='cegep',
+    )
+    op.drop_table('sync_portal_jobs', schema='cegep')
+    op.drop_table('consultas_portal', schema='cegep')
@@ -0,0 +1,57 @@
+"""snapshot delta nos logs de auditoria
+
+Revision ID: e6c1a3f9b2d5
+Revises: d4b8f2a6c1e3
+Create Date: 2026-10-17
+
+- `security.user_action_logs.snapshot` (JSONB) e `base_id`: logs de
+  missao/OM guardam um keyframe completo de tempos em tempos e, entre
+  eles, so o diff estrutural (`services.logs.log_snapshot_action`). Os
+  logs antigos continuam em `before`/`after` (texto);
+- indice (resource, resource_id, id): historico de um recurso e a busca
+  do log anterior a cada gravacao.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c1a3f9b2d5'
+down_revision: Union[str, None] = 'd4b8f2a6c1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'user_action_logs',
+        sa.Column(
+            'snapshot', postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+        schema='security',
+    )
+    op.add_column(
+        'user_action_logs',
+        sa.Column('base_id', sa.Integer(), nullable=True),
+        schema='security',
+    )
+    op.create_index(
+        'ix_user_action_logs_resource',
+        'user_action_logs',
+        ['resource', 'resource_id', 'id'],
+        unique=False,
+        schema='security',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_user_action_logs_resource',
+        table_name='user_action_logs',
+        schema='security',
+    )
+    op.drop_column('user_action_logs', 'base_id', schema='security')
+    op.drop_column('user_action_logs', 'snapshot', schema='security')
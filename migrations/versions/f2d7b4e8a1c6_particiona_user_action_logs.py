@@ -0,0 +1,237 @@
+"""particiona user_action_logs por mes
+
+Revision ID: f2d7b4e8a1c6
+Revises: e6c1a3f9b2d5
+Create Date: 2026-10-17
+
+`security.user_action_logs` vira tabela particionada por mes
+(RANGE em `timestamp`), e cada mes e subparticionado por LIST em
+`action`: `<mes>_login` guarda os logins e `<mes>_demais`, o resto. A
+retencao dos logins (cleanup `old_login_logs`) passa a ser um DROP da
+subparticao `_login` dos meses vencidos, sem DELETE linha a linha.
+
+- `security.garantir_particoes_user_action_logs(inicio, meses_a_frente)`
+  cria os meses que faltam de `inicio` ate `meses_a_frente` meses
+  adiante. Linhas que tinham caido na particao default (mes sem
+  particao) sao movidas para o mes criado;
+- a PK passa a (id, timestamp, action): o Postgres exige as chaves de
+  particao em toda constraint unica. `id` continua unico na pratica
+  (identity);
+- os dados existentes sao copiados com os mesmos ids.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d7b4e8a1c6'
+down_revision: Union[str, None] = 'e6c1a3f9b2d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MESES_A_FRENTE = 3
+
+GARANTIR_PARTICOES = """
+CREATE OR REPLACE FUNCTION security.garantir_particoes_user_action_logs(
+    inicio date, meses_a_frente integer DEFAULT 3
+) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    mes date := date_trunc('month', inicio)::date;
+    ultimo date := (
+        date_trunc('month', now()) + make_interval(months => meses_a_frente)
+    )::date;
+    proximo date;
+    nome text;
+    criadas integer := 0;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS _logs_sem_particao
+        (LIKE security.user_action_logs) ON COMMIT DROP;
+
+    WHILE mes <= ultimo LOOP
+        proximo := (mes + interval '1 month')::date;
+        nome := 'user_action_logs_' || to_char(mes, 'YYYY_MM');
+
+        IF to_regclass(format('security.%I', nome)) IS NULL THEN
+            -- O Postgres recusa criar a particao com linhas do mes na
+            -- default: elas saem antes e voltam depois.
+            WITH movidas AS (
+                DELETE FROM security.user_action_logs_default
+                WHERE "timestamp" >= mes AND "timestamp" < proximo
+                RETURNING *
+            )
+            INSERT INTO _logs_sem_particao SELECT * FROM movidas;
+
+            EXECUTE format(
+                'CREATE TABLE security.%I PARTITION OF '
+                'security.user_action_logs FOR VALUES FROM (%L) TO (%L) '
+                'PARTITION BY LIST (action)',
+                nome, mes, proximo
+            );
+            EXECUTE format(
+                'CREATE TABLE security.%I PARTITION OF security.%I '
+                'FOR VALUES IN (''login'')',
+                nome || '_login', nome
+            );
+            EXECUTE format(
+                'CREATE TABLE security.%I PARTITION OF security.%I DEFAULT',
+                nome || '_demais', nome
+            );
+
+            INSERT INTO security.user_action_logs OVERRIDING SYSTEM VALUE
+            SELECT * FROM _logs_sem_particao;
+            TRUNCATE _logs_sem_particao;
+            criadas := criadas + 1;
+        END IF;
+
+        mes := proximo;
+    END LOOP;
+
+    RETURN criadas;
+END
+$$;
+"""
+
+
+def upgrade() -> None:
+    # Tira a tabela atual do caminho (PK, indice e sequence tem nome
+    # unico no schema e sao reaproveitados pela nova).
+    op.execute("""
+        ALTER TABLE security.user_action_logs
+            RENAME TO user_action_logs_legado
+    """)
+    op.execute("""
+        ALTER TABLE security.user_action_logs_legado
+            RENAME CONSTRAINT user_action_logs_pkey
+            TO user_action_logs_legado_pkey
+    """)
+    op.execute("""
+        ALTER INDEX security.ix_user_action_logs_resource
+            RENAME TO ix_user_action_logs_legado_resource
+    """)
+    op.execute("""
+        ALTER SEQUENCE security.user_action_logs_id_seq
+            RENAME TO user_action_logs_legado_id_seq
+    """)
+
+    op.execute("""
+        CREATE TABLE security.user_action_logs (
+            id integer GENERATED BY DEFAULT AS IDENTITY,
+            user_id integer NOT NULL
+                REFERENCES public.users (id),
+            action varchar NOT NULL,
+            resource varchar NOT NULL,
+            resource_id integer,
+            before varchar,
+            after varchar,
+            "timestamp" timestamp without time zone
+                DEFAULT now() NOT NULL,
+            snapshot jsonb,
+            base_id integer,
+            CONSTRAINT user_action_logs_pkey
+                PRIMARY KEY (id, "timestamp", action)
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    op.execute("""
+        CREATE TABLE security.user_action_logs_default
+            PARTITION OF security.user_action_logs DEFAULT
+    """)
+    op.execute("""
+        CREATE INDEX ix_user_action_logs_resource
+            ON security.user_action_logs (resource, resource_id, id)
+    """)
+    op.execute("""
+        CREATE INDEX ix_user_action_logs_timestamp
+            ON security.user_action_logs ("timestamp", id)
+    """)
+
+    op.execute(GARANTIR_PARTICOES)
+
+    op.execute(f"""
+        SELECT security.garantir_particoes_user_action_logs(
+            COALESCE(
+                (SELECT min("timestamp")::date
+                 FROM security.user_action_logs_legado),
+                now()::date
+            ),
+            {MESES_A_FRENTE}
+        )
+    """)
+    op.execute("""
+        INSERT INTO security.user_action_logs OVERRIDING SYSTEM VALUE
+        SELECT id, user_id, action, resource, resource_id, before, after,
+               "timestamp", snapshot, base_id
+        FROM security.user_action_logs_legado
+    """)
+    op.execute("""
+        SELECT setval(
+            pg_get_serial_sequence('security.user_action_logs', 'id'),
+            COALESCE(
+                (SELECT max(id) FROM security.user_action_logs), 0
+            ) + 1,
+            false
+        )
+    """)
+    op.execute('DROP TABLE security.user_action_logs_legado')
+
+
+def downgrade() -> None:
+    op.execute("""
+        ALTER TABLE security.user_action_logs
+            RENAME TO user_action_logs_particionada
+    """)
+    op.execute("""
+        ALTER TABLE security.user_action_logs_particionada
+            RENAME CONSTRAINT user_action_logs_pkey
+            TO user_action_logs_particionada_pkey
+    """)
+    op.execute("""
+        ALTER INDEX security.ix_user_action_logs_resource
+            RENAME TO ix_user_action_logs_particionada_resource
+    """)
+    op.execute("""
+        ALTER SEQUENCE security.user_action_logs_id_seq
+            RENAME TO user_action_logs_particionada_id_seq
+    """)
+    op.execute("""
+        CREATE TABLE security.user_action_logs (
+            id integer GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            user_id integer NOT NULL
+                REFERENCES public.users (id),
+            action varchar NOT NULL,
+            resource varchar NOT NULL,
+            resource_id integer,
+            before varchar,
+            after varchar,
+            "timestamp" timestamp without time zone
+                DEFAULT now() NOT NULL,
+            snapshot jsonb,
+            base_id integer
+        )
+    """)
+    op.execute("""
+        CREATE INDEX ix_user_action_logs_resource
+            ON security.user_action_logs (resource, resource_id, id)
+    """)
+    op.execute("""
+        INSERT INTO security.user_action_logs OVERRIDING SYSTEM VALUE
+        SELECT id, user_id, action, resource, resource_id, before, after,
+               "timestamp", snapshot, base_id
+        FROM security.user_action_logs_particionada
+    """)
+    op.execute("""
+        SELECT setval(
+            pg_get_serial_sequence('security.user_action_logs', 'id'),
+            COALESCE(
+                (SELECT max(id) FROM security.user_action_logs), 0
+            ) + 1,
+            false
+        )
+    """)
+    op.execute('DROP TABLE security.user_action_logs_particionada')
+    op.execute("""
+        DROP FUNCTION security.garantir_particoes_user_action_logs(
+            date, integer
+        )
+    """)
@@ -0,0 +1,83 @@
+"""
+Benchmark de latência por modo de pool (DB_POOL_MODE).
+
+Para cada modo, abre um engine com a mesma configuração da aplicação
+(`engine_config`) e dispara N "requisições" — sessão + consulta curta +
+fechamento, como um handler típico — com até C simultâneas. Imprime
+p50/p95/máx por modo.
+
+Aponte DATABASE_URL para um Postgres local (ou para o pooler, para
+medir o modo 'pgbouncer' de verdade). Localmente não há TLS, então o
+custo do NullPool fica SUBESTIMADO em relação ao Supabase.
+
+Uso:
+    cd /path/to/api
+    python -m scripts.bench_pool [--requests 500] [--concurrency 25]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from fcontrol_api.database import POOL_MODES, engine_config
+from fcontrol_api.settings import Settings
+
+QUERY = text('SELECT count(*) FROM pg_catalog.pg_class')
+
+
+async def _request(engine, latencies: list[float]):
+    start = time.perf_counter()
+    async with AsyncSession(engine) as session:
+        await session.scalar(QUERY)
+    latencies.append(time.perf_counter() - start)
+
+
+async def bench_mode(mode: str, requests: int, concurrency: int) -> dict:
+    settings = Settings(DB_POOL_MODE=mode)
+    engine = create_async_engine(
+        settings.DATABASE_URL, **engine_config(settings)
+    )
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def worker():
+        async with sem:
+            await _request(engine, latencies)
+
+    # Aquecimento: abre as conexões do pool fora da medição.
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    latencies.clear()
+
+    await asyncio.gather(*(worker() for _ in range(requests)))
+    await engine.dispose()
+
+    ordered = sorted(latencies)
+    return {
+        'mode': mode,
+        'p50': statistics.median(ordered) * 1000,
+        'p95': ordered[int(0.95 * (len(ordered) - 1))] * 1000,
+        'max': ordered[-1] * 1000,
+    }
+
+
+async def main(requests: int, concurrency: int):
+    print(f'{requests} requisições, concorrência {concurrency}')
+    print(f'{"modo":<10} {"p50 ms":>8} {"p95 ms":>8} {"máx ms":>8}')
+    for mode in POOL_MODES:
+        r = await bench_mode(mode, requests, concurrency)
+        print(
+            f'{r["mode"]:<10} {r["p50"]:>8.2f} {r["p95"]:>8.2f}'
+            f' {r["max"]:>8.2f}'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=25)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
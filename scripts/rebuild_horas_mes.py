@@ -0,0 +1,64 @@
+"""
+Reconstrucao do consolidado mensal de horas voadas (estatistica).
+
+As rotas de etapa mantem `horas_mes_anv`, `horas_mes_oi` e
+`horas_mes_trip` na propria transacao; este script regrava as tabelas a
+partir de etapas/OIs/tripulantes quando elas derivam (etapas gravadas
+por SQL, restauracao de backup, correcao manual). Roda em uma transacao
+e so confirma no fim.
+
+Uso local:
+    cd /path/to/api
+    python -m scripts.rebuild_horas_mes
+    python -m scripts.rebuild_horas_mes --ano 2025
+
+Fly.io Machine (execucao unica):
+    flyctl machine run registry.fly.io/fcontrol-api \
+      --app fcontrol-api \
+      --region gru \
+      --vm-memory 256 \
+      --restart no \
+      --rm \
+      --entrypoint "python -m scripts.rebuild_horas_mes"
+"""
+
+import argparse
+import asyncio
+import logging
+
+from fcontrol_api.database import get_session
+from fcontrol_api.services.horas_mes import reconstruir_horas_mes
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
+)
+logger = logging.getLogger(__name__)
+
+
+def _args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--ano',
+        type=int,
+        default=None,
+        help='reconstroi so este ano (padrao: todo o historico)',
+    )
+    return parser.parse_args()
+
+
+async def main():
+    args = _args()
+    logger.info('Reconstruindo consolidado de horas (%s)...', args.ano or '*')
+
+    async for session in get_session():
+        linhas = await reconstruir_horas_mes(session, args.ano)
+        await session.commit()
+
+        for tabela, total in linhas.items():
+            logger.info('%s: %d linhas', tabela, total)
+        break
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
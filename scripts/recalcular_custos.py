@@ -0,0 +1,87 @@
+"""
+Recalculo em massa de custos de missoes (e caches de comissionamento)
+fora da requisicao, para janelas grandes.
+
+O admin de diarias/soldos ja recalcula na propria transacao; este script
+e para reprocessar um periodo inteiro (ex.: apos carga de tabela por SQL,
+ou uma faixa aberta que cobre anos de missoes) sem prender um worker da
+API. Roda em uma transacao e so confirma no fim.
+
+Uso local:
+    cd /path/to/api
+    python -m scripts.recalcular_custos --inicio 2025-01-01
+    python -m scripts.recalcular_custos --inicio 2025-01-01 \
+        --fim 2025-12-31 --sem-comiss
+
+Fly.io Machine (execucao unica):
+    flyctl machine run registry.fly.io/fcontrol-api \
+      --app fcontrol-api \
+      --region gru \
+      --vm-memory 512 \
+      --restart no \
+      --rm \
+      --entrypoint "python -m scripts.recalcular_custos --inicio 2025-01-01"
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import date
+
+from fcontrol_api.database import get_session
+from fcontrol_api.services.missao import (
+    LOTE_RECALCULO,
+    recalcular_custos_missoes,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
+)
+logger = logging.getLogger(__name__)
+
+
+def _args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--inicio', type=date.fromisoformat, required=True)
+    parser.add_argument('--fim', type=date.fromisoformat, default=None)
+    parser.add_argument(
+        '--sem-comiss',
+        action='store_true',
+        help='nao recalcula comissionamentos (ex.: so soldo mudou)',
+    )
+    parser.add_argument('--lote', type=int, default=LOTE_RECALCULO)
+    return parser.parse_args()
+
+
+def _progresso(feitas: int, total: int) -> None:
+    logger.info('Missoes: %d/%d (%.0f%%)', feitas, total, feitas / total * 100)
+
+
+async def main():
+    args = _args()
+    logger.info(
+        'Recalculando custos de %s a %s...', args.inicio, args.fim or '...'
+    )
+
+    async for session in get_session():
+        resultado = await recalcular_custos_missoes(
+            args.inicio,
+            args.fim,
+            session,
+            afeta_comiss=not args.sem_comiss,
+            tamanho_lote=args.lote,
+            progresso=_progresso,
+        )
+        await session.commit()
+
+        logger.info(
+            'Concluido: %d missoes, %d comissionamentos.',
+            resultado['missoes'],
+            resultado['comissionamentos'],
+        )
+        break
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
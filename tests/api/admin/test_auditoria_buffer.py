@@ -0,0 +1,34 @@
+"""Testes para GET /admin/auditoria/buffer."""
+
+from http import HTTPStatus
+
+import pytest
+
+from fcontrol_api.services.auditoria import auditoria
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_auditoria_buffer_status(client, token_sistema, users):
+    user, _ = users
+    auditoria.registrar(user.id, 'access_denied', 'om')
+
+    response = await client.get(
+        '/admin/auditoria/buffer',
+        headers={'Authorization': f'Bearer {token_sistema}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()['data']
+    assert data['pendentes'] == 1
+    assert data['registrados'] == 1
+    assert data['max_lote'] == auditoria.max_lote
+
+
+async def test_auditoria_buffer_exige_admin_sistema(client, token):
+    response = await client.get(
+        '/admin/auditoria/buffer',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
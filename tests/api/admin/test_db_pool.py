@@ -0,0 +1,24 @@
+"""
+Testes para o endpoint GET /admin/db/pool (saúde do pool de conexões).
+"""
+
+from http import HTTPStatus
+
+import pytest
+
+from fcontrol_api.database import POOL_MODE
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_pool_status_success(client, token_sistema):
+    response = await client.get(
+        '/admin/db/pool',
+        headers={'Authorization': f'Bearer {token_sistema}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()['data']
+    assert data['mode'] == POOL_MODE
+    for field in ('checked_out', 'overflow', 'acquired', 'wait_p95_ms'):
+        assert field in data
@@ -0,0 +1,85 @@
+"""
+Testes para o executor de documentos: GET /admin/documentos/pool e a
+admissão com 503 + Retry-After quando todas as vagas estão ocupadas.
+"""
+
+from http import HTTPStatus
+
+import pytest
+
+from fcontrol_api.services.documentos import documentos
+from fcontrol_api.services.pool_limitado import PoolLimitado
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def pool_zerado():
+    documentos.reset()
+    yield documentos
+    documentos.reset()
+
+
+async def test_documentos_pool_status(client, token_sistema, pool_zerado):
+    response = await client.get(
+        '/admin/documentos/pool',
+        headers={'Authorization': f'Bearer {token_sistema}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()['data']
+    assert data['max_jobs'] == documentos.max_jobs
+    assert data['jobs_ativos'] == 0
+    for field in ('na_fila', 'rejeitados', 'espera_p95_ms'):
+        assert field in data
+
+
+async def test_documentos_pool_exige_admin_sistema(client, token):
+    response = await client.get(
+        '/admin/documentos/pool',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+async def test_export_saturado_retorna_503_com_retry_after(
+    client, token, pool_zerado
+):
+    pool_zerado.jobs_ativos = pool_zerado.max_jobs
+
+    response = await client.post(
+        '/estatistica/etapas/export',
+        json={'ids': [1]},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['retry-after'] == str(pool_zerado.retry_after)
+    assert pool_zerado.rejeitados == 1
+    # A rejeição não consome vaga.
+    assert pool_zerado.jobs_ativos == pool_zerado.max_jobs
+
+
+async def test_export_devolve_a_vaga_ao_terminar(client, token, pool_zerado):
+    response = await client.post(
+        '/estatistica/etapas/export',
+        json={'ids': [999999]},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert pool_zerado.jobs_ativos == 0
+
+
+async def test_executar_conta_passos_no_pool():
+    pool = PoolLimitado(
+        max_workers=1, max_jobs=1, retry_after=5, nome='teste', ocupado=''
+    )
+
+    assert await pool.executar(sum, [1, 2, 3]) == 6
+    assert await pool.executar(str.upper, 'abc') == 'ABC'
+
+    status = pool.status()
+    assert status['iniciadas'] == status['concluidas'] == 2
+    assert status['na_fila'] == status['em_execucao'] == 0
@@ -23,6 +23,7 @@ GATED = [
     ('DELETE', '/admin/soldos/99999'),
     ('GET', '/admin/diarias/valores/'),
     ('DELETE', '/admin/diarias/valores/99999'),
+    ('GET', '/admin/db/pool'),
 ]
 
 
@@ -0,0 +1,84 @@
+"""
+Testes para o executor de senhas: GET /admin/senhas/pool e a admissão do
+login com 503 + Retry-After quando todas as vagas estão ocupadas.
+"""
+
+from http import HTTPStatus
+
+import pytest
+
+from fcontrol_api.services.senhas import senhas
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def pool_zerado():
+    senhas.reset()
+    yield senhas
+    senhas.reset()
+
+
+async def test_senhas_pool_status(client, token_sistema, pool_zerado):
+    response = await client.get(
+        '/admin/senhas/pool',
+        headers={'Authorization': f'Bearer {token_sistema}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()['data']
+    assert data['max_jobs'] == senhas.max_jobs
+    assert data['jobs_ativos'] == 0
+
+
+async def test_senhas_pool_exige_admin_sistema(client, token):
+    response = await client.get(
+        '/admin/senhas/pool',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+async def test_login_saturado_retorna_503_com_retry_after(
+    client, users, oauth_client, pool_zerado
+):
+    user, _ = users
+    pool_zerado.jobs_ativos = pool_zerado.max_jobs
+
+    response = await client.post(
+        '/auth/authorize',
+        data={
+            'client_id': oauth_client.client_id,
+            'redirect_uri': oauth_client.redirect_uri,
+            'response_type': 'code',
+            'code_challenge': 'x' * 43,
+            'code_challenge_method': 'S256',
+            'saram': user.saram,
+            'password': user.clean_password,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['retry-after'] == str(pool_zerado.retry_after)
+    assert pool_zerado.rejeitados == 1
+
+
+async def test_login_devolve_a_vaga(client, users, oauth_client, pool_zerado):
+    user, _ = users
+
+    await client.post(
+        '/auth/authorize',
+        data={
+            'client_id': oauth_client.client_id,
+            'redirect_uri': oauth_client.redirect_uri,
+            'response_type': 'code',
+            'code_challenge': 'x' * 43,
+            'code_challenge_method': 'S256',
+            'saram': user.saram,
+            'password': 'errada',
+        },
+    )
+
+    assert pool_zerado.jobs_ativos == 0
+    assert pool_zerado.status()['concluidas'] == 1
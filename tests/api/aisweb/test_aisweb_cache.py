@@ -0,0 +1,322 @@
+"""Cliente do AISWEB: conexão compartilhada, cache por área, coalescência
+e o lote de METAR/TAF (POST /met/batch).
+
+As rotas falam com um servidor HTTP local (stub) no lugar do AISWEB,
+que responde XML por área e conta as chamadas recebidas.
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+
+from fcontrol_api.database import get_session
+from fcontrol_api.exceptions import http_exception_handler
+from fcontrol_api.middlewares import middleware_stack
+from fcontrol_api.models.shared.aeronaves import Aeronave
+from fcontrol_api.routers.aisweb import client as aisweb
+from fcontrol_api.routers.aisweb import metar, rotaer, sol
+from tests.factories import OrdemEtapaFactory, OrdemMissaoFactory
+
+pytestmark = pytest.mark.anyio
+
+RESPOSTAS = {
+    'met': (
+        '<aisweb><met><metar>METAR {icao} 171200Z 18005KT CAVOK 25/18 '
+        'Q1015=</metar><taf>TAF {icao} 171100Z 1712/1818 18008KT CAVOK='
+        '</taf></met></aisweb>'
+    ),
+    'sol': (
+        '<aisweb><day><date>2026-10-17</date><sunrise>08:21</sunrise>'
+        '<sunset>21:05</sunset><weekDay>6</weekDay><aero>SBGL</aero>'
+        '</day></aisweb>'
+    ),
+    'rotaer': (
+        '<aisweb><status>ok</status><AeroCode>SBGL</AeroCode>'
+        '<name>GALEAO</name><city>RIO DE JANEIRO</city></aisweb>'
+    ),
+}
+# Aeródromo sem METAR publicado: o AISWEB responde 200 com XML vazio.
+SEM_METAR = 'SBXX'
+
+
+class _StubAisweb(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlparse(self.path).query)
+        area, icao = query['area'][0], query['icaoCode'][0]
+        with server.lock:
+            server.chamadas[(area, icao)] += 1
+            server.ativas += 1
+            server.pico = max(server.pico, server.ativas)
+        time.sleep(server.atraso)
+        with server.lock:
+            server.ativas -= 1
+        if server.status != HTTPStatus.OK:
+            self.send_response(server.status)
+            self.end_headers()
+            return
+        if area == 'met' and icao == SEM_METAR:
+            corpo = b'<aisweb><met/></aisweb>'
+        else:
+            corpo = RESPOSTAS[area].format(icao=icao).encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubAisweb)
+    server.chamadas = Counter()
+    server.lock = threading.Lock()
+    server.ativas = 0
+    server.pico = 0
+    server.atraso = 0
+    server.status = HTTPStatus.OK
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        aisweb, 'AISWEB_URL', f'http://127.0.0.1:{server.server_port}/'
+    )
+    aisweb.limpar_cache()
+    yield server
+    server.shutdown()
+    server.server_close()
+    aisweb.limpar_cache()
+
+
+@pytest.fixture
+def app():
+    # O grupo /aisweb não está montado na aplicação: os routers são
+    # servidos numa app própria.
+    app = FastAPI()
+    app.add_exception_handler(HTTPException, http_exception_handler)
+    for modulo in (metar, sol, rotaer):
+        app.include_router(modulo.router)
+    return app
+
+
+@pytest.fixture
+async def api(app, stub):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url='http://test'
+    ) as ac:
+        yield ac
+    await aisweb.fechar_cliente()
+
+
+@pytest.fixture
+async def api_db(app, api, session):
+    # O lote é escopado pela org ativa do token, posta pelos middlewares.
+    for middleware in middleware_stack:
+        app.middleware('http')(middleware)
+    app.dependency_overrides[get_session] = lambda: session
+    return api
+
+
+async def test_met_repetido_vem_do_cache(api, stub):
+    for _ in range(3):
+        response = await api.get('/met/sbgl')
+        assert response.status_code == HTTPStatus.OK
+
+    data = response.json()['data']
+    assert data['metar'].startswith('SBGL 171200Z')
+    assert stub.chamadas[('met', 'SBGL')] == 1
+
+
+async def test_cache_separado_por_area_e_parametros(api, stub):
+    await api.get('/met/SBGL')
+    await api.get('/sol/SBGL')
+    await api.get('/sol/SBGL', params={'dt_i': '2026-10-17'})
+    await api.get('/rotaer/SBGL')
+    await api.get('/rotaer/SBGL')
+
+    assert stub.chamadas == {
+        ('met', 'SBGL'): 1,
+        ('sol', 'SBGL'): 2,
+        ('rotaer', 'SBGL'): 1,
+    }
+
+
+async def test_consultas_simultaneas_geram_uma_chamada(api, stub):
+    stub.atraso = 0.2
+
+    responses = await asyncio.gather(
+        *(api.get('/rotaer/SBGL') for _ in range(20))
+    )
+
+    assert {r.status_code for r in responses} == {HTTPStatus.OK}
+    assert responses[0].json()['data']['data']['name'] == 'GALEAO'
+    assert stub.chamadas[('rotaer', 'SBGL')] == 1
+
+
+async def test_cliente_reaproveitado_entre_consultas(api, stub):
+    await api.get('/met/SBGL')
+    primeiro = aisweb.aisweb_client()
+    await api.get('/sol/SBGL')
+
+    assert aisweb.aisweb_client() is primeiro
+    assert not primeiro.is_closed
+
+
+async def test_erro_do_aisweb_vira_502_e_nao_e_guardado(api, stub):
+    stub.status = HTTPStatus.SERVICE_UNAVAILABLE
+
+    response = await api.get('/met/SBGL')
+
+    assert response.status_code == HTTPStatus.BAD_GATEWAY
+    assert response.json()['message'] == 'AISWEB retornou HTTP 503'
+
+    stub.status = HTTPStatus.OK
+    response = await api.get('/met/SBGL')
+
+    assert response.status_code == HTTPStatus.OK
+    assert stub.chamadas[('met', 'SBGL')] == 2  # noqa: PLR2004
+
+
+async def test_cache_expira(api, stub):
+    await api.get('/rotaer/SBGL')
+    for chave, (_, texto) in list(aisweb._cache.items()):
+        aisweb._cache[chave] = (time.monotonic() - 1, texto)
+    await api.get('/rotaer/SBGL')
+
+    assert stub.chamadas[('rotaer', 'SBGL')] == 2  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ('agora', 'esperado'),
+    [
+        # Perto da hora cheia: vale até HH:05, quando sai o novo METAR.
+        (datetime(2026, 10, 17, 11, 58, tzinfo=timezone.utc), 7 * 60),
+        (datetime(2026, 10, 17, 12, 3, tzinfo=timezone.utc), 2 * 60),
+        # Longe dela: limitado por MET_TTL_MAX (SPECI).
+        (datetime(2026, 10, 17, 12, 20, tzinfo=timezone.utc), 10 * 60),
+    ],
+)
+def test_ttl_met_alinhado_a_publicacao(agora, esperado):
+    assert aisweb.ttl_met(agora) == esperado
+
+
+def test_ttl_sol_ate_a_virada_do_dia():
+    agora = datetime(2026, 10, 17, 18, 0, tzinfo=timezone.utc)
+    assert aisweb.ttl_sol(agora) == 6 * 3600
+
+
+async def test_met_batch_por_icaos(api_db, stub, token):
+    await api_db.get('/met/SBGL')  # já em cache
+
+    response = await api_db.post(
+        '/met/batch',
+        json={'icaos': ['sbgl', 'SBBR', SEM_METAR, 'SBGL']},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    itens = response.json()['data']
+    assert [i['icao'] for i in itens] == ['SBGL', 'SBBR', SEM_METAR]
+    assert itens[1]['metar'].startswith('SBBR 171200Z')
+    assert itens[1]['taf'].startswith('SBBR 171100Z')
+    assert itens[2]['metar'] is None
+    assert itens[2]['erro'] == f'METAR não encontrado para {SEM_METAR}'
+    assert stub.chamadas[('met', 'SBGL')] == 1
+
+
+async def test_met_batch_limita_chamadas_simultaneas(api_db, stub, token):
+    stub.atraso = 0.1
+    icaos = [f'SB{chr(65 + i)}{chr(65 + i)}' for i in range(12)]
+
+    response = await api_db.post(
+        '/met/batch',
+        json={'icaos': icaos},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert all(i['metar'] for i in response.json()['data'])
+    assert sum(stub.chamadas.values()) == len(icaos)
+    assert stub.pico <= aisweb.MAX_CONCORRENTES
+
+
+async def test_met_batch_por_ordem(api_db, stub, session, users, token):
+    user, _ = users
+    session.add(Aeronave(matricula='2850', active=True, sit='DI', obs=None))
+    ordem = OrdemMissaoFactory(created_by=user.id, matricula_anv='2850')
+    session.add(ordem)
+    await session.flush()
+    agora = datetime.now(timezone.utc)
+    session.add_all([
+        OrdemEtapaFactory(
+            ordem_id=ordem.id,
+            dt_dep=agora,
+            origem='SBGL',
+            dest='SBBR',
+            alternativa='SBCF',
+        ),
+        OrdemEtapaFactory(
+            ordem_id=ordem.id,
+            dt_dep=agora + timedelta(hours=3),
+            origem='SBBR',
+            dest='SBGL',
+            alternativa='SBCF',
+        ),
+    ])
+    await session.commit()
+
+    response = await api_db.post(
+        '/met/batch',
+        json={'ordem_id': ordem.id},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    itens = response.json()['data']
+    assert [i['icao'] for i in itens] == ['SBGL', 'SBBR', 'SBCF']
+
+
+async def test_met_batch_ordem_de_outra_org(
+    api_db, stub, session, users, token
+):
+    user, _ = users
+    session.add(Aeronave(matricula='2850', active=True, sit='DI', obs=None))
+    ordem = OrdemMissaoFactory(
+        created_by=user.id, matricula_anv='2850', uae='1gt'
+    )
+    session.add(ordem)
+    await session.commit()
+
+    response = await api_db.post(
+        '/met/batch',
+        json={'ordem_id': ordem.id},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert not stub.chamadas
+
+
+@pytest.mark.parametrize(
+    'payload',
+    [{}, {'icaos': ['SBGL'], 'ordem_id': 1}, {'icaos': []}],
+)
+async def test_met_batch_payload_invalido(api_db, token, payload):
+    response = await api_db.post(
+        '/met/batch',
+        json=payload,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
@@ -1,10 +1,13 @@
 from http import HTTPStatus
 
 import pytest
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 from sqlalchemy.future import select
 
 from fcontrol_api.models.security.auth import OAuth2AuthorizationCode
 from fcontrol_api.models.security.resources import UserRole
+from fcontrol_api.security import pwd_context, verify_password
 from tests.api.conftest import generate_pkce_pair
 
 pytestmark = pytest.mark.anyio
@@ -287,3 +290,36 @@ async def test_authorize_creates_valid_auth_code(
     assert db_code.client_id == oauth_client.id
     assert db_code.code_challenge == code_challenge
     assert db_code.code_challenge_method == 'S256'
+
+
+async def test_authorize_rehash_senha_com_parametros_antigos(
+    client, users, oauth_client, session
+):
+    """Login com hash de custo antigo grava o hash com os parâmetros atuais."""
+    user, _ = users
+    antigo = PasswordHash((Argon2Hasher(time_cost=1),)).hash(
+        user.clean_password
+    )
+    user.password = antigo
+    session.add(UserRole(user_id=user.id, role_id=1))
+    await session.commit()
+    _, code_challenge = generate_pkce_pair()
+
+    response = await client.post(
+        '/auth/authorize',
+        data={
+            'client_id': oauth_client.client_id,
+            'redirect_uri': oauth_client.redirect_uri,
+            'response_type': 'code',
+            'code_challenge': code_challenge,
+            'code_challenge_method': 'S256',
+            'saram': user.saram,
+            'password': user.clean_password,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    await session.refresh(user)
+    assert user.password != antigo
+    assert verify_password(user.clean_password, user.password)
+    assert not pwd_context.current_hasher.check_needs_rehash(user.password)
@@ -267,6 +267,47 @@ async def test_get_comiss_by_id_includes_missoes(
     assert isinstance(resp['data']['missoes'], list)
 
 
+async def test_get_comiss_by_id_expoe_janelas_de_modulo(
+    client, session, token, users
+):
+    """Detalhe traz as janelas de afastamento que formam módulo."""
+    user, _ = users
+    comiss = ComissFactory(
+        user_id=user.id,
+        data_ab=date(2025, 1, 1),
+        data_fc=date(2025, 12, 31),
+    )
+    session.add(comiss)
+
+    # 01→10 e 10→20 de março: 20 dias contínuos. 01→05 de maio: curto.
+    for afast, regres in (
+        (datetime(2025, 3, 1, 8), datetime(2025, 3, 10, 18)),
+        (datetime(2025, 3, 10, 8), datetime(2025, 3, 20, 18)),
+        (datetime(2025, 5, 1, 8), datetime(2025, 5, 5, 18)),
+    ):
+        missao = FragMisFactory(afast=afast, regres=regres)
+        session.add(missao)
+        await session.flush()
+        session.add(
+            UserFragFactory(
+                frag_id=missao.id, user_id=user.id, sit='c', p_g=user.p_g
+            )
+        )
+    await session.commit()
+
+    response = await client.get(
+        f'/cegep/comiss/{comiss.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()['data']
+    assert data['maior_afastamento'] == 20
+    assert data['modulos'] == [
+        {'inicio': '2025-03-01', 'fim': '2025-03-20', 'dias': 20}
+    ]
+
+
 async def test_get_comiss_by_id_without_token(client, session, users):
     """Testa que requisicao sem token falha."""
     user, _ = users
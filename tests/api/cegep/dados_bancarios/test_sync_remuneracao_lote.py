@@ -0,0 +1,247 @@
+"""Sincronização em lote com o Portal da Transparência.
+
+`POST /cegep/dados-bancarios/sync-remuneracao/lote` cobre os militares da
+org com dados bancários x meses do intervalo, em background. O resultado
+de cada (cpf, mês) vai para `ConsultaPortal`, que é cache (a consulta
+avulsa responde dele) e progresso (o lote pula o que já está lá, então
+pedir de novo retoma de onde parou).
+
+O Portal é substituído por `fake_portal`, que responde por mês e conta
+as consultas.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from fcontrol_api.models.cegep.portal import ConsultaPortal, SyncPortalJob
+from fcontrol_api.services import sync_remuneracao
+from fcontrol_api.services.portal_transparencia import RemuneracaoPortal
+
+pytestmark = pytest.mark.anyio
+
+URL = '/cegep/dados-bancarios/sync-remuneracao/lote'
+JAN = date(2026, 1, 1)
+FEV = date(2026, 2, 1)
+MAR = date(2026, 3, 1)
+
+
+def _auth(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def fake_portal(monkeypatch):
+    """Janeiro e fevereiro publicados; março ainda não (404)."""
+    chamadas = []
+    falhas = {}
+
+    async def buscar(cpf, mes_ano):
+        chamadas.append((cpf, mes_ano))
+        if mes_ano in falhas:
+            raise HTTPException(status_code=falhas[mes_ano], detail='falha')
+        if mes_ano == MAR:
+            raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+        return RemuneracaoPortal(
+            mes_ano=mes_ano,
+            remuneracao_bruta=Decimal('10000.00'),
+            remuneracao_liquida=Decimal(7000 + mes_ano.month),
+        )
+
+    monkeypatch.setattr(sync_remuneracao, 'buscar_remuneracao', buscar)
+    fake = type('FakePortal', (), {})()
+    fake.chamadas = chamadas
+    fake.falhas = falhas
+    return fake
+
+
+async def _sync(client, token, inicio=JAN, fim=MAR):
+    return await client.post(
+        URL,
+        json={'mes_inicio': str(inicio), 'mes_fim': str(fim)},
+        headers=_auth(token),
+    )
+
+
+async def test_lote_consulta_militares_x_meses(
+    client, session, users, token, dados_bancarios, fake_portal
+):
+    user, _ = users
+
+    response = await _sync(client, token)
+
+    assert response.status_code == HTTPStatus.ACCEPTED
+    job_id = response.json()['data']['id']
+    assert sorted(fake_portal.chamadas) == [
+        (user.cpf, JAN),
+        (user.cpf, FEV),
+        (user.cpf, MAR),
+    ]
+
+    response = await client.get(f'{URL}/{job_id}', headers=_auth(token))
+    data = response.json()['data']
+    assert data['status'] == 'concluido'
+    assert data['total'] == 3  # noqa: PLR2004
+    assert data['processados'] == 3  # noqa: PLR2004
+    assert data['falhas'] == 0
+
+    consultas = {
+        c.mes_ano: c
+        for c in await session.scalars(
+            select(ConsultaPortal).where(ConsultaPortal.cpf == user.cpf)
+        )
+    }
+    assert consultas[FEV].remuneracao_liquida == Decimal('7002.00')
+    assert not consultas[MAR].encontrado
+
+
+async def test_lote_retoma_do_que_falta(
+    client, session, users, token, dados_bancarios, fake_portal
+):
+    user, _ = users
+    session.add(ConsultaPortal(cpf=user.cpf, mes_ano=JAN, encontrado=True))
+    await session.commit()
+    fake_portal.falhas[FEV] = HTTPStatus.BAD_GATEWAY
+
+    response = await _sync(client, token)
+
+    data = response.json()['data']
+    job = await session.get(SyncPortalJob, data['id'])
+    await session.refresh(job)
+    assert job.status == 'concluido'
+    assert (job.processados, job.falhas) == (2, 1)
+    assert (user.cpf, JAN) not in fake_portal.chamadas
+
+    # A falha pontual fica fora do cache: a próxima execução só refaz ela.
+    fake_portal.falhas.clear()
+    fake_portal.chamadas.clear()
+    await _sync(client, token)
+
+    assert fake_portal.chamadas == [(user.cpf, FEV)]
+
+
+async def test_lote_chave_recusada_encerra_com_erro(
+    client, session, token, dados_bancarios, fake_portal
+):
+    fake_portal.falhas[FEV] = HTTPStatus.SERVICE_UNAVAILABLE
+
+    response = await _sync(client, token)
+
+    job = await session.get(SyncPortalJob, response.json()['data']['id'])
+    await session.refresh(job)
+    assert job.status == 'erro'
+    assert job.erro == 'falha'
+    assert job.processados == 2  # noqa: PLR2004
+
+
+async def test_lote_em_andamento_nao_executa_de_novo(
+    client, session, users, token, dados_bancarios, fake_portal
+):
+    user, _ = users
+    job = SyncPortalJob(
+        uae='11gt', mes_inicio=JAN, mes_fim=MAR, created_by=user.id
+    )
+    session.add(job)
+    await session.commit()
+
+    response = await _sync(client, token, FEV, FEV)
+
+    assert response.status_code == HTTPStatus.ACCEPTED
+    assert response.json()['data']['id'] == job.id
+    assert response.json()['message'] == 'Sincronização já em andamento'
+    assert not fake_portal.chamadas
+
+
+async def test_lote_interrompido_e_retomado(
+    client, session, users, token, dados_bancarios, fake_portal
+):
+    user, _ = users
+    job = SyncPortalJob(
+        uae='11gt', mes_inicio=JAN, mes_fim=MAR, created_by=user.id
+    )
+    session.add(job)
+    await session.flush()
+    job.atualizado_em = datetime.now(timezone.utc) - timedelta(hours=1)
+    await session.commit()
+
+    response = await client.get(f'{URL}/{job.id}', headers=_auth(token))
+    assert response.json()['data']['status'] == 'interrompido'
+
+    response = await _sync(client, token)
+
+    assert response.json()['data']['id'] == job.id
+    await session.refresh(job)
+    assert job.status == 'concluido'
+    assert len(fake_portal.chamadas) == 3  # noqa: PLR2004
+
+
+async def test_lote_de_outra_org_nao_encontrado(
+    client, session, users, token, fake_portal
+):
+    user, _ = users
+    job = SyncPortalJob(
+        uae='1gt', mes_inicio=JAN, mes_fim=JAN, created_by=user.id
+    )
+    session.add(job)
+    await session.commit()
+
+    response = await client.get(f'{URL}/{job.id}', headers=_auth(token))
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    ('inicio', 'fim'),
+    [(FEV, JAN), (date(2024, 1, 1), date(2026, 1, 1))],
+)
+async def test_lote_intervalo_invalido(client, token, inicio, fim):
+    response = await _sync(client, token, inicio, fim)
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+async def test_consulta_avulsa_responde_do_cache(
+    client, session, users, token, fake_portal
+):
+    user, _ = users
+    session.add(
+        ConsultaPortal(
+            cpf=user.cpf,
+            mes_ano=JAN,
+            encontrado=True,
+            remuneracao_bruta=Decimal('9000.00'),
+            remuneracao_liquida=Decimal('6500.00'),
+        )
+    )
+    await session.commit()
+
+    response = await client.post(
+        '/cegep/dados-bancarios/sync-remuneracao',
+        json={'user_id': user.id, 'mes_ano': '2026-01-15'},
+        headers=_auth(token),
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['data']['remuneracao_liquida'] == '6500.00'
+    assert not fake_portal.chamadas
+
+
+async def test_consulta_avulsa_guarda_no_cache(
+    client, session, users, token, fake_portal
+):
+    user, _ = users
+    body = {'user_id': user.id, 'mes_ano': '2026-03-10'}
+
+    for _ in range(2):
+        response = await client.post(
+            '/cegep/dados-bancarios/sync-remuneracao',
+            json=body,
+            headers=_auth(token),
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    assert fake_portal.chamadas == [(user.cpf, MAR)]
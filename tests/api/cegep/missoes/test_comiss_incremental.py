@@ -0,0 +1,313 @@
+"""Manutenção incremental do cache do comissionamento.
+
+Salvar, editar e excluir missões aplica só a diferença da missão no
+`cache_calc` (`atualizar_comiss_da_missao`). Depois de cada operação o
+cache tem de bater com a reconstrução completa, que é o que a
+reconciliação (`reconciliar_caches_comiss`) confere.
+"""
+
+import asyncio
+from datetime import date, datetime, time
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fcontrol_api.models.cegep.comiss import ComissContrib, Comissionamento
+from fcontrol_api.models.cegep.missoes import FragMis, PernoiteFrag, UserFrag
+from fcontrol_api.models.shared.users import User
+from fcontrol_api.services.comis import (
+    atualizar_comiss_da_missao,
+    recalcular_caches_comiss,
+    reconciliar_caches_comiss,
+)
+from fcontrol_api.services.missao import sincronizar_custos_missao
+from tests.factories import (
+    ComissFactory,
+    FragMisFactory,
+    PernoiteFragFactory,
+    UserFactory,
+    UserFragFactory,
+)
+
+pytestmark = pytest.mark.anyio
+
+ORG = '11gt'
+
+
+@pytest.fixture
+async def comiss(session, users):
+    user, _ = users
+    comiss = ComissFactory(
+        user_id=user.id,
+        data_ab=date(2025, 1, 1),
+        data_fc=date(2025, 6, 30),
+        dias_cumprir=60,
+    )
+    session.add(comiss)
+    await session.commit()
+    await recalcular_caches_comiss({comiss.id}, session)
+    await session.commit()
+    return comiss
+
+
+async def _salvar(session, user, afast, regres, *, missao=None, commit=True):
+    """Cria (ou remarca as datas de) uma missão de um militar sit='c'."""
+    antigos = ()
+    if missao is None:
+        missao = FragMisFactory(
+            n_doc=f'{afast:%m%d}',
+            tipo_doc='om',
+            tipo='adm',
+            acrec_desloc=False,
+            indenizavel=True,
+            afast=datetime.combine(afast, time(8, 0)),
+            regres=datetime.combine(regres, time(18, 0)),
+        )
+        session.add(missao)
+        await session.flush()
+    else:
+        antigos = ((user.id, missao.afast.date(), missao.regres.date()),)
+        missao.afast = datetime.combine(afast, time(8, 0))
+        missao.regres = datetime.combine(regres, time(18, 0))
+        await session.execute(
+            delete(PernoiteFrag).where(PernoiteFrag.frag_id == missao.id)
+        )
+        await session.execute(
+            delete(UserFrag).where(UserFrag.frag_id == missao.id)
+        )
+
+    pernoite = PernoiteFragFactory(
+        frag_id=missao.id,
+        cidade_id=3550308,
+        data_ini=afast,
+        data_fim=regres,
+        acrec_desloc=False,
+        meia_diaria=False,
+        obs='',
+    )
+    user_frag = UserFragFactory(
+        frag_id=missao.id, user_id=user.id, sit='c', p_g=user.p_g
+    )
+    session.add_all([pernoite, user_frag])
+    await session.flush()
+
+    await sincronizar_custos_missao(
+        missao,
+        [user_frag],
+        [pernoite],
+        session,
+        ORG,
+        footprints_antigos=antigos,
+    )
+    if commit:
+        await session.commit()
+    return missao
+
+
+async def _excluir(session, user, missao):
+    """Mesma sequência da rota de exclusão."""
+    footprint = (user.id, ORG, missao.afast.date(), missao.regres.date())
+    await session.execute(
+        delete(PernoiteFrag).where(PernoiteFrag.frag_id == missao.id)
+    )
+    await session.execute(
+        delete(UserFrag).where(UserFrag.frag_id == missao.id)
+    )
+    await atualizar_comiss_da_missao(missao.id, [footprint], session)
+    await session.delete(missao)
+    await session.commit()
+
+
+async def _assert_reconciliado(session):
+    assert await reconciliar_caches_comiss(session) == []
+
+
+async def test_criar_editar_excluir_mantem_cache_igual_ao_completo(
+    session, users, comiss
+):
+    user, _ = users
+
+    a = await _salvar(session, user, date(2025, 2, 1), date(2025, 2, 5))
+    await _assert_reconciliado(session)
+    b = await _salvar(session, user, date(2025, 3, 1), date(2025, 3, 3))
+    await _assert_reconciliado(session)
+
+    await session.refresh(comiss)
+    assert comiss.cache_calc['missoes_count'] == 2
+
+    await _salvar(
+        session, user, date(2025, 2, 10), date(2025, 2, 20), missao=a
+    )
+    await _assert_reconciliado(session)
+
+    await _excluir(session, user, b)
+    await _assert_reconciliado(session)
+
+    await session.refresh(comiss)
+    assert comiss.cache_calc['missoes_count'] == 1
+    assert comiss.cache_calc['dias_comp'] == 10
+
+
+async def test_modulo_nasce_e_some_na_vizinhanca(session, users, comiss):
+    """Três missões encadeadas formam um bloco de 18 dias (módulo);
+    excluir a do meio desfaz o módulo sem reler as demais."""
+    user, _ = users
+
+    await _salvar(session, user, date(2025, 4, 1), date(2025, 4, 6))
+    meio = await _salvar(session, user, date(2025, 4, 7), date(2025, 4, 12))
+    await session.refresh(comiss)
+    assert comiss.cache_calc['modulo'] is False
+
+    await _salvar(session, user, date(2025, 4, 12), date(2025, 4, 18))
+    await session.refresh(comiss)
+    assert comiss.cache_calc['modulo'] is True
+    assert comiss.cache_calc['modulos'] == 1
+    await _assert_reconciliado(session)
+
+    await _excluir(session, user, meio)
+    await session.refresh(comiss)
+    assert comiss.cache_calc['modulo'] is False
+    assert comiss.cache_calc['modulos'] == 0
+    await _assert_reconciliado(session)
+
+
+async def test_missao_fora_do_periodo_sai_do_cache(session, users, comiss):
+    """Editar as datas para fora do comissionamento remove a
+    contribuição."""
+    user, _ = users
+
+    missao = await _salvar(session, user, date(2025, 5, 1), date(2025, 5, 4))
+    await _salvar(
+        session, user, date(2025, 8, 1), date(2025, 8, 4), missao=missao
+    )
+
+    await session.refresh(comiss)
+    assert comiss.cache_calc['missoes_count'] == 0
+    assert comiss.cache_calc['vals_comp'] == 0
+    assert not (
+        await session.scalars(
+            select(ComissContrib).where(ComissContrib.comiss_id == comiss.id)
+        )
+    ).all()
+    await _assert_reconciliado(session)
+
+
+async def test_cache_antigo_e_reconstruido_por_inteiro(session, users, comiss):
+    """Cache gravado antes da manutenção incremental (sem `modulos`) é
+    reconstruído no primeiro toque, e daí em diante segue incremental."""
+    user, _ = users
+    await _salvar(session, user, date(2025, 2, 1), date(2025, 2, 5))
+
+    comiss.cache_calc = {'missoes_count': 7}
+    await session.execute(delete(ComissContrib))
+    await session.commit()
+
+    await _salvar(session, user, date(2025, 3, 1), date(2025, 3, 5))
+
+    await session.refresh(comiss)
+    assert comiss.cache_calc['missoes_count'] == 2
+    assert 'modulos' in comiss.cache_calc
+    await _assert_reconciliado(session)
+
+
+async def test_reconciliacao_aponta_e_corrige_deriva(session, users, comiss):
+    user, _ = users
+    missao = await _salvar(session, user, date(2025, 2, 1), date(2025, 2, 5))
+
+    cache = dict(comiss.cache_calc)
+    cache['vals_comp'] += 10
+    comiss.cache_calc = cache
+    await session.commit()
+
+    divergentes = await reconciliar_caches_comiss(session)
+    assert [d[0] for d in divergentes] == [comiss.id]
+    assert any('vals_comp' in m for m in divergentes[0][2])
+
+    await reconciliar_caches_comiss(session, corrigir=True)
+    await session.commit()
+    await _assert_reconciliado(session)
+
+    contribs = (
+        await session.scalars(
+            select(ComissContrib.frag_id).where(
+                ComissContrib.comiss_id == comiss.id
+            )
+        )
+    ).all()
+    assert contribs == [missao.id]
+    assert await session.get(FragMis, missao.id) is not None
+
+
+@pytest.fixture
+async def comiss_comitado(db_engine):
+    """Militar e comissionamento commitados, para duas transações reais.
+
+    Limpa no fim as missões criadas pelo teste (e o que pende delas).
+    """
+    async with AsyncSession(db_engine, expire_on_commit=False) as s:
+        user = UserFactory()
+        s.add(user)
+        await s.flush()
+        comiss = ComissFactory(
+            user_id=user.id,
+            data_ab=date(2025, 1, 1),
+            data_fc=date(2025, 6, 30),
+            dias_cumprir=60,
+        )
+        s.add(comiss)
+        await s.flush()
+        await recalcular_caches_comiss({comiss.id}, s)
+        await s.commit()
+
+    yield user, comiss
+
+    async with AsyncSession(db_engine) as s:
+        frags = select(UserFrag.frag_id).where(UserFrag.user_id == user.id)
+        frag_ids = list(await s.scalars(frags))
+        await s.execute(
+            delete(ComissContrib).where(ComissContrib.comiss_id == comiss.id)
+        )
+        await s.execute(delete(UserFrag).where(UserFrag.frag_id.in_(frag_ids)))
+        await s.execute(
+            delete(PernoiteFrag).where(PernoiteFrag.frag_id.in_(frag_ids))
+        )
+        await s.execute(delete(FragMis).where(FragMis.id.in_(frag_ids)))
+        await s.execute(
+            delete(Comissionamento).where(Comissionamento.id == comiss.id)
+        )
+        await s.execute(delete(User).where(User.id == user.id))
+        await s.commit()
+
+
+async def test_missoes_simultaneas_nao_perdem_delta(
+    db_engine, comiss_comitado
+):
+    user, comiss = comiss_comitado
+
+    async with (
+        AsyncSession(db_engine, expire_on_commit=False) as primeira,
+        AsyncSession(db_engine, expire_on_commit=False) as segunda,
+    ):
+        await _salvar(
+            primeira, user, date(2025, 2, 1), date(2025, 2, 5), commit=False
+        )
+        tarefa = asyncio.create_task(
+            _salvar(segunda, user, date(2025, 3, 1), date(2025, 3, 3))
+        )
+        await asyncio.sleep(0.3)
+        # A segunda espera o lock do comissionamento, em vez de somar o
+        # delta dela sobre o cache que a primeira ainda vai sobrescrever
+        assert not tarefa.done()
+
+        await primeira.commit()
+        await tarefa
+
+    async with AsyncSession(db_engine) as s:
+        cache = await s.scalar(
+            select(Comissionamento.cache_calc).where(
+                Comissionamento.id == comiss.id
+            )
+        )
+        assert cache['missoes_count'] == 2  # noqa: PLR2004
+        assert await reconciliar_caches_comiss(s) == []
@@ -14,6 +14,10 @@ from sqlalchemy import update
 
 from fcontrol_api.models.cegep.diarias import DiariaValor
 from fcontrol_api.models.shared.posto_grad import Soldo
+from fcontrol_api.services.comis import (
+    recalcular_cache_de,
+    recalcular_caches_comiss,
+)
 from fcontrol_api.services.custos.integridade import chave_pg_sit
 from fcontrol_api.services.missao import recalcular_custos_missoes
 from tests.factories import (
@@ -388,3 +392,87 @@ async def test_afeta_comiss_false_recalcula_missao_sem_tocar_comiss(
 
     # Comissionamento: intocado (ficou desatualizado de propósito).
     assert _valores_cache(comiss) == cache_comiss_antes
+
+
+async def test_lotes_pequenos_reportam_progresso(session, user_with_comiss):
+    """Com `tamanho_lote` menor que a janela, todas as missões passam
+    pelo cursor em lotes, `progresso` é chamado a cada lote até o total
+    e o resultado não depende do tamanho do lote."""
+    user, comiss = user_with_comiss
+    today = date.today()
+    missoes = []
+    for i in range(5):
+        ini = today + timedelta(days=5 + i * 2)
+        missoes.append(
+            await _missao_com_militar(
+                session,
+                n_doc=f'72{i:02d}',
+                afast_date=ini,
+                regres_date=ini + timedelta(days=1),
+                user=user,
+                sit='c',
+            )
+        )
+    inicio = today + timedelta(days=5)
+    fim = today + timedelta(days=14)
+
+    await recalcular_custos_missoes(inicio, fim, session)
+    await session.refresh(comiss)
+    cache_lote_unico = _valores_cache(comiss)
+
+    chamadas = []
+    resultado = await recalcular_custos_missoes(
+        inicio,
+        fim,
+        session,
+        tamanho_lote=2,
+        progresso=lambda feitas, total: chamadas.append((feitas, total)),
+    )
+
+    total = resultado['missoes']
+    assert total >= 5
+    assert len(chamadas) >= 3
+    assert [f for f, _ in chamadas] == sorted(f for f, _ in chamadas)
+    assert chamadas[-1] == (total, total)
+    assert resultado['comissionamentos'] >= 1
+
+    for missao in missoes:
+        await session.refresh(missao)
+        assert missao.custos['total_dias'] >= 1
+
+    await session.refresh(comiss)
+    assert _valores_cache(comiss) == cache_lote_unico
+
+
+async def test_caches_em_lote_iguais_ao_recalculo_individual(
+    session, user_with_comiss
+):
+    """`recalcular_caches_comiss` (uma query agrupada para todos) grava o
+    mesmo cache que `recalcular_cache_de` comissionamento a comissionamento.
+    """
+    user, comiss = user_with_comiss
+    today = date.today()
+    for i in range(3):
+        ini = today + timedelta(days=5 + i * 3)
+        await _missao_com_militar(
+            session,
+            n_doc=f'73{i:02d}',
+            afast_date=ini,
+            regres_date=ini + timedelta(days=2),
+            user=user,
+            sit='c',
+        )
+    await recalcular_custos_missoes(
+        today + timedelta(days=5), today + timedelta(days=13), session
+    )
+
+    individual = await recalcular_cache_de(comiss, session)
+    await session.commit()
+
+    assert await recalcular_caches_comiss({comiss.id}, session) == 1
+    await session.commit()
+    await session.refresh(comiss)
+
+    em_lote = _valores_cache(comiss)
+    assert em_lote == {k: individual.get(k) for k in CAMPOS_CACHE_COMISS}
+    assert em_lote['missoes_count'] >= 3
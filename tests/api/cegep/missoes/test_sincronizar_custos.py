@@ -0,0 +1,162 @@
+"""Testes de `sincronizar_custos_missao` (invalidação ao salvar missão).
+
+O segundo nível — comissionamentos afetados pelos militares sit='c' da
+missão, nas datas novas e nas antigas — roda em lote: o número de
+statements não cresce com a tripulação nem com os comissionamentos.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from fcontrol_api.services.comis import (
+    recalcular_cache_de,
+    recalcular_caches_comiss,
+)
+from fcontrol_api.services.custos import carregar_caches_custo
+from fcontrol_api.services.missao import sincronizar_custos_missao
+from tests.factories import (
+    ComissFactory,
+    FragMisFactory,
+    PernoiteFragFactory,
+    UserFragFactory,
+)
+
+pytestmark = pytest.mark.anyio
+
+CAMPOS_CACHE_COMISS = (
+    'dias_comp',
+    'diarias_comp',
+    'vals_comp',
+    'modulo',
+    'completude',
+    'missoes_count',
+)
+
+
+def _valores(cache) -> dict:
+    return {k: (cache or {}).get(k) for k in CAMPOS_CACHE_COMISS}
+
+
+async def _comissionar(session, users):
+    today = date.today()
+    comissionamentos = [
+        ComissFactory(
+            user_id=user.id,
+            data_ab=today - timedelta(days=30),
+            data_fc=today + timedelta(days=60),
+            dias_cumprir=60,
+        )
+        for user in users
+    ]
+    session.add_all(comissionamentos)
+    await session.commit()
+    return comissionamentos
+
+
+async def _salvar_missao(session, users, *, n_doc, footprints_antigos=()):
+    """Cria a missão como o router faz e sincroniza os caches."""
+    afast = date.today() + timedelta(days=5)
+    regres = afast + timedelta(days=3)
+    missao = FragMisFactory(
+        n_doc=n_doc,
+        tipo_doc='om',
+        tipo='adm',
+        acrec_desloc=False,
+        indenizavel=True,
+        afast=datetime.combine(afast, time(8, 0)),
+        regres=datetime.combine(regres, time(18, 0)),
+    )
+    session.add(missao)
+    await session.flush()
+
+    pernoite = PernoiteFragFactory(
+        frag_id=missao.id,
+        cidade_id=3550308,
+        data_ini=afast,
+        data_fim=regres,
+        acrec_desloc=False,
+        meia_diaria=False,
+        obs='',
+    )
+    users_frag = [
+        UserFragFactory(frag_id=missao.id, user_id=u.id, sit='c', p_g=u.p_g)
+        for u in users
+    ]
+    session.add_all([pernoite, *users_frag])
+    await session.flush()
+
+    await sincronizar_custos_missao(
+        missao,
+        users_frag,
+        [pernoite],
+        session,
+        '11gt',
+        footprints_antigos=footprints_antigos,
+    )
+    return missao
+
+
+async def test_recalcula_todos_os_comiss_da_tripulacao(session, users):
+    """Cada militar comissionado tem o cache recalculado, com o mesmo
+    resultado do recálculo individual."""
+    comissionamentos = await _comissionar(session, users)
+
+    await _salvar_missao(session, users, n_doc='8001')
+    await session.commit()
+
+    for comiss in comissionamentos:
+        await session.refresh(comiss)
+        assert comiss.cache_calc['missoes_count'] == 1
+        esperado = await recalcular_cache_de(comiss, session)
+        assert _valores(comiss.cache_calc) == _valores(esperado)
+
+
+async def test_footprint_antigo_recalcula_comiss_que_saiu(session, users):
+    """Militar removido na edição (só no footprint antigo) também tem o
+    comissionamento recalculado."""
+    user, other_user = users
+    comiss_user, comiss_other = await _comissionar(session, users)
+    comiss_other.cache_calc = {'missoes_count': 99}
+    await session.commit()
+
+    hoje = date.today()
+    await _salvar_missao(
+        session,
+        [user],
+        n_doc='8002',
+        footprints_antigos=((other_user.id, hoje, hoje),),
+    )
+    await session.commit()
+
+    await session.refresh(comiss_other)
+    assert comiss_other.cache_calc['missoes_count'] == 0
+    await session.refresh(comiss_user)
+    assert comiss_user.cache_calc['missoes_count'] == 1
+
+
+async def test_statements_nao_crescem_com_a_tripulacao(session, users):
+    """Um ou dois militares comissionados: mesma quantidade de statements
+    na sincronização."""
+    comissionamentos = await _comissionar(session, users)
+    await recalcular_caches_comiss({c.id for c in comissionamentos}, session)
+    await carregar_caches_custo(session)
+
+    conexao = (await session.connection()).sync_connection
+    contagens = []
+
+    for n_doc, tripulacao in (('8003', users[:1]), ('8004', users)):
+        statements = []
+
+        def contar(conn, cursor, stmt, params, context, executemany):
+            statements.append(stmt)
+
+        event.listen(conexao, 'before_cursor_execute', contar)
+        try:
+            await _salvar_missao(session, tripulacao, n_doc=n_doc)
+        finally:
+            event.remove(conexao, 'before_cursor_execute', contar)
+        contagens.append(len(statements))
+
+    assert contagens[0] == contagens[1]
@@ -22,6 +22,7 @@ from fcontrol_api.models.estatistica.etapa import (
     TipoMissao,
 )
 from fcontrol_api.models.shared.aeronaves import Aeronave
+from fcontrol_api.services.horas_mes import reconstruir_horas_mes
 
 pytestmark = pytest.mark.anyio
 
@@ -151,6 +152,7 @@ async def test_default_inclui_simulador(client, session, token):
     sml = await _programa(session, sub_prog='SML')
     await _aloc(session, normal.id, alocado=100)
     await _aloc(session, sml.id, alocado=50, meses=[50] + [0] * 11)
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     data = await _get(client, token)
@@ -181,6 +183,7 @@ async def test_simulador_false_exclui_sml_itens_e_totais(
     await _voado(
         session, sml.id, tvoo=30, mes=3, tipo_missao_id=tipo_missao.id
     )
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     data = await _get(client, token, simulador=False)
@@ -211,6 +214,7 @@ async def test_item_so_voado_sem_alocacao(client, session, token, tipo_missao):
     await _voado(
         session, sml.id, tvoo=30, mes=5, tipo_missao_id=tipo_missao.id
     )
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     data = await _get(client, token)
@@ -244,6 +248,7 @@ async def test_isolamento_por_org_e_ano(client, session, token):
     await _aloc(session, esf.id, alocado=100)  # 11gt / 2025 (visível)
     await _aloc(session, esf.id, alocado=500, uae='1gt')  # outra org
     await _aloc(session, esf.id, alocado=700, ano_ref=2024)  # outro ano
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     data = await _get(client, token)
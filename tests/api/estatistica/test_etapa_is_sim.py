@@ -0,0 +1,131 @@
+"""Classificacao simulador/GTT materializada.
+
+`EsforcoAereo.is_sim`/`is_gtt` sao geradas da descricao; `Etapa.is_sim`
+e mantida pelo trigger de `oi_etapa` em qualquer escrita de OI — pela
+rota ou direto pela sessao.
+"""
+
+from datetime import date, time
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from fcontrol_api.models.estatistica.esf_aer import EsforcoAereo
+from fcontrol_api.models.estatistica.etapa import (
+    Etapa,
+    Missao,
+    OIEtapa,
+    TipoMissao,
+)
+from fcontrol_api.models.shared.aeronaves import Aeronave
+
+pytestmark = pytest.mark.anyio
+
+
+def _esf(prog, grupo='COMPREP'):
+    return EsforcoAereo(
+        tipo='AVIAO',
+        modelo='C-105',
+        grupo=grupo,
+        prog=prog,
+        sub_prog=None,
+        aplicacao=None,
+    )
+
+
+@pytest.fixture
+async def cenario(session):
+    voo, sml, gtt = _esf('PRPO'), _esf('SML'), _esf('PRPO', grupo='GTT')
+    tipo = TipoMissao(cod='ADT', desc='Adestramento')
+    missao = Missao(titulo=None, obs=None, uae='11gt')
+    session.add_all([
+        Aeronave(matricula='2850', active=True, sit='DI', obs=None),
+        voo,
+        sml,
+        gtt,
+        tipo,
+        missao,
+    ])
+    await session.flush()
+
+    etapa = Etapa(
+        missao_id=missao.id,
+        obs=None,
+        data=date(2025, 3, 10),
+        origem='SBGL',
+        destino='SBGL',
+        dep=time(10, 0),
+        arr=time(12, 0),
+        anv='2850',
+        pousos=1,
+        tow=None,
+        pax=None,
+        carga=None,
+        comb=None,
+        lub=None,
+        nivel=None,
+        sagem=True,
+        parte1=True,
+    )
+    session.add(etapa)
+    await session.flush()
+    return {
+        'etapa': etapa.id,
+        'voo': voo,
+        'sml': sml,
+        'gtt': gtt,
+        'tipo': tipo,
+    }
+
+
+async def _is_sim(session, etapa_id):
+    return await session.scalar(
+        select(Etapa.is_sim).where(Etapa.id == etapa_id)
+    )
+
+
+def _oi(cenario, esf, tvoo=60):
+    return OIEtapa(
+        etapa_id=cenario['etapa'],
+        esf_aer_id=cenario[esf].id,
+        tvoo=tvoo,
+        reg='d',
+        tipo_missao_id=cenario['tipo'].id,
+    )
+
+
+async def test_esforco_classificado_pela_descricao(session, cenario):
+    flags = [
+        (esf.is_sim, esf.is_gtt)
+        for esf in (cenario['voo'], cenario['sml'], cenario['gtt'])
+    ]
+    assert flags == [(False, False), (True, False), (False, True)]
+
+
+async def test_trigger_acompanha_insert_update_delete_de_oi(session, cenario):
+    etapa_id = cenario['etapa']
+    assert await _is_sim(session, etapa_id) is False
+
+    session.add_all([_oi(cenario, 'voo'), _oi(cenario, 'sml')])
+    await session.flush()
+    assert await _is_sim(session, etapa_id) is True
+
+    # Trocar o programa da OI de simulador para voo real desclassifica.
+    await session.execute(
+        update(OIEtapa)
+        .where(OIEtapa.esf_aer_id == cenario['sml'].id)
+        .values(esf_aer_id=cenario['gtt'].id)
+    )
+    assert await _is_sim(session, etapa_id) is False
+
+    await session.execute(
+        update(OIEtapa)
+        .where(OIEtapa.esf_aer_id == cenario['gtt'].id)
+        .values(esf_aer_id=cenario['sml'].id)
+    )
+    assert await _is_sim(session, etapa_id) is True
+
+    await session.execute(
+        delete(OIEtapa).where(OIEtapa.esf_aer_id == cenario['sml'].id)
+    )
+    assert await _is_sim(session, etapa_id) is False
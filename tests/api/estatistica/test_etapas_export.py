@@ -0,0 +1,411 @@
+"""Export de etapas em XLSX (POST /estatistica/etapas/export).
+
+A planilha e escrita em streaming, lote a lote; o arquivo montado tem
+de abrir no openpyxl com o mesmo layout de sempre (titulo, metadados,
+cabecalho, zebra, totais, painel congelado). O export em background
+(`/export/jobs`) grava o mesmo arquivo no storage, enderecado pelo
+conteudo.
+"""
+
+import csv
+import io
+from datetime import date
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+from pyarrow import ipc
+from sqlalchemy import select, update
+
+from fcontrol_api.models.estatistica.esf_aer import EsforcoAereo
+from fcontrol_api.models.estatistica.etapa import Etapa, Missao, TipoMissao
+from fcontrol_api.models.shared.aeronaves import Aeronave
+from fcontrol_api.models.shared.exportacoes import ExportJob
+from fcontrol_api.services import arrow_ipc, exportacoes
+from fcontrol_api.services.dados_etapas import (
+    stream_etapas_arrow,
+    stream_etapas_csv,
+)
+from fcontrol_api.services.documentos import documentos
+from fcontrol_api.services.excel_etapas import stream_etapas_xlsx
+from tests.factories import TripFactory, UserFactory
+
+pytestmark = pytest.mark.anyio
+
+URL = '/estatistica/etapas/export'
+JOBS_URL = f'{URL}/jobs'
+MISSAO_URL = '/estatistica/missao/'
+TODAS = {
+    'pousos': True,
+    'nivel': True,
+    'tow': True,
+    'pax': True,
+    'carga': True,
+    'comb': True,
+    'lub': True,
+    'esforco_aereo': True,
+    'tripulantes': True,
+}
+
+
+def _auth(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _etapa(refs, data, dep, arr):
+    tvoo = (int(arr[:2]) - int(dep[:2])) * 60
+    return {
+        'data': data,
+        'origem': 'sbgl',
+        'destino': 'sbrj',
+        'dep': dep,
+        'arr': arr,
+        'tvoo': tvoo,
+        'anv': '2850',
+        'pousos': 2,
+        'tow': None,
+        'pax': 10,
+        'carga': None,
+        'comb': 5000,
+        'lub': 1.5,
+        'nivel': None,
+        'sagem': True,
+        'parte1': True,
+        'obs': None,
+        'tripulantes': [
+            {'trip_id': refs['trip'], 'func': 'pil', 'func_bordo': 'P1'}
+        ],
+        'oi_etapas': [
+            {
+                'esf_aer_id': refs['esf'],
+                'tipo_missao_id': refs['tipo'],
+                'reg': 'd',
+                'tvoo': tvoo - 30,
+            },
+            {
+                'esf_aer_id': refs['esf'],
+                'tipo_missao_id': refs['tipo'],
+                'reg': 'n',
+                'tvoo': 30,
+            },
+        ],
+        'pqd': [],
+        'revo': [],
+        'heavy_cds': [],
+    }
+
+
+@pytest.fixture
+async def etapa_ids(client, session, token):
+    """Missao da org ativa com 5 etapas (1h a 5h de voo)."""
+    session.add(Aeronave(matricula='2850', active=True, sit='DI', obs=None))
+    user = UserFactory()
+    session.add(user)
+    await session.flush()
+    trip = TripFactory(user_id=user.id, func='pil', trig='abc')
+    esf = EsforcoAereo(
+        tipo='AVIAO',
+        modelo='C-105',
+        grupo='COMPREP',
+        prog='PRPO',
+        sub_prog=None,
+        aplicacao=None,
+    )
+    tipo = TipoMissao(cod='ADT', desc='Adestramento')
+    session.add_all([trip, esf, tipo])
+    await session.commit()
+    refs = {'trip': trip.id, 'esf': esf.id, 'tipo': tipo.id}
+
+    resp = await client.post(
+        f'{MISSAO_URL}with-etapas',
+        json={
+            'titulo': None,
+            'obs': None,
+            'is_simulador': False,
+            'etapas': [
+                _etapa(
+                    refs,
+                    f'2025-03-{10 + i:02d}',
+                    '10:00:00',
+                    f'{11 + i}:00:00',
+                )
+                for i in range(5)
+            ],
+        },
+        headers=_auth(token),
+    )
+    assert resp.status_code == HTTPStatus.CREATED
+    ids = await session.scalars(select(Etapa.id).order_by(Etapa.data))
+    return ids.all()
+
+
+async def test_export_monta_planilha_completa(client, token, etapa_ids):
+    resp = await client.post(
+        URL, json={'ids': etapa_ids, **TODAS}, headers=_auth(token)
+    )
+    assert resp.status_code == HTTPStatus.OK
+    assert 'etapas_11GT_' in resp.headers['content-disposition']
+
+    ws = load_workbook(BytesIO(resp.content)).active
+    assert ws.title == 'Etapas'
+    assert ws['A1'].value.endswith('Relatório de Etapas')
+    assert ws['A1'].font.b
+    assert 'Total de etapas: 5' in ws['A2'].value
+    assert 'TV total: 15:00' in ws['A2'].value
+    assert {str(r) for r in ws.merged_cells.ranges} == {'A1:R1', 'A2:R2'}
+    assert ws.freeze_panes == 'A4'
+    assert ws.auto_filter.ref == 'A3:R3'
+
+    headers = [c.value for c in ws[3]]
+    assert headers[:7] == [
+        'Data',
+        'Origem',
+        'Destino',
+        'DEP',
+        'ARR',
+        'TV',
+        'Aeronave',
+    ]
+    assert headers[-4:] == ['Cod OI', 'Esforço Aéreo', 'D/N/V', 'Tripulantes']
+
+    primeira = [c.value for c in ws[4]]
+    assert primeira[:7] == [
+        '10/03/2025',
+        'SBGL',
+        'SBRJ',
+        '10:00',
+        '11:00',
+        '01:00',
+        '2850',
+    ]
+    assert primeira[7] == 2
+    assert primeira[13] == 1.5
+    assert primeira[14] == 'ADT\nADT'
+    assert primeira[16] == 'D\nN'
+    assert primeira[17] == 'ABC'
+    # Zebra so nas linhas pares de dados; multilinha ganha altura.
+    assert ws['A4'].fill.fgColor.rgb == 'FFF2F6FC'
+    assert ws['A5'].fill.fill_type is None
+    assert ws.row_dimensions[4].height == 30
+
+    total = [c.value for c in ws[9]]
+    assert total[0] == 'TOTAL'
+    assert total[5] == '15:00'
+    assert total[7] == 10
+    assert total[10] == 50
+    assert total[12] == 25000
+    assert total[13] == 7.5
+    assert ws.column_dimensions['A'].width == 12
+
+
+async def test_export_sem_etapas_da_org_404(client, token):
+    resp = await client.post(URL, json={'ids': [999999]}, headers=_auth(token))
+    assert resp.status_code == HTTPStatus.NOT_FOUND
+
+
+async def test_stream_emite_um_pedaco_por_lote(session, etapa_ids):
+    filtro = Etapa.id.in_(etapa_ids) & (Missao.uae == '11gt')
+    pedacos = [
+        pedaco
+        async for pedaco in stream_etapas_xlsx(
+            session,
+            filtro,
+            total=5,
+            total_tvoo=900,
+            columns={'tripulantes': True},
+            tamanho_lote=2,
+        )
+    ]
+    # partes fixas, 3 lotes (2 + 2 + 1) e o fechamento do zip
+    assert len(pedacos) == 5
+
+    ws = load_workbook(BytesIO(b''.join(pedacos))).active
+    datas = [ws.cell(row=r, column=1).value for r in range(4, 9)]
+    assert datas == [f'{10 + i}/03/2025' for i in range(5)]
+    assert ws['A9'].value == 'TOTAL'
+    assert ws.max_column == 8
+
+
+async def test_export_csv_dados_brutos(client, token, etapa_ids):
+    resp = await client.post(
+        URL,
+        params={'format': 'csv'},
+        json={'ids': etapa_ids, **TODAS},
+        headers=_auth(token),
+    )
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.headers['content-type'].startswith('text/csv')
+    assert resp.headers['content-disposition'].endswith('.csv"')
+
+    assert resp.content.startswith(b'\xef\xbb\xbf')
+    linhas = list(
+        csv.DictReader(io.StringIO(resp.content.decode('utf-8-sig')))
+    )
+    assert len(linhas) == 5
+    primeira = linhas[0]
+    assert primeira['id'] == str(etapa_ids[0])
+    assert primeira['data'] == '2025-03-10'
+    assert primeira['origem'] == 'SBGL'
+    assert primeira['dep'] == '10:00'
+    assert primeira['tvoo_min'] == '60'
+    assert not primeira['tow']
+    assert primeira['lub'] == '1.5'
+    assert primeira['cod_oi'] == 'ADT|ADT'
+    assert primeira['reg'] == 'D|N'
+    assert primeira['tripulantes'] == 'ABC'
+
+
+async def test_stream_csv_um_pedaco_por_lote(session, etapa_ids):
+    filtro = Etapa.id.in_(etapa_ids) & (Missao.uae == '11gt')
+    pedacos = [
+        pedaco
+        async for pedaco in stream_etapas_csv(
+            session, filtro, columns={}, tamanho_lote=2
+        )
+    ]
+    # cabecalho e 3 lotes (2 + 2 + 1)
+    assert len(pedacos) == 4
+    assert (
+        pedacos[0]
+        == '\ufeffid,data,origem,destino,dep,arr,tvoo_min,anv\n'.encode()
+    )
+    assert b''.join(pedacos).count(b'\n') == 6
+
+
+async def test_stream_arrow_um_batch_por_lote(session, etapa_ids):
+    filtro = Etapa.id.in_(etapa_ids) & (Missao.uae == '11gt')
+    pedacos = [
+        pedaco
+        async for pedaco in stream_etapas_arrow(
+            session, filtro, columns={}, tamanho_lote=2
+        )
+    ]
+    # schema, 3 lotes (2 + 2 + 1) e o fim do stream
+    assert len(pedacos) == 5
+    assert pedacos[-1] == arrow_ipc.FIM_STREAM
+
+    leitor = ipc.open_stream(b''.join(pedacos))
+    assert [batch.num_rows for batch in leitor] == [2, 2, 1]
+
+
+async def test_export_arrow_stream_ipc(client, token, etapa_ids):
+    resp = await client.post(
+        URL,
+        params={'format': 'arrow'},
+        json={'ids': etapa_ids, **TODAS},
+        headers=_auth(token),
+    )
+    assert resp.status_code == HTTPStatus.OK
+
+    tabela = ipc.open_stream(resp.content).read_all()
+    assert tabela.num_rows == 5
+    assert tabela.column('tvoo_min').to_pylist() == [60, 120, 180, 240, 300]
+    assert tabela.column('data').to_pylist()[0] == date(2025, 3, 10)
+    assert tabela.column('tripulantes').to_pylist()[0] == 'ABC'
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """Bucket em memoria no lugar do S3: {(bucket, path): bytes}."""
+    objetos = {}
+
+    def _upload(bucket, path, fileobj, content_type):
+        objetos[bucket, path] = fileobj.read()
+
+    def _url(bucket, path, expires=900):
+        return f'https://storage.test/{bucket}/{path}'
+
+    monkeypatch.setattr(exportacoes, 'upload_fileobj', _upload)
+    monkeypatch.setattr(exportacoes, 'get_signed_url', _url)
+    return objetos
+
+
+async def test_export_job_gera_no_storage(client, token, etapa_ids, storage):
+    resp = await client.post(
+        JOBS_URL, json={'ids': etapa_ids, **TODAS}, headers=_auth(token)
+    )
+    assert resp.status_code == HTTPStatus.ACCEPTED
+    job = resp.json()['data']
+    assert job['status'] == 'pendente'
+    assert job['url'] is None
+
+    # A background task roda antes de o transport devolver a resposta.
+    resp = await client.get(f'{JOBS_URL}/{job["id"]}', headers=_auth(token))
+    assert resp.status_code == HTTPStatus.OK
+    pronto = resp.json()['data']
+    assert pronto['status'] == 'pronto'
+    assert pronto['file_name'].startswith('etapas_11GT_')
+
+    [(bucket, path)] = storage
+    assert bucket == exportacoes.BUCKET
+    assert path.startswith('etapas/11gt/')
+    assert path.endswith('.xlsx')
+    assert pronto['url'] == f'https://storage.test/{bucket}/{path}'
+    ws = load_workbook(BytesIO(storage[bucket, path])).active
+    assert ws['A9'].value == 'TOTAL'
+    assert documentos.jobs_ativos == 0
+
+
+async def test_export_job_devolve_vaga_se_falhar_antes_de_agendar(
+    client, session, token, etapa_ids, storage, monkeypatch
+):
+    async def _falha():
+        raise RuntimeError('commit falhou')
+
+    monkeypatch.setattr(session, 'commit', _falha)
+
+    with pytest.raises(RuntimeError, match='commit falhou'):
+        await client.post(
+            JOBS_URL, json={'ids': etapa_ids, **TODAS}, headers=_auth(token)
+        )
+
+    assert documentos.jobs_ativos == 0
+    assert storage == {}
+
+
+async def test_export_job_repetido_reaproveita_arquivo(
+    client, token, etapa_ids, storage
+):
+    body = {'ids': etapa_ids, **TODAS}
+    primeiro = await client.post(JOBS_URL, json=body, headers=_auth(token))
+    # Mesmo filtro em outra ordem: mesma chave de conteudo.
+    body['ids'] = list(reversed(etapa_ids))
+    segundo = await client.post(JOBS_URL, json=body, headers=_auth(token))
+
+    assert segundo.json()['data']['id'] == primeiro.json()['data']['id']
+    assert segundo.json()['data']['status'] == 'pronto'
+    assert segundo.json()['data']['url']
+    assert len(storage) == 1
+
+
+async def test_export_job_edicao_de_etapa_gera_de_novo(
+    client, token, etapa_ids, storage
+):
+    body = {'ids': etapa_ids, **TODAS}
+    primeiro = await client.post(JOBS_URL, json=body, headers=_auth(token))
+
+    resp = await client.delete(
+        f'/estatistica/etapas/{etapa_ids[-1]}', headers=_auth(token)
+    )
+    assert resp.status_code == HTTPStatus.OK
+
+    segundo = await client.post(JOBS_URL, json=body, headers=_auth(token))
+    assert segundo.json()['data']['id'] != primeiro.json()['data']['id']
+    assert segundo.json()['data']['status'] == 'pendente'
+    assert len(storage) == 2
+
+
+async def test_export_job_de_outra_org_404(
+    client, session, token, etapa_ids, storage
+):
+    resp = await client.post(
+        JOBS_URL, json={'ids': etapa_ids}, headers=_auth(token)
+    )
+    job_id = resp.json()['data']['id']
+    await session.execute(
+        update(ExportJob).where(ExportJob.id == job_id).values(uae='1gt')
+    )
+
+    resp = await client.get(f'{JOBS_URL}/{job_id}', headers=_auth(token))
+    assert resp.status_code == HTTPStatus.NOT_FOUND
@@ -17,6 +17,7 @@ import pytest
 
 from fcontrol_api.models.estatistica.etapa import Etapa, Missao
 from fcontrol_api.models.shared.aeronaves import Aeronave
+from fcontrol_api.services.horas_mes import reconstruir_horas_mes
 
 pytestmark = pytest.mark.anyio
 
@@ -80,6 +81,7 @@ async def cenario(session):
     await _mk_etapa(session, mis_11.id, anv='2850', tvoo_min=60)
     await _mk_etapa(session, mis_1a.id, anv='2850', tvoo_min=120)
     await _mk_etapa(session, mis_1b.id, anv='2860', tvoo_min=90)
+    await reconstruir_horas_mes(session)
     await session.commit()
 
 
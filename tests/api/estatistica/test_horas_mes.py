@@ -0,0 +1,269 @@
+"""Consolidado mensal de horas (`estatistica.horas_mes_*`).
+
+As rotas de escrita de etapas mantem o consolidado na propria transacao;
+depois de cada operacao ele tem de ser igual a reconstrucao completa
+(`reconstruir_horas_mes`), que e o que o script de deriva grava.
+"""
+
+from datetime import date
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import select
+
+from fcontrol_api.models.estatistica.esf_aer import EsforcoAereo
+from fcontrol_api.models.estatistica.etapa import TipoMissao
+from fcontrol_api.models.estatistica.horas_mes import (
+    HorasMesAnv,
+    HorasMesOI,
+    HorasMesTrip,
+)
+from fcontrol_api.models.shared.aeronaves import Aeronave
+from fcontrol_api.services.horas_mes import reconstruir_horas_mes
+from tests.factories import TripFactory, UserFactory
+
+pytestmark = pytest.mark.anyio
+
+ETAPAS_URL = '/estatistica/etapas/'
+MISSAO_URL = '/estatistica/missao/'
+
+
+def _auth(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+async def refs(session):
+    """Aeronave, tripulante e dois programas (um de simulador)."""
+    session.add(Aeronave(matricula='2850', active=True, sit='DI', obs=None))
+    user = UserFactory()
+    session.add(user)
+    await session.flush()
+    trip = TripFactory(user_id=user.id, func='pil')
+    voo = EsforcoAereo(
+        tipo='AVIAO',
+        modelo='C-105',
+        grupo='COMPREP',
+        prog='PRPO',
+        sub_prog=None,
+        aplicacao=None,
+    )
+    sml = EsforcoAereo(
+        tipo='AVIAO',
+        modelo='C-105',
+        grupo='COMPREP',
+        prog='SML',
+        sub_prog=None,
+        aplicacao=None,
+    )
+    tipo = TipoMissao(cod='ADT', desc='Adestramento')
+    session.add_all([trip, voo, sml, tipo])
+    await session.commit()
+    return {'trip': trip.id, 'voo': voo.id, 'sml': sml.id, 'tipo': tipo.id}
+
+
+def _etapa(refs, data, dep, arr, *, esf='voo'):
+    tvoo = (int(arr[:2]) - int(dep[:2])) * 60
+    return {
+        'data': data,
+        'origem': 'SBGL',
+        'destino': 'SBGL',
+        'dep': dep,
+        'arr': arr,
+        'tvoo': tvoo,
+        'anv': '2850',
+        'pousos': 2,
+        'tow': None,
+        'pax': 10,
+        'carga': None,
+        'comb': 5000,
+        'lub': None,
+        'nivel': None,
+        'sagem': True,
+        'parte1': True,
+        'obs': None,
+        'tripulantes': [
+            {'trip_id': refs['trip'], 'func': 'pil', 'func_bordo': 'P1'}
+        ],
+        'oi_etapas': [
+            {
+                'esf_aer_id': refs[esf],
+                'tipo_missao_id': refs['tipo'],
+                'reg': 'd',
+                'tvoo': tvoo,
+            }
+        ],
+        'pqd': [],
+        'revo': [],
+        'heavy_cds': [],
+    }
+
+
+async def _consolidado(session):
+    linhas = {}
+    for model in (HorasMesAnv, HorasMesOI, HorasMesTrip):
+        rows = await session.execute(select(*model.__table__.c))
+        linhas[model.__tablename__] = sorted(tuple(r) for r in rows.all())
+    return linhas
+
+
+async def _assert_igual_a_reconstrucao(session):
+    mantido = await _consolidado(session)
+    await reconstruir_horas_mes(session)
+    assert await _consolidado(session) == mantido
+    return mantido
+
+
+async def test_rotas_mantem_consolidado(client, session, token, refs):
+    resp = await client.post(
+        f'{MISSAO_URL}with-etapas',
+        json={
+            'titulo': None,
+            'obs': None,
+            'is_simulador': False,
+            'etapas': [
+                _etapa(refs, '2025-03-10', '10:00:00', '12:00:00'),
+                _etapa(refs, '2025-03-20', '10:00:00', '11:00:00'),
+            ],
+        },
+        headers=_auth(token),
+    )
+    assert resp.status_code == HTTPStatus.CREATED
+    missao_id = resp.json()['data']['id']
+
+    linhas = await _assert_igual_a_reconstrucao(session)
+    assert len(linhas['horas_mes_anv']) == 1
+    anv = (await session.scalars(select(HorasMesAnv))).one()
+    assert (anv.mes, anv.etapas, anv.tvoo, anv.pousos, anv.pax) == (
+        3,
+        2,
+        180,
+        4,
+        20,
+    )
+
+    # Etapa avulsa em abril, depois movida para maio: abril esvazia.
+    resp = await client.post(
+        ETAPAS_URL,
+        json={
+            'missao_id': missao_id,
+            **_etapa(refs, '2025-04-02', '10:00:00', '11:00:00'),
+        },
+        headers=_auth(token),
+    )
+    assert resp.status_code == HTTPStatus.CREATED
+    etapa_id = resp.json()['data']['id']
+    await _assert_igual_a_reconstrucao(session)
+
+    resp = await client.put(
+        f'{ETAPAS_URL}{etapa_id}',
+        json={'data': '2025-05-02'},
+        headers=_auth(token),
+    )
+    assert resp.status_code == HTTPStatus.OK
+    await _assert_igual_a_reconstrucao(session)
+    meses = await session.scalars(select(HorasMesAnv.mes).order_by('mes'))
+    assert meses.all() == [3, 5]
+
+    resp = await client.delete(f'{ETAPAS_URL}{etapa_id}', headers=_auth(token))
+    assert resp.status_code == HTTPStatus.OK
+    await _assert_igual_a_reconstrucao(session)
+
+    resp = await client.delete(
+        f'{MISSAO_URL}{missao_id}/com-etapas', headers=_auth(token)
+    )
+    assert resp.status_code == HTTPStatus.OK
+    assert await _assert_igual_a_reconstrucao(session) == {
+        'horas_mes_anv': [],
+        'horas_mes_oi': [],
+        'horas_mes_trip': [],
+    }
+
+
+async def test_update_with_etapas_reagrega_meses_de_origem_e_destino(
+    client, session, token, refs
+):
+    resp = await client.post(
+        f'{MISSAO_URL}with-etapas',
+        json={
+            'titulo': None,
+            'obs': None,
+            'is_simulador': False,
+            'etapas': [
+                _etapa(refs, '2025-06-10', '10:00:00', '12:00:00'),
+                _etapa(refs, '2025-07-10', '10:00:00', '12:00:00'),
+            ],
+        },
+        headers=_auth(token),
+    )
+    missao_id = resp.json()['data']['id']
+    detalhe = await client.get(
+        f'{MISSAO_URL}{missao_id}', headers=_auth(token)
+    )
+    junho, julho = sorted(
+        detalhe.json()['data']['etapas'], key=lambda e: e['data']
+    )
+
+    resp = await client.put(
+        f'{MISSAO_URL}{missao_id}/with-etapas',
+        json={
+            'titulo': None,
+            'obs': None,
+            'delete_ids': [julho['id']],
+            'update': [
+                {
+                    'id': junho['id'],
+                    **_etapa(refs, '2025-08-10', '10:00:00', '13:00:00'),
+                }
+            ],
+            'create': [_etapa(refs, '2025-09-10', '10:00:00', '11:00:00')],
+        },
+        headers=_auth(token),
+    )
+    assert resp.status_code == HTTPStatus.OK
+
+    await _assert_igual_a_reconstrucao(session)
+    tvoo = await session.execute(
+        select(HorasMesAnv.mes, HorasMesAnv.tvoo).order_by(HorasMesAnv.mes)
+    )
+    assert tvoo.all() == [(8, 180), (9, 60)]
+
+
+async def test_sebo_le_consolidado_sem_simulador(client, session, token, refs):
+    resp = await client.post(
+        f'{MISSAO_URL}with-etapas',
+        json={
+            'titulo': None,
+            'obs': None,
+            'is_simulador': False,
+            'etapas': [
+                _etapa(refs, '2024-12-01', '10:00:00', '11:00:00'),
+                _etapa(refs, '2025-02-01', '10:00:00', '12:00:00'),
+                _etapa(refs, '2025-02-03', '10:00:00', '13:00:00', esf='sml'),
+            ],
+        },
+        headers=_auth(token),
+    )
+    assert resp.status_code == HTTPStatus.CREATED
+
+    resp = await client.get(
+        '/estatistica/sebo/',
+        params={'func': 'pil', 'ano': 2025},
+        headers=_auth(token),
+    )
+    voo = next(
+        i['voo'] for i in resp.json()['data'] if i['trip_id'] == refs['trip']
+    )
+    assert voo['h_ano'] == 120
+    assert voo['data_ult_voo'] == date(2025, 2, 1).isoformat()
+
+    resp = await client.get(
+        '/estatistica/sebo/',
+        params={'func': 'pil', 'ano': 2024},
+        headers=_auth(token),
+    )
+    voo = next(
+        i['voo'] for i in resp.json()['data'] if i['trip_id'] == refs['trip']
+    )
+    assert voo['h_ano'] == 60
+    assert voo['data_ult_voo'] == date(2024, 12, 1).isoformat()
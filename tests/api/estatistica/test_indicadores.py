@@ -27,6 +27,7 @@ from fcontrol_api.models.estatistica.etapa import (
 )
 from fcontrol_api.models.security.resources import UserRole
 from fcontrol_api.models.shared.aeronaves import Aeronave
+from fcontrol_api.services.horas_mes import reconstruir_horas_mes
 
 pytestmark = pytest.mark.anyio
 
@@ -136,6 +137,7 @@ async def etapa_com_filhas(session, refs):
         HeavyCDS(etapa_id=etapa.id, tipo='cds', peso=300, dist=5, radial=180),
         HeavyCDS(etapa_id=etapa.id, tipo='cds', peso=400, dist=7, radial=270),
     ])
+    await reconstruir_horas_mes(session)
     await session.commit()
     return etapa
 
@@ -241,6 +243,7 @@ async def test_isolamento_cross_org(
     session.add(missao_1gt)
     await session.flush()
     await _mk_etapa(session, missao_1gt.id, anv='2860', carga=777, pax=3)
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     token_1gt = await make_org_token(other, active_org='1gt')
@@ -271,6 +274,7 @@ async def test_simulador_fica_de_fora(client, session, token, refs):
 
     await _mk_etapa(session, real.id, anv='2850', carga=100)
     await _mk_etapa(session, sim.id, anv='2850', carga=9999)
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     resp = await client.get(URL, params={'ano_ref': ANO}, headers=_auth(token))
@@ -301,6 +305,7 @@ async def test_filtro_por_projeto_discrimina(client, session, token, refs):
     await session.flush()
     await _mk_etapa(session, missao.id, anv='2850', carga=100)
     await _mk_etapa(session, missao.id, anv='2860', carga=200)
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     async def _get(**params):
@@ -358,6 +363,7 @@ async def test_etapa_de_outro_ano_nao_entra(client, session, token, refs):
     await _mk_etapa(
         session, missao.id, anv='2850', data=date(ANO + 1, 1, 1), carga=60
     )
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     resp = await client.get(URL, params={'ano_ref': ANO}, headers=_auth(token))
@@ -0,0 +1,199 @@
+"""Planos de consulta dos paineis de estatistica e da escala.
+
+Semeia alguns anos de historico em duas orgs, chama cada endpoint
+capturando os SELECTs que ele emite e roda `EXPLAIN` de cada um com
+`enable_seqscan = off`. Nesse modo o Postgres so escolhe Seq Scan quando
+nenhum indice atende o predicado — ou seja, quando um filtro voltou a
+ser nao sargable (ex.: `extract('year', data) == ano`) ou um indice
+composto foi perdido. Tabelas pequenas do dominio (aeronaves, esforco
+aereo, quads...) ficam de fora: so as tabelas de volume sao checadas.
+"""
+
+import json
+from datetime import date, time
+
+import pytest
+from sqlalchemy import event, text
+
+from fcontrol_api.models.estatistica.esf_aer import EsforcoAereo
+from fcontrol_api.models.estatistica.etapa import TipoMissao
+from fcontrol_api.models.shared.aeronaves import Aeronave
+from fcontrol_api.services.horas_mes import reconstruir_horas_mes
+from tests.factories import TripFactory, UserFactory
+
+pytestmark = pytest.mark.anyio
+
+ANO = 2025
+# Tabelas brutas: nenhuma leitura completa (Seq Scan ou indice sem
+# condicao). O consolidado mensal so e protegido contra Seq Scan: o
+# "ultimo voo" da escala agrega de proposito todo o historico da org, e o
+# planner pode percorrer o indice de trip_id inteiro para agrupar.
+TABELAS_BRUTAS = {'missao', 'etapas', 'oi_etapa', 'trip_etapa'}
+TABELAS_CONSOLIDADO = {'horas_mes_anv', 'horas_mes_oi', 'horas_mes_trip'}
+
+ENDPOINTS = [
+    ('/estatistica/esfaer/', {'ano_ref': ANO}),
+    ('/estatistica/horas-anv/', {'ano_ref': ANO}),
+    ('/estatistica/indicadores/', {'ano_ref': ANO}),
+    ('/estatistica/sebo/', {'func': 'pil', 'ano': ANO}),
+    (
+        '/estatistica/etapas/',
+        {'data_ini': f'{ANO}-03-01', 'data_fim': f'{ANO}-03-31'},
+    ),
+    (
+        '/ops/escala/disponiveis',
+        {
+            'date_start': f'{ANO}-06-01',
+            'date_end': f'{ANO}-06-30',
+            'tipo_quad_id': 1,
+            'funcs': ['pil'],
+            'sort': 'horas_voo',
+        },
+    ),
+]
+
+
+def _auth(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+async def historico(session):
+    """~11 anos de etapas em '11gt' e '1gt', com OI e tripulante."""
+    session.add(Aeronave(matricula='2850', active=True, sit='DI', obs=None))
+    esfs = [
+        EsforcoAereo(
+            tipo='AVIAO',
+            modelo='C-105',
+            grupo='COMPREP',
+            prog=prog,
+            sub_prog=None,
+            aplicacao=None,
+        )
+        for prog in ('PRPO', 'SML')
+    ]
+    tipo = TipoMissao(cod='ADT', desc='Adestramento')
+    users = [UserFactory() for _ in range(10)]
+    session.add_all([*esfs, tipo, *users])
+    await session.flush()
+    trips = [
+        TripFactory(
+            user_id=u.id, uae='11gt', func='pil', data_op=date(2020, 1, 1)
+        )
+        for u in users
+    ]
+    session.add_all(trips)
+    await session.flush()
+
+    params = {
+        'esf_voo': esfs[0].id,
+        'esf_sml': esfs[1].id,
+        'tipo': tipo.id,
+        'trips': [t.id for t in trips],
+    }
+    await session.execute(
+        text("""
+            INSERT INTO estatistica.missao (uae, is_simulador)
+            SELECT CASE WHEN g % 2 = 0 THEN '11gt' ELSE '1gt' END,
+                   g % 10 = 0
+            FROM generate_series(1, 200) g
+        """)
+    )
+    await session.execute(
+        text("""
+            INSERT INTO estatistica.etapas (
+                missao_id, data, origem, destino, dep, arr, anv,
+                pousos, sagem, parte1
+            )
+            SELECT m.id, DATE '2015-01-01' + (m.id * 37 + g * 83) % 4000,
+                   'SBGL', 'SBGL', :dep, :arr, '2850', 1, true, true
+            FROM estatistica.missao m, generate_series(1, 20) g
+        """),
+        {'dep': time(10, 0), 'arr': time(12, 0)},
+    )
+    await session.execute(
+        text("""
+            INSERT INTO estatistica.oi_etapa (
+                etapa_id, esf_aer_id, tvoo, reg, tipo_missao_id
+            )
+            SELECT e.id,
+                   CASE WHEN e.id % 7 = 0
+                        THEN CAST(:esf_sml AS smallint)
+                        ELSE CAST(:esf_voo AS smallint) END,
+                   120, 'd', CAST(:tipo AS integer)
+            FROM estatistica.etapas e
+        """),
+        params,
+    )
+    await session.execute(
+        text("""
+            INSERT INTO estatistica.trip_etapa (
+                etapa_id, func, func_bordo, trip_id
+            )
+            SELECT e.id, 'pil', 'P1',
+                   t.ids[1 + e.id % cardinality(t.ids)]
+            FROM estatistica.etapas e,
+                 (SELECT CAST(:trips AS integer[]) AS ids) t
+        """),
+        params,
+    )
+    await reconstruir_horas_mes(session)
+    for tabela in TABELAS_BRUTAS | TABELAS_CONSOLIDADO:
+        await session.execute(text(f'ANALYZE estatistica.{tabela}'))
+
+
+def _leituras_completas(plano: dict) -> set[tuple[str, str]]:
+    """(tabela, no) das tabelas lidas por inteiro: Seq Scan ou varredura
+    de indice sem condicao — o que o planner faz com seqscan desligado
+    quando nenhum indice casa com o filtro."""
+    achados = set()
+    tipo = plano.get('Node Type')
+    if tipo == 'Seq Scan' or (
+        tipo in {'Index Scan', 'Index Only Scan'} and 'Index Cond' not in plano
+    ):
+        achados.add((plano['Relation Name'], tipo))
+    for filho in plano.get('Plans', []):
+        achados |= _leituras_completas(filho)
+    return achados
+
+
+async def _selects_emitidos(session, client, token, url, params):
+    conn = await session.connection()
+    capturados = []
+
+    def _captura(_conn, _cursor, statement, parameters, _ctx, _many):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            capturados.append((statement, parameters))
+
+    event.listen(conn.sync_connection, 'before_cursor_execute', _captura)
+    try:
+        resp = await client.get(url, params=params, headers=_auth(token))
+    finally:
+        event.remove(conn.sync_connection, 'before_cursor_execute', _captura)
+    assert resp.status_code == 200, resp.text
+    return capturados
+
+
+@pytest.mark.parametrize(('url', 'params'), ENDPOINTS)
+async def test_endpoints_nao_caem_em_seq_scan(
+    client, session, token, historico, url, params
+):
+    consultas = await _selects_emitidos(session, client, token, url, params)
+    assert consultas
+
+    conn = await session.connection()
+    await conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+    for statement, parameters in consultas:
+        resultado = await conn.exec_driver_sql(
+            f'EXPLAIN (FORMAT JSON) {statement}', parameters
+        )
+        plano = resultado.scalar()
+        if isinstance(plano, str):
+            plano = json.loads(plano)
+        completas = {
+            (tabela, tipo)
+            for tabela, tipo in _leituras_completas(plano[0]['Plan'])
+            if tabela in TABELAS_BRUTAS
+            or (tabela in TABELAS_CONSOLIDADO and tipo == 'Seq Scan')
+        }
+        assert not completas, f'{sorted(completas)}:\n{statement}'
@@ -9,7 +9,10 @@ from datetime import date, datetime
 from http import HTTPStatus
 
 import pytest
+from sqlalchemy import select
 
+from fcontrol_api.models.security.logs import UserActionLog
+from fcontrol_api.services.logs import log_snapshot_action
 from tests.factories import UserActionLogFactory
 
 pytestmark = pytest.mark.anyio
@@ -326,3 +329,87 @@ async def test_list_user_actions_without_token(client):
     response = await client.get('/logs/user-actions')
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+async def test_list_user_actions_so_metadados(
+    client, token_sistema, user_action_logs
+):
+    """A listagem nao traz before/after: o conteudo sai no detalhe."""
+    response = await client.get(
+        '/logs/user-actions',
+        headers={'Authorization': f'Bearer {token_sistema}'},
+    )
+
+    item = response.json()['data'][0]
+    assert 'before' not in item
+    assert 'after' not in item
+
+
+async def test_detalhe_user_action_decodifica_json(
+    client, session, users, token_sistema
+):
+    user, _ = users
+    log = UserActionLogFactory(
+        user_id=user.id,
+        action='update',
+        resource='users',
+        resource_id=1,
+        before='{"nome": "A"}',
+        after='{"nome": "B"}',
+    )
+    session.add(log)
+    await session.commit()
+
+    response = await client.get(
+        f'/logs/user-actions/{log.id}',
+        headers={'Authorization': f'Bearer {token_sistema}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()['data']
+    assert data['before'] == {'nome': 'A'}
+    assert data['after'] == {'nome': 'B'}
+    assert data['user']['id'] == user.id
+
+
+async def test_detalhe_user_action_reconstroi_snapshot(
+    client, session, users, token_sistema
+):
+    user, _ = users
+    for antes, depois in [
+        (None, {'tipo': 'a'}),
+        ({'tipo': 'a'}, {'tipo': 'b'}),
+    ]:
+        await log_snapshot_action(
+            session,
+            user_id=user.id,
+            action='update',
+            resource='ops.ordem_missao',
+            resource_id=987654,
+            before=antes,
+            after=depois,
+        )
+    await session.commit()
+    ultimo = await session.scalar(
+        select(UserActionLog)
+        .where(UserActionLog.resource_id == 987654)  # noqa: PLR2004
+        .order_by(UserActionLog.id.desc())
+    )
+
+    response = await client.get(
+        f'/logs/user-actions/{ultimo.id}',
+        headers={'Authorization': f'Bearer {token_sistema}'},
+    )
+
+    data = response.json()['data']
+    assert data['before'] == {'tipo': 'a'}
+    assert data['after'] == {'tipo': 'b'}
+
+
+async def test_detalhe_user_action_inexistente(client, token_sistema):
+    response = await client.get(
+        '/logs/user-actions/99999999',
+        headers={'Authorization': f'Bearer {token_sistema}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -21,6 +21,7 @@ import pytest
 
 from fcontrol_api.models.estatistica.etapa import Etapa, Missao, TripEtapa
 from fcontrol_api.models.shared.aeronaves import Aeronave
+from fcontrol_api.services.horas_mes import reconstruir_horas_mes
 from tests.factories import TripFactory, UserFactory
 
 pytestmark = pytest.mark.anyio
@@ -166,6 +167,7 @@ async def cenario(session, users):
         session, missao.id, oe, tvoo_min=180, func='oe', func_bordo='O3'
     )
 
+    await reconstruir_horas_mes(session)
     await session.commit()
     return {'pil_o3': pil_o3, 'pil_puro': pil_puro, 'oe': oe}
 
@@ -239,6 +241,7 @@ async def test_piloto_sem_voo_na_propria_funcao_fica_zerado(
     await _voo(
         session, missao.id, pil_puro, tvoo_min=60, func='pil', func_bordo='1P'
     )
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     resp = await client.get(
@@ -268,6 +271,7 @@ async def test_horas_de_missao_de_outra_org_nao_contam(
     await _voo(
         session, mis_1gt.id, trip, tvoo_min=300, func='pil', func_bordo='1P'
     )
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     resp = await client.get(
@@ -300,6 +304,7 @@ async def cenario_projetos(session, users):
         func_bordo='1P',
         anv=ANV_OUTRO_PROJ,
     )
+    await reconstruir_horas_mes(session)
     await session.commit()
     return trip
 
@@ -361,6 +366,7 @@ async def test_data_ult_voo_ignora_missao_de_outra_org(
         func_bordo='1P',
         data=date(ANO, 5, 20),
     )
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     resp = await client.get(
@@ -399,6 +405,7 @@ async def test_data_ult_voo_ignora_voo_em_outra_funcao(
         func_bordo='O3',
         data=date(ANO, 5, 20),
     )
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     resp = await client.get(
@@ -436,6 +443,7 @@ async def cenario_data_projetos(session, users):
         anv=ANV_OUTRO_PROJ,
         data=date(ANO, 5, 20),
     )
+    await reconstruir_horas_mes(session)
     await session.commit()
     return trip
 
@@ -486,6 +494,7 @@ async def test_ult_voo_de_ano_anterior_vale_mas_nao_soma_horas(
         func_bordo='1P',
         data=date(ANO - 1, 11, 5),
     )
+    await reconstruir_horas_mes(session)
     await session.commit()
 
     resp = await client.get(
@@ -19,6 +19,7 @@ from sqlalchemy import select
 
 from fcontrol_api.models.security.logs import UserActionLog
 from fcontrol_api.models.shared.om import Etiqueta, OrdemEtapa
+from fcontrol_api.services.logs import snapshot_views
 
 pytestmark = pytest.mark.anyio
 
@@ -79,6 +80,11 @@ async def _logs(session, resource, action=None, resource_id=None):
     return list(result.all())
 
 
+async def _views(session, log):
+    """(before, after) completos do log (os de OM guardam diffs)."""
+    return (await snapshot_views(session, [log]))[log.id]
+
+
 async def _criar_ordem(client, token, **kwargs):
     """Cria uma OM pelo endpoint e devolve o payload de resposta."""
     response = await client.post(
@@ -123,9 +129,8 @@ async def test_create_ordem_loga_snapshot_completo(
     log = logs[0]
     assert log.user_id == user.id
     assert log.resource_id == data['id']
-    assert log.before is None
-
-    after = json.loads(log.after)
+    before, after = await _views(session, log)
+    assert before is None
     assert after['tipo'] == 'instrucao'
     assert after['status'] == 'rascunho'
     assert after['matricula_anv'] == '2850'
@@ -168,7 +173,7 @@ async def test_create_ordem_sem_doc_ref_omite_a_chave(client, session, token):
     await _criar_ordem(client, token)
 
     logs = await _logs(session, RESOURCE, action='create')
-    after = json.loads(logs[0].after)
+    _, after = await _views(session, logs[0])
     assert 'doc_ref' not in after
 
 
@@ -187,7 +192,8 @@ async def test_create_ordem_com_doc_ref_entra_no_snapshot(
     assert response.status_code == HTTPStatus.CREATED
 
     logs = await _logs(session, RESOURCE, action='create')
-    assert json.loads(logs[0].after)['doc_ref'] == 'OFICIO-42'
+    _, after = await _views(session, logs[0])
+    assert after['doc_ref'] == 'OFICIO-42'
 
 
 # ===============================================================
@@ -208,8 +214,9 @@ async def test_update_ordem_loga_before_e_after(client, session, token):
 
     logs = await _logs(session, RESOURCE, action='update')
     assert len(logs) == 1
-    assert json.loads(logs[0].before)['tipo'] == 'instrucao'
-    assert json.loads(logs[0].after)['tipo'] == 'transporte'
+    before, after = await _views(session, logs[0])
+    assert before['tipo'] == 'instrucao'
+    assert after['tipo'] == 'transporte'
 
 
 async def test_update_ordem_sem_mudanca_nao_loga(client, session, token):
@@ -255,8 +262,9 @@ async def test_update_tripulacao_entra_no_diff(
 
     logs = await _logs(session, RESOURCE, action='update')
     assert len(logs) == 1
-    assert json.loads(logs[0].before)['tripulacao'] == []
-    assert json.loads(logs[0].after)['tripulacao'] == [
+    before, after = await _views(session, logs[0])
+    assert before['tripulacao'] == []
+    assert after['tripulacao'] == [
         {
             'funcao': 'pil',
             'tripulante_id': trip.id,
@@ -279,8 +287,9 @@ async def test_update_etapas_removidas_entram_no_diff(client, session, token):
 
     logs = await _logs(session, RESOURCE, action='update')
     assert len(logs) == 1
-    assert len(json.loads(logs[0].before)['etapas']) == 1
-    assert json.loads(logs[0].after)['etapas'] == []
+    before, after = await _views(session, logs[0])
+    assert len(before['etapas']) == 1
+    assert after['etapas'] == []
 
 
 async def test_update_cancelamento_loga(client, session, token):
@@ -304,8 +313,31 @@ async def test_update_cancelamento_loga(client, session, token):
 
     logs = await _logs(session, RESOURCE, action='update')
     assert len(logs) == 2
-    assert json.loads(logs[-1].before)['status'] == 'aprovada'
-    assert json.loads(logs[-1].after)['status'] == 'cancelada'
+    before, after = await _views(session, logs[-1])
+    assert before['status'] == 'aprovada'
+    assert after['status'] == 'cancelada'
+
+
+async def test_update_ordem_grava_so_o_diff(client, session, token):
+    """O update guarda o diff sobre o log anterior, nao o snapshot."""
+    data = await _criar_ordem(client, token, etapas=[_make_etapa()])
+
+    response = await client.put(
+        f'{BASE_URL}{data["id"]}',
+        json={'tipo': 'transporte'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    criacao, update = await _logs(session, RESOURCE, resource_id=data['id'])
+    assert criacao.base_id is None
+    assert update.base_id == criacao.id
+    assert (update.before, update.after) == (None, None)
+    assert update.snapshot == {
+        'n': 1,
+        'before': {},
+        'after': {'set': {'tipo': 'transporte'}},
+    }
 
 
 # ===============================================================
@@ -335,9 +367,9 @@ async def test_delete_ordem_loga_snapshot_anterior(
     logs = await _logs(session, RESOURCE, action='delete')
     assert len(logs) == 1
     assert logs[0].resource_id == data['id']
-    assert logs[0].after is None
 
-    before = json.loads(logs[0].before)
+    before, after = await _views(session, logs[0])
+    assert after is None
     assert before['status'] == 'rascunho'
     assert len(before['etapas']) == 1
     assert len(before['tripulacao']) == 1
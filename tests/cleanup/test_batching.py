@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+
+from fcontrol_api.cleanup import batching
+from fcontrol_api.cleanup.batching import BatchDeleter, locked_ids
+from fcontrol_api.models.security.logs import UserActionLog
+from tests.factories import UserActionLogFactory
+
+pytestmark = pytest.mark.anyio
+
+RESOURCE = 'teste.batching'
+
+
+@pytest.fixture
+async def logs(session, users):
+    user, _ = users
+    session.add_all([
+        UserActionLogFactory(
+            user_id=user.id, action='update', resource=RESOURCE
+        )
+        for _ in range(5)
+    ])
+    await session.commit()
+
+
+@pytest.fixture
+def pausas(monkeypatch):
+    chamadas = []
+
+    async def _sleep(segundos):
+        chamadas.append(segundos)
+
+    monkeypatch.setattr(batching.asyncio, 'sleep', _sleep)
+    return chamadas
+
+
+async def _restantes(session):
+    return await session.scalar(
+        select(func.count()).where(UserActionLog.resource == RESOURCE)
+    )
+
+
+def test_lote_pula_linhas_travadas():
+    stmt = locked_ids(
+        UserActionLog, UserActionLog.resource == RESOURCE, limit=3
+    )
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert 'LIMIT' in sql
+    assert sql.endswith('FOR UPDATE SKIP LOCKED')
+
+
+async def test_apaga_em_lotes_com_pausa(session, logs, pausas):
+    lotes = BatchDeleter(
+        session, batch_size=2, time_budget=60, sleep_seconds=0.5
+    )
+
+    total = await lotes.delete(
+        UserActionLog, UserActionLog.resource == RESOURCE
+    )
+
+    assert total == lotes.rows == 5  # noqa: PLR2004
+    assert [b['rows'] for b in lotes.batches] == [2, 2, 1]
+    assert [b['batch'] for b in lotes.batches] == [1, 2, 3]
+    assert pausas == [0.5, 0.5]
+    assert lotes.complete
+    assert await _restantes(session) == 0
+
+
+async def test_para_ao_estourar_o_orcamento(session, logs, pausas):
+    lotes = BatchDeleter(session, batch_size=2, time_budget=0)
+
+    await lotes.delete(UserActionLog, UserActionLog.resource == RESOURCE)
+
+    assert lotes.rows == 0
+    assert not lotes.complete
+    assert await _restantes(session) == 5  # noqa: PLR2004
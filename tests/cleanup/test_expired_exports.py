@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from fcontrol_api.cleanup.tasks import expired_exports
+from fcontrol_api.cleanup.tasks.expired_exports import count, run
+from fcontrol_api.models.shared.exportacoes import ExportJob
+
+pytestmark = pytest.mark.anyio
+
+
+def _job(chave, expira_em, path=None, status='pronto'):
+    return ExportJob(
+        tipo='etapas',
+        uae='11gt',
+        chave=chave,
+        file_name='etapas.xlsx',
+        expira_em=expira_em,
+        created_by=None,
+        status=status,
+        path=path,
+    )
+
+
+@pytest.fixture
+def apagados(monkeypatch):
+    paths = []
+
+    def _delete(bucket, path):
+        paths.append(path)
+
+    monkeypatch.setattr(expired_exports, 'delete_file', _delete)
+    return paths
+
+
+async def test_cleanup_removes_expired_exports(session, apagados):
+    agora = datetime.now(timezone.utc)
+    vencido = _job('a' * 64, agora - timedelta(hours=1), 'etapas/11gt/a.xlsx')
+    sem_arquivo = _job('b' * 64, agora - timedelta(hours=1), status='erro')
+    vigente = _job('c' * 64, agora + timedelta(hours=1), 'etapas/11gt/c.xlsx')
+    session.add_all([vencido, sem_arquivo, vigente])
+    await session.commit()
+
+    assert await count(session) == 2
+    result = await run(session)
+
+    assert result.status == 'success'
+    assert result.rows_affected == 2
+    assert result.task_name == 'cleanup_expired_exports'
+    assert apagados == ['etapas/11gt/a.xlsx']
+    restantes = await session.scalars(select(ExportJob.chave))
+    assert restantes.all() == ['c' * 64]
+
+
+async def test_cleanup_keeps_job_when_storage_fails(session, monkeypatch):
+    def _falha(bucket, path):
+        raise RuntimeError('storage fora do ar')
+
+    monkeypatch.setattr(expired_exports, 'delete_file', _falha)
+    agora = datetime.now(timezone.utc)
+    session.add(_job('d' * 64, agora - timedelta(hours=1), 'etapas/x.xlsx'))
+    await session.commit()
+
+    result = await run(session)
+
+    assert result.status == 'error'
+    assert result.rows_affected == 0
+    assert 'storage fora do ar' in result.errors[0]
+    # Fica para a proxima execucao.
+    assert await count(session) == 1
+
+
+async def test_cleanup_skips_without_expired_exports(session, apagados):
+    result = await run(session)
+
+    assert result.status == 'skipped'
+    assert apagados == []
@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
 import pytest
-from sqlalchemy import select, update
+from sqlalchemy import select, text, update
 
 from fcontrol_api.cleanup.tasks.old_login_logs import run
 from fcontrol_api.models.security.logs import UserActionLog
@@ -13,7 +13,7 @@ pytestmark = pytest.mark.anyio
 
 async def test_cleanup_removes_old_login_logs(session, users):
     user, _ = users
-    old_date = datetime.now() - timedelta(days=60)
+    old_date = datetime.now() - timedelta(days=90)
 
     log = UserActionLogFactory(
         user_id=user.id,
@@ -44,6 +44,52 @@ async def test_cleanup_removes_old_login_logs(session, users):
     assert remaining is None
 
 
+async def test_cleanup_drops_old_login_partition(session, users):
+    user, _ = users
+    old_date = datetime.now() - timedelta(days=90)
+    particao = f'user_action_logs_{old_date:%Y_%m}_login'
+    await session.execute(
+        text('SELECT security.garantir_particoes_user_action_logs(:inicio)'),
+        {'inicio': old_date.date()},
+    )
+
+    logs = [
+        UserActionLogFactory(
+            user_id=user.id, action=action, resource=resource, resource_id=None
+        )
+        for action, resource in (('login', 'auth'), ('access_denied', 'om'))
+    ]
+    session.add_all(logs)
+    await session.commit()
+    await session.execute(
+        update(UserActionLog)
+        .where(UserActionLog.id.in_([log.id for log in logs]))
+        .values(timestamp=old_date)
+    )
+    await session.commit()
+    # As linhas da partição derrubada vêm da estatística (reltuples)
+    await session.execute(text(f'ANALYZE security."{particao}"'))
+
+    result = await run(session)
+
+    assert result.status == 'success'
+    assert result.rows_affected == 1
+    assert result.details['rows_estimated']
+    assert particao in result.details['partitions_dropped']
+    assert (
+        await session.scalar(
+            text(f"SELECT to_regclass('security.{particao}')")
+        )
+        is None
+    )
+    remaining = await session.scalars(
+        select(UserActionLog.action).where(
+            UserActionLog.id.in_([log.id for log in logs])
+        )
+    )
+    assert list(remaining) == ['access_denied']
+
+
 async def test_cleanup_keeps_recent_login_logs(session, users):
     user, _ = users
 
@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, patch
 import pytest
 from sqlalchemy import select
 
+from fcontrol_api.cleanup import batching
 from fcontrol_api.cleanup.tasks.old_unavailability import (
     cleanup_old_unavailability,
 )
@@ -130,6 +131,35 @@ async def test_cleanup_returns_result_with_metrics(session, users):
     assert 'cutoff_date' in result.details
 
 
+async def test_cleanup_removes_in_batches(session, users, monkeypatch):
+    monkeypatch.setattr(batching.settings, 'CLEANUP_BATCH_SIZE', 1)
+    monkeypatch.setattr(batching.settings, 'CLEANUP_BATCH_SLEEP_SECONDS', 0)
+    user, other_user = users
+    old_date = date.today() - timedelta(days=90)
+
+    indisps = [
+        IndispFactory(
+            user_id=other_user.id,
+            created_by=user.id,
+            date_start=old_date - timedelta(days=5),
+            date_end=old_date,
+        )
+        for _ in range(2)
+    ]
+    session.add_all(indisps)
+    await session.commit()
+
+    result = await cleanup_old_unavailability(session)
+
+    assert result.status == 'success'
+    assert result.rows_affected == 2  # noqa: PLR2004
+    assert [b['rows'] for b in result.batches] == [1, 1]
+    assert sorted(result.details['ids_removed']) == sorted(
+        i.id for i in indisps
+    )
+    assert result.details['complete'] is True
+
+
 async def test_cleanup_with_no_old_indisps(session, users):
     result = await cleanup_old_unavailability(session)
 
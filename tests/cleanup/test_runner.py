@@ -11,6 +11,7 @@ EXPECTED_TASK_NAMES = {
     'cleanup_old_unavailability',
     'cleanup_old_login_logs',
     'cleanup_expired_auth_codes',
+    'cleanup_expired_exports',
 }
 
 
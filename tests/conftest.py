@@ -10,6 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
 from testcontainers.postgres import PostgresContainer
 
+from fcontrol_api.services.auditoria import auditoria
+from fcontrol_api.services.authz_cache import clear_authz_cache
 from tests.seed import SEED_GROUPS
 
 # Configure testcontainers to use Podman
@@ -24,6 +26,32 @@ def anyio_backend():
     return 'asyncio'
 
 
+@pytest.fixture(autouse=True)
+def _isolate_authz_cache():
+    """Zera o cache de autorização entre testes.
+
+    Cada teste roda numa transação desfeita pelo rollback da conexão, que
+    não passa pelos eventos da Session: sem limpar, um grant criado num
+    teste sobreviveria em cache no seguinte.
+    """
+    clear_authz_cache()
+    yield
+    clear_authz_cache()
+
+
+@pytest.fixture(autouse=True)
+def _isolate_auditoria():
+    """Descarta a auditoria em buffer entre testes.
+
+    O buffer grava pelo engine da aplicação, que nos testes não aponta
+    para o banco de teste: quem precisa das linhas chama
+    `auditoria.descarregar(session)`.
+    """
+    auditoria.reset()
+    yield
+    auditoria.reset()
+
+
 @pytest.fixture(scope='session')
 def postgres_container():
     """Start PostgreSQL container for testing"""
@@ -110,3 +138,15 @@ async def session(database_url, run_migrations, seed_data):
         await session.close()
 
     await engine.dispose()
+
+
+@pytest.fixture
+async def db_engine(database_url, run_migrations, seed_data):
+    """Engine na base de teste SEM o rollback do `session`.
+
+    Para testes de concorrência, que precisam de duas transações de
+    verdade: o que for commitado fica, e o próprio teste limpa.
+    """
+    engine = create_async_engine(database_url.replace('psycopg2', 'asyncpg'))
+    yield engine
+    await engine.dispose()
@@ -0,0 +1,89 @@
+"""Micro-benchmark: busca de vigência por índice x varredura linear.
+
+Trava de regressão do ganho de `FaixasVigencia`: um pernoite de 60 dias
+com 6 combinações pg+sit, sobre chaves com muitas faixas de vigência
+(histórico longo de reajustes), não pode voltar a custar uma varredura
+da lista por dia. A referência linear abaixo reproduz a busca antiga.
+"""
+
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fcontrol_api.services.custos.cache_ref import FaixasVigencia, Vigencia
+from fcontrol_api.services.custos.calculo import _faixas
+from fcontrol_api.utils.datas import listar_datas_entre
+
+N_FAIXAS = 60
+INI = date(2026, 1, 1)
+FIM = INI + timedelta(days=59)
+COMBINACOES = [(gp, sit) for gp in (1, 2, 3) for sit in ('c', 'g')]
+GANHO_MINIMO = 10
+
+
+def _historico(valor_base: int) -> list[Vigencia]:
+    """N_FAIXAS faixas mensais fechadas e a vigente por último."""
+    faixas = []
+    ini = date(2021, 1, 1)
+    for i in range(N_FAIXAS):
+        fim = ini + timedelta(days=29)
+        faixas.append(Vigencia(ini, fim, Decimal(valor_base + i)))
+        ini = fim + timedelta(days=1)
+    faixas.append(Vigencia(ini, None, Decimal(valor_base + N_FAIXAS)))
+    return faixas
+
+
+def _busca_linear(lista, data):
+    for item in lista:
+        if item.data_inicio <= data and (
+            item.data_fim is None or data <= item.data_fim
+        ):
+            return item.valor
+    return Decimal('0')
+
+
+def _pernoite_linear(gp, sit, vals, soldos):
+    """Referência: varredura linear de faixas para cada dia."""
+    lista = soldos['cp'] if sit == 'g' else vals[gp, 1]
+    return [_busca_linear(lista, dia) for dia in listar_datas_entre(INI, FIM)]
+
+
+def _pernoite_indexado(gp, sit, vals, soldos):
+    """Mesma etapa (valor de cada dia) pelo caminho de `_custo_pernoite`."""
+    faixas = _faixas(soldos, 'cp') if sit == 'g' else _faixas(vals, (gp, 1))
+    valores = []
+    for de, ate, valor in faixas.trechos(INI, FIM):
+        valores.extend([valor] * ((ate - de).days + 1))
+    return valores
+
+
+def _melhor_tempo(fn, repeticoes=5):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def test_busca_por_indice_supera_varredura_linear():
+    listas = {(gp, 1): _historico(300 + gp) for gp in (1, 2, 3)}
+    soldos_lista = {'cp': _historico(9000)}
+    vals = {k: FaixasVigencia(v) for k, v in listas.items()}
+    soldos = {k: FaixasVigencia(v) for k, v in soldos_lista.items()}
+
+    def indexado():
+        for gp, sit in COMBINACOES:
+            _pernoite_indexado(gp, sit, vals, soldos)
+
+    def linear():
+        for gp, sit in COMBINACOES:
+            _pernoite_linear(gp, sit, listas, soldos_lista)
+
+    # Mesmo resultado dia a dia antes de comparar tempo.
+    for gp, sit in COMBINACOES:
+        assert _pernoite_indexado(gp, sit, vals, soldos) == _pernoite_linear(
+            gp, sit, listas, soldos_lista
+        )
+
+    assert _melhor_tempo(linear) / _melhor_tempo(indexado) >= GANHO_MINIMO
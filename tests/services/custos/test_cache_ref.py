@@ -0,0 +1,148 @@
+"""Testes do cache em processo de carregar_caches_custo (versão no banco)."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from fcontrol_api.models.cegep.diarias import DiariaValor, GrupoPg
+from fcontrol_api.models.shared.posto_grad import Soldo
+from fcontrol_api.services.custos import cache_ref
+from fcontrol_api.services.custos.cache_ref import (
+    FaixasVigencia,
+    Vigencia,
+    carregar_caches_custo,
+    invalidar_caches_custo,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def _cache_limpo():
+    invalidar_caches_custo()
+    yield
+    invalidar_caches_custo()
+
+
+@pytest.fixture
+def cargas(monkeypatch):
+    """Conta as cargas completas das quatro tabelas."""
+    chamadas = []
+    original = cache_ref._carregar
+
+    async def _spy(session):
+        chamadas.append(1)
+        return await original(session)
+
+    monkeypatch.setattr(cache_ref, '_carregar', _spy)
+    return chamadas
+
+
+async def test_reaproveita_entre_chamadas(session, cargas):
+    primeiro = await carregar_caches_custo(session)
+    segundo = await carregar_caches_custo(session)
+
+    assert segundo is primeiro
+    assert len(cargas) == 1
+
+
+async def test_valores_sao_vigencias_imutaveis(session):
+    valores_cache, soldos_cache, _, _ = await carregar_caches_custo(session)
+
+    faixas = next(iter(valores_cache.values()))
+    assert isinstance(faixas, FaixasVigencia)
+    assert all(isinstance(v, Vigencia) for v in faixas)
+    assert list(faixas) == sorted(faixas, key=lambda v: v.data_inicio)
+    assert all(isinstance(v, Vigencia) for v in soldos_cache['2s'])
+
+
+async def test_insercao_de_diaria_invalida(session, cargas):
+    await carregar_caches_custo(session)
+
+    session.add(
+        DiariaValor(
+            grupo_pg=99,
+            grupo_cid=99,
+            valor=Decimal('1.23'),
+            data_inicio=date(2020, 1, 1),
+            data_fim=None,
+        )
+    )
+    await session.flush()
+
+    valores_cache, _, _, _ = await carregar_caches_custo(session)
+    assert len(cargas) == 2
+    assert valores_cache[99, 99].valor_em(date(2026, 1, 1)) == Decimal('1.23')
+
+
+async def test_alteracao_de_soldo_invalida(session, cargas):
+    await carregar_caches_custo(session)
+
+    soldo = await session.scalar(select(Soldo).where(Soldo.pg == '2s'))
+    soldo.valor = Decimal('9999.99')
+    await session.flush()
+
+    _, soldos_cache, _, _ = await carregar_caches_custo(session)
+    assert len(cargas) == 2
+    assert Decimal('9999.99') in {v.valor for v in soldos_cache['2s']}
+
+
+async def test_alteracao_de_grupo_invalida(session, cargas):
+    await carregar_caches_custo(session)
+
+    grupo = await session.scalar(select(GrupoPg).limit(1))
+    grupo.grupo = 42
+    await session.flush()
+
+    _, _, grupos_pg, _ = await carregar_caches_custo(session)
+    assert len(cargas) == 2
+    assert grupos_pg[grupo.pg_short] == 42
+
+
+# --- FaixasVigencia (sem banco) ---
+
+FAIXAS = FaixasVigencia([
+    Vigencia(date(2025, 1, 1), date(2025, 1, 10), Decimal('100')),
+    # lacuna de 11 a 14/01
+    Vigencia(date(2025, 1, 15), date(2025, 1, 31), Decimal('150')),
+    Vigencia(date(2025, 2, 1), None, Decimal('200')),
+])
+
+
+@pytest.mark.parametrize(
+    ('dia', 'esperado'),
+    [
+        (date(2024, 12, 31), Decimal('0')),
+        (date(2025, 1, 1), Decimal('100')),
+        (date(2025, 1, 10), Decimal('100')),
+        (date(2025, 1, 12), Decimal('0')),
+        (date(2025, 1, 15), Decimal('150')),
+        (date(2025, 2, 1), Decimal('200')),
+        (date(2030, 1, 1), Decimal('200')),
+    ],
+)
+def test_valor_em(dia, esperado):
+    assert FAIXAS.valor_em(dia) == esperado
+
+
+def test_trechos_cortam_nas_fronteiras_e_lacunas():
+    trechos = list(FAIXAS.trechos(date(2024, 12, 30), date(2025, 2, 3)))
+
+    assert trechos == [
+        (date(2024, 12, 30), date(2024, 12, 31), Decimal('0')),
+        (date(2025, 1, 1), date(2025, 1, 10), Decimal('100')),
+        (date(2025, 1, 11), date(2025, 1, 14), Decimal('0')),
+        (date(2025, 1, 15), date(2025, 1, 31), Decimal('150')),
+        (date(2025, 2, 1), date(2025, 2, 3), Decimal('200')),
+    ]
+
+
+def test_trechos_dentro_de_uma_faixa():
+    trechos = list(FAIXAS.trechos(date(2025, 1, 3), date(2025, 1, 5)))
+    assert trechos == [(date(2025, 1, 3), date(2025, 1, 5), Decimal('100'))]
+
+
+def test_trechos_intervalo_vazio():
+    assert not list(FAIXAS.trechos(date(2025, 1, 5), date(2025, 1, 4)))
@@ -0,0 +1,196 @@
+"""Teste diferencial: motor por trechos x motor dia a dia.
+
+`_custo_pernoite` calcula por trechos de valor constante. A referência
+abaixo é o motor anterior, dia a dia (cópia congelada, com a busca linear
+de vigência), e serve de oráculo: para missões aleatórias, o JSONB de
+`calcular_custos_frag_mis` tem de sair byte a byte igual com os dois
+motores — `vals`, `subtotal`, totais e `_input_hash`.
+
+As faixas geradas têm lacunas, vigência aberta e reajustes no meio dos
+pernoites, e os pernoites cruzam essas fronteiras de propósito.
+"""
+
+import json
+import random
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+import pytest
+
+from fcontrol_api.enums.posto_grad import PostoGradEnum
+from fcontrol_api.schemas.cegep.custos import (
+    CustoFragMisInput,
+    CustoPernoiteInput,
+    CustoUserFragInput,
+)
+from fcontrol_api.services.custos import calculo
+from fcontrol_api.services.custos.cache_ref import FaixasVigencia, Vigencia
+from fcontrol_api.utils.datas import listar_datas_entre
+
+SEMENTES = range(200)
+GRUPOS_PG = (1, 2, 3, 4)
+GRUPOS_CID = (1, 2, 3)
+CIDADES = {3550308: 1, 5300108: 2, 2611606: 3, 9999999: None}
+BASE = date(2025, 1, 1)
+
+
+# --- Motor de referência (dia a dia) ---------------------------------------
+
+
+def _q(valor):
+    return valor.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def _buscar_linear(lista, data):
+    for item in lista:
+        if item.data_inicio <= data and (
+            item.data_fim is None or data <= item.data_fim
+        ):
+            return item.valor
+    return Decimal('0')
+
+
+def _custo_pernoite_dia_a_dia(
+    pg,
+    sit,
+    ini,
+    fim,
+    gp_pg,
+    gp_cid,
+    meia_diaria,
+    ac_desloc,
+    soldos_cache,
+    vals_cache,
+):
+    custo = {
+        'subtotal': Decimal('0'),
+        'ac_desloc': 0,
+        'vals': [],
+        'dias': 0,
+    }
+    val_ag: dict = {}
+    soldos = list(soldos_cache.get(pg, []))
+    vals = list(vals_cache.get((gp_pg, gp_cid), []))
+
+    dias_validos = listar_datas_entre(ini, fim)
+
+    if sit == 'g':
+        for dia in dias_validos:
+            valor_dia = _q(_buscar_linear(soldos, dia) * Decimal('0.02'))
+            if valor_dia not in val_ag:
+                val_ag[valor_dia] = {'valor': valor_dia, 'qtd': 0}
+            val_ag[valor_dia]['qtd'] += 1
+            custo['subtotal'] += valor_dia
+            custo['dias'] += 1
+    else:
+        for dia in dias_validos[:-1]:
+            valor_dia = _buscar_linear(vals, dia)
+            if valor_dia not in val_ag:
+                val_ag[valor_dia] = {'valor': valor_dia, 'qtd': 0}
+            val_ag[valor_dia]['qtd'] += 1
+            custo['subtotal'] += valor_dia
+            custo['dias'] += 1
+
+        if meia_diaria:
+            valor_ultimo = _buscar_linear(vals, dias_validos[-1])
+            if valor_ultimo not in val_ag:
+                val_ag[valor_ultimo] = {'valor': valor_ultimo, 'qtd': 0}
+            custo['subtotal'] += _q(valor_ultimo * Decimal('0.5'))
+            val_ag[valor_ultimo]['qtd'] += 0.5
+            custo['dias'] += 1
+
+        if ac_desloc:
+            custo['ac_desloc'] = 95
+            custo['subtotal'] += Decimal('95')
+
+    custo['vals'] = list(val_ag.values())
+    return custo
+
+
+# --- Geração aleatória ------------------------------------------------------
+
+
+def _faixas_aleatorias(rng: random.Random, base_valor: int) -> FaixasVigencia:
+    faixas = []
+    ini = BASE + timedelta(days=rng.randint(-30, 30))
+    for _ in range(rng.randint(0, 6)):
+        fim = ini + timedelta(days=rng.randint(0, 60))
+        valor = Decimal(base_valor + rng.randint(0, 50000)) / 100
+        faixas.append(Vigencia(ini, fim, valor))
+        # Lacuna ocasional entre faixas (dias sem valor vigente).
+        ini = fim + timedelta(
+            days=1 + rng.choice((0, 0, 0, rng.randint(1, 9)))
+        )
+    if rng.random() < 0.8:
+        valor = Decimal(base_valor + rng.randint(0, 50000)) / 100
+        faixas.append(Vigencia(ini, None, valor))
+    return FaixasVigencia(faixas)
+
+
+def _caches(rng: random.Random):
+    vals_cache = {
+        (gp, gc): _faixas_aleatorias(rng, 20000)
+        for gp in GRUPOS_PG
+        for gc in GRUPOS_CID
+        if rng.random() < 0.9
+    }
+    soldos_cache = {
+        pg.value: _faixas_aleatorias(rng, 200000)
+        for pg in PostoGradEnum
+        if rng.random() < 0.9
+    }
+    grupos_pg = {
+        pg.value: rng.choice(GRUPOS_PG)
+        for pg in PostoGradEnum
+        if rng.random() < 0.95
+    }
+    grupos_cidade = {c: g for c, g in CIDADES.items() if g is not None}
+    return vals_cache, soldos_cache, grupos_pg, grupos_cidade
+
+
+def _missao(rng: random.Random):
+    users = [
+        CustoUserFragInput(
+            p_g=rng.choice(list(PostoGradEnum)), sit=rng.choice('cgd')
+        )
+        for _ in range(rng.randint(1, 8))
+    ]
+    pernoites = []
+    for i in range(rng.randint(1, 4)):
+        ini = BASE + timedelta(days=rng.randint(-40, 200))
+        pernoites.append(
+            CustoPernoiteInput(
+                id=i + 1,
+                data_ini=ini,
+                data_fim=ini + timedelta(days=rng.randint(0, 90)),
+                meia_diaria=rng.random() < 0.5,
+                acrec_desloc=rng.random() < 0.5,
+                cidade_codigo=rng.choice(list(CIDADES)),
+            )
+        )
+    frag = CustoFragMisInput(acrec_desloc=rng.random() < 0.5)
+    return frag, users, pernoites
+
+
+@pytest.mark.parametrize('semente', SEMENTES)
+def test_jsonb_identico_ao_motor_dia_a_dia(semente, monkeypatch):
+    rng = random.Random(semente)
+    vals_cache, soldos_cache, grupos_pg, grupos_cidade = _caches(rng)
+    frag, users, pernoites = _missao(rng)
+
+    def _calcular():
+        return calculo.calcular_custos_frag_mis(
+            frag,
+            users,
+            pernoites,
+            grupos_pg,
+            grupos_cidade,
+            vals_cache,
+            soldos_cache,
+        )
+
+    por_trechos = _calcular()
+    monkeypatch.setattr(calculo, '_custo_pernoite', _custo_pernoite_dia_a_dia)
+    dia_a_dia = _calcular()
+
+    assert json.dumps(por_trechos) == json.dumps(dia_a_dia)
@@ -0,0 +1,120 @@
+"""Auditoria em buffer (`services/auditoria.py`).
+
+`registrar` só enfileira; os lotes saem por tamanho ou por tempo, numa
+sessão própria. Aqui o buffer grava na conexão do teste (`bind`), então
+tudo some no rollback do fim do teste.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from fcontrol_api.models.security.logs import UserActionLog
+from fcontrol_api.services.auditoria import AuditoriaBuffer
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def usuario(session):
+    user = UserFactory()
+    session.add(user)
+    await session.commit()
+    return user
+
+
+def _buffer(session, **kwargs):
+    opcoes = {'max_lote': 3, 'intervalo': 60, 'max_pendentes': 100}
+    opcoes.update(kwargs)
+    return AuditoriaBuffer(bind=session.bind, **opcoes)
+
+
+async def _logs(session, user):
+    return await session.scalar(
+        select(func.count()).where(UserActionLog.user_id == user.id)
+    )
+
+
+async def _esperar(buffer):
+    await asyncio.gather(*buffer._tarefas)
+
+
+async def test_registrar_so_enfileira(session, usuario):
+    buffer = _buffer(session)
+
+    buffer.registrar(usuario.id, 'access_denied', 'om', after='negado')
+
+    assert await _logs(session, usuario) == 0
+    assert buffer.status()['pendentes'] == 1
+    buffer.reset()
+
+
+async def test_lote_sai_ao_juntar_max_lote(session, usuario):
+    buffer = _buffer(session)
+
+    for _ in range(3):
+        buffer.registrar(usuario.id, 'login', 'auth', after={'client': 'x'})
+    await _esperar(buffer)
+
+    assert await _logs(session, usuario) == 3  # noqa: PLR2004
+    status = buffer.status()
+    assert (status['lotes'], status['gravados']) == (1, 3)
+    assert status['pendentes'] == 0
+
+    log = await session.scalar(
+        select(UserActionLog).where(UserActionLog.user_id == usuario.id)
+    )
+    assert log.after == '{"client": "x"}'
+
+
+async def test_lote_sai_pelo_intervalo(session, usuario):
+    buffer = _buffer(session, intervalo=0.05)
+
+    buffer.registrar(usuario.id, 'login', 'auth')
+    await asyncio.sleep(0.2)
+    await _esperar(buffer)
+
+    assert await _logs(session, usuario) == 1
+    assert buffer.status()['pendentes'] == 0
+
+
+async def test_falha_devolve_o_lote_para_a_fila(session, usuario, monkeypatch):
+    buffer = _buffer(session)
+    for resource in ('a', 'b'):
+        buffer.registrar(usuario.id, 'access_denied', resource)
+
+    async def falha(lote, session):
+        raise RuntimeError('banco fora')
+
+    monkeypatch.setattr(buffer, '_gravar', falha)
+    assert await buffer.descarregar() == 0
+    assert buffer.status()['falhas'] == 1
+    assert [e['resource'] for e in buffer._pendentes] == ['a', 'b']
+
+    monkeypatch.undo()
+    assert await buffer.descarregar() == 2  # noqa: PLR2004
+    assert await _logs(session, usuario) == 2  # noqa: PLR2004
+
+
+async def test_teto_descarta_as_mais_antigas(session, usuario):
+    buffer = _buffer(session, max_pendentes=2)
+
+    for resource in ('a', 'b', 'c'):
+        buffer.registrar(usuario.id, 'access_denied', resource)
+
+    assert buffer.status()['descartados'] == 1
+    assert [e['resource'] for e in buffer._pendentes] == ['b', 'c']
+    buffer.reset()
+
+
+async def test_encerrar_grava_o_que_restou(session, usuario):
+    buffer = _buffer(session)
+    buffer.registrar(usuario.id, 'login', 'auth')
+    buffer.registrar(usuario.id, 'login', 'auth')
+
+    await buffer.encerrar()
+
+    assert await _logs(session, usuario) == 2  # noqa: PLR2004
+    assert buffer._timer is None
@@ -1,8 +1,16 @@
 """Testes para verificar_modulo (afastamento >= 16 dias)."""
 
-from datetime import datetime
+import random
+from datetime import date, datetime, timedelta
 
-from fcontrol_api.services.comis import verificar_modulo
+import pytest
+
+from fcontrol_api.services.comis import (
+    _delta_modulos,
+    afastamentos_continuos,
+    contar_modulos,
+    verificar_modulo,
+)
 
 
 def test_14_dias_consecutivos_retorna_false():
@@ -108,3 +116,91 @@ def test_missoes_sobrepostas_uniao_contigua_ativa_modulo():
         },
     ]
     assert verificar_modulo(missoes) is True
+
+
+def test_contar_modulos_conta_cada_bloco():
+    """Dois afastamentos de 16+ dias separados por folga contam dois
+    módulos; um bloco curto no meio não conta."""
+    intervalos = [
+        (date(2026, 1, 1), date(2026, 1, 16)),
+        (date(2026, 2, 1), date(2026, 2, 5)),
+        (date(2026, 3, 1), date(2026, 3, 10)),
+        (date(2026, 3, 11), date(2026, 3, 20)),
+    ]
+    assert contar_modulos(intervalos) == 2
+    assert contar_modulos([]) == 0
+
+
+def test_delta_modulos_so_olha_a_vizinhanca():
+    """Tirar a missão que emenda dois blocos desfaz o módulo; a variação
+    sai só dos intervalos vizinhos."""
+    vizinhos = {
+        1: (date(2026, 4, 1), date(2026, 4, 6)),
+        2: (date(2026, 4, 7), date(2026, 4, 12)),
+        3: (date(2026, 4, 12), date(2026, 4, 18)),
+    }
+    assert _delta_modulos(vizinhos, 2, None) == -1
+    nova = {
+        'data_afast': date(2026, 4, 7),
+        'data_regres': date(2026, 4, 9),
+    }
+    assert _delta_modulos(vizinhos, 2, nova) == -1
+    assert (
+        _delta_modulos(
+            {1: vizinhos[1], 3: vizinhos[3]},
+            2,
+            {
+                'data_afast': date(2026, 4, 6),
+                'data_regres': date(2026, 4, 12),
+            },
+        )
+        == 1
+    )
+
+
+def test_afastamentos_continuos_janelas_e_maior():
+    """Expõe as janelas de módulo (datas reais) e o maior afastamento."""
+    afast = afastamentos_continuos([
+        (date(2026, 1, 10), date(2026, 1, 20)),
+        (date(2026, 1, 1), date(2026, 1, 9)),
+        (date(2026, 3, 1), date(2026, 3, 5)),
+    ])
+    assert afast.maior == 20
+    assert afast.janelas == [(date(2026, 1, 1), date(2026, 1, 20))]
+
+    curtas = afastamentos_continuos(
+        [(date(2026, 3, 1), date(2026, 3, 5))], minimo=5
+    )
+    assert curtas.janelas == [(date(2026, 3, 1), date(2026, 3, 5))]
+    assert afastamentos_continuos([]).maior == 0
+
+
+def _maior_dia_a_dia(intervalos):
+    """Referência: expande cada dia e conta a maior sequência."""
+    dias = sorted({
+        ini + timedelta(days=n)
+        for ini, fim in intervalos
+        for n in range((fim - ini).days + 1)
+    })
+    maior = atual = 0
+    for i, dia in enumerate(dias):
+        atual = atual + 1 if i and (dia - dias[i - 1]).days == 1 else 1
+        maior = max(maior, atual)
+    return maior
+
+
+@pytest.mark.parametrize('semente', range(50))
+def test_afastamentos_continuos_igual_a_contagem_dia_a_dia(semente):
+    rng = random.Random(semente)
+    base = date(2026, 1, 1)
+    intervalos = []
+    for _ in range(rng.randint(0, 25)):
+        ini = base + timedelta(days=rng.randint(0, 200))
+        intervalos.append((ini, ini + timedelta(days=rng.randint(0, 12))))
+
+    afast = afastamentos_continuos(intervalos)
+
+    assert afast.maior == _maior_dia_a_dia(intervalos)
+    for ini, fim in afast.janelas:
+        dentro = [(i, f) for i, f in intervalos if ini <= i and f <= fim]
+        assert _maior_dia_a_dia(dentro) == (fim - ini).days + 1 >= 16
@@ -0,0 +1,115 @@
+"""Concorrência na reagregação do consolidado (`atualizar_horas_mes`).
+
+Duas transações de verdade (`db_engine`): a segunda reagrega o mesmo mês
+enquanto a primeira ainda não commitou. Os dados são commitados, então a
+fixture limpa tudo no fim.
+"""
+
+import asyncio
+from datetime import date, time
+
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fcontrol_api.models.estatistica.etapa import Etapa, Missao
+from fcontrol_api.models.estatistica.horas_mes import (
+    HorasMesAnv,
+    VersaoEtapas,
+)
+from fcontrol_api.models.shared.aeronaves import Aeronave
+from fcontrol_api.services.horas_mes import atualizar_horas_mes
+
+pytestmark = pytest.mark.anyio
+
+UAE = '11gt'
+ANO = 2001  # mês que nenhum outro teste usa
+MATRICULA = '9901'
+
+
+@pytest.fixture
+async def etapa_comitada(db_engine):
+    async with AsyncSession(db_engine, expire_on_commit=False) as s:
+        versao = await s.scalar(
+            select(VersaoEtapas.versao).where(VersaoEtapas.uae == UAE)
+        )
+        s.add(Aeronave(matricula=MATRICULA, active=True, sit='DI', obs=None))
+        missao = Missao(titulo=None, obs=None, uae=UAE)
+        s.add(missao)
+        await s.flush()
+        s.add(
+            Etapa(
+                missao_id=missao.id,
+                obs=None,
+                data=date(ANO, 1, 10),
+                origem='SBGL',
+                destino='SBGL',
+                dep=time(10, 0),
+                arr=time(11, 0),
+                anv=MATRICULA,
+                pousos=1,
+                tow=None,
+                pax=None,
+                carga=None,
+                comb=None,
+                lub=None,
+                nivel=None,
+                sagem=False,
+                parte1=False,
+            )
+        )
+        await s.commit()
+
+    yield
+
+    async with AsyncSession(db_engine) as s:
+        await s.execute(
+            delete(HorasMesAnv).where(
+                HorasMesAnv.uae == UAE, HorasMesAnv.ano == ANO
+            )
+        )
+        await s.execute(delete(Etapa).where(Etapa.missao_id == missao.id))
+        await s.execute(delete(Missao).where(Missao.id == missao.id))
+        await s.execute(
+            delete(Aeronave).where(Aeronave.matricula == MATRICULA)
+        )
+        if versao is None:
+            await s.execute(
+                delete(VersaoEtapas).where(VersaoEtapas.uae == UAE)
+            )
+        else:
+            await s.execute(
+                update(VersaoEtapas)
+                .where(VersaoEtapas.uae == UAE)
+                .values(versao=versao)
+            )
+        await s.commit()
+
+
+async def test_escritas_simultaneas_no_mesmo_mes(db_engine, etapa_comitada):
+    async def reagregar_e_commitar(session):
+        await atualizar_horas_mes(session, {(UAE, ANO, 1)})
+        await session.commit()
+
+    async with (
+        AsyncSession(db_engine) as primeira,
+        AsyncSession(db_engine) as segunda,
+    ):
+        await atualizar_horas_mes(primeira, {(UAE, ANO, 1)})
+        tarefa = asyncio.create_task(reagregar_e_commitar(segunda))
+        await asyncio.sleep(0.3)
+        # A segunda espera a primeira, em vez de ler o mês pela metade
+        assert not tarefa.done()
+
+        await primeira.commit()
+        await tarefa
+
+    async with AsyncSession(db_engine) as s:
+        linhas = (
+            await s.scalars(
+                select(HorasMesAnv).where(
+                    HorasMesAnv.uae == UAE, HorasMesAnv.ano == ANO
+                )
+            )
+        ).all()
+    assert [(linha.etapas, linha.tvoo) for linha in linhas] == [(1, 60)]
@@ -0,0 +1,158 @@
+"""Snapshots de auditoria em diff (`services/logs.py`).
+
+`log_snapshot_action` guarda keyframes de tempos em tempos e, entre eles,
+o diff estrutural sobre o log anterior do recurso; `snapshot_views`
+reconstrói os before/after completos.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from fcontrol_api.models.security.logs import UserActionLog
+from fcontrol_api.services import logs as logs_service
+from fcontrol_api.services.logs import (
+    aplicar_diff,
+    diff_json,
+    log_snapshot_action,
+    remover_log,
+    snapshot_views,
+)
+from tests.factories import UserFactory
+
+pytestmark = pytest.mark.anyio
+
+RESOURCE = 'teste.snapshot'
+
+
+def _estado(tipo='instrucao', etapas=1, **extra):
+    return {
+        'tipo': tipo,
+        'status': 'rascunho',
+        'etapas': [{'origem': 'SBGL', 'dest': 'SBBR'}] * etapas,
+        'extra': {'doc': 'A', 'obs': 'x'},
+        **extra,
+    }
+
+
+@pytest.mark.parametrize(
+    ('antes', 'depois'),
+    [
+        (_estado(), _estado()),
+        (_estado(), _estado(tipo='transporte')),
+        (_estado(), _estado(etapas=3)),
+        (_estado(), {**_estado(), 'extra': {'doc': 'B'}}),
+        (_estado(), _estado(doc_ref='OF-1')),
+        (_estado(doc_ref='OF-1'), _estado()),
+        (None, _estado()),
+        (_estado(), None),
+    ],
+)
+def test_aplicar_diff_reconstroi_o_depois(antes, depois):
+    copia = None if antes is None else dict(antes)
+
+    assert aplicar_diff(antes, diff_json(antes, depois)) == depois
+    assert antes == copia
+
+
+def test_diff_so_leva_o_que_mudou():
+    patch = diff_json(_estado(), {**_estado(), 'extra': {'doc': 'B'}})
+
+    assert patch == {'sub': {'extra': {'set': {'doc': 'B'}, 'del': ['obs']}}}
+
+
+@pytest.fixture
+async def usuario(session):
+    user = UserFactory()
+    session.add(user)
+    await session.commit()
+    return user
+
+
+async def _gravar(session, user, resource_id, before, after, action='update'):
+    await log_snapshot_action(
+        session,
+        user_id=user.id,
+        action=action,
+        resource=RESOURCE,
+        resource_id=resource_id,
+        before=before,
+        after=after,
+    )
+    await session.flush()
+
+
+async def _logs(session, resource_id):
+    return list(
+        await session.scalars(
+            select(UserActionLog)
+            .where(
+                UserActionLog.resource == RESOURCE,
+                UserActionLog.resource_id == resource_id,
+            )
+            .order_by(UserActionLog.id)
+        )
+    )
+
+
+async def test_historico_reconstroi_cada_versao(session, usuario):
+    versoes = [None] + [_estado(etapas=i) for i in range(1, 6)]
+    for antes, depois in zip(versoes, versoes[1:]):
+        await _gravar(session, usuario, 1, antes, depois)
+
+    logs = await _logs(session, 1)
+    views = await snapshot_views(session, logs)
+
+    assert [views[log.id] for log in logs] == list(zip(versoes, versoes[1:]))
+    assert logs[0].base_id is None
+    assert all(log.base_id == ant.id for ant, log in zip(logs, logs[1:]))
+
+
+async def test_keyframe_a_cada_n_logs(session, usuario, monkeypatch):
+    monkeypatch.setattr(logs_service, 'KEYFRAME_A_CADA', 3)
+    versoes = [_estado(etapas=i) for i in range(8)]
+    for antes, depois in zip(versoes, versoes[1:]):
+        await _gravar(session, usuario, 2, antes, depois)
+
+    logs = await _logs(session, 2)
+
+    assert [log.base_id is None for log in logs] == [
+        True,
+        False,
+        False,
+        True,
+        False,
+        False,
+        True,
+    ]
+    views = await snapshot_views(session, logs[-2:])
+    assert views[logs[-1].id] == (versoes[-2], versoes[-1])
+
+
+async def test_keyframe_na_virada_do_mes(session, usuario):
+    await _gravar(session, usuario, 3, None, _estado())
+    primeiro = (await _logs(session, 3))[0]
+    primeiro.timestamp = datetime.now(timezone.utc).replace(
+        tzinfo=None
+    ) - timedelta(days=40)
+    await session.flush()
+
+    await _gravar(session, usuario, 3, _estado(), _estado(tipo='transporte'))
+
+    assert (await _logs(session, 3))[-1].base_id is None
+
+
+async def test_remover_base_promove_dependente(session, usuario):
+    versoes = [None, _estado(), _estado(tipo='transporte'), _estado(etapas=2)]
+    for antes, depois in zip(versoes, versoes[1:]):
+        await _gravar(session, usuario, 4, antes, depois)
+    _, segundo, _ = await _logs(session, 4)
+
+    await remover_log(session, segundo)
+    await session.flush()
+
+    _, terceiro = await _logs(session, 4)
+    assert terceiro.base_id is None
+    views = await snapshot_views(session, [terceiro])
+    assert views[terceiro.id] == (versoes[2], versoes[3])
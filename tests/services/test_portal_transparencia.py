@@ -0,0 +1,63 @@
+"""Limite de requisições ao Portal da Transparência.
+
+A cota muda com o horário de Brasília (700/min de 00h a 06h, 90/min no
+resto do dia) e o token bucket a aplica por processo.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from fcontrol_api.services import portal_transparencia
+from fcontrol_api.services.portal_transparencia import (
+    LIMITE_DIA,
+    LIMITE_NOITE,
+    LimitadorPortal,
+    limite_por_minuto,
+)
+
+
+@pytest.mark.parametrize(
+    ('agora', 'esperado'),
+    [
+        # 03h UTC = 00h em Brasília: abre a janela da madrugada.
+        (datetime(2026, 10, 17, 3, 0, tzinfo=timezone.utc), LIMITE_NOITE),
+        (datetime(2026, 10, 17, 8, 59, tzinfo=timezone.utc), LIMITE_NOITE),
+        (datetime(2026, 10, 17, 9, 0, tzinfo=timezone.utc), LIMITE_DIA),
+        (datetime(2026, 10, 17, 2, 59, tzinfo=timezone.utc), LIMITE_DIA),
+    ],
+)
+def test_limite_por_minuto_segue_horario_de_brasilia(agora, esperado):
+    assert limite_por_minuto(agora) == esperado
+
+
+@pytest.mark.anyio
+async def test_limitador_respeita_a_taxa(monkeypatch):
+    # 1200/min = 20/s; o balde novo tem 1 ficha: 30 levam ~1,45 s.
+    monkeypatch.setattr(
+        portal_transparencia, 'limite_por_minuto', lambda: 1200
+    )
+    limitador = LimitadorPortal()
+
+    inicio = time.monotonic()
+    await asyncio.gather(*(limitador.adquirir() for _ in range(30)))
+    decorrido = time.monotonic() - inicio
+
+    assert 1.3 <= decorrido < 3  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_limitador_libera_rajada_sem_esperar(monkeypatch):
+    monkeypatch.setattr(
+        portal_transparencia, 'limite_por_minuto', lambda: 1200
+    )
+    limitador = LimitadorPortal()
+    await asyncio.sleep(1)  # enche o balde (capacidade = 1 s de cota)
+
+    inicio = time.monotonic()
+    for _ in range(20):
+        await limitador.adquirir()
+
+    assert time.monotonic() - inicio < 0.1  # noqa: PLR2004
@@ -0,0 +1,18 @@
+"""Desligamento da aplicação (lifespan em fcontrol_api/app.py)."""
+
+import pytest
+
+from fcontrol_api.app import app, lifespan
+from fcontrol_api.routers.aisweb import client as aisweb
+from fcontrol_api.services import portal_transparencia
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_lifespan_fecha_clientes_http():
+    async with lifespan(app):
+        portal = portal_transparencia.portal_client()
+        ais = aisweb.aisweb_client()
+
+    assert portal.is_closed
+    assert ais.is_closed
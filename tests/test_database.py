@@ -0,0 +1,73 @@
+"""Configuração do pool de conexões por modo (fcontrol_api/database.py)."""
+
+import pytest
+from sqlalchemy.pool import NullPool, QueuePool
+
+from fcontrol_api.database import (
+    PoolStats,
+    engine_config,
+    resolve_pool_mode,
+)
+from fcontrol_api.settings import Settings
+
+
+@pytest.mark.parametrize(
+    ('env', 'mode', 'expected'),
+    [
+        ('production', None, 'pgbouncer'),
+        ('development', None, 'queue'),
+        ('production', 'null', 'null'),
+        ('development', 'pgbouncer', 'pgbouncer'),
+    ],
+)
+def test_resolve_pool_mode(env, mode, expected):
+    assert resolve_pool_mode(Settings(ENV=env, DB_POOL_MODE=mode)) == expected
+
+
+def test_resolve_pool_mode_rejects_unknown():
+    with pytest.raises(ValueError, match='DB_POOL_MODE'):
+        resolve_pool_mode(Settings(DB_POOL_MODE='static'))
+
+
+def test_queue_mode_keeps_statement_cache():
+    config = engine_config(
+        Settings(DB_POOL_MODE='queue', DB_POOL_SIZE=3, DB_MAX_OVERFLOW=7)
+    )
+
+    assert issubclass(config['poolclass'], QueuePool)
+    assert config['pool_size'] == 3
+    assert config['max_overflow'] == 7
+    assert 'prepared_statement_cache_size' not in config['connect_args']
+
+
+def test_pgbouncer_mode_disables_statement_cache():
+    config = engine_config(Settings(DB_POOL_MODE='pgbouncer'))
+    connect_args = config['connect_args']
+
+    assert issubclass(config['poolclass'], QueuePool)
+    assert connect_args['statement_cache_size'] == 0
+    assert connect_args['prepared_statement_cache_size'] == 0
+    name_func = connect_args['prepared_statement_name_func']
+    assert name_func() != name_func()
+
+
+def test_default_pool_ceiling_matches_fly_hard_limit():
+    config = engine_config(Settings(DB_POOL_MODE='queue'))
+    assert config['pool_size'] + config['max_overflow'] == 25
+
+
+def test_null_mode():
+    config = engine_config(Settings(DB_POOL_MODE='null'))
+
+    assert issubclass(config['poolclass'], NullPool)
+    assert 'pool_size' not in config
+
+
+def test_pool_stats_percentiles():
+    stats = PoolStats()
+    for ms in range(1, 101):
+        stats.record(ms / 1000)
+
+    assert stats.acquired == 100
+    assert stats.wait_max == pytest.approx(0.1)
+    assert stats.percentile(95) == pytest.approx(0.096)
@@ -19,6 +19,8 @@ from zoneinfo import ZoneInfo
 import pytest
 from fastapi import HTTPException
 from jwt import decode
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 from sqlalchemy import select
 
 from fcontrol_api.models.security.logs import UserActionLog
@@ -32,14 +34,17 @@ from fcontrol_api.models.security.resources import (
 from fcontrol_api.models.shared.users import User
 from fcontrol_api.security import (
     AdminScope,
+    check_password,
     create_access_token,
     ensure_permission_or_owner,
     get_active_org,
     get_admin_scope,
     get_current_user,
+    get_current_user_full,
     get_password_hash,
     has_org_permission,
     has_permission,
+    hash_password,
     permission_checker,
     require_active_org,
     require_admin,
@@ -49,6 +54,14 @@ from fcontrol_api.security import (
     verify_password,
     verify_pkce_challenge,
 )
+from fcontrol_api.services import auth as auth_service
+from fcontrol_api.services.auditoria import auditoria
+from fcontrol_api.services.auth import get_user_authz, get_user_roles
+from fcontrol_api.services.authz_cache import (
+    Principal,
+    bump_authz_version,
+    get_cached_authz,
+)
 from tests.factories import UserFactory
 
 pytestmark = pytest.mark.anyio
@@ -164,6 +177,22 @@ class TestPasswordHashing:
         assert verify_password('mesma', h1)
         assert verify_password('mesma', h2)
 
+    async def test_hash_password_no_pool(self):
+        h = await hash_password('correta')
+        assert await check_password('correta', h) == (True, None)
+        assert await check_password('errada', h) == (False, None)
+
+    async def test_check_password_rehash_com_parametros_antigos(self):
+        """Hash com custo antigo verifica e volta rehasheado."""
+        antigo = PasswordHash((Argon2Hasher(time_cost=1),)).hash('correta')
+
+        confere, novo = await check_password('correta', antigo)
+
+        assert confere is True
+        assert novo is not None
+        assert f't={settings.ARGON2_TIME_COST}' in novo
+        assert verify_password('correta', novo)
+
 
 # --------------------------------------------------------------------------- #
 # PKCE
@@ -305,6 +334,72 @@ class TestGetCurrentUser:
 
         assert result.id == user.id
 
+    async def test_returns_slim_principal(self, session):
+        user = await make_user(session)
+        req = make_request(user_id=user.id, app_client=None)
+
+        result = await get_current_user(req, session)
+
+        assert isinstance(result, Principal)
+        assert result.p_g == user.p_g
+        assert result.first_login == user.first_login
+
+    async def test_principal_cached_per_client(self, session, monkeypatch):
+        user = await make_user(session)
+        await bind_role(session, user, 'user')
+
+        calls = []
+        original = auth_service._load_principal
+
+        async def _spy(*args, **kwargs):
+            calls.append(args[1])
+            return await original(*args, **kwargs)
+
+        monkeypatch.setattr(auth_service, '_load_principal', _spy)
+
+        for client in ('fatcontrol', 'fatcontrol', 'fatbird', 'fatcontrol'):
+            req = make_request(user_id=user.id, app_client=client)
+            try:
+                await get_current_user(req, session)
+            except HTTPException:
+                pass  # fatbird: sem lotação de tripulante → 403
+        assert calls == ['fatcontrol', 'fatbird']
+
+    async def test_deactivation_invalidates_principal(self, session):
+        user = await make_user(session)
+        req = make_request(user_id=user.id, app_client=None)
+        await get_current_user(req, session)
+
+        user.active = False
+        await session.flush()
+
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(req, session)
+        assert exc.value.status_code == HTTPStatus.FORBIDDEN
+
+    async def test_role_revocation_invalidates_principal(self, session):
+        user = await make_user(session)
+        ur = await bind_role(session, user, 'user')
+        req = make_request(user_id=user.id, app_client='fatcontrol')
+        await get_current_user(req, session)
+
+        await session.delete(ur)
+        await session.flush()
+
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(req, session)
+        assert exc.value.status_code == HTTPStatus.FORBIDDEN
+
+    async def test_full_user_on_request(self, session):
+        user = await make_user(session)
+        req = make_request(user_id=user.id, app_client=None)
+        principal = await get_current_user(req, session)
+
+        full = await get_current_user_full(session, principal)
+
+        assert isinstance(full, User)
+        assert full.nome_guerra == user.nome_guerra
+
 
 # --------------------------------------------------------------------------- #
 # require_admin (admin escopado à org ativa)
@@ -628,7 +723,9 @@ class TestPermissionChecker:
         with pytest.raises(HTTPException):
             await checker(session, '11gt', user)
 
-        await session.flush()
+        # Vai para o buffer, não para a sessão da requisição negada.
+        assert auditoria.status()['pendentes'] == 1
+        await auditoria.descarregar(session)
         log = await session.scalar(
             select(UserActionLog).where(
                 UserActionLog.user_id == user.id,
@@ -666,3 +763,91 @@ class TestEnsurePermissionOrOwner:
                 user, session, 'users', 'update', owner_id=user.id + 1000
             )
         assert exc.value.status_code == HTTPStatus.FORBIDDEN
+
+
+# --------------------------------------------------------------------------- #
+# Cache de autorização (services/authz_cache)
+# --------------------------------------------------------------------------- #
+class TestAuthzCache:
+    async def test_second_check_served_from_cache(self, session, monkeypatch):
+        user = await make_user(session)
+        await grant(session, 'ops', 'om', 'update', org='11gt', user=user)
+
+        calls = []
+        original = auth_service._load_user_authz
+
+        async def _spy(*args, **kwargs):
+            calls.append(args[0])
+            return await original(*args, **kwargs)
+
+        monkeypatch.setattr(auth_service, '_load_user_authz', _spy)
+
+        for _ in range(3):
+            assert await has_org_permission(
+                user, session, '11gt', 'om', 'update'
+            )
+        assert calls == [user.id]
+
+    async def test_keyed_by_active_org(self, session):
+        user = await make_user(session)
+        await grant(session, 'ops', 'om', 'update', org='11gt', user=user)
+
+        assert await has_org_permission(user, session, '11gt', 'om', 'update')
+        assert not await has_org_permission(
+            user, session, '1gt', 'om', 'update'
+        )
+
+    async def test_revoked_grant_invalidates(self, session):
+        user = await make_user(session)
+        await grant(session, 'ops', 'om', 'update', org='11gt', user=user)
+        assert await has_org_permission(user, session, '11gt', 'om', 'update')
+
+        rp = await session.scalar(
+            select(RolePermissions)
+            .join(Roles, Roles.id == RolePermissions.role_id)
+            .where(Roles.name == 'ops')
+        )
+        await session.delete(rp)
+        await session.flush()
+
+        assert not await has_org_permission(
+            user, session, '11gt', 'om', 'update'
+        )
+
+    async def test_new_user_role_invalidates(self, session):
+        user = await make_user(session)
+        assert not await has_org_permission(
+            user, session, '11gt', 'qualquer', 'coisa'
+        )
+
+        await bind_role(session, user, 'admin', org='11gt')
+
+        assert await has_org_permission(
+            user, session, '11gt', 'qualquer', 'coisa'
+        )
+
+    async def test_stale_load_not_stored(self, session, monkeypatch):
+        """Escrita de RBAC durante o carregamento descarta o resultado."""
+        user = await make_user(session)
+        original = auth_service._load_user_authz
+
+        async def _racing(*args, **kwargs):
+            result = await original(*args, **kwargs)
+            bump_authz_version()
+            return result
+
+        monkeypatch.setattr(auth_service, '_load_user_authz', _racing)
+        await get_user_authz(user.id, session, '11gt')
+
+        assert get_cached_authz((user.id, '11gt', None)) is None
+
+    async def test_role_data_contract_preserved(self, session):
+        user = await make_user(session)
+        await grant(session, 'ops', 'om', 'update', org='11gt', user=user)
+
+        data = await get_user_roles(user.id, session, '11gt')
+
+        assert data == {
+            'role': 'ops',
+            'perms': [{'resource': 'om', 'name': 'update'}],
+        }